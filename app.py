@@ -1,13 +1,25 @@
 """TQA Manual - Manuaalinen käännöslaadun arviointi."""
 
+import functools
+
 import streamlit as st
 
 from ui.sidebar import render_sidebar
 from ui.segment_table import render_segment_table
 from ui.annotation_form import render_annotation_panel
-from ui.dashboard import render_dashboard
-from ui.export import render_export_button
-from assessment.scoring import score_segment, score_document
+from ui.portfolio import render_portfolio
+from ui.agreement import render_agreement
+from ui.jobs import collect_finished_jobs, render_job_progress, start_job
+from ui.sampling import reviewed_segments, sample_indices
+from ui.checks import render_checks_button, render_llm_button
+from ui.repetitions import repetition_order
+from ui.memory import refresh_memory_matches
+from ui.shared_project import assessments_version, render_project_updates, session_id
+from ui.session_memory import track_session_memory
+from assessment.profiles import get_profile
+from assessment.scoring import apply_settings, rescore_document, score_assessments
+from jobs.runner import DONE, FAILED
+from perf.trace import rerun as trace_rerun
 from i18n.fi import FI
 
 
@@ -17,6 +29,12 @@ def main():
         layout="wide",
     )
 
+    # Taustatehtävien valmiit tulokset session stateen ennen renderöintiä
+    collect_finished_jobs()
+    # Muiden tarkastajien muutokset jaettuun projektiin
+    render_project_updates()
+    _drop_stale_scores()
+
     st.title(FI["page_title"])
     st.caption(FI["page_subtitle"])
 
@@ -26,20 +44,54 @@ def main():
     segments = st.session_state.get("segments")
     assessments = st.session_state.get("assessments")
 
+    # Välilehdet
+    tab_segments, tab_dashboard, tab_portfolio, tab_agreement = st.tabs(
+        [
+            FI["tab_segments"],
+            FI["tab_dashboard"],
+            FI["tab_portfolio"],
+            FI["tab_agreement"],
+        ]
+    )
+
+    with tab_portfolio:
+        render_portfolio()
+    with tab_agreement:
+        render_agreement()
+
     if not segments:
-        st.markdown(f"### {FI['getting_started']}")
-        st.markdown(FI["getting_started_steps"])
+        with tab_segments:
+            st.markdown(f"### {FI['getting_started']}")
+            st.markdown(FI["getting_started_steps"])
+        with tab_dashboard:
+            st.info(FI["run_assessment_first"])
         return
 
-    # Kaksi valilehtea
-    tab_segments, tab_dashboard = st.tabs(
-        [FI["tab_segments"], FI["tab_dashboard"]]
-    )
-
     with tab_segments:
+        # Virhemuistin osumat haetaan taustalla dokumentin latauksen jälkeen
+        refresh_memory_matches(segments)
+        render_job_progress("memory")
+
         # Segmenttitaulukko
-        st.subheader(f"{len(segments)} {FI['segments_loaded']}")
-        selected_idx = render_segment_table(segments, assessments)
+        indices = sample_indices()
+        if indices is None:
+            st.subheader(f"{len(segments)} {FI['segments_loaded']}")
+        else:
+            st.subheader(
+                FI["sample_active"].format(n=len(indices), total=len(segments))
+            )
+        order = st.radio(
+            FI["segment_order"],
+            ["file", "risk", "repetitions"],
+            format_func=lambda o: FI["segment_orders"][o],
+            horizontal=True,
+            key="segment_order",
+        )
+        if order == "risk":
+            indices = _risk_order(segments, indices)
+        elif order == "repetitions":
+            indices = repetition_order(segments, indices)
+        selected_idx = render_segment_table(segments, assessments, indices)
 
         st.divider()
 
@@ -53,14 +105,36 @@ def main():
         else:
             st.info(FI["select_segment"])
 
-        # Pistelasku-painike
+        # Automaattiset tarkistukset ja pistelasku
         st.divider()
+        render_checks_button(segments)
+        render_llm_button(segments)
         if st.button(FI["calculate_scores"], type="primary"):
             _recalculate_scores(segments, assessments)
-            st.rerun()
+        render_job_progress("score")
 
     with tab_dashboard:
-        if st.session_state.get("document_score"):
+        doc_score = st.session_state.get("document_score")
+        if doc_score:
+            settings = st.session_state.get("scoring_settings")
+            profile = get_profile(st.session_state.get("scoring_profile"))
+            if doc_score.profile != profile.name:
+                # Profiilin vaihto: dokumentin pisteet lasketaan heti
+                # virhemäärien taulukosta, segmenttien pisteet taustalla
+                st.session_state["document_score"] = rescore_document(
+                    doc_score, profile, settings
+                )
+                _recalculate_scores(segments, assessments)
+            else:
+                # Asetusten muutos näkyy heti ilman uutta pisteytystä
+                st.session_state["document_score"] = apply_settings(
+                    doc_score, settings
+                )
+
+            # Yhteenveto tuo plotlyn ja pandasin: tuodaan vasta tarvittaessa
+            from ui.dashboard import render_dashboard
+            from ui.export import render_export_button
+
             render_dashboard()
             st.divider()
             render_export_button()
@@ -68,22 +142,80 @@ def main():
             st.info(FI["run_assessment_first"])
 
 
-def _recalculate_scores(segments, assessments):
-    """Laske pisteet nykyisten virhemerkintoen perusteella."""
-    seg_scores = []
-    for seg, assessment in zip(segments, assessments):
-        seg_score = score_segment(
-            segment_id=seg.id,
-            target_text=seg.target_text,
-            annotations=assessment.annotations,
-        )
-        seg_scores.append(seg_score)
+def _risk_order(segments, indices):
+    """Segmenttien indeksit riskipisteiden mukaan, suurin ensin."""
+    if any(s.risk is None for s in segments):
+        # Vanhat tallennukset: riski lasketaan kerran ja tallennetaan segmentteihin
+        from assessment.risk import segment_risks
+
+        for seg, risk in zip(segments, segment_risks(segments)):
+            seg.risk = risk
+    if indices is None:
+        indices = range(len(segments))
+    return sorted(indices, key=lambda i: -segments[i].risk)
+
 
+def _drop_stale_scores():
+    """Virhemerkintöjen muututtua segmenttien pisteet ja valmis CSV eivät enää päde."""
+    if st.session_state.get("_scored_version") != assessments_version():
+        st.session_state["segment_scores"] = None
+        st.session_state.pop("_export_csv_ready", None)
+
+
+def _recalculate_scores(segments, assessments):
+    """Laske pisteet nykyisten virhemerkintoen perusteella taustalla."""
+    # Otantatarkastuksessa pisteytetään vain otos
+    indices = sample_indices()
+    segments, assessments = reviewed_segments(segments, assessments)
     settings = st.session_state.get("scoring_settings")
-    doc_score = score_document(seg_scores, settings=settings)
-    st.session_state["segment_scores"] = seg_scores
-    st.session_state["document_score"] = doc_score
+    profile = get_profile(st.session_state.get("scoring_profile"))
+    # Avain kuvaa sisällön: arviointien versio, otos, profiili ja asetukset
+    version = assessments_version()
+    sample = None if indices is None else hash(tuple(indices))
+    start_job(
+        "score",
+        f"score:{version}:{sample}:{profile.name}:{sorted((settings or {}).items())}",
+        FI["job_scoring"],
+        _score_job,
+        segments,
+        assessments,
+        settings,
+        profile,
+        indices,
+        on_done=functools.partial(_on_scores_done, version),
+    )
+
+
+def _score_job(job, segments, assessments, settings, profile, indices):
+    return score_assessments(
+        segments,
+        assessments,
+        settings,
+        progress=job.report,
+        profile=profile,
+        indices=indices,
+    )
+
+
+def _on_scores_done(version, job):
+    if job.status == DONE:
+        seg_scores, doc_score = job.result
+        st.session_state["segment_scores"] = seg_scores
+        st.session_state["document_score"] = doc_score
+        # Pisteiden versio; vienti tunnistaa pisteytyksen sen avaimesta
+        st.session_state["_scored_version"] = version
+        st.session_state["_scores_key"] = job.key
+        st.session_state.pop("_export_csv_ready", None)
+    elif job.status == FAILED:
+        st.error(f"Odottamaton virhe: {job.error}")
 
 
 if __name__ == "__main__":
-    main()
+    try:
+        # Kierroksen aikana tehdyt kutsut kirjataan kehittäjäpaneelia varten
+        with trace_rerun(session_id()):
+            main()
+    finally:
+        # Session tilan koko muistibudjettia varten, myös kun kierros
+        # päättyy st.rerun()- tai st.stop()-kutsuun
+        track_session_memory()
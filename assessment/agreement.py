@@ -0,0 +1,335 @@
+"""
+Inter-annotator agreement between reviewers of the same document.
+
+Sessions are aligned by segment id. On each segment, the annotations of all
+reviewers are matched by span overlap with the same sorted-interval sweep as
+assessment/merge: every cluster of overlapping spans is one "error unit", and
+each reviewer labels the unit with the error type and severity of their
+annotation in it, or "None" if they did not mark it.
+
+Metrics (all kappas are computed from count matrices with numpy):
+  - Fleiss' kappa over all reviewers and Cohen's kappa per reviewer pair,
+    for the type and severity labels of the error units
+  - per error type and per severity: agreement on whether a segment has an
+    error of that type/severity (binary Fleiss and mean pairwise Cohen),
+    evaluated for every type at once
+  - Pearson and Spearman correlation of the per-segment error scores of each
+    reviewer pair
+
+Batch use:
+    python -m assessment.agreement a.json b.json c.json --report agreement.json
+"""
+
+import argparse
+import json
+from itertools import combinations
+
+import numpy as np
+from pydantic import BaseModel
+
+from models.session import SessionData, load_session
+from assessment.spans import span_clusters, span_interval
+from assessment.profiles import get_profile
+from assessment.scoring import segment_word_count
+
+NONE_LABEL = "None"
+
+
+class PairAgreement(BaseModel):
+    """Agreement of one reviewer pair (indexes of the input sessions)."""
+
+    reviewers: tuple[int, int]
+    kappa: float | None
+
+
+class PairCorrelation(BaseModel):
+    """Correlation of the segment error scores of one reviewer pair."""
+
+    reviewers: tuple[int, int]
+    pearson: float | None
+    spearman: float | None
+
+
+class CategoryAgreement(BaseModel):
+    """Agreement on whether segments have an error of one type or severity."""
+
+    fleiss_kappa: float | None
+    mean_cohen_kappa: float | None
+    flagged_segments: list[int]  # per reviewer
+
+
+class AgreementReport(BaseModel):
+    """Agreement metrics of two or more reviewers on one document."""
+
+    reviewer_count: int
+    segment_count: int  # segments present in every session
+    unit_count: int  # error units (clusters of overlapping spans)
+    full_agreement_units: int  # units every reviewer labelled the same
+    type_fleiss_kappa: float | None
+    severity_fleiss_kappa: float | None
+    type_cohen_kappa: list[PairAgreement]
+    severity_cohen_kappa: list[PairAgreement]
+    per_type: dict[str, CategoryAgreement]
+    per_severity: dict[str, CategoryAgreement]
+    score_correlation: list[PairCorrelation]
+
+
+def _nan_to_none(value) -> float | None:
+    value = float(value)
+    return None if np.isnan(value) else value
+
+
+def fleiss_kappa(counts) -> np.ndarray:
+    """
+    Fleiss' kappa of a (..., items, categories) array of rater counts.
+
+    Every item must have the same number of raters. Leading dimensions are
+    batched, e.g. one binary table per error type. NaN where kappa is
+    undefined (all raters always chose one category).
+    """
+    counts = np.asarray(counts, dtype=float)
+    raters = counts.sum(axis=-1)
+    n = raters[..., :1]
+    items = counts.shape[-2]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p_item = ((counts * counts).sum(axis=-1) - n) / (n * (n - 1))
+        p_obs = p_item.mean(axis=-1)
+        p_cat = counts.sum(axis=-2) / (items * n)
+        p_exp = (p_cat * p_cat).sum(axis=-1)
+        return (p_obs - p_exp) / (1.0 - p_exp)
+
+
+def cohen_kappa(a, b, n_categories: int) -> float:
+    """Cohen's kappa of two integer label arrays."""
+    a = np.asarray(a, dtype=np.int64)
+    b = np.asarray(b, dtype=np.int64)
+    if len(a) == 0:
+        return float("nan")
+    table = np.bincount(a * n_categories + b, minlength=n_categories**2).reshape(
+        n_categories, n_categories
+    ) / len(a)
+    p_obs = np.trace(table)
+    p_exp = float(table.sum(axis=1) @ table.sum(axis=0))
+    if p_exp == 1.0:
+        return float("nan")
+    return float((p_obs - p_exp) / (1.0 - p_exp))
+
+
+def binary_cohen_kappa(a, b) -> np.ndarray:
+    """Cohen's kappa of (..., items) boolean arrays, batched over leading axes."""
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    p_obs = (a == b).mean(axis=-1)
+    pa, pb = a.mean(axis=-1), b.mean(axis=-1)
+    p_exp = pa * pb + (1 - pa) * (1 - pb)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (p_obs - p_exp) / (1.0 - p_exp)
+
+
+def _spearman(x: np.ndarray, y: np.ndarray) -> float:
+    """Spearman correlation (Pearson of average ranks)."""
+
+    def ranks(v):
+        order = np.argsort(v, kind="stable")
+        r = np.empty(len(v))
+        r[order] = np.arange(len(v))
+        # Average ranks of ties
+        _, inverse, counts = np.unique(v, return_inverse=True, return_counts=True)
+        sums = np.bincount(inverse, weights=r)
+        return (sums / counts)[inverse]
+
+    return _pearson(ranks(x), ranks(y))
+
+
+def _pearson(x: np.ndarray, y: np.ndarray) -> float:
+    if len(x) < 2 or x.std() == 0 or y.std() == 0:
+        return float("nan")
+    return float(np.corrcoef(x, y)[0, 1])
+
+
+def compute_agreement(sessions: list[SessionData]) -> AgreementReport:
+    """Agreement metrics of two or more sessions of the same document."""
+    if len(sessions) < 2:
+        raise ValueError("At least two sessions are required.")
+    n_rev = len(sessions)
+    profile = get_profile(sessions[0].scoring_profile)
+
+    indexes = [
+        {seg.id: pos for pos, seg in enumerate(s.segments)} for s in sessions
+    ]
+    common = [
+        seg.id for seg in sessions[0].segments if all(seg.id in ix for ix in indexes)
+    ]
+
+    # Profile categories first, then any others found in the sessions
+    types = list(profile.error_types)
+    severities = list(profile.severities)
+    for session in sessions:
+        for assessment in session.assessments:
+            for ann in assessment.annotations:
+                if ann.error_type not in types:
+                    types.append(ann.error_type)
+                if ann.severity not in severities:
+                    severities.append(ann.severity)
+    type_index = {t: i for i, t in enumerate(types)}
+    sev_index = {s: i for i, s in enumerate(severities)}
+
+    # Labels of the error units: one row per unit, one column per reviewer
+    unit_types: list[list[str]] = []
+    unit_severities: list[list[str]] = []
+    # Segment-level presence, filled per (segment, reviewer, category)
+    type_flags = np.zeros((len(common), n_rev, len(types)), dtype=bool)
+    sev_flags = np.zeros((len(common), n_rev, len(severities)), dtype=bool)
+    # Per-segment penalty and word count per reviewer
+    penalties = np.zeros((n_rev, len(common)))
+    words = np.zeros(len(common))
+
+    for row, seg_id in enumerate(common):
+        base = sessions[0].segments[indexes[0][seg_id]]
+        words[row] = max(segment_word_count(base), 1)
+        items = []
+        for r, session in enumerate(sessions):
+            for ann in session.assessments[indexes[r][seg_id]].annotations:
+                start, end = span_interval(base.target_text, ann)
+                items.append((start, end, r, ann))
+                penalties[r, row] += profile.penalty(ann.error_type, ann.severity)
+                type_flags[row, r, type_index[ann.error_type]] = True
+                sev_flags[row, r, sev_index[ann.severity]] = True
+
+        for cluster in span_clusters(items):
+            labels_t = [NONE_LABEL] * n_rev
+            labels_s = [NONE_LABEL] * n_rev
+            # A reviewer with several annotations in one unit is labelled by
+            # the first of them in text order
+            for item in sorted(cluster, key=lambda it: (it[0], it[1])):
+                r, ann = item[2], item[3]
+                if labels_t[r] == NONE_LABEL:
+                    labels_t[r] = ann.error_type
+                    labels_s[r] = ann.severity
+            unit_types.append(labels_t)
+            unit_severities.append(labels_s)
+
+    type_fleiss, type_pairs = _unit_agreement(unit_types, [NONE_LABEL, *types])
+    sev_fleiss, sev_pairs = _unit_agreement(
+        unit_severities, [NONE_LABEL, *severities]
+    )
+    full = sum(
+        1
+        for t, s in zip(unit_types, unit_severities)
+        if len(set(t)) == 1 and len(set(s)) == 1
+    )
+
+    correlations = []
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = penalties / words * 1000
+    for i, j in combinations(range(n_rev), 2):
+        correlations.append(
+            PairCorrelation(
+                reviewers=(i, j),
+                pearson=_nan_to_none(_pearson(scores[i], scores[j])),
+                spearman=_nan_to_none(_spearman(scores[i], scores[j])),
+            )
+        )
+
+    return AgreementReport(
+        reviewer_count=n_rev,
+        segment_count=len(common),
+        unit_count=len(unit_types),
+        full_agreement_units=full,
+        type_fleiss_kappa=type_fleiss,
+        severity_fleiss_kappa=sev_fleiss,
+        type_cohen_kappa=type_pairs,
+        severity_cohen_kappa=sev_pairs,
+        per_type=_category_agreement(type_flags, types),
+        per_severity=_category_agreement(sev_flags, severities),
+        score_correlation=correlations,
+    )
+
+
+def _unit_agreement(
+    unit_labels: list[list[str]], categories: list[str]
+) -> tuple[float | None, list[PairAgreement]]:
+    """Fleiss' kappa and pairwise Cohen's kappa of the unit labels."""
+    n_rev = len(unit_labels[0]) if unit_labels else 0
+    index = {c: k for k, c in enumerate(categories)}
+    codes = np.array(
+        [[index[label] for label in unit] for unit in unit_labels], dtype=np.int64
+    ).reshape(len(unit_labels), n_rev)
+
+    counts = np.zeros((len(codes), len(categories)))
+    for r in range(n_rev):
+        np.add.at(counts, (np.arange(len(codes)), codes[:, r]), 1)
+    fleiss = _nan_to_none(fleiss_kappa(counts)) if len(codes) else None
+
+    pairs = [
+        PairAgreement(
+            reviewers=(i, j),
+            kappa=_nan_to_none(cohen_kappa(codes[:, i], codes[:, j], len(categories))),
+        )
+        for i, j in combinations(range(n_rev), 2)
+    ]
+    return fleiss, pairs
+
+
+def _category_agreement(
+    flags: np.ndarray, categories: list[str]
+) -> dict[str, CategoryAgreement]:
+    """Binary per-category agreement from a (segments, reviewers, categories) array."""
+    n_seg, n_rev, _ = flags.shape
+    # (categories, segments, [present, absent]) rater counts
+    present = flags.sum(axis=1).T
+    counts = np.stack([present, n_rev - present], axis=-1)
+    fleiss = fleiss_kappa(counts) if n_seg else np.full(len(categories), np.nan)
+
+    by_reviewer = flags.transpose(1, 2, 0)  # (reviewers, categories, segments)
+    cohen = np.array(
+        [
+            binary_cohen_kappa(by_reviewer[i], by_reviewer[j])
+            for i, j in combinations(range(n_rev), 2)
+        ]
+    )
+    with np.errstate(invalid="ignore"):
+        valid = ~np.isnan(cohen)
+        mean_cohen = np.where(
+            valid.any(axis=0),
+            np.nansum(cohen, axis=0) / np.maximum(valid.sum(axis=0), 1),
+            np.nan,
+        )
+    flagged = flags.sum(axis=0)  # (reviewers, categories)
+
+    return {
+        category: CategoryAgreement(
+            fleiss_kappa=_nan_to_none(fleiss[k]),
+            mean_cohen_kappa=_nan_to_none(mean_cohen[k]),
+            flagged_segments=flagged[:, k].tolist(),
+        )
+        for k, category in enumerate(categories)
+        if flagged[:, k].any()
+    }
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(
+        description="Inter-annotator agreement of TQA session files."
+    )
+    parser.add_argument("sessions", nargs="+", help="Session JSON files")
+    parser.add_argument("--report", help="Agreement report file (JSON)")
+    args = parser.parse_args(argv)
+
+    report = compute_agreement([load_session(p) for p in args.sessions])
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report.model_dump(), f, ensure_ascii=False, indent=2)
+
+    def fmt(value):
+        return "–" if value is None else f"{value:.3f}"
+
+    print(
+        f"{report.segment_count} segments, {report.unit_count} error units, "
+        f"type kappa {fmt(report.type_fleiss_kappa)}, "
+        f"severity kappa {fmt(report.severity_fleiss_kappa)}"
+    )
+
+
+if __name__ == "__main__":
+    main()
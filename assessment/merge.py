@@ -0,0 +1,200 @@
+"""
+Merge sessions of the same document produced by several reviewers.
+
+Sessions are aligned by segment id through one dict index per session.
+Annotations on a segment are clustered by overlapping span intervals; within
+a cluster, annotations from different reviewers with the same error type and
+severity are duplicates and kept once, while differing type/severity is
+reported as a conflict (all variants are kept in the merged session).
+
+Batch use:
+    python -m assessment.merge a.json b.json c.json -o merged.json \
+        --report conflicts.json
+"""
+
+import argparse
+import json
+
+from pydantic import BaseModel
+
+from models.data_models import ErrorAnnotation, SegmentAssessment
+from models.session import SessionData, load_session, session_to_json
+from assessment.spans import span_clusters, span_interval
+
+
+class MergeConflict(BaseModel):
+    """A disagreement between reviewers on one segment."""
+
+    segment_id: int
+    kind: str  # "annotation", "target_text" or "missing"
+    reviewers: list[int]  # indexes of the input sessions
+    detail: str = ""
+    annotations: list[ErrorAnnotation] = []
+
+
+class MergeReport(BaseModel):
+    """Summary of a merge and the conflicts found."""
+
+    reviewer_count: int
+    segment_count: int
+    annotation_count: int
+    duplicate_count: int
+    conflicts: list[MergeConflict]
+
+
+def _merge_segment(seg_id, target_text, entries, stats, conflicts):
+    """Merge the (reviewer, assessment) entries of one segment."""
+    items = []
+    for reviewer, assessment in entries:
+        for ann in assessment.annotations:
+            start, end = span_interval(target_text, ann)
+            items.append((start, end, reviewer, ann))
+
+    merged: list[tuple[int, int, ErrorAnnotation]] = []
+    for cluster in span_clusters(items):
+        by_label: dict[tuple[str, str], list] = {}
+        for item in cluster:
+            by_label.setdefault((item[3].error_type, item[3].severity), []).append(
+                item
+            )
+
+        for group in by_label.values():
+            # Keep every annotation of the first reviewer in the group
+            keeper = group[0][2]
+            for item in group:
+                if item[2] == keeper:
+                    merged.append((item[0], item[2], item[3]))
+                else:
+                    stats["duplicates"] += 1
+
+        reviewers = sorted({item[2] for item in cluster})
+        if len(by_label) > 1 and len(reviewers) > 1:
+            conflicts.append(
+                MergeConflict(
+                    segment_id=seg_id,
+                    kind="annotation",
+                    reviewers=reviewers,
+                    detail=", ".join(
+                        f"{et}/{sev}" for et, sev in by_label.keys()
+                    ),
+                    annotations=[item[3] for item in cluster],
+                )
+            )
+
+    # Text order; spans not found in the target go last
+    merged.sort(key=lambda m: (m[0] < 0, m[0], m[1]))
+    annotations = [m[2] for m in merged]
+    stats["annotations"] += len(annotations)
+
+    comments = []
+    for _, assessment in entries:
+        comment = assessment.overall_comment.strip()
+        if comment and comment not in comments:
+            comments.append(comment)
+
+    return SegmentAssessment(
+        annotations=annotations, overall_comment="\n".join(comments)
+    )
+
+
+def merge_sessions(sessions: list[SessionData]) -> tuple[SessionData, MergeReport]:
+    """
+    Merge two or more sessions into one session and a conflict report.
+
+    Segment order follows the first session; segments only present in later
+    sessions are appended. Languages, scoring settings and project metadata
+    come from the first session.
+    """
+    if not sessions:
+        raise ValueError("At least one session is required.")
+
+    indexes = [
+        {seg.id: pos for pos, seg in enumerate(s.segments)} for s in sessions
+    ]
+    order: dict[int, None] = {}
+    for s in sessions:
+        for seg in s.segments:
+            order.setdefault(seg.id, None)
+
+    stats = {"annotations": 0, "duplicates": 0}
+    conflicts: list[MergeConflict] = []
+    segments = []
+    assessments = []
+
+    for seg_id in order:
+        present = [r for r, index in enumerate(indexes) if seg_id in index]
+        base = sessions[present[0]].segments[indexes[present[0]][seg_id]]
+
+        if len(present) < len(sessions):
+            conflicts.append(
+                MergeConflict(
+                    segment_id=seg_id,
+                    kind="missing",
+                    reviewers=[r for r in range(len(sessions)) if r not in present],
+                )
+            )
+        differing = [
+            r
+            for r in present
+            if sessions[r].segments[indexes[r][seg_id]].target_text
+            != base.target_text
+        ]
+        if differing:
+            conflicts.append(
+                MergeConflict(segment_id=seg_id, kind="target_text", reviewers=differing)
+            )
+
+        entries = [
+            (r, sessions[r].assessments[indexes[r][seg_id]]) for r in present
+        ]
+        segments.append(base)
+        assessments.append(
+            _merge_segment(seg_id, base.target_text, entries, stats, conflicts)
+        )
+
+    first = sessions[0]
+    merged = SessionData(
+        source_lang=first.source_lang,
+        target_lang=first.target_lang,
+        segments=segments,
+        assessments=assessments,
+        scoring_settings=first.scoring_settings,
+        vendor=first.vendor,
+        delivered=first.delivered,
+    )
+    report = MergeReport(
+        reviewer_count=len(sessions),
+        segment_count=len(segments),
+        annotation_count=stats["annotations"],
+        duplicate_count=stats["duplicates"],
+        conflicts=conflicts,
+    )
+    return merged, report
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(
+        description="Merge TQA session files of the same document."
+    )
+    parser.add_argument("sessions", nargs="+", help="Session JSON files")
+    parser.add_argument("-o", "--output", required=True, help="Merged session file")
+    parser.add_argument("--report", help="Conflict report file (JSON)")
+    args = parser.parse_args(argv)
+
+    merged, report = merge_sessions([load_session(p) for p in args.sessions])
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        f.write(session_to_json(merged))
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report.model_dump(), f, ensure_ascii=False, indent=2)
+
+    print(
+        f"{report.segment_count} segments, {report.annotation_count} annotations, "
+        f"{report.duplicate_count} duplicates removed, "
+        f"{len(report.conflicts)} conflicts"
+    )
+
+
+if __name__ == "__main__":
+    main()
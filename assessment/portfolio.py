@@ -0,0 +1,231 @@
+"""
+Portfolio analytics across many scored documents.
+
+Each document is reduced once, at ingest, to one row of totals (words,
+penalty points, critical errors) plus one row per (error type, severity)
+count. All reports are pandas group-bys over these two frames, so the
+documents are never re-scored and thresholds are applied vectorized.
+"""
+
+from collections import Counter
+
+import pandas as pd
+
+from models.data_models import DocumentScore
+from models.session import SessionData
+from assessment.profiles import get_profile
+from assessment.scoring import (
+    CRITICAL_ERROR_MAX,
+    ERROR_SCORE_THRESHOLD,
+    segment_word_count,
+)
+
+# Label for missing vendor / delivery month
+UNKNOWN = "–"
+
+DOC_COLUMNS = [
+    "doc",
+    "name",
+    "vendor",
+    "lang_pair",
+    "month",
+    "words",
+    "penalty",
+    "critical",
+]
+COUNT_COLUMNS = ["doc", "error_type", "severity", "count", "penalty"]
+
+# Dimensions a portfolio can be grouped by
+GROUP_DIMENSIONS = ["vendor", "lang_pair", "month"]
+
+
+class Portfolio:
+    """Per-document totals and per-document error counts."""
+
+    def __init__(self, docs: pd.DataFrame, counts: pd.DataFrame):
+        self.docs = docs
+        self.counts = counts
+
+    def __len__(self):
+        return len(self.docs)
+
+
+def _month(delivered: str) -> str:
+    return delivered[:7] if len(delivered) >= 7 else UNKNOWN
+
+
+def document_record(
+    name: str,
+    doc_score: DocumentScore,
+    vendor: str = "",
+    source_lang: str = "",
+    target_lang: str = "",
+    delivered: str = "",
+) -> tuple[dict, list[tuple[str, str, int, float]]]:
+    """Reduce a DocumentScore to a totals row and (type, severity, count, penalty) rows."""
+    profile = get_profile(doc_score.profile)
+    counts = []
+    for error_type, by_severity in doc_score.error_type_severity_counts.items():
+        for severity, count in by_severity.items():
+            if count:
+                counts.append(
+                    (
+                        error_type,
+                        severity,
+                        count,
+                        count * profile.penalty(error_type, severity),
+                    )
+                )
+    doc = {
+        "name": name,
+        "vendor": vendor or UNKNOWN,
+        "lang_pair": f"{source_lang} → {target_lang}",
+        "month": _month(delivered),
+        "words": doc_score.total_word_count,
+        "penalty": doc_score.total_penalty,
+        "critical": doc_score.critical_error_count,
+    }
+    return doc, counts
+
+
+def session_record(
+    name: str, session: SessionData
+) -> tuple[dict, list[tuple[str, str, int, float]]]:
+    """
+    Reduce a saved session to portfolio rows.
+
+    Uses the score stored in the session when present; otherwise word counts
+    and annotation counts are tallied in one pass.
+    """
+    if session.document_score is not None:
+        return document_record(
+            name,
+            session.document_score,
+            session.vendor,
+            session.source_lang,
+            session.target_lang,
+            session.delivered,
+        )
+
+    profile = get_profile(session.scoring_profile)
+    tally: Counter = Counter()
+    for assessment in session.assessments:
+        for ann in assessment.annotations:
+            tally[(ann.error_type, ann.severity)] += 1
+    counts = [
+        (et, sev, n, n * profile.penalty(et, sev))
+        for (et, sev), n in tally.items()
+    ]
+    doc = {
+        "name": name,
+        "vendor": session.vendor or UNKNOWN,
+        "lang_pair": f"{session.source_lang} → {session.target_lang}",
+        "month": _month(session.delivered),
+        "words": sum(max(segment_word_count(s), 1) for s in session.segments),
+        "penalty": float(sum(c[3] for c in counts)),
+        "critical": sum(c[2] for c in counts if c[1] == profile.critical_severity),
+    }
+    return doc, counts
+
+
+def build_portfolio(records) -> Portfolio:
+    """Build a Portfolio from (doc, counts) records of document/session_record."""
+    doc_rows = []
+    count_rows = []
+    for doc_idx, (doc, counts) in enumerate(records):
+        doc_rows.append({"doc": doc_idx, **doc})
+        count_rows.extend((doc_idx, *c) for c in counts)
+
+    docs = pd.DataFrame(doc_rows, columns=DOC_COLUMNS)
+    counts = pd.DataFrame(count_rows, columns=COUNT_COLUMNS)
+    for col in ("vendor", "lang_pair", "month"):
+        docs[col] = docs[col].astype("category")
+    for col in ("error_type", "severity"):
+        counts[col] = counts[col].astype("category")
+    return Portfolio(docs, counts)
+
+
+def with_outcomes(docs: pd.DataFrame, settings: dict | None = None) -> pd.DataFrame:
+    """Add error_score and pass columns under the given scoring settings."""
+    settings = settings or {}
+    pf_threshold = settings.get("pass_fail_threshold", ERROR_SCORE_THRESHOLD)
+    crit_max = settings.get("critical_error_max", CRITICAL_ERROR_MAX)
+
+    words = docs["words"].where(docs["words"] > 0)
+    error_score = (docs["penalty"] / words * 1000).fillna(0.0)
+    return docs.assign(
+        error_score=error_score,
+        passed=(error_score <= pf_threshold) & (docs["critical"] <= crit_max),
+    )
+
+
+def _aggregate(frame: pd.DataFrame, keys) -> pd.DataFrame:
+    grouped = frame.groupby(keys, observed=True).agg(
+        documents=("doc", "size"),
+        words=("words", "sum"),
+        penalty=("penalty", "sum"),
+        critical=("critical", "sum"),
+        passed=("passed", "sum"),
+    )
+    words = grouped["words"].where(grouped["words"] > 0)
+    grouped["error_score"] = (grouped["penalty"] / words * 1000).fillna(0.0).round(2)
+    grouped["pass_rate"] = (grouped["passed"] / grouped["documents"]).round(3)
+    return grouped.reset_index()
+
+
+def group_summary(
+    portfolio: Portfolio, by: str, settings: dict | None = None
+) -> pd.DataFrame:
+    """
+    Totals per vendor, language pair or month.
+
+    error_score is the word-weighted score of the group (total penalty per
+    1000 words), pass_rate the share of documents that pass on their own.
+    """
+    return _aggregate(with_outcomes(portfolio.docs, settings), [by]).sort_values(
+        "error_score", ascending=False
+    )
+
+
+def error_score_trend(
+    portfolio: Portfolio, settings: dict | None = None, by: str | None = None
+) -> pd.DataFrame:
+    """Monthly word-weighted error score, optionally split by a dimension."""
+    docs = with_outcomes(portfolio.docs, settings)
+    docs = docs[docs["month"] != UNKNOWN]
+    keys = ["month"] if by in (None, "month") else ["month", by]
+    return _aggregate(docs, keys).sort_values("month")
+
+
+def pass_rate_table(
+    portfolio: Portfolio,
+    rows: str,
+    columns: str,
+    settings: dict | None = None,
+) -> pd.DataFrame:
+    """Pass rate cross-table, e.g. vendor × month."""
+    docs = with_outcomes(portfolio.docs, settings)
+    return docs.pivot_table(
+        index=rows, columns=columns, values="passed", aggfunc="mean", observed=True
+    ).round(3)
+
+
+def top_error_types(
+    portfolio: Portfolio, n: int = 10, by: str | None = None
+) -> pd.DataFrame:
+    """Error types with the most penalty points, overall or within each group."""
+    counts = portfolio.counts
+    if by is not None:
+        counts = counts.merge(portfolio.docs[["doc", by]], on="doc")
+    keys = ["error_type"] if by is None else [by, "error_type"]
+    totals = (
+        counts.groupby(keys, observed=True)[["count", "penalty"]].sum().reset_index()
+    )
+    totals = totals[totals["count"] > 0]
+    if by is None:
+        return totals.nlargest(n, "penalty")
+    return (
+        totals.sort_values("penalty", ascending=False)
+        .groupby(by, observed=True)
+        .head(n)
+    )
@@ -0,0 +1,147 @@
+"""
+Scoring profiles: error types, severities and penalty weights.
+
+The built-in "default" profile is the scorecard defined in
+models/data_models (penalty depends on severity only). Further profiles are
+read from TOML files in the profiles/ directory (or TQA_PROFILE_DIR), e.g.
+MQM-style per-type weights, a zero-penalty "Neutral" severity or custom
+categories:
+
+    name = "mqm"
+    label = "MQM (painotettu)"
+    critical_severity = "Critical"
+
+    [severities]          # in display order, base penalty per severity
+    Neutral = 0
+    Minor = 1
+
+    [[error_types]]
+    name = "Terminology"
+    number = 5
+    default_severity = "Major"
+    weight = 1.5          # multiplies the severity penalty (default 1)
+
+Each profile is compiled once into a dense type × severity penalty table, so
+scoring an annotation is two dict lookups and a list index.
+"""
+
+import os
+import tomllib
+from functools import lru_cache
+
+from pydantic import BaseModel
+
+from models.data_models import (
+    DEFAULT_SEVERITIES,
+    ERROR_TYPE_NUMBERS,
+    ERROR_TYPES,
+    SEVERITY_LEVELS,
+    SEVERITY_PENALTIES,
+)
+
+DEFAULT_PROFILE = "default"
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROFILE_DIR = os.environ.get("TQA_PROFILE_DIR", os.path.join(REPO_ROOT, "profiles"))
+
+
+class ErrorTypeSpec(BaseModel):
+    """One error category of a profile."""
+
+    name: str
+    number: int
+    default_severity: str
+    weight: float = 1.0
+
+
+class ScoringProfile(BaseModel):
+    """A named scoring profile as written in its config file."""
+
+    name: str
+    label: str = ""
+    severities: dict[str, float]
+    error_types: list[ErrorTypeSpec]
+    critical_severity: str = "Critical"
+
+
+class CompiledProfile:
+    """A profile compiled into index maps and a type × severity penalty table."""
+
+    def __init__(self, profile: ScoringProfile):
+        for t in profile.error_types:
+            if t.default_severity not in profile.severities:
+                raise ValueError(
+                    f"Profile '{profile.name}': unknown default severity "
+                    f"'{t.default_severity}' for '{t.name}'."
+                )
+        self.name = profile.name
+        self.label = profile.label or profile.name
+        self.critical_severity = profile.critical_severity
+        self.severities = list(profile.severities)
+        self.severity_penalties = dict(profile.severities)
+        self.error_types = [t.name for t in profile.error_types]
+        self.type_numbers = {t.name: t.number for t in profile.error_types}
+        self.default_severities = {
+            t.name: t.default_severity for t in profile.error_types
+        }
+        self.type_index = {name: i for i, name in enumerate(self.error_types)}
+        self.severity_index = {name: j for j, name in enumerate(self.severities)}
+        self.penalty_matrix = [
+            [t.weight * profile.severities[s] for s in self.severities]
+            for t in profile.error_types
+        ]
+
+    def penalty(self, error_type: str, severity: str) -> float:
+        """Penalty points of one annotation (0 for an unknown severity)."""
+        j = self.severity_index.get(severity)
+        if j is None:
+            return 0
+        i = self.type_index.get(error_type)
+        if i is None:
+            # Categories outside the profile count at the severity base penalty
+            return self.severity_penalties[severity]
+        return self.penalty_matrix[i][j]
+
+    def weight_label(self, severity: str) -> str:
+        """Multiplier shown in scorecard headers, e.g. 'x5'."""
+        return f"x{self.severity_penalties.get(severity, 0):g}"
+
+
+def _builtin_default() -> ScoringProfile:
+    return ScoringProfile(
+        name=DEFAULT_PROFILE,
+        label="ISO 5060",
+        severities={s: SEVERITY_PENALTIES[s] for s in SEVERITY_LEVELS},
+        error_types=[
+            ErrorTypeSpec(
+                name=et,
+                number=ERROR_TYPE_NUMBERS[et],
+                default_severity=DEFAULT_SEVERITIES[et],
+            )
+            for et in ERROR_TYPES
+        ],
+    )
+
+
+@lru_cache(maxsize=None)
+def load_profiles(directory: str = PROFILE_DIR) -> dict[str, CompiledProfile]:
+    """Compile the built-in profile and every *.toml profile in the directory."""
+    profiles = {DEFAULT_PROFILE: CompiledProfile(_builtin_default())}
+    if os.path.isdir(directory):
+        for filename in sorted(os.listdir(directory)):
+            if not filename.endswith(".toml"):
+                continue
+            with open(os.path.join(directory, filename), "rb") as f:
+                profile = ScoringProfile(**tomllib.load(f))
+            if profile.name == DEFAULT_PROFILE:
+                raise ValueError(
+                    f"{filename}: the profile name '{DEFAULT_PROFILE}' is reserved."
+                )
+            profiles[profile.name] = CompiledProfile(profile)
+    return profiles
+
+
+def get_profile(name: str | None = None) -> CompiledProfile:
+    """Compiled profile by name; unknown or missing names give the default."""
+    profiles = load_profiles()
+    return profiles.get(name or DEFAULT_PROFILE, profiles[DEFAULT_PROFILE])
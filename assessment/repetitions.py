@@ -0,0 +1,153 @@
+"""
+Repetition groups: identical and near-identical segments of a document.
+
+Computed once at ingest for the whole document:
+  1. exact repetitions - segments whose normalized (case-folded, whitespace
+     collapsed) source and target are the same are grouped by hashing
+  2. near repetitions - one representative per exact group is MinHashed on
+     character shingles of its source and target, candidates are found
+     with locality-sensitive hashing (banded signatures), and a candidate
+     joins a group when its estimated Jaccard similarity with the bucket's
+     first member is at least NEAR_THRESHOLD
+
+Shingle hashing and MinHash are numpy operations over the concatenated
+texts, so the cost is a few vectorized passes rather than per-segment
+Python loops. Every segment gets the position of its group's first segment
+as group id; a segment without repetitions is its own group.
+"""
+
+import re
+
+import numpy as np
+
+SHINGLE = 5  # characters per shingle
+SAMPLE = 2  # one in SAMPLE shingles is MinHashed
+NUM_PERM = 64
+BANDS = 16  # NUM_PERM / BANDS rows per band
+NEAR_THRESHOLD = 0.75
+SEED = 20240601
+# Shingle positions hashed per MinHash batch (bounds memory to ~75 MB)
+BATCH = 100_000
+
+_MASK32 = (1 << 32) - 1
+_BASE = 1_000_003
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize(text: str) -> str:
+    """Case-folded text with whitespace collapsed."""
+    return _WHITESPACE.sub(" ", text).strip().casefold()
+
+
+def _find(parent: list[int], i: int) -> int:
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def _union(parent: list[int], i: int, j: int):
+    ri, rj = _find(parent, i), _find(parent, j)
+    if ri != rj:
+        # The smaller position becomes the root, so group ids are stable
+        parent[max(ri, rj)] = min(ri, rj)
+
+
+def _signatures(texts: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    MinHash signatures (len(texts) x NUM_PERM) and a mask of texts that
+    have sampled shingles (the others are only grouped by exact match).
+    """
+    lengths = np.array([len(t) for t in texts], dtype=np.int64)
+    codes = np.frombuffer("".join(texts).encode("utf-32-le"), dtype=np.uint32)
+    codes = codes.astype(np.uint64)
+
+    # Polynomial hash of every SHINGLE-character window
+    n_windows = max(len(codes) - SHINGLE + 1, 0)
+    hashes = np.zeros(n_windows, dtype=np.uint64)
+    for k in range(SHINGLE):
+        hashes = (hashes * np.uint64(_BASE) + codes[k : k + n_windows]) & np.uint64(
+            _MASK32
+        )
+
+    # Keep windows that lie inside one text, and of those a consistent
+    # 1/SAMPLE of the shingles: the same shingle is kept in every text, so
+    # Jaccard similarities are preserved while MinHash does less work
+    ends = np.cumsum(lengths)
+    text_of = np.repeat(np.arange(len(texts)), lengths)[:n_windows]
+    keep = (np.arange(n_windows) + SHINGLE <= ends[text_of]) & (
+        hashes % np.uint64(SAMPLE) == 0
+    )
+    hashes, text_of = hashes[keep], text_of[keep]
+    windows = np.bincount(text_of, minlength=len(texts))
+    first = np.cumsum(windows) - windows  # first kept shingle of each text
+    has_shingles = windows > 0
+
+    # Multiply-shift hash functions: (a * x + b) mod 2**64, high 32 bits
+    rng = np.random.default_rng(SEED)
+    a = rng.integers(0, 1 << 63, size=NUM_PERM, dtype=np.uint64)[:, None] | 1
+    b = rng.integers(0, 1 << 63, size=NUM_PERM, dtype=np.uint64)[:, None]
+    signatures = np.full((len(texts), NUM_PERM), _MASK32, dtype=np.uint32)
+
+    # Batches of whole texts, so each text's minimum is taken in one batch
+    owners = np.flatnonzero(has_shingles)
+    batch_of = (first[owners] + windows[owners] - 1) // BATCH
+    for batch_id in np.unique(batch_of):
+        batch = owners[batch_of == batch_id]
+        pos, stop = first[batch[0]], first[batch[-1]] + windows[batch[-1]]
+        values = ((a * hashes[pos:stop] + b) >> np.uint64(32)).astype(np.uint32)
+        signatures[batch] = np.minimum.reduceat(values, first[batch] - pos, axis=1).T
+    return signatures, has_shingles
+
+
+def repetition_groups(source, target) -> list[int]:
+    """Group id (position of the group's first segment) of each segment."""
+    keys = [normalize(s) + "\x1f" + normalize(t) for s, t in zip(source, target)]
+    parent = list(range(len(keys)))
+
+    # 1. Exact repetitions
+    representatives = {}
+    for i, key in enumerate(keys):
+        first = representatives.setdefault(key, i)
+        if first != i:
+            parent[i] = first
+    reps = list(representatives.values())
+    if len(reps) < 2:
+        return [_find(parent, i) for i in range(len(keys))]
+
+    # 2. Near repetitions among the exact groups' representatives
+    signatures, has_shingles = _signatures([keys[i] for i in reps])
+    rows = NUM_PERM // BANDS
+    candidates = np.flatnonzero(has_shingles)
+    for band in range(BANDS):
+        # The band's rows folded into one 64-bit bucket key
+        band_rows = signatures[candidates, band * rows : (band + 1) * rows]
+        bucket = np.zeros(len(candidates), dtype=np.uint64)
+        for row in band_rows.T:
+            bucket = bucket * np.uint64(_BASE) + row
+        order = np.argsort(bucket, kind="stable")
+        sorted_buckets = bucket[order]
+        heads = np.flatnonzero(np.r_[True, sorted_buckets[1:] != sorted_buckets[:-1]])
+        # Members are compared with the first member of their bucket
+        head_of = order[heads[np.searchsorted(heads, np.arange(len(order)), "right") - 1]]
+        members = order[head_of != order]
+        heads_for = head_of[head_of != order]
+        if not len(members):
+            continue
+        similarity = (
+            signatures[candidates[members]] == signatures[candidates[heads_for]]
+        ).mean(axis=1)
+        for m, h in zip(
+            members[similarity >= NEAR_THRESHOLD],
+            heads_for[similarity >= NEAR_THRESHOLD],
+        ):
+            _union(parent, reps[candidates[m]], reps[candidates[h]])
+
+    return [_find(parent, i) for i in range(len(keys))]
+
+
+def segment_repetition_groups(segments) -> list[int]:
+    """Repetition groups of already parsed segments (e.g. older sessions)."""
+    return repetition_groups(
+        [s.source_text for s in segments], [s.target_text for s in segments]
+    )
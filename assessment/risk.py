@@ -0,0 +1,117 @@
+"""
+Review-priority risk score per segment.
+
+Computed once at ingest over whole columns with pandas string operations,
+so the cost is a handful of vectorized passes rather than per-segment
+Python checks. Signals and their weights:
+
+  - numbers missing or changed in the target (per number)     NUMBER_WEIGHT
+  - URLs and e-mail addresses missing or changed (per item)   URL_WEIGHT
+  - tags / placeholders (<b>, {1}, %s) count mismatch         TAG_WEIGHT
+  - target identical to the source                            IDENTICAL_WEIGHT
+  - sentence-final punctuation or bracket count mismatch      PUNCT_WEIGHT
+  - length ratio far from the document's typical ratio        LENGTH_WEIGHT per
+    robust z-unit (median/MAD of log ratios), capped at LENGTH_CAP
+  - very long segments (target words)                         LONG_WEIGHT per
+    LONG_WORDS words
+
+Numbers are compared by their digits only, so "12,5" and "12.5" or
+"1 000" and "1,000" (locale conventions) are not reported as changes.
+"""
+
+import numpy as np
+import pandas as pd
+
+from assessment.scoring import segment_word_count
+
+NUMBER_WEIGHT = 3.0
+URL_WEIGHT = 3.0
+TAG_WEIGHT = 3.0
+IDENTICAL_WEIGHT = 4.0
+PUNCT_WEIGHT = 1.0
+LENGTH_WEIGHT = 0.75
+LENGTH_CAP = 4.0
+LONG_WEIGHT = 1.0
+LONG_WORDS = 40
+
+_NUMBER = r"(\d+(?:[.,]\d+|[ \u00a0\u202f]\d{3}(?!\d))*)"
+_URL = r"((?:https?://|www\.)\S+|[\w.+-]+@[\w-]+\.[\w.]+)"
+_TAG = r"</?[A-Za-z][^>]*>|\{\d+\}|%\d*\$?[sd]"
+_FINAL_PUNCT = r"([.!?:;…。！？：；])\W*$"
+_BRACKETS = r"[()\[\]\"“”«»]"
+
+
+def _missing_items(source: pd.Series, target: pd.Series, pattern: str, normalize):
+    """
+    Per row: how many items matched in the source have no counterpart in
+    the target (multiset difference), computed on long-format frames.
+    normalize maps a Series of matches to comparable keys.
+    """
+
+    def items(texts: pd.Series) -> pd.Series:
+        found = normalize(texts.str.findall(pattern).explode().dropna())
+        frame = pd.DataFrame({"row": found.index, "item": found.to_numpy()})
+        return frame.groupby(["row", "item"]).size()
+
+    src = items(source)
+    if src.empty:
+        return pd.Series(0, index=source.index)
+    tgt = items(target).reindex(src.index, fill_value=0)
+    missing = (src - tgt).clip(lower=0)
+    return missing.groupby(level="row").sum().reindex(source.index, fill_value=0)
+
+
+def risk_scores(source, target, word_counts) -> list[float]:
+    """Risk score of each (source, target) pair; higher = review first."""
+    source = pd.Series(list(source), dtype=object).astype(str)
+    target = pd.Series(list(target), dtype=object).astype(str)
+    words = np.asarray(word_counts, dtype=float)
+    if len(source) == 0:
+        return []
+
+    risk = np.zeros(len(source))
+
+    numbers = _missing_items(
+        source, target, _NUMBER, lambda n: n.str.replace(r"\D", "", regex=True)
+    )
+    risk += NUMBER_WEIGHT * numbers.to_numpy()
+
+    urls = _missing_items(
+        source, target, _URL, lambda u: u.str.rstrip(".,;:)").str.lower()
+    )
+    risk += URL_WEIGHT * urls.to_numpy()
+
+    tags = (source.str.count(_TAG) - target.str.count(_TAG)).abs()
+    risk += TAG_WEIGHT * tags.to_numpy()
+
+    identical = (source.str.strip() == target.str.strip()) & source.str.contains(
+        r"[^\W\d_]", regex=True
+    )
+    risk += IDENTICAL_WEIGHT * identical.to_numpy()
+
+    src_final = source.str.extract(_FINAL_PUNCT)[0].notna()
+    tgt_final = target.str.extract(_FINAL_PUNCT)[0].notna()
+    brackets = source.str.count(_BRACKETS) != target.str.count(_BRACKETS)
+    risk += PUNCT_WEIGHT * ((src_final != tgt_final) | brackets).to_numpy()
+
+    # Length ratio relative to the document's own typical ratio
+    src_len = source.str.len().to_numpy().clip(min=1)
+    tgt_len = target.str.len().to_numpy().clip(min=1)
+    log_ratio = np.log(tgt_len / src_len)
+    median = np.median(log_ratio)
+    mad = np.median(np.abs(log_ratio - median)) * 1.4826
+    deviation = np.abs(log_ratio - median) / max(mad, 0.1)
+    risk += LENGTH_WEIGHT * np.minimum(np.maximum(deviation - 2.0, 0.0), LENGTH_CAP)
+
+    risk += LONG_WEIGHT * np.floor(words / LONG_WORDS)
+
+    return np.round(risk, 2).tolist()
+
+
+def segment_risks(segments) -> list[float]:
+    """Risk scores of already parsed segments (e.g. sessions saved without them)."""
+    return risk_scores(
+        [s.source_text for s in segments],
+        [s.target_text for s in segments],
+        [segment_word_count(s) for s in segments],
+    )
@@ -1,11 +1,16 @@
+from array import array
+from typing import Callable
+
 from models.data_models import (
-    ERROR_TYPES,
-    SEVERITY_LEVELS,
-    SEVERITY_PENALTIES,
     ErrorAnnotation,
-    SegmentScore,
+    SegmentAssessment,
+    SegmentScores,
     DocumentScore,
+    TranslationSegment,
 )
+from assessment.profiles import CompiledProfile, get_profile
+from assessment.wordcount import count_words
+from perf.trace import traced
 
 # Scoring thresholds
 ERROR_SCORE_THRESHOLD = 40  # Score <= 40 = Pass
@@ -20,32 +25,33 @@ QUALITY_RATING_THRESHOLDS = [
 ]
 # Anything above 40 = Rating 1
 
+# Segments between progress callbacks in score_assessments
+PROGRESS_EVERY = 1000
+
 
-def count_words(text: str) -> int:
-    """Count words in text by splitting on whitespace."""
-    return len(text.split())
+def segment_word_count(segment: TranslationSegment) -> int:
+    """Word count stored at ingest, or counted now for segments saved without one."""
+    if segment.word_count is not None:
+        return segment.word_count
+    return count_words(segment.target_text, segment.target_lang)
 
 
-def calculate_annotation_penalty(annotation: ErrorAnnotation) -> float:
+def calculate_annotation_penalty(
+    annotation: ErrorAnnotation, profile: CompiledProfile | None = None
+) -> float:
     """Calculate penalty points for a single annotation."""
-    return SEVERITY_PENALTIES.get(annotation.severity, 0)
+    profile = profile or get_profile()
+    return profile.penalty(annotation.error_type, annotation.severity)
 
 
-def score_segment(
-    segment_id: int,
-    target_text: str,
-    annotations: list[ErrorAnnotation],
-) -> SegmentScore:
+# Called once per segment: counted per rerun, no event per call
+@traced("segment_penalty", detail=False)
+def segment_penalty(
+    annotations: list[ErrorAnnotation], profile: CompiledProfile | None = None
+) -> float:
     """Calculate the penalty total for a single segment."""
-    word_count = max(count_words(target_text), 1)
-    total_penalty = sum(calculate_annotation_penalty(a) for a in annotations)
-
-    return SegmentScore(
-        segment_id=segment_id,
-        word_count=word_count,
-        total_penalty=total_penalty,
-        annotations=annotations,
-    )
+    profile = profile or get_profile()
+    return sum(profile.penalty(a.error_type, a.severity) for a in annotations)
 
 
 def get_quality_rating(
@@ -65,12 +71,34 @@ def get_quality_rating(
     return 1, "Very serious deficiencies"
 
 
+def _resolve_thresholds(settings: dict | None):
+    """(pass/fail threshold, critical max, rating table or None) from settings."""
+    settings = settings or {}
+    pf_threshold = settings.get("pass_fail_threshold", ERROR_SCORE_THRESHOLD)
+    crit_max = settings.get("critical_error_max", CRITICAL_ERROR_MAX)
+    custom_rating_thresholds = None
+    rt = settings.get("rating_thresholds")
+    if rt and len(rt) == 4:
+        descriptions = [d for _, _, d in QUALITY_RATING_THRESHOLDS]
+        custom_rating_thresholds = [
+            (rt[0], 5, descriptions[0]),
+            (rt[1], 4, descriptions[1]),
+            (rt[2], 3, descriptions[2]),
+            (rt[3], 2, descriptions[3]),
+        ]
+    return pf_threshold, crit_max, custom_rating_thresholds
+
+
+@traced("score_document", size=lambda _, assessments, *args, **kwargs: len(assessments))
 def score_document(
-    segment_scores: list[SegmentScore],
+    assessments: list[SegmentAssessment],
+    segment_scores: SegmentScores,
     settings: dict | None = None,
+    profile: CompiledProfile | None = None,
 ) -> DocumentScore:
     """
-    Calculate the overall document score.
+    Calculate the overall document score of the scored segments: their
+    assessments (in segment_scores order) and their scores.
 
     Error Score = (Total Penalty Points / Word Count) * 1000
     Pass/Fail: Error Score <= threshold AND critical errors <= max
@@ -81,27 +109,91 @@ def score_document(
             "pass_fail_threshold": 40,
             "critical_error_max": 1,
         }
+    Penalties and the critical severity come from the scoring profile
+    (default profile if not given).
     """
-    # Resolve thresholds
-    pf_threshold = ERROR_SCORE_THRESHOLD
-    crit_max = CRITICAL_ERROR_MAX
-    custom_rating_thresholds = None
+    profile = profile or get_profile()
+
+    # Error type counts
+    error_type_counts: dict[str, int] = {}
+    severity_counts: dict[str, int] = {}
+    # Every (type, severity) seen is counted, including types outside the
+    # profile, so the document can be re-scored under another profile
+    error_type_severity_counts: dict[str, dict[str, int]] = {
+        et: {s: 0 for s in profile.severities} for et in profile.error_types
+    }
+
+    for assessment in assessments:
+        for ann in assessment.annotations:
+            # Overall counts
+            error_type_counts[ann.error_type] = (
+                error_type_counts.get(ann.error_type, 0) + 1
+            )
+            severity_counts[ann.severity] = (
+                severity_counts.get(ann.severity, 0) + 1
+            )
+            # Detailed breakdown
+            by_severity = error_type_severity_counts.setdefault(ann.error_type, {})
+            by_severity[ann.severity] = by_severity.get(ann.severity, 0) + 1
+
+    return _build_document_score(
+        total_segments=len(segment_scores),
+        total_word_count=sum(segment_scores.word_counts),
+        error_type_counts=error_type_counts,
+        severity_counts=severity_counts,
+        error_type_severity_counts=error_type_severity_counts,
+        settings=settings,
+        profile=profile,
+    )
+
+
+def rescore_document(
+    doc_score: DocumentScore,
+    profile: CompiledProfile,
+    settings: dict | None = None,
+) -> DocumentScore:
+    """
+    Score a document under another profile from its (type, severity) counts,
+    without walking the annotations again.
+    """
+    counts = {
+        et: {s: 0 for s in profile.severities} for et in profile.error_types
+    }
+    for et, by_severity in doc_score.error_type_severity_counts.items():
+        row = counts.setdefault(et, {})
+        for sev, n in by_severity.items():
+            row[sev] = row.get(sev, 0) + n
+
+    return _build_document_score(
+        total_segments=doc_score.total_segments,
+        total_word_count=doc_score.total_word_count,
+        error_type_counts=doc_score.error_type_counts,
+        severity_counts=doc_score.severity_counts,
+        error_type_severity_counts=counts,
+        settings=settings,
+        profile=profile,
+    )
 
-    if settings:
-        pf_threshold = settings.get("pass_fail_threshold", ERROR_SCORE_THRESHOLD)
-        crit_max = settings.get("critical_error_max", CRITICAL_ERROR_MAX)
-        rt = settings.get("rating_thresholds")
-        if rt and len(rt) == 4:
-            descriptions = [d for _, _, d in QUALITY_RATING_THRESHOLDS]
-            custom_rating_thresholds = [
-                (rt[0], 5, descriptions[0]),
-                (rt[1], 4, descriptions[1]),
-                (rt[2], 3, descriptions[2]),
-                (rt[3], 2, descriptions[3]),
-            ]
-
-    total_word_count = sum(s.word_count for s in segment_scores)
-    total_penalty = sum(s.total_penalty for s in segment_scores)
+
+def _build_document_score(
+    total_segments: int,
+    total_word_count: int,
+    error_type_counts: dict[str, int],
+    severity_counts: dict[str, int],
+    error_type_severity_counts: dict[str, dict[str, int]],
+    settings: dict | None,
+    profile: CompiledProfile,
+) -> DocumentScore:
+    """Penalties, pass/fail and rating from the count table (a table lookup)."""
+    pf_threshold, crit_max, custom_rating_thresholds = _resolve_thresholds(settings)
+
+    # Per error type penalty totals
+    error_type_penalties: dict[str, float] = {et: 0.0 for et in profile.error_types}
+    for et, by_severity in error_type_severity_counts.items():
+        penalty = sum(n * profile.penalty(et, sev) for sev, n in by_severity.items())
+        if penalty or et in error_type_penalties:
+            error_type_penalties[et] = penalty
+    total_penalty = sum(error_type_penalties.values())
 
     if total_word_count == 0:
         error_score = 0.0
@@ -109,11 +201,10 @@ def score_document(
         error_score = (total_penalty / total_word_count) * 1000
 
     # Count critical errors
-    critical_error_count = 0
-    for seg in segment_scores:
-        for ann in seg.annotations:
-            if ann.severity == "Critical":
-                critical_error_count += 1
+    critical_error_count = sum(
+        by_severity.get(profile.critical_severity, 0)
+        for by_severity in error_type_severity_counts.values()
+    )
 
     # Pass/Fail
     error_score_pass = error_score <= pf_threshold
@@ -125,34 +216,8 @@ def score_document(
         error_score, custom_rating_thresholds
     )
 
-    # Error type counts
-    error_type_counts: dict[str, int] = {}
-    severity_counts: dict[str, int] = {}
-    error_type_severity_counts: dict[str, dict[str, int]] = {
-        et: {s: 0 for s in SEVERITY_LEVELS} for et in ERROR_TYPES
-    }
-    error_type_penalties: dict[str, float] = {et: 0.0 for et in ERROR_TYPES}
-
-    for seg in segment_scores:
-        for ann in seg.annotations:
-            # Overall counts
-            error_type_counts[ann.error_type] = (
-                error_type_counts.get(ann.error_type, 0) + 1
-            )
-            severity_counts[ann.severity] = (
-                severity_counts.get(ann.severity, 0) + 1
-            )
-            # Detailed breakdown
-            if ann.error_type in error_type_severity_counts:
-                if ann.severity in error_type_severity_counts[ann.error_type]:
-                    error_type_severity_counts[ann.error_type][ann.severity] += 1
-            if ann.error_type in error_type_penalties:
-                error_type_penalties[ann.error_type] += calculate_annotation_penalty(
-                    ann
-                )
-
     return DocumentScore(
-        total_segments=len(segment_scores),
+        total_segments=total_segments,
         total_word_count=total_word_count,
         total_penalty=round(total_penalty, 2),
         error_score=round(error_score, 2),
@@ -166,4 +231,66 @@ def score_document(
         severity_counts=severity_counts,
         error_type_severity_counts=error_type_severity_counts,
         error_type_penalties=error_type_penalties,
+        profile=profile.name,
+    )
+
+
+def score_assessments(
+    segments: list[TranslationSegment],
+    assessments: list[SegmentAssessment],
+    settings: dict | None = None,
+    progress: Callable[[int, int], None] | None = None,
+    profile: CompiledProfile | None = None,
+    indices: list[int] | None = None,
+) -> tuple[SegmentScores, DocumentScore]:
+    """
+    Score every segment and the whole document.
+
+    indices are the document positions of the given segments when they are
+    a subset (sampling review); by default the segments are the document.
+    If progress is given, it is called as progress(segments_done, total).
+    """
+    profile = profile or get_profile()
+    total = len(segments)
+    seg_scores = SegmentScores(
+        indices=array("q", range(total) if indices is None else indices),
+        segment_ids=array("q", (seg.id for seg in segments)),
+        word_counts=array("q"),
+        penalties=array("d"),
     )
+    for n, (seg, assessment) in enumerate(zip(segments, assessments)):
+        if progress is not None and n % PROGRESS_EVERY == 0:
+            progress(n, total)
+        seg_scores.word_counts.append(max(segment_word_count(seg), 1))
+        seg_scores.penalties.append(segment_penalty(assessment.annotations, profile))
+    return seg_scores, score_document(
+        assessments, seg_scores, settings=settings, profile=profile
+    )
+
+
+def apply_settings(doc_score: DocumentScore, settings: dict | None) -> DocumentScore:
+    """
+    Re-evaluate pass/fail and rating of a scored document under new settings
+    without re-walking its annotations.
+    """
+    pf_threshold, crit_max, rating_thresholds = _resolve_thresholds(settings)
+
+    # Unrounded score, as in score_document
+    error_score = (
+        doc_score.total_penalty / doc_score.total_word_count * 1000
+        if doc_score.total_word_count
+        else 0.0
+    )
+    error_score_pass = error_score <= pf_threshold
+    critical_pass = doc_score.critical_error_count <= crit_max
+    rating, description = get_quality_rating(error_score, rating_thresholds)
+    update = {
+        "error_score_pass_fail": "Pass" if error_score_pass else "Fail",
+        "critical_count_pass_fail": "Pass" if critical_pass else "Fail",
+        "overall_pass_fail": "Pass" if error_score_pass and critical_pass else "Fail",
+        "quality_rating": rating,
+        "quality_rating_description": description,
+    }
+    if all(getattr(doc_score, k) == v for k, v in update.items()):
+        return doc_score
+    return doc_score.model_copy(update=update)
@@ -0,0 +1,46 @@
+"""
+Locating annotation spans in a target text and grouping overlapping ones.
+
+Shared by the session merge and the inter-annotator agreement report, which
+both compare annotations of several reviewers on the same segment.
+"""
+
+from models.data_models import ErrorAnnotation
+
+
+def span_interval(target_text: str, ann: ErrorAnnotation) -> tuple[int, int]:
+    """(start, end) of the span in the target, or (-1, -1) if not found."""
+    if ann.start is not None and target_text.startswith(ann.span, ann.start):
+        return ann.start, ann.start + max(len(ann.span), 1)
+    start = target_text.find(ann.span)
+    if start < 0:
+        return -1, -1
+    return start, start + max(len(ann.span), 1)
+
+
+def span_clusters(items: list[tuple[int, int, int, ErrorAnnotation]]):
+    """
+    Group (start, end, reviewer, annotation) items into clusters of
+    overlapping intervals. Spans not found in the target cluster by text.
+    """
+    unresolved: dict[str, list] = {}
+    located = []
+    for item in items:
+        if item[0] < 0:
+            unresolved.setdefault(item[3].span, []).append(item)
+        else:
+            located.append(item)
+
+    located.sort(key=lambda it: (it[0], it[1]))
+    cluster: list = []
+    cluster_end = -1
+    for item in located:
+        if cluster and item[0] >= cluster_end:
+            yield cluster
+            cluster = []
+        cluster_end = max(cluster_end, item[1]) if cluster else item[1]
+        cluster.append(item)
+    if cluster:
+        yield cluster
+
+    yield from unresolved.values()
@@ -0,0 +1,98 @@
+"""
+Threshold what-if analysis from per-document sufficient statistics.
+
+A document's pass/fail and quality rating depend only on its total penalty,
+word count and critical error count. Given those three numbers per document,
+a whole grid of threshold settings is evaluated with numpy broadcasting
+instead of re-scoring anything.
+"""
+
+import numpy as np
+
+from models.data_models import DocumentScore
+from assessment.scoring import QUALITY_RATING_THRESHOLDS
+
+DEFAULT_RATING_THRESHOLDS = [t[0] for t in QUALITY_RATING_THRESHOLDS]
+
+
+class SufficientStats:
+    """Total penalty, word count and critical error count per document."""
+
+    def __init__(self, penalty, words, critical):
+        self.penalty = np.asarray(penalty, dtype=float)
+        self.words = np.asarray(words, dtype=float)
+        self.critical = np.asarray(critical, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.penalty)
+
+    @classmethod
+    def from_document_scores(
+        cls, doc_scores: list[DocumentScore]
+    ) -> "SufficientStats":
+        return cls(
+            [d.total_penalty for d in doc_scores],
+            [d.total_word_count for d in doc_scores],
+            [d.critical_error_count for d in doc_scores],
+        )
+
+    @classmethod
+    def from_frame(cls, docs) -> "SufficientStats":
+        """From a frame with penalty, words and critical columns (portfolio docs)."""
+        return cls(
+            docs["penalty"].to_numpy(),
+            docs["words"].to_numpy(),
+            docs["critical"].to_numpy(),
+        )
+
+    def error_scores(self) -> np.ndarray:
+        """Penalty points per 1000 words (0 for documents without words)."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = self.penalty / self.words * 1000
+        return np.where(self.words > 0, scores, 0.0)
+
+
+def pass_grid(
+    stats: SufficientStats, pass_fail_thresholds, critical_maxes
+) -> np.ndarray:
+    """
+    Pass/fail of every document under every (threshold, critical max) pair.
+
+    Returns a bool array of shape (len(pass_fail_thresholds),
+    len(critical_maxes), documents).
+    """
+    pf = np.asarray(pass_fail_thresholds, dtype=float)[:, None, None]
+    cm = np.asarray(critical_maxes, dtype=np.int64)[None, :, None]
+    scores = stats.error_scores()[None, None, :]
+    return (scores <= pf) & (stats.critical[None, None, :] <= cm)
+
+
+def rating_grid(stats: SufficientStats, rating_threshold_sets) -> np.ndarray:
+    """
+    Quality rating (1-5) of every document under every threshold set.
+
+    rating_threshold_sets has shape (sets, 4): the upper limits for ratings
+    5, 4, 3 and 2, matched in order like get_quality_rating. Returns an int
+    array of shape (sets, documents).
+    """
+    thresholds = np.asarray(rating_threshold_sets, dtype=float)[:, None, :]
+    within = stats.error_scores()[None, :, None] <= thresholds
+    first = np.argmax(within, axis=2)
+    return np.where(within.any(axis=2), 5 - first, 1)
+
+
+def rating_distribution(ratings: np.ndarray) -> np.ndarray:
+    """Document counts per rating: shape (sets, 5), columns are ratings 1..5."""
+    counts = np.zeros((ratings.shape[0], 5), dtype=np.int64)
+    for rating in range(1, 6):
+        counts[:, rating - 1] = (ratings == rating).sum(axis=1)
+    return counts
+
+
+def outcome_shift(baseline: np.ndarray, candidate: np.ndarray) -> dict[str, int]:
+    """How many documents move pass→fail and fail→pass between two settings."""
+    return {
+        "pass_to_fail": int((baseline & ~candidate).sum()),
+        "fail_to_pass": int((~baseline & candidate).sum()),
+        "unchanged": int((baseline == candidate).sum()),
+    }
@@ -0,0 +1,98 @@
+"""
+Word counting per target language.
+
+The error score is penalty points per 1000 words, so the word count is the
+denominator of every score. Whitespace splitting is right for Latin,
+Cyrillic and most other scripts, but Chinese and Japanese are written
+without spaces and Thai separates phrases, not words. Counters are
+registered per target language (the language names of the sidebar):
+
+  - whitespace: one word per whitespace-separated token (default)
+  - cjk: every Han, Hiragana or Katakana character counts as one word;
+    runs of other characters (Latin words, numbers) count as one word each.
+    Korean is written with spaces between words, so Hangul falls into the
+    "other characters" runs and is effectively counted by whitespace.
+  - thai: pythainlp's dictionary segmenter when it is installed, otherwise
+    Thai characters / THAI_CHARS_PER_WORD (rounded up) per run.
+
+Counts are computed once at ingest and stored on the segment
+(TranslationSegment.word_count), so scoring never re-tokenizes text.
+"""
+
+import functools
+import math
+import re
+from typing import Callable
+
+WordCounter = Callable[[str], int]
+
+_CJK_CHAR = (
+    "\u3040-\u30ff"  # Hiragana, Katakana
+    "\u3400-\u4dbf"  # CJK extension A
+    "\u4e00-\u9fff"  # CJK unified ideographs
+    "\uf900-\ufaff"  # CJK compatibility ideographs
+    "\uff66-\uff9f"  # halfwidth Katakana
+)
+# CJK punctuation and fullwidth ASCII punctuation are not words
+_CJK_PUNCT = "\u3000-\u303f\uff01-\uff0f\uff1a-\uff20"
+_CJK_TOKEN = re.compile(f"[{_CJK_CHAR}]|[^\\s{_CJK_CHAR}{_CJK_PUNCT}]+")
+
+_THAI_RUN = re.compile("[\u0e00-\u0e7f]+")
+# Average length of a Thai word in characters, used without a segmenter
+THAI_CHARS_PER_WORD = 5
+
+
+def whitespace_words(text: str) -> int:
+    """Count whitespace-separated tokens."""
+    return len(text.split())
+
+
+def cjk_words(text: str) -> int:
+    """Count each CJK character, and each run of other non-space characters, as a word."""
+    return len(_CJK_TOKEN.findall(text))
+
+
+@functools.cache
+def _thai_tokenizer() -> Callable | None:
+    """pythainlp's word_tokenize, imported on first use; None if not installed."""
+    try:
+        from pythainlp.tokenize import word_tokenize
+    except ImportError:
+        return None
+    return word_tokenize
+
+
+def thai_words(text: str) -> int:
+    """Count Thai words with pythainlp if available, otherwise estimate from characters."""
+    word_tokenize = _thai_tokenizer()
+    if word_tokenize is None:
+        count = 0
+        for token in text.split():
+            thai = "".join(_THAI_RUN.findall(token))
+            other = _THAI_RUN.sub(" ", token).split()
+            count += math.ceil(len(thai) / THAI_CHARS_PER_WORD) + len(other)
+        return count
+    return sum(1 for w in word_tokenize(text, keep_whitespace=False) if w.strip())
+
+
+_COUNTERS: dict[str, WordCounter] = {
+    "japani": cjk_words,
+    "kiina (yksinkertaistettu)": cjk_words,
+    "kiina (perinteinen)": cjk_words,
+    "thai": thai_words,
+}
+
+
+def register_counter(lang: str, counter: WordCounter):
+    """Use counter for segments whose target language is lang."""
+    _COUNTERS[lang] = counter
+
+
+def get_counter(lang: str) -> WordCounter:
+    """Counter for a target language; whitespace splitting if none is registered."""
+    return _COUNTERS.get(lang, whitespace_words)
+
+
+def count_words(text: str, lang: str = "") -> int:
+    """Count the words of text written in lang."""
+    return get_counter(lang)(text)
@@ -0,0 +1,320 @@
+"""Streaming CSV export: annotation rows + document totals (Finnish labels)."""
+
+import csv
+import io
+import os
+import tempfile
+import threading
+import weakref
+from itertools import islice
+from typing import Callable, Iterator
+
+from assessment.profiles import CompiledProfile, get_profile
+from i18n.fi import FI
+
+# Rows are written to disk in batches of this size
+CHUNK_ROWS = 1000
+# Segments whose rows are kept between exports; the rest are rebuilt each time
+CACHE_SEGMENTS = 5000
+
+EXPORT_HEADER = [
+    "Segmentti",
+    "Lähdeteksti",
+    "Kohdeteksti",
+    "Lähdekieli",
+    "Kohdekieli",
+    "Virhetyyppi",
+    "Vakavuusaste",
+    "Virhejakso",
+    "Selitys",
+    "Pisteet",
+    "Segmentin sanamäärä",
+    "Segmentin virhepistesumma",
+    "Yleiskommentti",
+]
+
+
+class CsvExportCache:
+    """
+    Per-session export state.
+
+    Keeps the detail rows of up to CACHE_SEGMENTS segments together with the
+    values they were built from, so unchanged segments are reused on the next
+    export without holding a second copy of a large document, and the path
+    of the latest temp file so it can be removed when replaced.
+
+    The background CSV job, the Excel and Parquet downloads and the memory
+    evictor use the same cache from different threads, so the rows are only
+    read and changed under the cache lock. The latest temp file is also
+    removed when the cache itself is collected (the session ended).
+    """
+
+    def __init__(self):
+        self.rows: dict[int, tuple[tuple, list[list]]] = {}
+        self._lock = threading.Lock()
+        # One-item list shared with the finalizer, which must not hold self
+        self._file: list[str | None] = [None]
+        weakref.finalize(self, _remove_file, self._file)
+
+    @property
+    def tmp_path(self) -> str | None:
+        return self._file[0]
+
+    def get(self, idx: int, key: tuple) -> list[list] | None:
+        """Cached rows of a segment, if built from the same values."""
+        with self._lock:
+            cached = self.rows.get(idx)
+        return cached[1] if cached is not None and cached[0] == key else None
+
+    def put(self, idx: int, key: tuple, rows: list[list]):
+        """Remember a segment's rows, unless the cache is full of others."""
+        with self._lock:
+            if idx in self.rows or len(self.rows) < CACHE_SEGMENTS:
+                self.rows[idx] = (key, rows)
+
+    def prune(self, count: int):
+        """Drop segments at positions count and above (no longer in the document)."""
+        with self._lock:
+            for idx in [i for i in self.rows if i >= count]:
+                del self.rows[idx]
+
+    def clear(self):
+        with self._lock:
+            self.rows.clear()
+
+    def replace_file(self, path: str):
+        """Make path the latest temp file, removing the previous one."""
+        with self._lock:
+            previous, self._file[0] = self._file[0], path
+        _remove_file([previous])
+
+    def discard_file(self):
+        with self._lock:
+            previous, self._file[0] = self._file[0], None
+        _remove_file([previous])
+
+
+def _remove_file(holder: list[str | None]):
+    path = holder[0]
+    if path and os.path.exists(path):
+        os.unlink(path)
+
+
+def _segment_key(seg, assessment, word_count, penalty, profile) -> tuple:
+    """Values that the detail rows of a segment depend on."""
+    return (
+        profile.name,
+        seg.id,
+        seg.source_text,
+        seg.target_text,
+        seg.source_lang,
+        seg.target_lang,
+        assessment.overall_comment,
+        tuple(
+            (a.error_type, a.severity, a.span, a.explanation)
+            for a in assessment.annotations
+        ),
+        word_count,
+        penalty,
+    )
+
+
+def _build_segment_rows(seg, assessment, word_count, penalty, profile) -> list[list]:
+    comment = assessment.overall_comment or ""
+    if not assessment.annotations:
+        return [
+            [
+                seg.id,
+                seg.source_text,
+                seg.target_text,
+                seg.source_lang,
+                seg.target_lang,
+                "",
+                "",
+                "",
+                "",
+                0,
+                word_count,
+                penalty,
+                comment,
+            ]
+        ]
+
+    rows = []
+    for i, ann in enumerate(assessment.annotations):
+        rows.append(
+            [
+                seg.id,
+                seg.source_text,
+                seg.target_text,
+                seg.source_lang,
+                seg.target_lang,
+                ann.error_type,
+                ann.severity,
+                ann.span,
+                ann.explanation,
+                profile.penalty(ann.error_type, ann.severity),
+                word_count,
+                penalty,
+                comment if i == 0 else "",
+            ]
+        )
+    return rows
+
+
+def iter_segment_rows(
+    segments,
+    assessments,
+    seg_scores,
+    cache: CsvExportCache | None = None,
+    progress: Callable[[int, int], None] | None = None,
+    profile: CompiledProfile | None = None,
+) -> Iterator[list]:
+    """
+    Yield the detail rows (one per annotation, or one per clean segment).
+
+    segments and assessments are the whole document; rows are produced for
+    the scored segments, looked up through seg_scores.indices. If progress
+    is given, it is called as progress(segments_done, total) every
+    CHUNK_ROWS segments. Penalties use the given scoring profile.
+    """
+    profile = profile or get_profile()
+    total = len(seg_scores)
+    for n, (idx, word_count, penalty) in enumerate(
+        zip(seg_scores.indices, seg_scores.word_counts, seg_scores.penalties)
+    ):
+        if progress is not None and n % CHUNK_ROWS == 0:
+            progress(n, total)
+        seg, assessment = segments[idx], assessments[idx]
+        if cache is None:
+            yield from _build_segment_rows(seg, assessment, word_count, penalty, profile)
+            continue
+
+        key = _segment_key(seg, assessment, word_count, penalty, profile)
+        rows = cache.get(idx, key)
+        if rows is None:
+            rows = _build_segment_rows(seg, assessment, word_count, penalty, profile)
+            cache.put(idx, key, rows)
+        yield from rows
+
+    if cache is not None:
+        # Drop segments that no longer exist (e.g. a new file was loaded)
+        cache.prune(len(segments))
+
+
+def iter_summary_rows(doc_score) -> Iterator[list]:
+    """Yield the document totals block that follows the detail rows."""
+    if not doc_score:
+        return
+
+    yield []
+    yield ["KOKONAISTULOKSET"]
+    yield []
+
+    pf_fi = "Hyväksytty" if doc_score.overall_pass_fail == "Pass" else "Hylätty"
+    es_pf = "Hyväksytty" if doc_score.error_score_pass_fail == "Pass" else "Hylätty"
+    cr_pf = "Hyväksytty" if doc_score.critical_count_pass_fail == "Pass" else "Hylätty"
+    rating_info = FI["rating_descriptions"].get(doc_score.quality_rating, ("", ""))
+
+    yield ["Segmenttejä yhteensä", doc_score.total_segments]
+    yield ["Sanamäärä yhteensä", doc_score.total_word_count]
+    yield ["Virhepistesumma", doc_score.total_penalty]
+    yield []
+    yield ["Virhepisteet / 1000 sanaa", f"{doc_score.error_score:.2f}"]
+    yield ["Virhepisteiden raja-arvo", "≤ 40"]
+    yield ["Virhepisteet", es_pf]
+    yield []
+    yield ["Kriittiset virheet", doc_score.critical_error_count]
+    yield ["Kriittisten virheiden raja-arvo", "≤ 1"]
+    yield ["Kriittiset virheet", cr_pf]
+    yield []
+    yield ["Kokonaistulos", pf_fi]
+    yield ["Laatuarvosana", f"{doc_score.quality_rating}/5 — {rating_info[0]}"]
+    yield ["Kuvaus", rating_info[1]]
+
+    # Virheet tyypeittäin
+    yield []
+    yield ["VIRHEET TYYPEITTÄIN"]
+    yield ["Virhetyyppi", "Lukumäärä", "Virhepistesumma"]
+    for et, count in doc_score.error_type_counts.items():
+        fi_name = FI["error_type_names"].get(et, et)
+        yield [fi_name, count, doc_score.error_type_penalties.get(et, 0)]
+
+    # Virheet vakavuusasteittain
+    yield []
+    yield ["VIRHEET VAKAVUUSASTEITTAIN"]
+    yield ["Vakavuusaste", "Lukumäärä"]
+    for sev, count in doc_score.severity_counts.items():
+        yield [FI["severity_names"].get(sev, sev), count]
+
+
+def iter_export_rows(
+    segments,
+    assessments,
+    seg_scores,
+    doc_score,
+    cache: CsvExportCache | None = None,
+    progress: Callable[[int, int], None] | None = None,
+    profile: CompiledProfile | None = None,
+) -> Iterator[list]:
+    """Yield every row of the export: header, detail rows, totals."""
+    yield EXPORT_HEADER
+    yield from iter_segment_rows(
+        segments, assessments, seg_scores, cache, progress, profile
+    )
+    yield from iter_summary_rows(doc_score)
+
+
+def iter_export_csv_chunks(
+    segments,
+    assessments,
+    seg_scores,
+    doc_score,
+    cache: CsvExportCache | None = None,
+    progress: Callable[[int, int], None] | None = None,
+    profile: CompiledProfile | None = None,
+) -> Iterator[str]:
+    """Yield the CSV text in chunks of CHUNK_ROWS rows."""
+    rows = iter_export_rows(
+        segments, assessments, seg_scores, doc_score, cache, progress, profile
+    )
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    while True:
+        batch = list(islice(rows, CHUNK_ROWS))
+        if not batch:
+            return
+        writer.writerows(batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def write_export_csv(
+    segments,
+    assessments,
+    seg_scores,
+    doc_score,
+    cache: CsvExportCache | None = None,
+    progress: Callable[[int, int], None] | None = None,
+    profile: CompiledProfile | None = None,
+) -> str:
+    """
+    Stream the export into a temp file and return its path.
+
+    If a cache is given, its previous temp file is removed and replaced.
+    """
+    fd, path = tempfile.mkstemp(prefix="tqa_export_", suffix=".csv")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            for chunk in iter_export_csv_chunks(
+                segments, assessments, seg_scores, doc_score, cache, progress, profile
+            ):
+                f.write(chunk)
+    except Exception:
+        os.unlink(path)
+        raise
+
+    if cache is not None:
+        cache.replace_file(path)
+    return path
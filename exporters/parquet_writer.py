@@ -0,0 +1,74 @@
+"""Columnar Parquet export of the annotation rows."""
+
+import os
+import tempfile
+from itertools import islice
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from exporters.csv_writer import CHUNK_ROWS, CsvExportCache, iter_segment_rows
+from assessment.profiles import CompiledProfile
+
+# One row per annotation (or per clean segment, with null error columns)
+PARQUET_SCHEMA = pa.schema(
+    [
+        ("segment_id", pa.int64()),
+        ("source_text", pa.string()),
+        ("target_text", pa.string()),
+        ("source_lang", pa.string()),
+        ("target_lang", pa.string()),
+        ("error_type", pa.string()),
+        ("severity", pa.string()),
+        ("span", pa.string()),
+        ("explanation", pa.string()),
+        ("penalty", pa.float64()),
+        ("segment_word_count", pa.int64()),
+        ("segment_penalty", pa.float64()),
+        ("overall_comment", pa.string()),
+    ]
+)
+
+# Columns that are empty strings in the CSV when a segment has no errors
+_NULLABLE_ERROR_COLUMNS = {5, 6, 7, 8}
+
+
+def write_export_parquet(
+    segments,
+    assessments,
+    seg_scores,
+    cache: CsvExportCache | None = None,
+    profile: CompiledProfile | None = None,
+) -> str:
+    """
+    Write the annotation rows into a temp Parquet file and return its path.
+
+    Rows are converted to Arrow record batches of CHUNK_ROWS rows, so only
+    one batch is held in memory at a time.
+    """
+    rows = iter_segment_rows(
+        segments, assessments, seg_scores, cache, profile=profile
+    )
+    n_cols = len(PARQUET_SCHEMA)
+
+    fd, path = tempfile.mkstemp(prefix="tqa_export_", suffix=".parquet")
+    os.close(fd)
+    try:
+        with pq.ParquetWriter(path, PARQUET_SCHEMA) as writer:
+            while True:
+                batch = list(islice(rows, CHUNK_ROWS))
+                if not batch:
+                    break
+                columns = [[] for _ in range(n_cols)]
+                for row in batch:
+                    for c, value in enumerate(row):
+                        if c in _NULLABLE_ERROR_COLUMNS and value == "":
+                            value = None
+                        columns[c].append(value)
+                writer.write_batch(
+                    pa.record_batch(columns, schema=PARQUET_SCHEMA)
+                )
+    except Exception:
+        os.unlink(path)
+        raise
+    return path
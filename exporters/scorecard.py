@@ -0,0 +1,42 @@
+"""Scorecard table rows shared by the dashboard and the report exports."""
+
+from assessment.profiles import CompiledProfile, get_profile
+from i18n.fi import FI
+
+
+def scorecard_columns(profile: CompiledProfile | None = None) -> list[str]:
+    """Column labels of the scorecard table (Finnish)."""
+    profile = profile or get_profile()
+    return [
+        "#",
+        FI["error_type"],
+        FI["count"],
+        *(
+            f"{FI['severity_names'].get(s, s)} ({profile.weight_label(s)})"
+            for s in profile.severities
+        ),
+        FI["penalty"],
+    ]
+
+
+def scorecard_rows(doc_score, profile: CompiledProfile | None = None) -> list[list]:
+    """
+    One row per error type: number, name, count, counts per severity, penalty.
+
+    Zero counts and penalties are left blank, as on the paper scorecard.
+    """
+    profile = profile or get_profile(doc_score.profile)
+    rows = []
+    for error_type in profile.error_types:
+        severity_counts = doc_score.error_type_severity_counts.get(error_type, {})
+        penalty_total = doc_score.error_type_penalties.get(error_type, 0)
+        rows.append(
+            [
+                profile.type_numbers[error_type],
+                FI["error_type_names"].get(error_type, error_type),
+                sum(severity_counts.values()),
+                *(severity_counts.get(s, 0) or "" for s in profile.severities),
+                penalty_total if penalty_total > 0 else "",
+            ]
+        )
+    return rows
@@ -0,0 +1,96 @@
+"""Multi-sheet Excel scorecard export (openpyxl write-only mode)."""
+
+import os
+import tempfile
+
+from openpyxl import Workbook
+
+from exporters.csv_writer import EXPORT_HEADER, CsvExportCache, iter_segment_rows
+from exporters.scorecard import scorecard_columns, scorecard_rows
+from assessment.profiles import CompiledProfile, get_profile
+from i18n.fi import FI
+
+
+def write_export_xlsx(
+    segments,
+    assessments,
+    seg_scores,
+    doc_score,
+    cache: CsvExportCache | None = None,
+    profile: CompiledProfile | None = None,
+) -> str:
+    """
+    Write the report workbook into a temp file and return its path.
+
+    Sheets:
+      1. Virherivit       - detail rows, same columns as the CSV export
+      2. Pisteytyslomake  - scorecard table and document totals
+      3. Virhetyypit      - count and penalty per error type
+      4. Vakavuusasteet   - count per severity
+
+    Rows are appended one at a time in write-only mode, so the workbook is
+    never held in memory as a whole.
+    """
+    profile = profile or get_profile(doc_score.profile if doc_score else None)
+    wb = Workbook(write_only=True)
+
+    ws = wb.create_sheet("Virherivit")
+    ws.append(EXPORT_HEADER)
+    for row in iter_segment_rows(
+        segments, assessments, seg_scores, cache, profile=profile
+    ):
+        ws.append(row)
+
+    if doc_score:
+        _write_scorecard_sheet(wb.create_sheet("Pisteytyslomake"), doc_score, profile)
+        _write_type_sheet(wb.create_sheet("Virhetyypit"), doc_score)
+        _write_severity_sheet(wb.create_sheet("Vakavuusasteet"), doc_score, profile)
+
+    fd, path = tempfile.mkstemp(prefix="tqa_export_", suffix=".xlsx")
+    os.close(fd)
+    try:
+        wb.save(path)
+    except Exception:
+        os.unlink(path)
+        raise
+    return path
+
+
+def _write_scorecard_sheet(ws, doc_score, profile):
+    ws.append(scorecard_columns(profile))
+    for row in scorecard_rows(doc_score, profile):
+        ws.append(row)
+
+    pf_fi = FI["pass"] if doc_score.overall_pass_fail == "Pass" else FI["fail"]
+    rating_info = FI["rating_descriptions"].get(doc_score.quality_rating, ("", ""))
+
+    ws.append([])
+    ws.append([FI["total_penalty_points"], doc_score.total_penalty])
+    ws.append([FI["word_count"], doc_score.total_word_count])
+    ws.append([FI["error_score_per_1000"], round(doc_score.error_score, 2)])
+    ws.append([FI["critical_count"], doc_score.critical_error_count])
+    ws.append([FI["overall"], pf_fi])
+    ws.append(
+        [FI["quality_rating"], f"{doc_score.quality_rating}/5 — {rating_info[0]}"]
+    )
+
+
+def _write_type_sheet(ws, doc_score):
+    ws.append([FI["error_type"], FI["count"], FI["penalty"]])
+    for et, count in doc_score.error_type_counts.items():
+        ws.append(
+            [
+                FI["error_type_names"].get(et, et),
+                count,
+                doc_score.error_type_penalties.get(et, 0),
+            ]
+        )
+
+
+def _write_severity_sheet(ws, doc_score, profile):
+    ws.append([FI["severity"], FI["count"]])
+    for sev in profile.severities:
+        if sev in doc_score.severity_counts:
+            ws.append(
+                [FI["severity_names"].get(sev, sev), doc_score.severity_counts[sev]]
+            )
@@ -10,6 +10,8 @@ FI = {
     "upload_help": "Excel-tiedosto (.xlsx): segmenttinumero, lähdeteksti, kohdeteksti",
     "source_lang": "Lähdekieli",
     "target_lang": "Kohdekieli",
+    "vendor": "Toimittaja",
+    "delivered": "Toimituspäivä",
     "save_session": "Tallenna arviointi",
     "load_session": "Lataa aiempi arviointi",
     "save_success": "Arviointi tallennettu!",
@@ -17,6 +19,12 @@ FI = {
     "save_help": "Tallentaa arvioinnin JSON-muodossa jatkamista varten",
     "load_help": "Lataa aiemmin tallennettu arviointi (.json)",
     "load_file_label": "Lataa arviointi (.json)",
+    "merge_sessions": "Yhdistä tarkastajien arvioinnit",
+    "merge_files_label": "Arvioinnit (.json, vähintään kaksi)",
+    "merge_help": "Saman dokumentin arvioinnit eri tarkastajilta. Segmentit kohdistetaan segmenttinumeron mukaan.",
+    "merge_button": "Yhdistä",
+    "merge_summary": "{reviewers} arviointia yhdistetty: {segments} segmenttiä, {duplicates} päällekkäistä virhettä poistettu, {conflicts} ristiriitaa.",
+    "merge_report_download": "Lataa ristiriitaraportti",
     # Segmenttitaulukko
     "segments_loaded": "segmenttiä ladattu",
     "segment_col": "Segmentti",
@@ -30,8 +38,17 @@ FI = {
     "annotate_header": "Segmentin {seg_id} virhearviointi",
     "source_label": "Lähde",
     "target_label": "Kohde",
-    "highlight_instruction": "Maalaa virheellinen teksti hiirellä — se kopioituu leikepöydälle. Liitä Ctrl+V / Cmd+V.",
+    "highlight_instruction": "Maalaa virheelliset jaksot hiirellä, valitse kullekin tyyppi ja kirjoita selitys. Enter lisää kaikki kerralla.",
     "selected_text": "Valittu teksti",
+    # Virhejaksojen valintakomponentin tekstit
+    "span_selector": {
+        "hint": "Enter lisää jaksot, Esc tyhjentää, askelpalautin poistaa viimeisimmän.",
+        "commit": "Lisää virheet (Enter)",
+        "clear": "Tyhjennä (Esc)",
+        "explanation": "Selitys",
+        "remove": "Poista jakso",
+    },
+    "spans_added": "{n} virhettä lisätty",
     "error_type": "Virhetyyppi",
     "severity": "Vakavuusaste",
     "error_span": "Virheellinen tekstijakso",
@@ -58,9 +75,11 @@ FI = {
         "Critical Mistranslation": "Kriittinen käännösvirhe",
         "Omission": "Puuttuva sisältö",
         "Numerical Error": "Numerovirhe",
+        "Locale Convention": "Paikallistamiskäytäntö",
     },
     # Vakavuusasteiden suomenkieliset nimet
     "severity_names": {
+        "Neutral": "Neutraali",
         "Minor": "Vähäinen",
         "Major": "Merkittävä",
         "Critical": "Kriittinen",
@@ -100,6 +119,9 @@ FI = {
     },
     # Vienti
     "export_csv": "Lataa tulokset CSV-tiedostona",
+    "prepare_csv": "Valmistele CSV-vienti",
+    "export_xlsx": "Lataa raportti Excel-tiedostona",
+    "export_parquet": "Lataa virherivit Parquet-tiedostona",
     # Aloitus
     "getting_started": "Aloitus",
     "getting_started_steps": (
@@ -111,10 +133,147 @@ FI = {
     # Välilehdet
     "tab_segments": "Segmentit",
     "tab_dashboard": "Yhteenveto",
+    "tab_portfolio": "Portfolio",
+    # Portfolio
+    "portfolio_title": "Portfolio: kaikki toimitukset",
+    "portfolio_files_label": "Tallennetut arvioinnit (.json)",
+    "portfolio_help": "Valitse useita tallennettuja arviointeja. Toimittaja ja toimituspäivä luetaan tiedostoista.",
+    "portfolio_empty": "Lataa tallennettuja arviointeja nähdäksesi yhteenvedon toimittajittain, kielipareittain ja kuukausittain.",
+    "portfolio_group_by": "Ryhmittely",
+    "portfolio_documents": "Dokumentit",
+    "portfolio_no_dates": "Arvioinneissa ei ole toimituspäiviä.",
+    "lang_pair": "Kielipari",
+    "month": "Kuukausi",
+    "pass_rate": "Hyväksymisaste",
+    "error_score_trend": "Virhepisteiden kehitys",
+    "top_error_types": "Eniten virhepisteitä tuottavat virhetyypit",
+    "whatif_title": "Entä jos: raja-arvojen vaikutus",
+    "whatif_help": "Tulokset lasketaan dokumenttien virhepistesummista, sanamääristä ja kriittisten virheiden määristä ilman uutta pisteytystä.",
+    "whatif_rating_scale": "Arvosanarajojen kerroin",
+    "whatif_shift": "Nykyisiin asetuksiin verrattuna **{pass_to_fail}** dokumenttia muuttuisi hylätyksi ja **{fail_to_pass}** hyväksytyksi.",
+    "whatif_rating_distribution": "Laatuarvosanojen jakauma",
     # Painikkeet
     "calculate_scores": "Laske pisteet",
+    # Taustatehtävät
+    "job_parsing": "Luetaan tiedostoa",
+    "job_scoring": "Lasketaan pisteitä",
+    "job_exporting": "Kirjoitetaan CSV-tiedostoa",
+    "cancel_job": "Peruuta",
     # Pisteytysasetukset
     "scoring_settings": "Pisteytysasetukset",
+    # Automaattiset tarkistukset
+    "run_checks": "Suorita automaattiset tarkistukset",
+    "job_checking": "Tarkistetaan segmenttejä",
+    "checks_done": "Ehdotuksia {n} segmentissä",
+    "suggestions": "Automaattiset ehdotukset",
+    "accept": "Hyväksy",
+    "reject": "Hylkää",
+    "qa_number_unit": "Yksikkö tai valuutta eroaa: lähteessä {source}, käännöksessä {target}",
+    "qa_number_changed": "Luku muuttunut: lähteessä {source}, käännöksessä {target}",
+    "qa_number_extra": "Käännöksessä luku, jota ei ole lähteessä: {target}",
+    "qa_number_missing": "Lähteen luku puuttuu käännöksestä: {source}",
+    "qa_spelling": "Sana puuttuu sanakirjasta: {word}",
+    "qa_spelling_suggest": "Sana puuttuu sanakirjasta: {word} (ehdotukset: {suggestions})",
+    "qa_punctuation": "Välimerkkien määrä eroaa (lähde/käännös): {marks}",
+    "qa_end_punct": "Segmentin lopetusmerkki eroaa: lähteessä {source}, käännöksessä {target}",
+    "qa_spaces": "Ylimääräinen välilyönti",
+    "qa_brackets": "Sulkeet eivät ole parillisia",
+    "qa_quotes": "Lainausmerkit eivät ole parillisia",
+    "qa_tags_missing": "Lähteen tagit puuttuvat käännöksestä: {tags}",
+    "qa_tags_extra": "Käännöksessä tagi, jota ei ole lähteessä: {tag}",
+    "qa_untranslated": "Käännös on sama kuin lähde",
+    "qa_mostly_untranslated": "Käännös koostuu enimmäkseen lähteen sanoista",
+    "shared_projects": "Jaetut projektit",
+    "shared_current": "Nykyinen projekti: {name} ({id}), tarkastajia paikalla {n}",
+    "shared_none": "Ei muita avoimia projekteja",
+    "shared_entry": "{name} – {segments} segmenttiä, tarkastajia {n}",
+    "shared_join_help": "Liity projektiin: näet muiden tarkastajien merkinnät ja he näkevät sinun merkintäsi.",
+    "shared_changed": "Toinen tarkastaja muutti {n} segmenttiä",
+    "shared_many": "useita",
+    "shared_conflict": "Toinen tarkastaja muutti segmenttiä juuri ennen sinua; muutosta ei tallennettu. Tarkista uusi tila ja yritä uudelleen.",
+    "run_llm": "Esiannotoi kielimallilla",
+    "run_llm_help": "Lähettää segmentit TQA_LLM_URL-palveluun; aiemmin arvioidut muuttumattomat segmentit haetaan välimuistista.",
+    "job_llm": "Esiannotoidaan kielimallilla",
+    "llm_done": "Kielimallin ehdotuksia {n} segmentissä ({cached} välimuistista, {requested} lähetetty)",
+    "llm_failed": "{n} segmentin arviointi epäonnistui; ne lähetetään uudelleen seuraavalla ajolla",
+    "check_timings": "Tarkistukset kestivät {elapsed:.1f} s ({timings})",
+    "check_names": {
+        "numbers": "luvut",
+        "spelling": "oikeinkirjoitus",
+        "glossary": "termistö",
+        "punctuation": "välimerkit",
+        "end_punct": "lopetusmerkit",
+        "spaces": "välilyönnit",
+        "brackets": "sulkeet",
+        "tags": "tagit",
+        "untranslated": "kääntämättömät",
+    },
+    "qa_glossary": "Termin '{source}' vastinetta ei löydy käännöksestä, termistön mukaan: {target}",
+    "glossary": "Termistö",
+    "glossary_label": "Lataa termistö (CSV tai TBX)",
+    "glossary_help": "CSV: lähdetermi, kohdetermi (vaihtoehdot erotetaan |-merkillä) ja valinnainen huomautus; otsikkorivi (esim. source, target tai lähdetermi, kohdetermi) ohitetaan. TBX: termit valittujen lähde- ja kohdekielten mukaan.",
+    "glossary_loaded": "{n} termiä, tarkistetaan automaattisten tarkistusten yhteydessä",
+    # Tarkastusjärjestys
+    "risk_col": "Riski",
+    "segment_order": "Järjestys",
+    "segment_orders": {
+        "file": "Tiedoston järjestys",
+        "risk": "Suurin riski ensin",
+        "repetitions": "Toistot ryhmiteltyinä",
+    },
+    # Virhemuisti
+    "memory": "Virhemuisti",
+    "memory_size": "Muistissa {n} aiemmin merkittyä virhettä",
+    "memory_files_label": "Lisää aiempia arviointeja muistiin (JSON)",
+    "memory_help": "Tallennettujen arviointien virheet lisätään muistiin. Tallennetut arvioinnit lisätään muistiin automaattisesti.",
+    "memory_import": "Lisää muistiin",
+    "memory_added": "Virhemuistiin lisätty {n} virhettä",
+    "memory_matches": "Aiemmin merkittyjä virheitä",
+    "memory_match_info": "osuvuus {similarity:.0%}, merkitty {count} kertaa",
+    "memory_use": "Käytä",
+    "job_memory": "Haetaan virhemuistista",
+    # Toistot
+    "repetitions_title": "Samanlaisia segmenttejä dokumentissa",
+    "propagate": "Lisää myös toistoihin ({n} segmenttiä)",
+    "propagate_help": "Virhe lisätään samanlaisiin segmentteihin, joiden käännöksessä sama virhejakso esiintyy.",
+    "propagated": "Virhe lisätty {added} toistoon, ohitettu {skipped} (virhejaksoa ei löytynyt)",
+    # Tarkastajien yhtäpitävyys
+    "tab_agreement": "Yhtäpitävyys",
+    "agreement_title": "Tarkastajien yhtäpitävyys",
+    "agreement_files_label": "Saman dokumentin arvioinnit (JSON)",
+    "agreement_help": "Valitse vähintään kaksi eri tarkastajien tallentamaa arviointia samasta dokumentista.",
+    "agreement_empty": "Lataa vähintään kaksi arviointia verrattavaksi.",
+    "agreement_units": "Virhekohdat",
+    "agreement_full": "Täysin yhtäpitävät",
+    "agreement_type_kappa": "Virhetyyppi κ",
+    "agreement_severity_kappa": "Vakavuus κ",
+    "agreement_segments": "Verrattu {n} segmenttiä, jotka ovat kaikissa arvioinneissa.",
+    "agreement_pairs": "Tarkastajaparit (Cohenin κ ja segmenttipisteiden korrelaatio)",
+    "agreement_pair": "Tarkastajat",
+    "agreement_per_type": "Virhetyypeittäin",
+    "agreement_per_severity": "Vakavuusasteittain",
+    "agreement_category": "Luokka",
+    "agreement_download": "Lataa yhtäpitävyysraportti (JSON)",
+    # Otantatarkastus
+    "sampling": "Otantatarkastus",
+    "sample_size": "Otoskoko (segmenttejä)",
+    "sample_stratify": "Ositus segmentin pituuden mukaan",
+    "sample_stratify_help": "Otos jaetaan pituusluokkiin (sanamäärän kvartiilit) niiden koon suhteessa.",
+    "draw_sample": "Arvo otos",
+    "clear_sample": "Tarkasta kaikki",
+    "sample_active": "Otos: {n} / {total} segmenttiä",
+    "sample_estimate": "Arvio koko dokumentille",
+    "sample_method": "Luottamusväli",
+    "sample_methods": {"bootstrap": "Bootstrap", "analytical": "Analyyttinen"},
+    "sample_confidence": "Luottamustaso",
+    "sample_error_score": "Arvioidut virhepisteet",
+    "sample_interval": "{confidence:.0%} luottamusväli",
+    "pass_probability": "Hyväksymistodennäköisyys",
+    "pass_probability_help": "Todennäköisyys, että koko dokumentin virhepisteet ovat enintään {threshold}.",
+    "sample_coverage": "Tarkastettu sanamäärästä",
+    "sample_rescore": "Otos on muuttunut – laske pisteet uudelleen.",
+    "scoring_profile": "Pisteytysprofiili",
+    "scoring_profile_help": "Virhetyypit, vakavuusasteet ja niiden painot. Profiilit luetaan profiles/-kansion TOML-tiedostoista.",
     "rating_threshold_label_5": "Arvosana 5 — enintään",
     "rating_threshold_label_4": "Arvosana 4 — enintään",
     "rating_threshold_label_3": "Arvosana 3 — enintään",
@@ -124,4 +283,30 @@ FI = {
     "critical_error_max_label": "Kriittisten virheiden enimmäismäärä",
     "reset_defaults": "Palauta oletusasetukset",
     "defaults_restored": "Oletusasetukset palautettu.",
+    # Kehittäjän suorituskykypaneeli (TQA_DEV=1 tai ?dev=<TQA_DEV_TOKEN>)
+    "dev_panel": "Suorituskyky (kehittäjä)",
+    "dev_trace": "Mittaa kuumien polkujen ajat",
+    "dev_trace_off": "Mittaus ei ole päällä.",
+    "dev_rerun": "Kierros",
+    "dev_rerun_entry": "#{id} klo {time} ({ms:.0f} ms)",
+    "dev_no_reruns": "Ei vielä mitattuja kierroksia tässä sessiossa.",
+    "dev_background": "Taustatehtävät ja fragmentit",
+    "dev_columns": {
+        "name": "Kohta",
+        "calls": "Kutsuja",
+        "total": "Yhteensä (ms)",
+        "max": "Pisin (ms)",
+        "size": "Koko",
+    },
+    "dev_download": "Lataa trace (JSON)",
+    "dev_download_help": "Chrome trace -muoto: avaa chrome://tracing tai ui.perfetto.dev",
+    "dev_memory_total": "**Sessioiden muisti:** {total:.1f} Mt / budjetti {budget} Mt",
+    "dev_memory_unlimited": "ei rajaa",
+    "dev_memory_you": "sinä",
+    "dev_memory_columns": {
+        "session": "Sessio",
+        "total": "Koko (Mt)",
+        "largest": "Suurimmat avaimet (Mt)",
+        "evicted": "Vapautettu (Mt)",
+    },
 }
@@ -0,0 +1,168 @@
+"""
+Background job runner for long operations (parsing, scoring, export).
+
+Jobs run on a process-wide thread pool, so they outlive the Streamlit rerun
+that submitted them. Each job is identified by a key describing its input;
+submitting a key that is already pending or running returns the existing
+job instead of starting a duplicate. Every submitter is a subscriber of the
+job: cancel(subscriber) only drops that subscription, and the job is
+cancelled once no subscriber is left, so one session cannot cancel a job
+that another session is waiting for. Job functions receive the Job as their
+first argument and call job.report(done, total) to publish progress; the
+same call raises JobCancelled once the job has been cancelled.
+
+Threads are used instead of processes because job results (model lists)
+are handed over to the session without pickling, and the heavy parts
+(pandas/openpyxl I/O) spend much of their time outside the GIL.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+# Finished jobs are kept this long so that every session polling them can
+# pick up the result
+FINISHED_JOB_TTL = 300
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class JobCancelled(Exception):
+    """Raised inside a job function when the job has been cancelled."""
+
+
+class Job:
+    """State of one background job."""
+
+    def __init__(self, key: str, label: str):
+        self.key = key
+        self.label = label
+        self.status = PENDING
+        self.progress = 0.0  # 0..1
+        self.result: Any = None
+        self.error: BaseException | None = None
+        self.finished_at: float | None = None
+        self._cancel = threading.Event()
+        self._subscribers: set[str | None] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED, CANCELLED)
+
+    def report(self, done: int, total: int):
+        """Publish progress; raises JobCancelled if cancellation was requested."""
+        if self._cancel.is_set():
+            raise JobCancelled()
+        self.progress = min(done / total, 1.0) if total else 0.0
+
+    def cancel(self, subscriber: str | None = None):
+        """Drop the subscription; the last one to go cancels the job."""
+        with self._lock:
+            self._subscribers.discard(subscriber)
+            if self._subscribers:
+                return
+            self._cancel.set()
+        if self.status == PENDING:
+            self._finish(CANCELLED)
+
+    def _subscribe(self, subscriber: str | None) -> bool:
+        """Add a subscriber; False if the job has already been cancelled."""
+        with self._lock:
+            if self._cancel.is_set():
+                return False
+            self._subscribers.add(subscriber)
+            return True
+
+    def _finish(self, status: str):
+        self.status = status
+        self.finished_at = time.monotonic()
+
+
+class JobRunner:
+    """Thread pool plus a registry of jobs by key."""
+
+    def __init__(self, max_workers: int | None = None):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="tqa-job"
+        )
+        self._jobs: dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        key: str,
+        label: str,
+        fn: Callable[..., Any],
+        *args,
+        subscriber: str | None = None,
+        **kwargs,
+    ) -> Job:
+        """
+        Start fn(job, *args, **kwargs) in the background and return its Job.
+
+        If a job with the same key is pending or running and not cancelled,
+        subscriber is added to that job and it is returned instead.
+        """
+        with self._lock:
+            self._prune()
+            existing = self._jobs.get(key)
+            if (
+                existing is not None
+                and existing.status in (PENDING, RUNNING)
+                and existing._subscribe(subscriber)
+            ):
+                return existing
+            job = Job(key, label)
+            job._subscribe(subscriber)
+            self._jobs[key] = job
+
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def get(self, key: str) -> Job | None:
+        with self._lock:
+            return self._jobs.get(key)
+
+    def _run(self, job: Job, fn, args, kwargs):
+        if job.status == CANCELLED:
+            return
+        job.status = RUNNING
+        try:
+            job.result = fn(job, *args, **kwargs)
+            job.progress = 1.0
+            job._finish(DONE)
+        except JobCancelled:
+            job._finish(CANCELLED)
+        except BaseException as e:
+            job.error = e
+            job._finish(FAILED)
+
+    def _prune(self):
+        now = time.monotonic()
+        expired = [
+            key
+            for key, job in self._jobs.items()
+            if job.finished and now - job.finished_at > FINISHED_JOB_TTL
+        ]
+        for key in expired:
+            del self._jobs[key]
+
+
+_runner: JobRunner | None = None
+_runner_lock = threading.Lock()
+
+
+def get_runner() -> JobRunner:
+    """The process-wide runner (worker count from TQA_JOB_WORKERS, default 4)."""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = JobRunner(int(os.environ.get("TQA_JOB_WORKERS", "4")))
+        return _runner
@@ -1,4 +1,6 @@
-from pydantic import BaseModel, Field
+from array import array
+
+from pydantic import BaseModel, ConfigDict, Field
 
 
 # The 12 error types from the scorecard
@@ -69,6 +71,33 @@ class ErrorAnnotation(BaseModel):
         description="The exact span of text in the target that contains the error"
     )
     explanation: str = Field(description="Brief explanation of the error")
+    start: int | None = Field(
+        default=None,
+        description="Character offset of the span in the target, if known",
+    )
+    end: int | None = Field(
+        default=None, description="End offset (exclusive) of the span, if known"
+    )
+
+
+class Suggestion(BaseModel):
+    """An annotation proposed by an automatic check, pending reviewer decision."""
+
+    check: str  # name of the check that produced it
+    annotation: ErrorAnnotation
+
+    def key(self, segment_id: int) -> tuple:
+        """Identity used to remember accepted and rejected suggestions."""
+        ann = self.annotation
+        return (
+            segment_id,
+            self.check,
+            ann.error_type,
+            ann.start,
+            ann.end,
+            ann.span,
+            ann.explanation,
+        )
 
 
 class SegmentAssessment(BaseModel):
@@ -90,15 +119,31 @@ class TranslationSegment(BaseModel):
     target_text: str
     source_lang: str = ""
     target_lang: str = ""
+    # Target word count, computed once at ingest (assessment/wordcount)
+    word_count: int | None = None
+    # Review-priority risk score, computed once at ingest (assessment/risk)
+    risk: float | None = None
+    # Position of the first segment of this segment's repetition group,
+    # computed once at ingest (assessment/repetitions)
+    repetition_group: int | None = None
 
 
-class SegmentScore(BaseModel):
-    """Computed score for a single segment."""
+class SegmentScores(BaseModel):
+    """
+    Computed scores of the scored segments, as parallel arrays of machine
+    numbers. Annotations are not copied here: they are read from the
+    assessments at the document positions in indices.
+    """
 
-    segment_id: int
-    word_count: int
-    total_penalty: float
-    annotations: list[ErrorAnnotation]
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    indices: array  # position of each scored segment in the document ("q")
+    segment_ids: array  # ("q")
+    word_counts: array  # target words, at least 1 ("q")
+    penalties: array  # penalty points ("d")
+
+    def __len__(self) -> int:
+        return len(self.indices)
 
 
 class DocumentScore(BaseModel):
@@ -120,3 +165,15 @@ class DocumentScore(BaseModel):
     error_type_severity_counts: dict[str, dict[str, int]]
     # Per error type penalty totals
     error_type_penalties: dict[str, float]
+    # Name of the scoring profile the penalties were computed with
+    profile: str = "default"
+
+
+class SamplePlan(BaseModel):
+    """Segments drawn for a sampling review, with their length strata."""
+
+    indices: list[int]  # positions in the segment list, ascending
+    strata: list[int]  # stratum of each sampled segment
+    stratum_sizes: list[int]  # segments per stratum in the whole document
+    population_words: int
+    seed: int
@@ -0,0 +1,53 @@
+"""Saved assessment session (the JSON file written by the sidebar)."""
+
+import json
+
+from pydantic import BaseModel, Field
+
+from models.data_models import (
+    DocumentScore,
+    SamplePlan,
+    SegmentAssessment,
+    TranslationSegment,
+)
+from perf.trace import traced
+
+SESSION_VERSION = 2
+
+
+class SessionData(BaseModel):
+    """Segments, their assessments and the scoring settings of one session."""
+
+    version: int = SESSION_VERSION
+    source_lang: str = ""
+    target_lang: str = ""
+    segments: list[TranslationSegment]
+    assessments: list[SegmentAssessment]
+    scoring_settings: dict | None = Field(default=None)
+    scoring_profile: str = "default"
+    # Project metadata for portfolio reporting
+    vendor: str = ""
+    delivered: str = ""  # ISO date of the delivery
+    # Score at save time, so portfolio reports need not re-score the file
+    document_score: DocumentScore | None = None
+    # Segments drawn for a sampling review (None = full review)
+    sample: SamplePlan | None = None
+
+
+@traced("session_to_json", size=lambda data, *args, **kwargs: len(data))
+def session_to_json(session: SessionData) -> str:
+    """Serialize a session in the saved-file format."""
+    return json.dumps(session.model_dump(), ensure_ascii=False, indent=2)
+
+
+@traced("load_session", size=lambda session, *args, **kwargs: len(session.segments))
+def load_session(source) -> SessionData:
+    """Load a session from a path, an open file or an already parsed dict."""
+    if isinstance(source, dict):
+        data = source
+    elif isinstance(source, str):
+        with open(source, encoding="utf-8") as f:
+            data = json.load(f)
+    else:
+        data = json.load(source)
+    return SessionData(**data)
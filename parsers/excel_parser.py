@@ -1,10 +1,19 @@
-import pandas as pd
+from typing import Callable
 
 from models.data_models import TranslationSegment
+from perf.trace import traced
+from assessment.wordcount import get_counter
 
+# Rows between progress callbacks
+PROGRESS_EVERY = 500
 
+
+@traced("parse_excel", size=lambda segments, *args, **kwargs: len(segments))
 def parse_excel(
-    uploaded_file, source_lang: str = "", target_lang: str = ""
+    uploaded_file,
+    source_lang: str = "",
+    target_lang: str = "",
+    progress: Callable[[int, int], None] | None = None,
 ) -> list[TranslationSegment]:
     """
     Parse an Excel (.xlsx) file with three columns (by position):
@@ -12,9 +21,17 @@ def parse_excel(
       2. Source text (ST segment)
       3. Translated text (target segment)
 
-    First row is treated as a header. Language pair is provided externally.
+    First row is treated as a header. Language pair is provided externally;
+    target word counts (with the target language's counter), review risk
+    scores and repetition groups are computed here.
+    If progress is given, it is called as progress(rows_done, rows_total).
     Returns a list of TranslationSegment objects.
     """
+    import pandas as pd  # lazy: keeps pandas out of app start-up
+
+    from assessment.repetitions import repetition_groups
+    from assessment.risk import risk_scores
+
     df = pd.read_excel(uploaded_file, engine="openpyxl")
 
     if len(df.columns) < 3:
@@ -30,19 +47,34 @@ def parse_excel(
 
     # Drop rows where source or target is empty
     df = df.dropna(subset=["source_text", "target_text"])
+    df["source_text"] = df["source_text"].astype(str).str.strip()
+    df["target_text"] = df["target_text"].astype(str).str.strip()
+
+    counter = get_counter(target_lang)
+    word_counts = [counter(t) for t in df["target_text"]]
+    # Review-priority risk for the whole file in one vectorized pass
+    risks = risk_scores(df["source_text"], df["target_text"], word_counts)
+    # Identical and near-identical segments, for propagating annotations
+    groups = repetition_groups(df["source_text"], df["target_text"])
 
     segments = []
-    for _, row in df.iterrows():
+    total = len(df)
+    for n, (_, row) in enumerate(df.iterrows()):
+        if progress is not None and n % PROGRESS_EVERY == 0:
+            progress(n, total)
         seg_num = row["segment_number"]
         seg_id = int(seg_num) if pd.notna(seg_num) else len(segments)
 
         segments.append(
             TranslationSegment(
                 id=seg_id,
-                source_text=str(row["source_text"]).strip(),
-                target_text=str(row["target_text"]).strip(),
+                source_text=row["source_text"],
+                target_text=row["target_text"],
                 source_lang=source_lang,
                 target_lang=target_lang,
+                word_count=word_counts[n],
+                risk=risks[n],
+                repetition_group=groups[n],
             )
         )
 
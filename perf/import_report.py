@@ -0,0 +1,102 @@
+"""
+Import-time report for app start-up.
+
+Imports the app module in a fresh interpreter with `-X importtime`, then
+prints the slowest top-level imports, the total import time and whether any
+of the heavy dependencies (loaded lazily at first use) were pulled in.
+
+Usage:
+    python -m perf.import_report [--module app] [--top 15] [--check]
+
+With --check, the exit status is 1 if a heavy dependency is imported at
+start-up.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+# Loaded lazily behind the dashboard, parser and export functions.
+# (Streamlit itself imports the base plotly package for its chart theme, so
+# plotly.express is the module to watch.)
+HEAVY_MODULES = ["pandas", "plotly.express", "openpyxl", "pyarrow", "numpy"]
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_imports(
+    module: str = "app",
+) -> tuple[int, list[tuple[str, int, int]], list[str]]:
+    """
+    Import `module` in a subprocess.
+
+    Returns (cumulative import time of the module in microseconds,
+    [(name, self_us, cumulative_us), ...] for its direct imports,
+    heavy modules present in sys.modules afterwards).
+    """
+    probe = (
+        f"import sys, {module}; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    # -X importtime prints a module after its imports, indented two spaces
+    # per nesting level
+    total_us = 0
+    children: list[tuple[str, int, int]] = []
+    timings: list[tuple[str, int, int]] = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or line.count("|") != 2:
+            continue
+        self_part, cumulative_part, name = line[len("import time:"):].split("|")
+        try:
+            self_us, cumulative_us = int(self_part), int(cumulative_part)
+        except ValueError:
+            continue  # header line
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        if depth == 1:
+            children.append((name.strip(), self_us, cumulative_us))
+        elif depth == 0:
+            if name.strip() == module:
+                total_us = cumulative_us
+                timings = children
+            children = []
+
+    loaded = [m for m in proc.stdout.strip().split(",") if m]
+    return total_us, timings, loaded
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Report app start-up import time.")
+    parser.add_argument("--module", default="app", help="Module to import")
+    parser.add_argument("--top", type=int, default=15, help="Rows to show")
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Fail if a heavy dependency is imported at start-up",
+    )
+    args = parser.parse_args(argv)
+
+    total_us, timings, loaded = measure_imports(args.module)
+
+    print(f"{'module':<40} {'self ms':>10} {'cumulative ms':>14}")
+    for name, self_us, cumulative_us in sorted(timings, key=lambda t: -t[2])[
+        : args.top
+    ]:
+        print(f"{name:<40} {self_us / 1000:>10.1f} {cumulative_us / 1000:>14.1f}")
+    print(f"\nTotal import time of {args.module}: {total_us / 1000:.1f} ms")
+    print(f"Heavy modules loaded at start-up: {', '.join(loaded) or 'none'}")
+
+    if args.check and loaded:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
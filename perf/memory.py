@@ -0,0 +1,276 @@
+"""
+Per-session memory accounting and pressure-based eviction.
+
+After each rerun a session reports its state to the process-wide
+accountant, which estimates the size (deep_size) of each key whose value
+was replaced since the last report, and of every key once per
+ACCOUNT_INTERVAL to catch values changed in place. Large containers are
+sized from an evenly spaced sample of SAMPLE items, so accounting a
+100 000-segment document costs about as much as a small one.
+
+Keys holding derived data (caches that the UI rebuilds when they are
+missing) are registered with register_evictable(). When the accounted total
+of all sessions exceeds the budget (TQA_MEMORY_BUDGET_MB, 0 = no limit),
+derived keys are evicted until the total is back under LOW_WATER of the
+budget: those of the longest idle sessions first, the largest first within
+a session. Source data (segments, assessments, scores, suggestions) is
+never evicted.
+
+Values owned by the shared project store are reported as shared: they are
+counted once for the node however many sessions use them.
+
+Session state is not thread-safe, so the report that pushes the node over
+budget never touches other sessions' state: the chosen keys are only marked
+pending in their session (their bytes count as freed from then on), and
+each session deletes or releases its own pending keys on its script thread
+when it next reports. A key whose value was replaced in the meantime is
+left alone.
+"""
+
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import deque
+from collections.abc import Mapping, MutableMapping
+from typing import Any, Callable, NamedTuple
+
+BUDGET = int(os.environ.get("TQA_MEMORY_BUDGET_MB", 1024)) * 2**20
+LOW_WATER = 0.8  # eviction stops at this fraction of the budget
+ACCOUNT_INTERVAL = 10.0  # seconds between measurements of one session
+SAMPLE = 256  # items measured per large container
+
+_ATOMIC = (str, bytes, bytearray, int, float, complex, bool, type(None))
+
+
+def deep_size(obj: Any, seen: set[int] | None = None) -> int:
+    """
+    Approximate bytes held by obj and everything it references. Objects
+    already in seen are not counted again; containers longer than SAMPLE
+    are extrapolated from a sample of their items.
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj, 0)
+    if isinstance(obj, _ATOMIC) or isinstance(obj, type):
+        return size
+    if isinstance(obj, Mapping):
+        return size + _items_size(obj.items(), len(obj), seen)
+    if isinstance(obj, (list, tuple, set, frozenset, deque)):
+        return size + _items_size(obj, len(obj), seen)
+    if type(obj).__sizeof__ is not object.__sizeof__:
+        # numpy arrays, data frames: the object reports its own data
+        return size
+    attrs = getattr(obj, "__dict__", None)
+    if attrs is not None:
+        size += deep_size(attrs, seen)
+    for slot in getattr(type(obj), "__slots__", ()):
+        if hasattr(obj, slot):
+            size += deep_size(getattr(obj, slot), seen)
+    return size
+
+
+def _items_size(items, n: int, seen: set[int]) -> int:
+    if n <= SAMPLE:
+        return sum(deep_size(item, seen) for item in items)
+    if isinstance(items, (list, tuple)):
+        sample = items[:: n // SAMPLE]
+    else:
+        sample = list(itertools.islice(items, SAMPLE))
+    return sum(deep_size(item, seen) for item in sample) * n // len(sample)
+
+
+class Evictable(NamedTuple):
+    linked: tuple[str, ...]  # keys dropped together with this one
+    release: Callable[[Any], None] | None  # frees the value in place instead
+
+
+class SessionUsage:
+    """Accounted state of one session."""
+
+    def __init__(self, session: str, state: MutableMapping, alive: Callable[[], bool]):
+        self.session = session
+        self.state = state  # latest handle to the session's state
+        self.alive = alive  # False once the session has closed
+        self.sizes: dict[str, int] = {}  # key -> bytes, shared values excluded
+        self.shared: dict[str, tuple[int, int]] = {}  # key -> (object id, bytes)
+        self.ids: dict[str, int] = {}  # key -> id of the value when sized
+        self.measured = 0.0  # time of the last full measurement
+        self.active = time.monotonic()
+        self.evicted = 0  # bytes evicted from this session so far
+        self.pending: dict[str, int] = {}  # key -> id of the value to evict
+
+    @property
+    def total(self) -> int:
+        return sum(self.sizes.values())
+
+
+class MemoryAccountant:
+    """Sizes of all sessions' state and the derived keys that may be evicted."""
+
+    def __init__(self, budget: int = BUDGET):
+        self.budget = budget
+        self._evictable: dict[str, Evictable] = {}
+        self._sessions: dict[str, SessionUsage] = {}
+        self._lock = threading.Lock()
+
+    def register_evictable(
+        self,
+        key: str,
+        *linked: str,
+        release: Callable[[Any], None] | None = None,
+    ):
+        """
+        Mark a state key as derived data. On eviction the key and the linked
+        keys are deleted, or, if release is given, release(value) is called
+        and the key is kept (for objects that also track files and the like).
+        """
+        self._evictable[key] = Evictable(linked, release)
+
+    def account(
+        self,
+        session: str,
+        state: MutableMapping,
+        values: Mapping[str, Any],
+        alive: Callable[[], bool] = lambda: True,
+        shared: set[str] = frozenset(),
+        force: bool = False,
+    ) -> SessionUsage:
+        """
+        Record that a session has run and measure its state (the replaced
+        values; all of them if ACCOUNT_INTERVAL has passed or force). values
+        is a snapshot of the contents of state, and alive tells whether the
+        session is still open. Keys in shared are counted as shared values.
+        Must be called on the session's own thread: its pending evictions are
+        applied to state first. Marks derived data for eviction if the node
+        is over budget.
+        """
+        now = time.monotonic()
+        with self._lock:
+            usage = self._sessions.get(session)
+            if usage is None:
+                usage = self._sessions[session] = SessionUsage(session, state, alive)
+            usage.state, usage.alive = state, alive
+            usage.active = now
+            full = force or now - usage.measured >= ACCOUNT_INTERVAL
+            if full:
+                usage.measured = now
+            pending, usage.pending = usage.pending, {}
+            previous = usage.ids
+
+        if pending:
+            changed = self._apply_evictions(state, pending)
+            values = {k: v for k, v in values.items() if k in state}
+            # Released values are measured again
+            previous = {k: v for k, v in previous.items() if k not in changed}
+
+        # Between full measurements only keys whose value was replaced are sized
+        ids = {key: id(value) for key, value in values.items()}
+        if not full and ids == previous:
+            return usage
+        sizes, shared_sizes = {}, {}
+        for key, value in values.items():
+            replaced = full or previous.get(key) != ids[key]
+            if key in shared:
+                if replaced or key not in usage.shared:
+                    shared_sizes[key] = (ids[key], deep_size(value))
+                else:
+                    shared_sizes[key] = usage.shared[key]
+            elif replaced or key not in usage.sizes:
+                sizes[key] = deep_size(value)
+            else:
+                sizes[key] = usage.sizes[key]
+
+        with self._lock:
+            usage.ids = ids
+            usage.sizes = sizes
+            usage.shared = shared_sizes
+            self._enforce()
+        return usage
+
+    def total(self) -> int:
+        """Accounted bytes of all sessions, shared values counted once."""
+        with self._lock:
+            return self._total()
+
+    def _total(self) -> int:
+        shared = {}
+        for usage in self._sessions.values():
+            shared.update(usage.shared.values())
+        return sum(u.total for u in self._sessions.values()) + sum(shared.values())
+
+    def _enforce(self):
+        for session, usage in list(self._sessions.items()):
+            if not usage.alive():
+                del self._sessions[session]
+        if not self.budget:
+            return
+        total = self._total()
+        if total <= self.budget:
+            return
+        candidates = sorted(
+            (
+                (usage.active, -size, key, usage)
+                for usage in self._sessions.values()
+                for key, size in usage.sizes.items()
+                if key in self._evictable
+            ),
+            key=lambda c: c[:3],
+        )
+        for _, _, key, usage in candidates:
+            if total <= self.budget * LOW_WATER:
+                break
+            if key not in usage.ids or key in usage.pending:
+                continue
+            usage.pending[key] = usage.ids[key]
+            entry = self._evictable[key]
+            for k in (key,) if entry.release else (key, *entry.linked):
+                freed = usage.sizes.pop(k, 0)
+                usage.evicted += freed
+                total -= freed
+
+    def _apply_evictions(self, state: MutableMapping, pending: dict[str, int]) -> set[str]:
+        """Delete or release the pending keys that still hold the marked value."""
+        changed = set()
+        for key, value_id in pending.items():
+            entry = self._evictable[key]
+            if key not in state or id(state[key]) != value_id:
+                continue
+            value = state[key]
+            if entry.release is not None:
+                entry.release(value)
+                changed.add(key)
+                continue
+            for k in (key, *entry.linked):
+                if k in state:
+                    del state[k]
+                    changed.add(k)
+        return changed
+
+    def usage(self) -> list[SessionUsage]:
+        """Sessions by accounted size, largest first."""
+        with self._lock:
+            sessions = list(self._sessions.values())
+        return sorted(sessions, key=lambda u: -u.total)
+
+
+_accountant: MemoryAccountant | None = None
+_accountant_lock = threading.Lock()
+
+
+def get_accountant() -> MemoryAccountant:
+    """The process-wide memory accountant."""
+    global _accountant
+    with _accountant_lock:
+        if _accountant is None:
+            _accountant = MemoryAccountant()
+        return _accountant
+
+
+def register_evictable(key: str, *linked: str, release: Callable[[Any], None] | None = None):
+    """Register a derived state key with the process-wide accountant."""
+    get_accountant().register_evictable(key, *linked, release=release)
@@ -0,0 +1,234 @@
+"""
+Timing instrumentation for the app's hot paths.
+
+Functions are wrapped with @traced(...) and code blocks with span(...):
+
+    @traced("parse_excel", size=lambda segments, *args, **kwargs: len(segments))
+    def parse_excel(...): ...
+
+    with span("build_rows", size=len(rows)):
+        ...
+
+Each call records its duration and, if size is given, a payload size (for
+traced functions, size is called with the result followed by the call's
+arguments). Calls are recorded in two places:
+  - a process-wide ring buffer of the last RING_SIZE events, exported in
+    the Chrome trace event format (chrome://tracing, Perfetto) by
+    chrome_trace()
+  - per-rerun statistics (calls, total and max duration, total size per
+    name) for the RERUNS_KEPT most recent reruns; calls made outside a
+    rerun (background jobs, fragment reruns) go to one background table
+
+Functions called once per segment are traced with detail=False, which
+updates the statistics without adding an event per call.
+
+Instrumentation is off unless TQA_TRACE=1 or set_enabled(True) (the
+developer panel's toggle); when off, a traced call costs one flag test.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Callable, NamedTuple
+
+RING_SIZE = int(os.environ.get("TQA_TRACE_EVENTS", 20_000))
+RERUNS_KEPT = 100
+
+_enabled = os.environ.get("TQA_TRACE") == "1"
+
+
+class Event(NamedTuple):
+    name: str
+    start_ns: int  # time.perf_counter_ns() at the start
+    duration_ns: int
+    size: int | None
+    thread: int
+    rerun: int | None
+
+
+class Stat:
+    """Accumulated calls of one name."""
+
+    __slots__ = ("calls", "total_ns", "max_ns", "size")
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.size = 0
+
+    def add(self, duration_ns: int, size: int | None):
+        self.calls += 1
+        self.total_ns += duration_ns
+        self.max_ns = max(self.max_ns, duration_ns)
+        if size is not None:
+            self.size += size
+
+
+class Rerun:
+    """One traced script run of a session."""
+
+    def __init__(self, rerun_id: int, session: str):
+        self.id = rerun_id
+        self.session = session
+        self.started = time.time()
+        self.duration_ns: int | None = None  # None while running
+        self.stats: dict[str, Stat] = {}
+
+
+_events: deque[Event] = deque(maxlen=RING_SIZE)
+_reruns: OrderedDict[int, Rerun] = OrderedDict()
+_background: dict[str, Stat] = {}
+_lock = threading.Lock()
+_local = threading.local()
+_next_rerun = 0
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def set_enabled(on: bool):
+    global _enabled
+    _enabled = on
+
+
+def _record(name: str, start_ns: int, duration_ns: int, size: int | None, detail: bool):
+    rerun: Rerun | None = getattr(_local, "rerun", None)
+    if detail:
+        _events.append(
+            Event(
+                name,
+                start_ns,
+                duration_ns,
+                size,
+                threading.get_ident(),
+                rerun.id if rerun else None,
+            )
+        )
+    stats = rerun.stats if rerun is not None else _background
+    with _lock:
+        stat = stats.get(name)
+        if stat is None:
+            stat = stats[name] = Stat()
+        stat.add(duration_ns, size)
+
+
+@contextmanager
+def span(name: str, size: int | None = None, detail: bool = True):
+    """Time the enclosed block under name."""
+    if not _enabled:
+        yield
+        return
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        _record(name, start, time.perf_counter_ns() - start, size, detail)
+
+
+def traced(
+    name: str | None = None,
+    size: Callable[..., int] | None = None,
+    detail: bool = True,
+):
+    """Decorator timing every call of a function (name defaults to its qualname)."""
+
+    def decorate(fn):
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter_ns()
+            result = fn(*args, **kwargs)
+            duration = time.perf_counter_ns() - start
+            _record(
+                label,
+                start,
+                duration,
+                size(result, *args, **kwargs) if size is not None else None,
+                detail,
+            )
+            return result
+
+        return wrapper
+
+    return decorate
+
+
+@contextmanager
+def rerun(session: str):
+    """Attribute the calls made on this thread in the block to one rerun."""
+    global _next_rerun
+    if not _enabled:
+        yield None
+        return
+    with _lock:
+        _next_rerun += 1
+        record = Rerun(_next_rerun, session)
+        _reruns[record.id] = record
+        while len(_reruns) > RERUNS_KEPT:
+            _reruns.popitem(last=False)
+    previous = getattr(_local, "rerun", None)
+    _local.rerun = record
+    start = time.perf_counter_ns()
+    try:
+        yield record
+    finally:
+        _local.rerun = previous
+        record.duration_ns = time.perf_counter_ns() - start
+        _events.append(
+            Event("rerun", start, record.duration_ns, None, threading.get_ident(), record.id)
+        )
+
+
+def reruns(session: str | None = None) -> list[Rerun]:
+    """Finished reruns (of one session, if given), newest first."""
+    with _lock:
+        found = list(_reruns.values())
+    return [
+        r
+        for r in reversed(found)
+        if r.duration_ns is not None and (session is None or r.session == session)
+    ]
+
+
+def background_stats() -> dict[str, Stat]:
+    """Statistics of the calls made outside reruns since start-up."""
+    with _lock:
+        return dict(_background)
+
+
+def events() -> list[Event]:
+    return list(_events)
+
+
+def chrome_trace() -> str:
+    """The ring buffer as Chrome trace event JSON (complete "X" events, in µs)."""
+    pid = os.getpid()
+    trace = []
+    for e in list(_events):
+        args = {}
+        if e.size is not None:
+            args["size"] = e.size
+        if e.rerun is not None:
+            args["rerun"] = e.rerun
+        trace.append(
+            {
+                "name": e.name,
+                "cat": "rerun" if e.name == "rerun" else "tqa",
+                "ph": "X",
+                "ts": e.start_ns / 1000,
+                "dur": e.duration_ns / 1000,
+                "pid": pid,
+                "tid": e.thread,
+                "args": args,
+            }
+        )
+    return json.dumps({"traceEvents": trace, "displayTimeUnit": "ms"})
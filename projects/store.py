@@ -0,0 +1,221 @@
+"""
+Shared project store: documents and their assessments held once per server
+process and read by every browser session.
+
+A project is one document under review: its segments and one
+SegmentAssessment per segment. Segment lists are interned by a digest of
+their content, so sessions that upload the same file share one copy even
+when they review it separately; sessions that join a project also share
+its assessments.
+
+Assessments are only written through Project.update(), which applies a
+change to a copy of the segment's assessment under the project lock and
+then swaps the copy in (readers never see a half-applied change). Every
+segment has a version number; an update based on a version other than the
+current one fails with VersionConflict (optimistic concurrency), so a
+reviewer never overwrites a change they have not seen. Updates are recorded
+in a bounded change log that sessions poll with changes_since() to learn
+which segments others have changed.
+
+An open page polls its project every few seconds, so a project that no
+session has used for MEMBER_TTL seconds has been closed or left by its
+last reviewer (a new upload, load or merge opens a new project). Such
+projects are dropped, and with them segment lists no project uses any
+more: memory follows the documents under review, not every one ever
+opened.
+"""
+
+import hashlib
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Callable, NamedTuple
+
+from models.data_models import SegmentAssessment, TranslationSegment
+
+MEMBER_TTL = 60  # a session counts as present this long after its last poll
+CHANGE_LOG = 10_000  # changes kept per project
+
+
+class VersionConflict(Exception):
+    """The segment was changed after the version an update was based on."""
+
+    def __init__(self, seg_idx: int, expected: int, current: int):
+        super().__init__(
+            f"segment {seg_idx} is at version {current}, update was based on {expected}"
+        )
+        self.seg_idx = seg_idx
+        self.expected = expected
+        self.current = current
+
+
+class Change(NamedTuple):
+    version: int  # project version after the change
+    seg_idx: int
+    author: str  # id of the session that made it
+
+
+def document_digest(segments: list[TranslationSegment]) -> str:
+    """Digest of a document's segments (ids, languages and texts)."""
+    digest = hashlib.sha1()
+    for s in segments:
+        digest.update(
+            "\x1f".join(
+                [str(s.id), s.source_lang, s.target_lang, s.source_text, s.target_text]
+            ).encode()
+        )
+        digest.update(b"\x1e")
+    return digest.hexdigest()
+
+
+class Project:
+    """One shared document: segments, assessments and their versions."""
+
+    def __init__(
+        self,
+        project_id: str,
+        name: str,
+        digest: str,
+        segments: list[TranslationSegment],
+        assessments: list[SegmentAssessment],
+    ):
+        self.id = project_id
+        self.name = name
+        self.digest = digest
+        self.segments = segments  # read-only, possibly shared with other projects
+        self.assessments = assessments  # items replaced by update(), never mutated
+        self.versions = [0] * len(segments)
+        self.version = 0  # number of changes so far
+        self.touched = time.monotonic()
+        self._members: dict[str, float] = {}  # session id -> last seen
+        self._log: deque[Change] = deque(maxlen=CHANGE_LOG)
+        self._lock = threading.Lock()
+
+    def touch(self, member: str | None = None):
+        now = time.monotonic()
+        self.touched = now
+        if member is not None:
+            self._members[member] = now
+
+    def leave(self, member: str):
+        self._members.pop(member, None)
+
+    def members(self) -> int:
+        """Sessions that have polled the project within MEMBER_TTL."""
+        now = time.monotonic()
+        return sum(1 for seen in list(self._members.values()) if now - seen < MEMBER_TTL)
+
+    def abandoned(self, now: float) -> bool:
+        """No session has polled or looked the project up within MEMBER_TTL."""
+        return now - self.touched > MEMBER_TTL and self.members() == 0
+
+    def snapshot(self, seg_idx: int) -> tuple[SegmentAssessment, int]:
+        """A segment's assessment together with its version."""
+        with self._lock:
+            return self.assessments[seg_idx], self.versions[seg_idx]
+
+    def update(
+        self,
+        seg_idx: int,
+        change: Callable[[SegmentAssessment], bool | None],
+        author: str,
+        expected: int | None = None,
+    ) -> int | None:
+        """
+        Apply change to a copy of a segment's assessment and store it;
+        returns the segment's new version. If expected is given and the
+        segment is no longer at that version, VersionConflict is raised and
+        nothing changes. change may return False to leave the segment as
+        it is (e.g. nothing to add); then None is returned.
+        """
+        with self._lock:
+            current = self.versions[seg_idx]
+            if expected is not None and expected != current:
+                raise VersionConflict(seg_idx, expected, current)
+            updated = self.assessments[seg_idx].model_copy(deep=True)
+            if change(updated) is False:
+                return None
+            self.assessments[seg_idx] = updated
+            self.versions[seg_idx] = current + 1
+            self.version += 1
+            self._log.append(Change(self.version, seg_idx, author))
+            self.touch(author)
+            return current + 1
+
+    def changes_since(self, version: int) -> list[Change] | None:
+        """
+        Changes made after the given project version, oldest first; None
+        if the log no longer reaches back that far.
+        """
+        with self._lock:
+            if version >= self.version:
+                return []
+            if not self._log or self._log[0].version > version + 1:
+                return None
+            return [c for c in self._log if c.version > version]
+
+
+class ProjectStore:
+    """Open projects by id, and the segment lists they share."""
+
+    def __init__(self):
+        self._projects: dict[str, Project] = {}
+        self._documents: dict[str, list[TranslationSegment]] = {}
+        self._lock = threading.Lock()
+
+    def open(
+        self,
+        name: str,
+        segments: list[TranslationSegment],
+        assessments: list[SegmentAssessment] | None = None,
+    ) -> Project:
+        """
+        Register a document as a new project. If the same document is
+        already open, its segment list is reused and the given one dropped.
+        """
+        digest = document_digest(segments)
+        if assessments is None:
+            assessments = [SegmentAssessment() for _ in segments]
+        with self._lock:
+            self._prune()
+            segments = self._documents.setdefault(digest, segments)
+            project = Project(uuid.uuid4().hex[:8], name, digest, segments, assessments)
+            self._projects[project.id] = project
+        return project
+
+    def get(self, project_id: str | None) -> Project | None:
+        with self._lock:
+            project = self._projects.get(project_id)
+        if project is not None:
+            project.touch()
+        return project
+
+    def projects(self) -> list[Project]:
+        """Open projects, most recently used first."""
+        with self._lock:
+            self._prune()
+            return sorted(self._projects.values(), key=lambda p: -p.touched)
+
+    def _prune(self):
+        now = time.monotonic()
+        for project_id, project in list(self._projects.items()):
+            if project.abandoned(now):
+                del self._projects[project_id]
+        used = {p.digest for p in self._projects.values()}
+        for digest in list(self._documents):
+            if digest not in used:
+                del self._documents[digest]
+
+
+_store: ProjectStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> ProjectStore:
+    """The process-wide project store."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ProjectStore()
+        return _store
@@ -0,0 +1,108 @@
+"""
+Aho-Corasick automaton for finding many terms in a text in one pass.
+
+The automaton runs over word tokens rather than characters: texts and terms
+are split into words and punctuation marks, so matches always fall on word
+boundaries and a segment costs one transition per word. Han, kana, hangul
+and Thai characters are tokens of their own, which lets terms of languages
+written without spaces match anywhere. Matching is case-insensitive and
+ignores differences in whitespace. Overlapping matches are resolved
+leftmost-longest, so "safety equipment" wins over "equipment".
+"""
+
+import re
+
+# Scripts written without spaces between words: every character is a token
+SCRIPT_CHARS = (
+    "\u0e00-\u0e7f"  # Thai
+    "\u3040-\u30ff"  # kana
+    "\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff"  # Han
+    "\uac00-\ud7af"  # hangul
+)
+_TOKEN = re.compile(rf"[{SCRIPT_CHARS}]|[^\W{SCRIPT_CHARS}]+|[^\w\s]")
+
+
+def fold(text: str) -> str:
+    """Lowercase text without changing its length (offsets stay valid)."""
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return "".join(ch.lower()[:1] or ch for ch in text)
+
+
+def tokenize(text: str) -> list[str]:
+    """Case-folded word and punctuation tokens of a text."""
+    return _TOKEN.findall(fold(text))
+
+
+class TermAutomaton:
+    """Goto, failure and output tables built once from a list of terms."""
+
+    def __init__(self, terms: list[str]):
+        self.goto: list[dict[str, int]] = [{}]
+        self.fail: list[int] = [0]
+        self.out: list[list[int]] = [[]]
+        self.lengths: list[int] = []  # in tokens
+
+        for term_id, term in enumerate(terms):
+            tokens = tokenize(term)
+            self.lengths.append(len(tokens))
+            if not tokens:
+                continue
+            node = 0
+            for token in tokens:
+                nxt = self.goto[node].get(token)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][token] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                node = nxt
+            self.out[node].append(term_id)
+
+        # Breadth-first failure links; outputs of the failure node are merged
+        # in so the search never walks the failure chain to report matches
+        queue = list(self.goto[0].values())
+        for node in queue:
+            for token, child in self.goto[node].items():
+                queue.append(child)
+                f = self.fail[node]
+                while f and token not in self.goto[f]:
+                    f = self.fail[f]
+                target = self.goto[f].get(token, 0)
+                self.fail[child] = target if target != child else 0
+                self.out[child] = self.out[child] + self.out[self.fail[child]]
+
+    def find_all(self, text: str) -> list[tuple[int, int, int]]:
+        """Every (start, end, term_id) match in text, as character offsets."""
+        tokens = tokenize(text)
+        goto, fail, out = self.goto, self.fail, self.out
+        hits = []
+        node = 0
+        for i, token in enumerate(tokens):
+            while node and token not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(token, 0)
+            if out[node]:
+                hits.append((i, node))
+        if not hits:
+            return []
+        # Token offsets are only needed for texts that contain a term
+        spans = [m.span() for m in _TOKEN.finditer(fold(text))]
+        return [
+            (spans[i + 1 - self.lengths[term_id]][0], spans[i][1], term_id)
+            for i, node in hits
+            for term_id in out[node]
+        ]
+
+    def find(self, text: str) -> list[tuple[int, int, int]]:
+        """Non-overlapping matches, leftmost-longest first, in text order."""
+        matches = sorted(self.find_all(text), key=lambda m: (m[0], m[0] - m[1]))
+        chosen = []
+        taken_until = -1
+        for start, end, term_id in matches:
+            if start >= taken_until:
+                chosen.append((start, end, term_id))
+                taken_until = end
+        return chosen
@@ -0,0 +1,245 @@
+"""
+Source/target consistency checks.
+
+Each check compares one segment's target with its source and returns
+suggestions on the target:
+
+  punctuation   !, ?, : and ; counted per mark (full-width forms count as
+                their ASCII mark) differ between source and target; a
+                differing final mark is left to end_punct
+  end_punct     the segment-final punctuation differs ("." vs "!" vs none)
+  spaces        doubled spaces in the target that the source does not have
+  brackets      unbalanced brackets, or an odd number of quotation marks,
+                in the target where the source is balanced
+  tags          inline tags and placeholders (<b>, {1}, %s, %1$s) missing
+                from or added to the target
+  untranslated  target equal to the source, or made mostly of source words
+"""
+
+import re
+from collections import Counter
+from typing import Callable
+
+from models.data_models import ErrorAnnotation, Suggestion, TranslationSegment
+from assessment.profiles import get_profile
+from i18n.fi import FI
+
+# Segments between progress callbacks
+PROGRESS_EVERY = 1000
+# Share of target words found in the source that marks a segment untranslated
+UNTRANSLATED_SHARE = 0.8
+UNTRANSLATED_MIN_WORDS = 3
+
+_FULL_WIDTH = str.maketrans("。！？：；", ".!?:;")
+_COUNTED_MARKS = "!?:;"
+_FINAL = re.compile(r"([.!?:;…])[\s\"'”’»)\]]*$")
+_DOUBLE_SPACE = re.compile(r"(?<=\S)  +(?=\S)")
+_BRACKETS = {"(": ")", "[": "]", "{": "}"}
+_OPENING = {v: k for k, v in _BRACKETS.items()}
+_QUOTES = re.compile(r"[\"“”„«»]")
+_TAG = re.compile(r"</?[A-Za-z][^>]*>|\{\d+\}|%\d+\$[sd]|%[sd]")
+_WORD = re.compile(r"[^\W\d_]{3,}")
+
+
+def _suggestion(check, segment, error_type, severities, reason, span=None, **values):
+    """Suggestion on target[start:end] (the whole target if span is None)."""
+    target = segment.target_text
+    start, end = span if span is not None else (0, len(target))
+    return Suggestion(
+        check=check,
+        annotation=ErrorAnnotation(
+            error_type=error_type,
+            severity=severities[error_type],
+            span=target[start:end],
+            explanation=FI[f"qa_{reason}"].format(**values),
+            start=start,
+            end=end,
+        ),
+    )
+
+
+def _mark_counts(text: str) -> Counter:
+    return Counter(c for c in text.translate(_FULL_WIDTH) if c in _COUNTED_MARKS)
+
+
+def _final_mark(text: str) -> str:
+    final = _FINAL.search(text.translate(_FULL_WIDTH))
+    return final.group(1) if final else ""
+
+
+def punctuation_parity(segment, severities) -> list[Suggestion]:
+    source = _mark_counts(segment.source_text)
+    target = _mark_counts(segment.target_text)
+    source_final = _final_mark(segment.source_text)
+    target_final = _final_mark(segment.target_text)
+    if source_final != target_final:
+        # end_punctuation reports the final marks; count only the others
+        source[source_final] -= 1
+        target[target_final] -= 1
+        source, target = +source, +target
+    if source == target:
+        return []
+    marks = " ".join(
+        f"{mark} {source[mark]}/{target[mark]}"
+        for mark in _COUNTED_MARKS
+        if source[mark] != target[mark]
+    )
+    return [
+        _suggestion(
+            "punctuation", segment, "Punctuation", severities,
+            "punctuation", marks=marks,
+        )
+    ]
+
+
+def end_punctuation(segment, severities) -> list[Suggestion]:
+    source = _FINAL.search(segment.source_text.translate(_FULL_WIDTH))
+    target = _FINAL.search(segment.target_text.translate(_FULL_WIDTH))
+    source_mark = source.group(1) if source else ""
+    target_mark = target.group(1) if target else ""
+    if source_mark == target_mark:
+        return []
+    if target:
+        start, end = target.start(1), target.end(1)
+    else:
+        end = len(segment.target_text.rstrip())
+        start = max(end - 1, 0)
+    return [
+        _suggestion(
+            "end_punct", segment, "Punctuation", severities,
+            "end_punct", span=(start, end),
+            source=source_mark or "–", target=target_mark or "–",
+        )
+    ]
+
+
+def doubled_spaces(segment, severities) -> list[Suggestion]:
+    if _DOUBLE_SPACE.search(segment.source_text):
+        return []
+    return [
+        _suggestion(
+            "spaces", segment, "Punctuation", severities,
+            "spaces", span=(m.start(), m.end()),
+        )
+        for m in _DOUBLE_SPACE.finditer(segment.target_text)
+    ]
+
+
+def _unbalanced(text: str) -> int | None:
+    """Offset of the first unmatched bracket, len(text) if one is left open."""
+    stack = []
+    for i, ch in enumerate(text):
+        if ch in _BRACKETS:
+            stack.append(i)
+        elif ch in _OPENING:
+            if not stack or text[stack[-1]] != _OPENING[ch]:
+                return i
+            stack.pop()
+    return stack[0] if stack else None
+
+
+def bracket_balance(segment, severities) -> list[Suggestion]:
+    found = []
+    source, target = segment.source_text, segment.target_text
+    pos = _unbalanced(target)
+    if pos is not None and _unbalanced(source) is None:
+        found.append(
+            _suggestion(
+                "brackets", segment, "Punctuation", severities,
+                "brackets", span=(pos, pos + 1),
+            )
+        )
+    quotes = list(_QUOTES.finditer(target))
+    if len(quotes) % 2 and not len(_QUOTES.findall(source)) % 2:
+        last = quotes[-1]
+        found.append(
+            _suggestion(
+                "brackets", segment, "Punctuation", severities,
+                "quotes", span=(last.start(), last.end()),
+            )
+        )
+    return found
+
+
+def tag_mismatch(segment, severities) -> list[Suggestion]:
+    source = Counter(_TAG.findall(segment.source_text))
+    target_tags = list(_TAG.finditer(segment.target_text))
+    target = Counter(m.group() for m in target_tags)
+    found = []
+    missing = source - target
+    if missing:
+        found.append(
+            _suggestion(
+                "tags", segment, "Omission", severities,
+                "tags_missing", tags=" ".join(missing.elements()),
+            )
+        )
+    extra = target - source
+    for m in target_tags:
+        if extra[m.group()] > 0:
+            extra[m.group()] -= 1
+            found.append(
+                _suggestion(
+                    "tags", segment, "Style", severities,
+                    "tags_extra", span=(m.start(), m.end()), tag=m.group(),
+                )
+            )
+    return found
+
+
+def untranslated(segment, severities) -> list[Suggestion]:
+    source, target = segment.source_text.strip(), segment.target_text.strip()
+    if not _WORD.search(source):
+        return []
+    if source.casefold() == target.casefold():
+        reason = "untranslated"
+    else:
+        target_words = [w.casefold() for w in _WORD.findall(target)]
+        if len(target_words) < UNTRANSLATED_MIN_WORDS:
+            return []
+        source_words = {w.casefold() for w in _WORD.findall(source)}
+        share = sum(w in source_words for w in target_words) / len(target_words)
+        if share < UNTRANSLATED_SHARE:
+            return []
+        reason = "mostly_untranslated"
+    return [
+        _suggestion(
+            "untranslated", segment, "Untranslated", severities, reason
+        )
+    ]
+
+
+def _batch(check: Callable) -> Callable:
+    """Turn a one-segment check into a batch check of the pipeline's form."""
+
+    def run(
+        segments: list[TranslationSegment],
+        profile_name: str | None = None,
+        progress: Callable[[int, int], None] | None = None,
+    ) -> dict[int, list[Suggestion]]:
+        profile = get_profile(profile_name)
+        severities = {
+            t: profile.default_severities.get(t, "Minor") for t in profile.error_types
+        }
+        for t in ("Punctuation", "Omission", "Style", "Untranslated"):
+            severities.setdefault(t, "Minor")
+        total = len(segments)
+        results = {}
+        for idx, segment in enumerate(segments):
+            if progress is not None and idx % PROGRESS_EVERY == 0:
+                progress(idx, total)
+            found = check(segment, severities)
+            if found:
+                results[idx] = found
+        return results
+
+    run.__name__ = run.__qualname__ = f"check_{check.__name__}"
+    return run
+
+
+check_punctuation_parity = _batch(punctuation_parity)
+check_end_punctuation = _batch(end_punctuation)
+check_doubled_spaces = _batch(doubled_spaces)
+check_bracket_balance = _batch(bracket_balance)
+check_tag_mismatch = _batch(tag_mismatch)
+check_untranslated = _batch(untranslated)
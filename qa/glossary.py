@@ -0,0 +1,269 @@
+"""
+Glossary (termbase) check: required target terms for source terms.
+
+A glossary is read from CSV (source term, target term(s), optional note;
+several allowed target terms separated by "|") or TBX (TBX 2 termEntry /
+langSet and TBX 3 conceptEntry / langSec are both accepted). All source
+terms are compiled into one Aho-Corasick automaton, cached per glossary
+content and language pair, so every segment is scanned in a single pass.
+
+For each source term found, the segment passes if the target contains one
+of the required target terms. Target terms are matched at word starts and
+may carry an inflectional ending (Finnish "tietokone" also matches
+"tietokoneen"), so only genuinely missing terms are suggested. Terms in
+scripts written without spaces (Japanese, Chinese, Thai, Korean) are
+matched anywhere in the text, as written.
+
+The first CSV row is skipped only if it is a header: its first two cells
+are known column names (HEADER_NAMES) or language names or codes.
+"""
+
+import csv
+import io
+import re
+import xml.etree.ElementTree as ET
+from functools import lru_cache
+from typing import Callable
+
+from pydantic import BaseModel
+
+from models.data_models import ErrorAnnotation, Suggestion, TranslationSegment
+from assessment.profiles import get_profile
+from qa.automaton import SCRIPT_CHARS, TermAutomaton
+from i18n.fi import FI
+
+CHECK_NAME = "glossary"
+ERROR_TYPE = "Terminology"
+# Segments between progress callbacks
+PROGRESS_EVERY = 1000
+# Characters cut off a target term's last word before matching any ending
+# ("tietokone" -> "tietokon" matches "tietokoneen" and "tietokonetta"),
+# never shorter than MIN_STEM characters ("kone" stays "kone")
+STEM_TRIM = 1
+MIN_STEM = 4
+
+# ISO codes of the sidebar languages, for TBX xml:lang attributes
+LANGUAGE_CODES = {
+    "englanti": "en",
+    "suomi": "fi",
+    "ruotsi": "sv",
+    "saksa": "de",
+    "ranska": "fr",
+    "espanja": "es",
+    "italia": "it",
+    "portugali": "pt",
+    "hollanti": "nl",
+    "puola": "pl",
+    "tshekki": "cs",
+    "japani": "ja",
+    "kiina (yksinkertaistettu)": "zh",
+    "kiina (perinteinen)": "zh",
+    "korea": "ko",
+    "thai": "th",
+    "venäjä": "ru",
+    "arabia": "ar",
+    "hindi": "hi",
+}
+
+# First-row cells that make a CSV row a header (compared in lower case)
+HEADER_NAMES = {
+    "source",
+    "target",
+    "source term",
+    "target term",
+    "term",
+    "note",
+    "lähde",
+    "kohde",
+    "lähdetermi",
+    "kohdetermi",
+    "termi",
+    "huomautus",
+    *LANGUAGE_CODES,
+    *LANGUAGE_CODES.values(),
+}
+
+_XML_LANG = "{http://www.w3.org/XML/1998/namespace}lang"
+_SCRIPT_START = re.compile(rf"[{SCRIPT_CHARS}]")
+
+
+class GlossaryEntry(BaseModel):
+    """One source term and the target terms accepted for it."""
+
+    source: str
+    targets: list[str]
+    note: str = ""
+
+
+class CompiledGlossary:
+    """Glossary entries with their source-term automaton."""
+
+    def __init__(self, entries: list[GlossaryEntry]):
+        self.entries = entries
+        self.automaton = TermAutomaton([e.source for e in entries])
+        self._target_patterns: dict[int, re.Pattern] = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def target_pattern(self, entry_id: int) -> re.Pattern:
+        """Pattern of the accepted target terms, compiled on first use."""
+        pattern = self._target_patterns.get(entry_id)
+        if pattern is None:
+            variants = "|".join(
+                _target_pattern(t) for t in self.entries[entry_id].targets if t.strip()
+            )
+            pattern = re.compile(variants, re.IGNORECASE)
+            self._target_patterns[entry_id] = pattern
+        return pattern
+
+
+def _target_pattern(term: str) -> str:
+    """Regex for one accepted target term."""
+    term = term.strip()
+    if _SCRIPT_START.match(term):
+        # No word boundaries to anchor on, and no inflectional endings
+        return re.escape(term)
+    return rf"(?<!\w){_stem_pattern(term)}"
+
+
+def _stem_pattern(term: str) -> str:
+    """Regex for a target term whose last word may be inflected."""
+    words = term.strip().split()
+    last = words[-1]
+    stem_len = max(len(last) - STEM_TRIM, min(MIN_STEM, len(last)))
+    stem = re.escape(last[:stem_len]) + r"\w*"
+    return r"\s+".join([*(re.escape(w) for w in words[:-1]), stem])
+
+
+def _split_targets(cell: str) -> list[str]:
+    return [t.strip() for t in cell.split("|") if t.strip()]
+
+
+def _is_header(row: list[str]) -> bool:
+    return len(row) >= 2 and all(cell.strip().lower() in HEADER_NAMES for cell in row[:2])
+
+
+def _parse_csv(text: str) -> list[GlossaryEntry]:
+    try:
+        dialect = csv.Sniffer().sniff(text[:4096], delimiters=",;\t")
+        rows = list(csv.reader(io.StringIO(text), dialect))
+    except csv.Error:
+        # Rows of uneven length: the delimiter most used on the first line
+        first = text.split("\n", 1)[0]
+        rows = list(csv.reader(io.StringIO(text), delimiter=max(",;\t", key=first.count)))
+    if rows and _is_header(rows[0]):
+        rows = rows[1:]
+    entries = []
+    for row in rows:
+        if len(row) < 2 or not row[0].strip() or not row[1].strip():
+            continue
+        entries.append(
+            GlossaryEntry(
+                source=row[0].strip(),
+                targets=_split_targets(row[1]),
+                note=row[2].strip() if len(row) > 2 else "",
+            )
+        )
+    return entries
+
+
+def _lang_matches(attr: str | None, code: str) -> bool:
+    return bool(attr) and attr.lower().split("-")[0].split("_")[0] == code
+
+
+def _parse_tbx(data: bytes, source_code: str, target_code: str) -> list[GlossaryEntry]:
+    root = ET.fromstring(data)
+    entries = []
+    for concept in root.iter():
+        if not concept.tag.endswith(("termEntry", "conceptEntry")):
+            continue
+        sources, targets = [], []
+        for lang_set in concept:
+            if not lang_set.tag.endswith(("langSet", "langSec")):
+                continue
+            lang = lang_set.get(_XML_LANG) or lang_set.get("lang")
+            terms = [
+                el.text.strip()
+                for el in lang_set.iter()
+                if el.tag.split("}")[-1] == "term" and el.text and el.text.strip()
+            ]
+            if _lang_matches(lang, source_code):
+                sources.extend(terms)
+            elif _lang_matches(lang, target_code):
+                targets.extend(terms)
+        if targets:
+            entries.extend(GlossaryEntry(source=s, targets=targets) for s in sources)
+    return entries
+
+
+@lru_cache(maxsize=8)
+def compile_glossary(
+    data: bytes, filename: str, source_lang: str, target_lang: str
+) -> CompiledGlossary:
+    """
+    Parse and compile a glossary file. Cached per content and language pair,
+    so the automaton is built once however many checks use it.
+    """
+    if filename.lower().endswith(".tbx"):
+        entries = _parse_tbx(
+            data,
+            LANGUAGE_CODES.get(source_lang, source_lang),
+            LANGUAGE_CODES.get(target_lang, target_lang),
+        )
+    else:
+        entries = _parse_csv(data.decode("utf-8-sig"))
+    if not entries:
+        raise ValueError(
+            f"No glossary entries found in {filename} for {source_lang} → {target_lang}."
+        )
+    return CompiledGlossary(entries)
+
+
+def check_glossary(
+    segments: list[TranslationSegment],
+    glossary: CompiledGlossary,
+    profile_name: str | None = None,
+    progress: Callable[[int, int], None] | None = None,
+) -> dict[int, list[Suggestion]]:
+    """
+    Terminology suggestions for a batch of segments, keyed by the position
+    of the segment in the list. If progress is given, it is called as
+    progress(done, total).
+    """
+    profile = get_profile(profile_name)
+    severity = profile.default_severities.get(ERROR_TYPE, "Major")
+    total = len(segments)
+    results = {}
+    for idx, segment in enumerate(segments):
+        if progress is not None and idx % PROGRESS_EVERY == 0:
+            progress(idx, total)
+        found = []
+        seen = set()
+        for start, end, entry_id in glossary.automaton.find(segment.source_text):
+            if entry_id in seen:
+                continue
+            seen.add(entry_id)
+            if glossary.target_pattern(entry_id).search(segment.target_text):
+                continue
+            entry = glossary.entries[entry_id]
+            found.append(
+                Suggestion(
+                    check=CHECK_NAME,
+                    annotation=ErrorAnnotation(
+                        error_type=ERROR_TYPE,
+                        severity=severity,
+                        span=segment.target_text,
+                        explanation=FI["qa_glossary"].format(
+                            source=segment.source_text[start:end],
+                            target=" / ".join(entry.targets),
+                        )
+                        + (f" ({entry.note})" if entry.note else ""),
+                        start=0,
+                        end=len(segment.target_text),
+                    ),
+                )
+            )
+        if found:
+            results[idx] = found
+    return results
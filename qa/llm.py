@@ -0,0 +1,428 @@
+"""
+Pre-annotation of segments by a language model behind an HTTP endpoint.
+
+The endpoint is any server speaking the OpenAI-compatible chat completions
+protocol (POST {TQA_LLM_URL}/chat/completions); the stage is off when
+TQA_LLM_URL is not set. qa/llm_stub.py is a local stand-in for testing.
+
+Segments are sent BATCH_SIZE at a time as one JSON user message. The reply
+must be a JSON object {"assessments": [{"id": ..., "annotations": [...],
+"overall_comment": ...}]} following the SegmentAssessment field
+descriptions; the schema is also passed as response_format. Replies are
+validated with pydantic, annotations with an error type or severity not in
+the scoring profile, or a span that does not occur in the target, are
+dropped, and a batch whose reply does not cover all of its segments is
+retried.
+
+Requests run on one asyncio event loop with at most CONCURRENCY in flight
+and at most RATE started per second. Connection errors, 429 and 5xx
+replies and invalid replies are retried up to MAX_RETRIES times with
+exponential backoff (Retry-After is honoured).
+
+Every validated assessment is cached in a SQLite file under the digest of
+the segment (languages, source and target text), the model, the profile and
+PROMPT_VERSION, so re-runs only query segments that changed; repeated
+segments within a run are sent once. Bump PROMPT_VERSION whenever the
+prompt changes.
+
+httpx is needed only when the stage is used and is imported on first use.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import sqlite3
+from collections import Counter
+from contextlib import contextmanager
+from typing import Callable
+
+from pydantic import BaseModel, ValidationError
+
+from models.data_models import SegmentAssessment, Suggestion, TranslationSegment
+from assessment.profiles import get_profile
+
+CHECK_NAME = "llm"
+PROMPT_VERSION = "1"
+
+CACHE_PATH = os.environ.get(
+    "TQA_LLM_CACHE",
+    os.path.join(os.path.expanduser("~"), ".tqa", "llm_cache.sqlite"),
+)
+BATCH_SIZE = 20  # segments per request
+CONCURRENCY = 4  # requests in flight
+RATE = 2.0  # requests started per second
+TIMEOUT = 120.0  # seconds per request
+MAX_RETRIES = 4
+BACKOFF = 1.0  # seconds before the first retry, doubled for each further one
+RETRY_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS assessments (
+    digest TEXT PRIMARY KEY,
+    assessment TEXT NOT NULL
+);
+"""
+
+
+class LLMConfig(BaseModel):
+    """Endpoint settings, read from TQA_LLM_* environment variables."""
+
+    url: str
+    api_key: str = ""
+    model: str = "default"
+    batch_size: int = BATCH_SIZE
+    concurrency: int = CONCURRENCY
+    rate: float = RATE
+
+    @classmethod
+    def from_env(cls) -> "LLMConfig | None":
+        """The configured endpoint, or None when TQA_LLM_URL is not set."""
+        url = os.environ.get("TQA_LLM_URL")
+        if not url:
+            return None
+        env = os.environ.get
+        return cls(
+            url=url.rstrip("/"),
+            api_key=env("TQA_LLM_API_KEY", ""),
+            model=env("TQA_LLM_MODEL", "default"),
+            batch_size=int(env("TQA_LLM_BATCH", BATCH_SIZE)),
+            concurrency=int(env("TQA_LLM_CONCURRENCY", CONCURRENCY)),
+            rate=float(env("TQA_LLM_RATE", RATE)),
+        )
+
+
+class BatchItem(SegmentAssessment):
+    """Assessment of one segment of a batch, identified by its id in the request."""
+
+    id: int
+
+
+class BatchAssessment(BaseModel):
+    """The reply expected for one batch."""
+
+    assessments: list[BatchItem]
+
+
+class PreAnnotation(BaseModel):
+    """Result of one pre-annotation run."""
+
+    results: dict[int, SegmentAssessment]  # by position in the segment list
+    cached: int  # segments answered from the cache
+    requested: int  # segments sent to the endpoint
+    failed: int  # segments whose batch failed after all retries
+
+
+class InvalidReply(Exception):
+    """The endpoint answered, but not with a usable batch assessment."""
+
+
+class _RetryableStatus(Exception):
+    def __init__(self, status: int, retry_after: float | None):
+        super().__init__(f"HTTP {status}")
+        self.retry_after = retry_after
+
+
+class AssessmentCache:
+    """Validated assessments by segment digest, in a SQLite file."""
+
+    def __init__(self, path: str = CACHE_PATH):
+        self.path = path
+
+    @contextmanager
+    def _connect(self):
+        """A connection that commits on success and is always closed."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        db = sqlite3.connect(self.path)
+        try:
+            with db:
+                db.executescript(_SCHEMA)
+                yield db
+        finally:
+            db.close()
+
+    def get_many(self, digests: list[str]) -> dict[str, SegmentAssessment]:
+        found = {}
+        with self._connect() as db:
+            for i in range(0, len(digests), 500):
+                chunk = digests[i : i + 500]
+                rows = db.execute(
+                    "SELECT digest, assessment FROM assessments WHERE digest IN "
+                    f"({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                for digest, assessment in rows:
+                    found[digest] = SegmentAssessment.model_validate_json(assessment)
+        return found
+
+    def put_many(self, assessments: dict[str, SegmentAssessment]):
+        with self._connect() as db:
+            db.executemany(
+                "INSERT OR REPLACE INTO assessments (digest, assessment) VALUES (?, ?)",
+                [(d, a.model_dump_json()) for d, a in assessments.items()],
+            )
+
+
+def segment_digest(
+    segment: TranslationSegment, config: LLMConfig, profile_name: str | None
+) -> str:
+    """Cache key of a segment's assessment."""
+    return hashlib.sha256(
+        "\x1f".join(
+            [
+                PROMPT_VERSION,
+                config.model,
+                profile_name or "default",
+                segment.source_lang,
+                segment.target_lang,
+                segment.source_text,
+                segment.target_text,
+            ]
+        ).encode()
+    ).hexdigest()
+
+
+def _system_prompt(profile_name: str | None) -> str:
+    profile = get_profile(profile_name)
+    types = "\n".join(
+        f"- {t} (usually {profile.default_severities.get(t, 'Minor')})"
+        for t in profile.error_types
+    )
+    return (
+        "You are a translation quality reviewer. For each segment, find the "
+        "errors in the target text compared with the source text and annotate "
+        "each with one error type, one severity and the exact span of target "
+        "text that contains it. Report only real errors; a correct segment has "
+        "no annotations.\n\n"
+        f"Error types (with their usual severity):\n{types}\n\n"
+        f"Severities: {', '.join(profile.severities)}\n\n"
+        'Reply with a JSON object {"assessments": [...]} holding one '
+        "assessment per segment, with the segment's id."
+    )
+
+
+def _request_body(
+    config: LLMConfig, system_prompt: str, batch: list[TranslationSegment]
+) -> dict:
+    first = batch[0]
+    user = {
+        "source_lang": first.source_lang,
+        "target_lang": first.target_lang,
+        "segments": [
+            {"id": i, "source": s.source_text, "target": s.target_text}
+            for i, s in enumerate(batch)
+        ],
+    }
+    return {
+        "model": config.model,
+        "temperature": 0,
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": json.dumps(user, ensure_ascii=False)},
+        ],
+        "response_format": {
+            "type": "json_schema",
+            "json_schema": {
+                "name": "batch_assessment",
+                "schema": BatchAssessment.model_json_schema(),
+            },
+        },
+    }
+
+
+def _clean(
+    item: SegmentAssessment, target: str, error_types: set, severities: set
+) -> SegmentAssessment:
+    """Keep the annotations that fit the profile and locate their spans."""
+    annotations = []
+    for ann in item.annotations:
+        if ann.error_type not in error_types or ann.severity not in severities:
+            continue
+        if not ann.span:
+            continue
+        start = ann.start
+        if start is None or not target.startswith(ann.span, start):
+            start = target.find(ann.span)
+        if start < 0:
+            continue
+        annotations.append(
+            ann.model_copy(update={"start": start, "end": start + len(ann.span)})
+        )
+    return SegmentAssessment(
+        annotations=annotations, overall_comment=item.overall_comment
+    )
+
+
+def parse_reply(
+    reply: dict, batch: list[TranslationSegment], profile_name: str | None
+) -> list[SegmentAssessment]:
+    """Validated assessments of a batch, in batch order; raises InvalidReply."""
+    try:
+        content = reply["choices"][0]["message"]["content"]
+        parsed = BatchAssessment.model_validate_json(content)
+    except (KeyError, IndexError, TypeError, ValidationError) as e:
+        raise InvalidReply(str(e)) from e
+    by_id = {item.id: item for item in parsed.assessments}
+    missing = [i for i in range(len(batch)) if i not in by_id]
+    if missing:
+        raise InvalidReply(f"no assessment for segments {missing}")
+    profile = get_profile(profile_name)
+    error_types, severities = set(profile.error_types), set(profile.severities)
+    return [
+        _clean(by_id[i], segment.target_text, error_types, severities)
+        for i, segment in enumerate(batch)
+    ]
+
+
+class RateLimiter:
+    """Spaces request starts evenly, at most rate per second."""
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate if rate > 0 else 0.0
+        self._next = 0.0
+
+    async def wait(self):
+        now = asyncio.get_running_loop().time()
+        start = max(now, self._next)
+        self._next = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+async def _post_batch(
+    client,
+    config: LLMConfig,
+    limiter: RateLimiter,
+    slots: asyncio.Semaphore,
+    body: dict,
+    batch: list[TranslationSegment],
+    profile_name: str | None,
+) -> list[SegmentAssessment]:
+    import httpx
+
+    for attempt in range(MAX_RETRIES + 1):
+        retry_after = None
+        try:
+            async with slots:
+                await limiter.wait()
+                response = await client.post(f"{config.url}/chat/completions", json=body)
+            if response.status_code in RETRY_STATUS:
+                header = response.headers.get("retry-after", "")
+                raise _RetryableStatus(
+                    response.status_code,
+                    float(header) if header.replace(".", "", 1).isdigit() else None,
+                )
+            response.raise_for_status()
+            try:
+                reply = response.json()
+            except ValueError as e:
+                raise InvalidReply(str(e)) from e
+            return parse_reply(reply, batch, profile_name)
+        except (httpx.TransportError, _RetryableStatus, InvalidReply) as e:
+            if attempt == MAX_RETRIES:
+                raise
+            if isinstance(e, _RetryableStatus):
+                retry_after = e.retry_after
+        delay = BACKOFF * 2**attempt * (0.5 + random.random())
+        await asyncio.sleep(retry_after if retry_after is not None else delay)
+
+
+async def _annotate(
+    segments: list[TranslationSegment],
+    config: LLMConfig,
+    profile_name: str | None,
+    cache: AssessmentCache,
+    progress: Callable[[int, int], None] | None,
+) -> PreAnnotation:
+    import httpx
+
+    total = len(segments)
+    digests = [segment_digest(s, config, profile_name) for s in segments]
+    known = cache.get_many(sorted(set(digests)))
+
+    # One request per distinct uncached segment; batches share a language pair
+    pending: dict[str, TranslationSegment] = {}
+    for digest, segment in zip(digests, segments):
+        if digest not in known:
+            pending.setdefault(digest, segment)
+    by_pair: dict[tuple[str, str], list[str]] = {}
+    for digest, segment in pending.items():
+        by_pair.setdefault((segment.source_lang, segment.target_lang), []).append(digest)
+    batches = [
+        group[i : i + config.batch_size]
+        for group in by_pair.values()
+        for i in range(0, len(group), config.batch_size)
+    ]
+    # Segments each digest stands for, for progress and the counts
+    weight = Counter(d for d in digests if d in pending)
+
+    done = total - sum(weight.values())
+    if progress is not None:
+        progress(done, total)
+
+    failed = 0
+    if batches:
+        system_prompt = _system_prompt(profile_name)
+        limiter = RateLimiter(config.rate)
+        slots = asyncio.Semaphore(config.concurrency)
+        headers = {"Authorization": f"Bearer {config.api_key}"} if config.api_key else {}
+
+        async def run(batch_digests):
+            batch = [pending[d] for d in batch_digests]
+            body = _request_body(config, system_prompt, batch)
+            try:
+                found = await _post_batch(
+                    client, config, limiter, slots, body, batch, profile_name
+                )
+            except (httpx.HTTPError, _RetryableStatus, InvalidReply):
+                return batch_digests, None
+            return batch_digests, dict(zip(batch_digests, found))
+
+        async with httpx.AsyncClient(timeout=TIMEOUT, headers=headers) as client:
+            for next_done in asyncio.as_completed([run(b) for b in batches]):
+                batch_digests, found = await next_done
+                if found is None:
+                    failed += sum(weight[d] for d in batch_digests)
+                else:
+                    # Stored as soon as they arrive, so a cancelled run keeps them
+                    cache.put_many(found)
+                    known.update(found)
+                done += sum(weight[d] for d in batch_digests)
+                if progress is not None:
+                    progress(done, total)
+
+    return PreAnnotation(
+        results={i: known[d] for i, d in enumerate(digests) if d in known},
+        cached=total - sum(weight.values()),
+        requested=len(pending),
+        failed=failed,
+    )
+
+
+def pre_annotate(
+    segments: list[TranslationSegment],
+    config: LLMConfig,
+    profile_name: str | None = None,
+    cache: AssessmentCache | None = None,
+    progress: Callable[[int, int], None] | None = None,
+) -> PreAnnotation:
+    """
+    Assess all segments with the endpoint, reusing cached assessments. Runs
+    its own event loop, so call it from a worker thread (a background job).
+    If progress is given, it is called as progress(done, total).
+    """
+    return asyncio.run(
+        _annotate(segments, config, profile_name, cache or AssessmentCache(), progress)
+    )
+
+
+def assessment_suggestions(
+    results: dict[int, SegmentAssessment],
+) -> dict[int, list[Suggestion]]:
+    """The annotations of a run as suggestions for the reviewer."""
+    return {
+        idx: [Suggestion(check=CHECK_NAME, annotation=a) for a in assessment.annotations]
+        for idx, assessment in results.items()
+        if assessment.annotations
+    }
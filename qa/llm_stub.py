@@ -0,0 +1,147 @@
+"""
+Local stand-in for the pre-annotation endpoint (qa/llm), for testing.
+
+Answers POST .../chat/completions in the OpenAI-compatible format with
+rule-based assessments: a target equal to its source is Untranslated, a
+word written twice in a row is a Grammar error and a doubled space is a
+Punctuation error. The server counts the segments it has been sent, and
+can fail the first requests with 503 to exercise the client's retries.
+
+Usage:
+    python -m qa.llm_stub [--port 8765] [--fail-first 0]
+
+then point the app at it with TQA_LLM_URL=http://127.0.0.1:8765/v1.
+"""
+
+import argparse
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_DOUBLED_WORD = re.compile(r"\b(\w+) \1\b", re.IGNORECASE)
+_DOUBLE_SPACE = re.compile(r"(?<=\S)  +(?=\S)")
+
+
+def assess(source: str, target: str) -> dict:
+    """The stub's assessment of one segment, as the endpoint would return it."""
+    annotations = []
+    if target.strip() and target.strip() == source.strip():
+        annotations.append(
+            {
+                "error_type": "Untranslated",
+                "severity": "Major",
+                "span": target,
+                "explanation": "Target equals the source",
+            }
+        )
+    for m in _DOUBLED_WORD.finditer(target):
+        annotations.append(
+            {
+                "error_type": "Grammar",
+                "severity": "Minor",
+                "span": m.group(),
+                "explanation": f"Repeated word: {m.group(1)}",
+                "start": m.start(),
+                "end": m.end(),
+            }
+        )
+    for m in _DOUBLE_SPACE.finditer(target):
+        annotations.append(
+            {
+                "error_type": "Punctuation",
+                "severity": "Minor",
+                "span": m.group(),
+                "explanation": "Doubled space",
+            }
+        )
+    return {"annotations": annotations, "overall_comment": ""}
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, fail_first: int = 0):
+        super().__init__(address, _Handler)
+        self.fail_first = fail_first
+        self.requests = 0
+        self.segments = 0  # segments received in successful requests
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: StubServer
+
+    def do_POST(self):
+        if not self.path.endswith("/chat/completions"):
+            self._send(404, {"error": "not found"})
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        with self.server.lock:
+            self.server.requests += 1
+            if self.server.requests <= self.server.fail_first:
+                self._send(503, {"error": "overloaded"}, {"Retry-After": "0"})
+                return
+        batch = json.loads(body["messages"][-1]["content"])
+        assessments = [
+            {"id": s["id"], **assess(s["source"], s["target"])}
+            for s in batch["segments"]
+        ]
+        with self.server.lock:
+            self.server.segments += len(assessments)
+        content = json.dumps({"assessments": assessments}, ensure_ascii=False)
+        self._send(
+            200,
+            {
+                "object": "chat.completion",
+                "model": body.get("model", "stub"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+            },
+        )
+
+    def _send(self, status: int, payload: dict, headers: dict | None = None):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port: int = 0, fail_first: int = 0) -> StubServer:
+    """Start the stub on a background thread (port 0 picks a free port)."""
+    server = StubServer(("127.0.0.1", port), fail_first)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--fail-first", type=int, default=0, help="answer 503 to this many requests"
+    )
+    args = parser.parse_args()
+    server = StubServer(("127.0.0.1", args.port), args.fail_first)
+    print(f"Serving on {server.url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
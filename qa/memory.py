@@ -0,0 +1,262 @@
+"""
+Annotation memory: errors annotated in earlier sessions, matched against
+new documents.
+
+Every saved annotation (span, error type, severity, explanation) is stored
+in a SQLite file, one row per distinct normalized span, error type and
+target language, with a count of how often it has been annotated. The
+process keeps an inverted index over word stems of the stored spans
+(casefolded words cut to STEM characters, so inflected Finnish forms still
+meet); it is built once from the file and updated in place when sessions
+are added.
+
+A stored span matches a target text when at least MIN_CONTAINMENT of its
+stems occur in the text. With that threshold it suffices to index each
+span under its (k - ceil(MIN_CONTAINMENT * k) + 1) rarest stems (prefix
+filtering): any matching text contains at least one of them, so a lookup
+only touches the posting lists of the text's own stems.
+"""
+
+import hashlib
+import math
+import os
+import re
+import sqlite3
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Callable
+
+from pydantic import BaseModel
+
+from models.data_models import SegmentAssessment, TranslationSegment
+
+MEMORY_PATH = os.environ.get(
+    "TQA_MEMORY_PATH",
+    os.path.join(os.path.expanduser("~"), ".tqa", "annotation_memory.sqlite"),
+)
+STEM = 6  # characters of each word used as its stem
+MIN_CONTAINMENT = 0.75
+MAX_MATCHES = 5  # per segment
+# Segments between progress callbacks
+PROGRESS_EVERY = 1000
+
+_WORD = re.compile(r"\w+")
+_WHITESPACE = re.compile(r"\s+")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS memory (
+    id INTEGER PRIMARY KEY,
+    target_lang TEXT NOT NULL,
+    span_key TEXT NOT NULL,
+    span TEXT NOT NULL,
+    error_type TEXT NOT NULL,
+    severity TEXT NOT NULL,
+    explanation TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 1,
+    UNIQUE (target_lang, span_key, error_type)
+);
+CREATE TABLE IF NOT EXISTS seen (key TEXT PRIMARY KEY);
+"""
+
+
+class MemoryEntry(BaseModel):
+    """One remembered error."""
+
+    id: int
+    target_lang: str
+    span: str
+    error_type: str
+    severity: str
+    explanation: str
+    count: int
+
+
+class MemoryMatch(BaseModel):
+    """A remembered error that probably occurs in a segment."""
+
+    entry: MemoryEntry
+    similarity: float  # share of the entry's stems found in the target
+    start: int | None = None  # offset of the span in the target, if found verbatim
+
+
+def _stems(text: str) -> set[str]:
+    return {w[:STEM] for w in _WORD.findall(text.casefold())}
+
+
+def _span_key(span: str) -> str:
+    return _WHITESPACE.sub(" ", span).strip().casefold()
+
+
+class AnnotationMemory:
+    """The stored errors and their in-process inverted index."""
+
+    def __init__(self, path: str = MEMORY_PATH):
+        self.path = path
+        self.version = 0  # increases whenever entries change
+        self._lock = threading.Lock()
+        self._entries: dict[int, MemoryEntry] = {}
+        self._entry_stems: dict[int, set[str]] = {}
+        self._postings: dict[str, list[int]] = {}
+        self._frequency: Counter = Counter()  # entries per stem
+        if os.path.exists(path):
+            with self._connect() as db:
+                rows = db.execute(
+                    "SELECT id, target_lang, span, error_type, severity, "
+                    "explanation, count FROM memory"
+                ).fetchall()
+            entries = [MemoryEntry(**dict(row)) for row in rows]
+            for entry in entries:
+                self._frequency.update(_stems(entry.span))
+            for entry in entries:
+                self._index(entry)
+
+    def __len__(self):
+        return len(self._entries)
+
+    @contextmanager
+    def _connect(self):
+        """A connection that commits on success and is always closed."""
+        db = sqlite3.connect(self.path)
+        db.row_factory = sqlite3.Row
+        try:
+            with db:
+                db.executescript(_SCHEMA)
+                yield db
+        finally:
+            db.close()
+
+    def _index(self, entry: MemoryEntry):
+        stems = _stems(entry.span)
+        self._entries[entry.id] = entry
+        self._entry_stems[entry.id] = stems
+        if not stems:
+            return
+        probes = len(stems) - math.ceil(MIN_CONTAINMENT * len(stems)) + 1
+        for stem in sorted(stems, key=lambda s: (self._frequency[s], s))[:probes]:
+            self._postings.setdefault(stem, []).append(entry.id)
+
+    def add_session(
+        self,
+        segments: list[TranslationSegment],
+        assessments: list[SegmentAssessment],
+    ) -> int:
+        """
+        Remember the annotations of a session. Annotations already added
+        (same target text, span, position and type) are skipped, so saving
+        a session again only adds what is new. Returns the number added.
+        """
+        rows = []
+        for segment, assessment in zip(segments, assessments):
+            for ann in assessment.annotations:
+                if not ann.span.strip():
+                    continue
+                seen = hashlib.sha1(
+                    "\x1f".join(
+                        [segment.target_text, ann.span, str(ann.start), ann.error_type]
+                    ).encode()
+                ).hexdigest()
+                rows.append((seen, segment.target_lang, ann))
+        if not rows:
+            return 0
+
+        added = 0
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with self._connect() as db:
+                for seen, target_lang, ann in rows:
+                    if db.execute(
+                        "INSERT OR IGNORE INTO seen (key) VALUES (?)", (seen,)
+                    ).rowcount == 0:
+                        continue
+                    row = db.execute(
+                        "INSERT INTO memory (target_lang, span_key, span, error_type, "
+                        "severity, explanation) VALUES (?, ?, ?, ?, ?, ?) "
+                        "ON CONFLICT (target_lang, span_key, error_type) DO UPDATE SET "
+                        "count = count + 1, severity = excluded.severity, "
+                        "explanation = excluded.explanation "
+                        "RETURNING id, target_lang, span, error_type, severity, "
+                        "explanation, count",
+                        (
+                            target_lang,
+                            _span_key(ann.span),
+                            ann.span,
+                            ann.error_type,
+                            ann.severity,
+                            ann.explanation,
+                        ),
+                    ).fetchone()
+                    entry = MemoryEntry(**dict(row))
+                    if entry.id in self._entries:
+                        self._entries[entry.id] = entry
+                    else:
+                        self._frequency.update(_stems(entry.span))
+                        self._index(entry)
+                    added += 1
+            if added:
+                self.version += 1
+        return added
+
+    def match(self, text: str, target_lang: str = "") -> list[MemoryMatch]:
+        """Remembered errors likely present in text, most similar first."""
+        stems = _stems(text)
+        candidates = set()
+        for stem in stems:
+            candidates.update(self._postings.get(stem, ()))
+        if not candidates:
+            return []
+
+        folded = text.casefold()
+        found = []
+        for entry_id in candidates:
+            entry = self._entries[entry_id]
+            if target_lang and entry.target_lang and entry.target_lang != target_lang:
+                continue
+            entry_stems = self._entry_stems[entry_id]
+            similarity = len(entry_stems & stems) / len(entry_stems)
+            if similarity < MIN_CONTAINMENT:
+                continue
+            start = folded.find(entry.span.casefold())
+            found.append((start < 0, -similarity, -entry.count, entry_id, start))
+        # Verbatim spans first, then by stem overlap and how often seen
+        found.sort()
+        return [
+            MemoryMatch(
+                entry=self._entries[entry_id],
+                similarity=round(-neg_similarity, 3),
+                start=start if start >= 0 else None,
+            )
+            for _, neg_similarity, _, entry_id, start in found[:MAX_MATCHES]
+        ]
+
+    def match_segments(
+        self,
+        segments: list[TranslationSegment],
+        progress: Callable[[int, int], None] | None = None,
+    ) -> dict[int, list[MemoryMatch]]:
+        """
+        Matches for a batch of segments, keyed by the position of the segment
+        in the list. If progress is given, it is called as progress(done, total).
+        """
+        total = len(segments)
+        results = {}
+        for idx, segment in enumerate(segments):
+            if progress is not None and idx % PROGRESS_EVERY == 0:
+                progress(idx, total)
+            found = self.match(segment.target_text, segment.target_lang)
+            if found:
+                results[idx] = found
+        return results
+
+
+_memory: AnnotationMemory | None = None
+_memory_lock = threading.Lock()
+
+
+def get_memory() -> AnnotationMemory:
+    """The process-wide memory (file from TQA_MEMORY_PATH)."""
+    global _memory
+    with _memory_lock:
+        if _memory is None:
+            _memory = AnnotationMemory()
+        return _memory
@@ -0,0 +1,307 @@
+"""
+Numeric mismatch check: numbers, dates, percentages and currency amounts.
+
+Numbers are read with the conventions of the segment's language: decimal
+comma and space (or point) grouping for e.g. Finnish and German, decimal
+point and comma or space grouping for English and the Asian languages.
+Dates are recognised in ISO form, as numeric day-month-year
+(month-day-year for English) and with English or Finnish month names, and
+compared as (year, month, day). Times of day are compared as (hour,
+minute): "10:30" everywhere, "10.30" in the decimal-comma languages
+(Finnish time notation), with an optional am/pm. One compiled pattern per
+language is built once and reused for every segment of the batch.
+
+Per segment, source and target tokens are matched in three steps:
+  1. same value and same unit (%, currency) - fine
+  2. same value, different unit - suggestion on the target token
+  3. remaining tokens are paired in text order - suggestion on the target
+     token; unpaired target tokens are extra, unpaired source tokens are
+     missing (suggested on the whole target)
+"""
+
+import re
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+from typing import Callable, NamedTuple
+
+from models.data_models import ErrorAnnotation, Suggestion, TranslationSegment
+from assessment.profiles import get_profile
+from i18n.fi import FI
+
+CHECK_NAME = "numbers"
+# Segments between progress callbacks
+PROGRESS_EVERY = 1000
+ERROR_TYPE = "Numerical Error"
+
+# Languages (sidebar names) that write decimals with a comma
+DECIMAL_COMMA_LANGUAGES = {
+    "suomi",
+    "ruotsi",
+    "saksa",
+    "ranska",
+    "espanja",
+    "italia",
+    "portugali",
+    "hollanti",
+    "puola",
+    "tshekki",
+    "venäjä",
+}
+# Decimal-comma languages that group thousands with a point
+POINT_GROUP_LANGUAGES = {"saksa", "espanja", "italia", "portugali", "hollanti"}
+# Languages that write numeric dates month first (1/15/2025)
+MONTH_FIRST_LANGUAGES = {"englanti"}
+
+_EN_MONTHS = [
+    "january", "february", "march", "april", "may", "june",
+    "july", "august", "september", "october", "november", "december",
+]
+_FI_MONTHS = [
+    "tammi", "helmi", "maalis", "huhti", "touko", "kesä",
+    "heinä", "elo", "syys", "loka", "marras", "joulu",
+]
+
+_CURRENCIES = {
+    "$": "USD", "usd": "USD", "dollar": "USD", "dollars": "USD",
+    "dollari": "USD", "dollaria": "USD",
+    "€": "EUR", "eur": "EUR", "euro": "EUR", "euros": "EUR", "euroa": "EUR",
+    "£": "GBP", "gbp": "GBP", "pound": "GBP", "pounds": "GBP", "puntaa": "GBP",
+    "¥": "JPY", "jpy": "JPY", "sek": "SEK", "kr": "SEK",
+}
+
+_SPACE = r"[ \u00a0\u202f]"
+
+
+class NumericToken(NamedTuple):
+    """A number or date found in a text."""
+
+    kind: str  # "number", "date" or "time"
+    value: object  # Decimal, (year | None, month, day) or (hour, minute)
+    unit: str  # "%", a currency code or ""
+    start: int
+    end: int
+    text: str
+
+
+@lru_cache(maxsize=None)
+def _pattern(lang: str) -> re.Pattern:
+    """The combined number/date pattern of one language, compiled once."""
+    if lang in DECIMAL_COMMA_LANGUAGES:
+        decimal = ","
+        group = r"[. \u00a0\u202f]" if lang in POINT_GROUP_LANGUAGES else _SPACE
+        # A point is free to separate hours and minutes (klo 10.30)
+        time_sep = "[:.]"
+    else:
+        decimal = r"\."
+        group = r"[, \u00a0\u202f]"
+        time_sep = ":"
+    number = rf"\d{{1,3}}(?:{group}\d{{3}})+(?:{decimal}\d+)?|\d+(?:{decimal}\d+)?"
+
+    # Full month names and three-letter abbreviations ("Jan.")
+    en_names = sorted(
+        {*_EN_MONTHS, *(m[:3] for m in _EN_MONTHS)}, key=len, reverse=True
+    )
+    en_month = r"(?P<en_month>(?:" + "|".join(en_names) + r")\b\.?)"
+    fi_month = r"(?P<fi_month>(?:" + "|".join(_FI_MONTHS) + r")kuu[a-zäö]*)"
+    currency_pre = r"(?P<cur_pre>[$€£¥]|USD|EUR|GBP|JPY|SEK)"
+    currency_post = (
+        r"(?P<cur_post>[$€£¥]|(?:USD|EUR|GBP|JPY|SEK|kr)\b"
+        r"|(?:dollars?|dollaria?|euros?|euroa|pounds?|puntaa)\b)"
+    )
+    percent = r"(?P<pct>%(?::a)?|percent\b|prosenttia?\b)"
+
+    alternatives = [
+        # 2025-01-15
+        r"(?P<iso>(?P<iso_y>\d{4})-(?P<iso_m>\d{1,2})-(?P<iso_d>\d{1,2}))",
+        # January 15, 2025 / Jan. 15th 2025
+        rf"(?P<en_md>{en_month}{_SPACE}+(?P<en_md_d>\d{{1,2}})(?:st|nd|rd|th)?"
+        rf"(?:,?{_SPACE}+(?P<en_md_y>\d{{4}}))?)",
+        # 15 January 2025
+        rf"(?P<en_dm>(?P<en_dm_d>\d{{1,2}}){_SPACE}+"
+        + en_month.replace("en_month", "en_month2")
+        + rf"(?:{_SPACE}+(?P<en_dm_y>\d{{4}}))?)",
+        # 15. tammikuuta 2025
+        rf"(?P<fi>(?P<fi_d>\d{{1,2}})\.{_SPACE}*{fi_month}"
+        rf"(?:{_SPACE}+(?P<fi_y>\d{{4}}))?)",
+        # 15.1.2025, 1/15/2025
+        r"(?P<num_date>(?P<nd_a>\d{1,2})[./](?P<nd_b>\d{1,2})[./](?P<nd_y>\d{4}))",
+        # 10:30, klo 10.30, 3:30 pm
+        rf"(?P<time>(?P<time_h>[01]?\d|2[0-3]){time_sep}(?P<time_m>[0-5]\d)(?!\d)"
+        rf"(?:{_SPACE}?(?P<ampm>[ap]\.?m\b\.?))?)",
+        # $12.5, € 10
+        rf"(?P<pre>{currency_pre}{_SPACE}?(?P<pre_num>{number}))",
+        # 12,5 %, 10 euroa, 500
+        rf"(?P<plain>(?P<num>{number})(?:{_SPACE}?(?:{percent}|{currency_post}))?)",
+    ]
+    return re.compile(
+        r"(?<![\w.,])(?:" + "|".join(alternatives) + ")", re.IGNORECASE
+    )
+
+
+def _to_decimal(text: str, lang: str) -> Decimal | None:
+    digits = re.sub(r"[ \u00a0\u202f]", "", text)
+    if lang in DECIMAL_COMMA_LANGUAGES:
+        digits = digits.replace(".", "").replace(",", ".")
+    else:
+        digits = digits.replace(",", "")
+    try:
+        return Decimal(digits).normalize()
+    except InvalidOperation:
+        return None
+
+
+def _month_number(name: str, months: list[str]) -> int:
+    """1-12 by the first three letters (unique within each list)."""
+    name = name.lower()[:3]
+    for number, month in enumerate(months, start=1):
+        if month.startswith(name):
+            return number
+    return 0
+
+
+def extract_numeric(text: str, lang: str) -> list[NumericToken]:
+    """Numbers and dates of a text, in text order."""
+    tokens = []
+    for m in _pattern(lang).finditer(text):
+        g = m.groupdict()
+        kind, unit = "number", ""
+        if g["iso"]:
+            kind = "date"
+            value = (int(g["iso_y"]), int(g["iso_m"]), int(g["iso_d"]))
+        elif g["en_md"]:
+            kind = "date"
+            year = int(g["en_md_y"]) if g["en_md_y"] else None
+            month = _month_number(g["en_month"], _EN_MONTHS)
+            value = (year, month, int(g["en_md_d"]))
+        elif g["en_dm"]:
+            kind = "date"
+            year = int(g["en_dm_y"]) if g["en_dm_y"] else None
+            month = _month_number(g["en_month2"], _EN_MONTHS)
+            value = (year, month, int(g["en_dm_d"]))
+        elif g["fi"]:
+            kind = "date"
+            year = int(g["fi_y"]) if g["fi_y"] else None
+            month = _month_number(g["fi_month"], _FI_MONTHS)
+            value = (year, month, int(g["fi_d"]))
+        elif g["num_date"]:
+            kind = "date"
+            a, b = int(g["nd_a"]), int(g["nd_b"])
+            month, day = (a, b) if lang in MONTH_FIRST_LANGUAGES else (b, a)
+            value = (int(g["nd_y"]), month, day)
+        elif g["time"]:
+            kind = "time"
+            hour = int(g["time_h"])
+            if g["ampm"]:
+                hour = hour % 12 + (12 if g["ampm"][0].lower() == "p" else 0)
+            value = (hour, int(g["time_m"]))
+        elif g["pre"]:
+            value = _to_decimal(g["pre_num"], lang)
+            unit = _CURRENCIES.get(g["cur_pre"].lower(), g["cur_pre"].upper())
+        else:
+            value = _to_decimal(g["num"], lang)
+            if g["pct"]:
+                unit = "%"
+            elif g["cur_post"]:
+                unit = _CURRENCIES.get(g["cur_post"].lower(), g["cur_post"].upper())
+        if value is None:
+            continue
+        tokens.append(NumericToken(kind, value, unit, m.start(), m.end(), m.group()))
+    return tokens
+
+
+def _same_value(a: NumericToken, b: NumericToken) -> bool:
+    if a.kind != b.kind:
+        return False
+    if a.kind == "date":
+        # A year missing on one side does not make the dates differ
+        year_a, year_b = a.value[0], b.value[0]
+        years_match = year_a is None or year_b is None or year_a == year_b
+        return years_match and a.value[1:] == b.value[1:]
+    return a.value == b.value
+
+
+def _take(tokens: list[NumericToken], predicate) -> NumericToken | None:
+    for i, token in enumerate(tokens):
+        if predicate(token):
+            return tokens.pop(i)
+    return None
+
+
+def compare_segment(
+    source: list[NumericToken], target: list[NumericToken]
+) -> list[tuple[NumericToken | None, NumericToken | None, str]]:
+    """
+    Mismatches of one segment as (source token, target token, reason) with
+    reason "unit", "changed", "extra" or "missing".
+    """
+    src_rest, tgt_rest = [], list(target)
+    for token in source:
+        if _take(tgt_rest, lambda t: _same_value(token, t) and t.unit == token.unit):
+            continue
+        src_rest.append(token)
+
+    mismatches = []
+    unmatched = []
+    for token in src_rest:
+        other = _take(tgt_rest, lambda t: _same_value(token, t))
+        if other is not None:
+            mismatches.append((token, other, "unit"))
+        else:
+            unmatched.append(token)
+
+    for token in unmatched:
+        other = _take(tgt_rest, lambda t: t.kind == token.kind)
+        mismatches.append((token, other, "changed" if other else "missing"))
+    mismatches.extend((None, token, "extra") for token in tgt_rest)
+    return mismatches
+
+
+def _suggestion(segment, src, tgt, reason, severity) -> Suggestion:
+    if tgt is not None:
+        span, start, end = tgt.text, tgt.start, tgt.end
+    else:
+        span, start, end = segment.target_text, 0, len(segment.target_text)
+    explanation = FI[f"qa_number_{reason}"].format(
+        source=src.text if src else "", target=tgt.text if tgt else ""
+    )
+    return Suggestion(
+        check=CHECK_NAME,
+        annotation=ErrorAnnotation(
+            error_type=ERROR_TYPE,
+            severity=severity,
+            span=span,
+            explanation=explanation,
+            start=start,
+            end=end,
+        ),
+    )
+
+
+def check_numbers(
+    segments: list[TranslationSegment],
+    profile_name: str | None = None,
+    progress: Callable[[int, int], None] | None = None,
+) -> dict[int, list[Suggestion]]:
+    """
+    Numeric mismatch suggestions for a batch of segments, keyed by the
+    position of the segment in the list. Segments without findings are
+    left out. If progress is given, it is called as progress(done, total).
+    """
+    profile = get_profile(profile_name)
+    severity = profile.default_severities.get(ERROR_TYPE, profile.critical_severity)
+    total = len(segments)
+    results = {}
+    for idx, segment in enumerate(segments):
+        if progress is not None and idx % PROGRESS_EVERY == 0:
+            progress(idx, total)
+        source = extract_numeric(segment.source_text, segment.source_lang)
+        target = extract_numeric(segment.target_text, segment.target_lang)
+        if not source and not target:
+            continue
+        mismatches = compare_segment(source, target)
+        if mismatches:
+            results[idx] = [
+                _suggestion(segment, src, tgt, reason, severity)
+                for src, tgt, reason in mismatches
+            ]
+    return results
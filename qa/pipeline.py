@@ -0,0 +1,213 @@
+"""
+QA check pipeline: registered checks run over chunks of segments in worker
+processes.
+
+A check is a module-level function of the form
+
+    check(segments, profile_name=None, progress=None, **options)
+        -> dict[int, list[Suggestion]]
+
+keyed by the position of the segment in the list it was given. Checks are
+registered under a name with register_check(); options lists the keyword
+arguments the check takes from the options given to run_checks() (e.g. the
+glossary), so checks that need none keep the plain signature.
+
+run_checks() splits the segments into CHUNK_SIZE chunks and runs every
+registered check on each chunk in a process-wide pool of spawned workers
+(TQA_CHECK_WORKERS, default one per CPU). The checks are pure Python and
+hold the GIL, so processes rather than the job runner's threads are what
+spread them over the cores. Checks are sent to the workers by reference,
+so they must be importable module-level functions. Per-process caches
+(dictionaries, compiled glossaries) are filled once per worker and reused
+by later chunks and runs. Small documents (under PARALLEL_MIN segments) are
+checked in-process, where starting the pool would cost more than it saves.
+
+Results are merged into one suggestion list per segment, in registration
+order of the checks, and the time spent in each check is summed over the
+chunks.
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, NamedTuple
+
+from pydantic import BaseModel
+
+from models.data_models import Suggestion, TranslationSegment
+from qa.consistency import (
+    check_bracket_balance,
+    check_doubled_spaces,
+    check_end_punctuation,
+    check_punctuation_parity,
+    check_tag_mismatch,
+    check_untranslated,
+)
+from qa.glossary import check_glossary, compile_glossary
+from qa.numbers import check_numbers
+from qa.spelling import check_spelling
+
+CHUNK_SIZE = 2000
+PARALLEL_MIN = 5000
+WORKERS = int(os.environ.get("TQA_CHECK_WORKERS", 0)) or os.cpu_count() or 1
+
+
+class RegisteredCheck(NamedTuple):
+    name: str
+    fn: Callable
+    options: tuple[str, ...]
+
+
+CHECKS: dict[str, RegisteredCheck] = {}
+
+
+def register_check(name: str, fn: Callable, options: tuple[str, ...] = ()):
+    """Add a check to the pipeline (replaces a check of the same name)."""
+    CHECKS[name] = RegisteredCheck(name, fn, tuple(options))
+
+
+class CheckRun(BaseModel):
+    """Merged results of one pipeline run."""
+
+    results: dict[int, list[Suggestion]]
+    timings: dict[str, float]  # seconds per check, summed over chunks
+    elapsed: float  # wall-clock seconds of the whole run
+
+
+def check_glossary_args(
+    segments: list[TranslationSegment],
+    profile_name: str | None = None,
+    progress: Callable[[int, int], None] | None = None,
+    glossary: tuple | None = None,
+) -> dict[int, list[Suggestion]]:
+    """
+    check_glossary for the pipeline: the glossary is given as the arguments
+    of compile_glossary (bytes, filename, source_lang, target_lang), which
+    pickle cheaply and hit each worker's compile cache after the first chunk.
+    """
+    if glossary is None:
+        return {}
+    return check_glossary(
+        segments, compile_glossary(*glossary), profile_name, progress=progress
+    )
+
+
+register_check("numbers", check_numbers)
+register_check("spelling", check_spelling)
+register_check("glossary", check_glossary_args, options=("glossary",))
+register_check("punctuation", check_punctuation_parity)
+register_check("end_punct", check_end_punctuation)
+register_check("spaces", check_doubled_spaces)
+register_check("brackets", check_bracket_balance)
+register_check("tags", check_tag_mismatch)
+register_check("untranslated", check_untranslated)
+
+
+def _run_chunk(
+    checks: list[RegisteredCheck],
+    segments: list[TranslationSegment],
+    offset: int,
+    profile_name: str | None,
+    options: dict[str, Any],
+) -> tuple[dict[int, list[Suggestion]], dict[str, float]]:
+    """Run every check on one chunk; indices are shifted by the chunk offset."""
+    results: dict[int, list[Suggestion]] = {}
+    timings = {}
+    for check in checks:
+        kwargs = {k: options[k] for k in check.options if k in options}
+        started = time.perf_counter()
+        found = check.fn(segments, profile_name, **kwargs)
+        timings[check.name] = time.perf_counter() - started
+        for idx, suggestions in found.items():
+            results.setdefault(offset + idx, []).extend(suggestions)
+    return results, timings
+
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """The process-wide worker pool, started on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking the multi-threaded server process is not safe
+            _pool = ProcessPoolExecutor(
+                max_workers=WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def _discard_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def run_checks(
+    segments: list[TranslationSegment],
+    profile_name: str | None = None,
+    options: dict[str, Any] | None = None,
+    names: list[str] | None = None,
+    progress: Callable[[int, int], None] | None = None,
+) -> CheckRun:
+    """
+    Run the registered checks (or those named) on all segments. If progress
+    is given, it is called as progress(done, total) as chunks complete; an
+    exception raised by it (job cancellation) cancels the remaining chunks.
+    """
+    options = options or {}
+    checks = [CHECKS[n] for n in names] if names is not None else list(CHECKS.values())
+    # Checks that need an option that was not given have nothing to do
+    checks = [c for c in checks if all(k in options for k in c.options)]
+    total = len(segments)
+    started = time.perf_counter()
+    chunks = [(i, segments[i : i + CHUNK_SIZE]) for i in range(0, total, CHUNK_SIZE)]
+
+    parts = []
+    if total < PARALLEL_MIN or WORKERS < 2:
+        for offset, chunk in chunks:
+            if progress is not None:
+                progress(offset, total)
+            parts.append(_run_chunk(checks, chunk, offset, profile_name, options))
+    else:
+        pool = get_pool()
+        futures = {
+            pool.submit(_run_chunk, checks, chunk, offset, profile_name, options): len(chunk)
+            for offset, chunk in chunks
+        }
+        done = 0
+        pending = set(futures)
+        try:
+            while pending:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    parts.append(future.result())
+                    done += futures[future]
+                if progress is not None:
+                    progress(done, total)
+        except BrokenProcessPool:
+            _discard_pool()
+            raise
+        finally:
+            for future in pending:
+                future.cancel()
+
+    results: dict[int, list[Suggestion]] = {}
+    timings = {c.name: 0.0 for c in checks}
+    for found, chunk_timings in parts:
+        # Each segment is in exactly one chunk, in check order already
+        results.update(found)
+        for name, seconds in chunk_timings.items():
+            timings[name] += seconds
+    return CheckRun(
+        results=dict(sorted(results.items())),
+        timings=timings,
+        elapsed=time.perf_counter() - started,
+    )
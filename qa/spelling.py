@@ -0,0 +1,329 @@
+"""
+Offline spell-check of target texts.
+
+Dictionaries are read from the dictionaries/ directory (or
+TQA_DICTIONARY_DIR), one per language, named by ISO code:
+
+    fi.txt            plain wordlist, one word per line ("#" comments)
+    sv.dic + sv.aff   Hunspell dictionary; PFX/SFX affix rules are expanded
+
+Each dictionary is loaded once per process into two structures:
+  - a Bloom filter of all word forms for membership (a few bits per word
+    instead of a Python set of strings)
+  - a symmetric-delete index (every word with one character deleted ->
+    words) for suggestions at edit distance 1, built on first use and only
+    over the first SUGGEST_WORDS words (wordlists are usually ordered by
+    frequency)
+
+A target word is reported when it is not in the dictionary, is not a
+compound of two dictionary words (compounding languages only) and does
+not occur in the source text (names, product names). Capitalised words
+are skipped unless they start the segment, as are words with digits.
+"""
+
+import hashlib
+import math
+import os
+import re
+from functools import lru_cache
+from typing import Callable
+
+from models.data_models import ErrorAnnotation, Suggestion, TranslationSegment
+from assessment.profiles import REPO_ROOT, get_profile
+from qa.glossary import LANGUAGE_CODES
+from i18n.fi import FI
+
+CHECK_NAME = "spelling"
+ERROR_TYPE = "Spelling"
+# Segments between progress callbacks
+PROGRESS_EVERY = 1000
+
+DICTIONARY_DIR = os.environ.get(
+    "TQA_DICTIONARY_DIR", os.path.join(REPO_ROOT, "dictionaries")
+)
+FALSE_POSITIVE_RATE = 0.001
+SUGGEST_WORDS = 200_000
+MAX_SUGGESTIONS = 3
+MIN_WORD = 3  # shorter words are not checked
+MIN_COMPOUND_PART = 3
+VERDICT_CACHE = 500_000  # checked words remembered per dictionary
+SUGGEST_CACHE = 10_000  # suggestion lists remembered per dictionary
+# Languages (sidebar names) that write compounds as one word
+COMPOUND_LANGUAGES = {"suomi", "ruotsi", "saksa", "hollanti"}
+
+_WORD = re.compile(r"[^\W\d_]+(?:['’-][^\W\d_]+)*|\w+")
+
+
+class BloomFilter:
+    """Set membership in a bit array; false positives at the given rate."""
+
+    def __init__(self, capacity: int, error_rate: float = FALSE_POSITIVE_RATE):
+        capacity = max(capacity, 1)
+        self.size = max(
+            8, int(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    @staticmethod
+    def _digest(word: str) -> tuple[int, int]:
+        digest = hashlib.blake2b(word.encode(), digest_size=16).digest()
+        return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little")
+
+    def _positions(self, word: str):
+        # Double hashing: k positions from the two 64-bit halves of one digest
+        h1, h2 = self._digest(word)
+        h1, h2 = h1 % self.size, (h2 | 1) % self.size
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def update(self, words: list[str]):
+        """Add many words at once (positions computed with numpy); earlier words stay."""
+        import numpy as np  # lazy: only needed while a dictionary is loaded
+
+        digests = np.array([self._digest(w) for w in words], dtype=np.uint64)
+        if not len(digests):
+            return
+        # Same positions as _positions; reducing h1 and h2 first keeps the
+        # uint64 sums from overflowing
+        size = np.uint64(self.size)
+        h1 = digests[:, 0] % size
+        h2 = (digests[:, 1] | np.uint64(1)) % size
+        bits = np.zeros(len(self.bits) * 8, dtype=bool)
+        pos = h1.copy()
+        for _ in range(self.hashes):
+            bits[pos] = True
+            pos = (pos + h2) % size
+        packed = np.packbits(bits, bitorder="little")
+        packed |= np.frombuffer(self.bits, dtype=np.uint8)
+        self.bits = bytearray(packed.tobytes())
+
+    def __contains__(self, word: str) -> bool:
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(word))
+
+
+def _deletes(word: str) -> set[str]:
+    return {word[:i] + word[i + 1 :] for i in range(len(word))}
+
+
+class SpellDictionary:
+    """Bloom filter of a language's word forms plus a lazy suggestion index."""
+
+    def __init__(self, words: list[str]):
+        self.count = len(words)
+        self.words = BloomFilter(len(words))
+        self.words.update(words)
+        self._suggest_words = words[:SUGGEST_WORDS]
+        self._deletes: dict[str, list[int]] | None = None
+        # Verdicts of words already checked; documents repeat their vocabulary
+        self._known: dict[tuple[str, bool], bool] = {}
+        self._suggestions: dict[str, list[str]] = {}
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.words
+
+    def is_known(self, word: str, compounds: bool) -> bool:
+        """Whether a case-folded word (or hyphen/compound of words) is known."""
+        verdict = self._known.get((word, compounds))
+        if verdict is None:
+            verdict = (
+                word in self.words
+                or ("-" in word and all(p in self.words for p in word.split("-") if p))
+                or (compounds and self.is_compound(word))
+            )
+            if len(self._known) >= VERDICT_CACHE:
+                self._known.clear()
+            self._known[(word, compounds)] = verdict
+        return verdict
+
+    def is_compound(self, word: str) -> bool:
+        """Whether word splits into two dictionary words."""
+        for i in range(MIN_COMPOUND_PART, len(word) - MIN_COMPOUND_PART + 1):
+            head, tail = word[:i], word[i:]
+            if head in self.words and tail in self.words:
+                return True
+        return False
+
+    def suggest(self, word: str) -> list[str]:
+        """Dictionary words at edit distance 1 (symmetric delete lookup)."""
+        suggestions = self._suggestions.get(word)
+        if suggestions is None:
+            if len(self._suggestions) >= SUGGEST_CACHE:
+                self._suggestions.clear()
+            suggestions = self._suggestions[word] = self._lookup(word)
+        return suggestions
+
+    def _lookup(self, word: str) -> list[str]:
+        if self._deletes is None:
+            index: dict[str, list[int]] = {}
+            for i, known in enumerate(self._suggest_words):
+                index.setdefault(known, []).append(i)
+                for deleted in _deletes(known):
+                    index.setdefault(deleted, []).append(i)
+            self._deletes = index
+        found: dict[int, None] = {}
+        for key in (word, *sorted(_deletes(word))):
+            for i in self._deletes.get(key, ()):
+                found.setdefault(i, None)
+        # Word ids follow the wordlist order, so frequent words come first
+        candidates = [self._suggest_words[i] for i in sorted(found)]
+        return [c for c in candidates if c != word][:MAX_SUGGESTIONS]
+
+
+def _read_wordlist(path: str) -> list[str]:
+    with open(path, encoding="utf-8-sig") as f:
+        return [
+            line.strip().casefold()
+            for line in f
+            if line.strip() and not line.startswith("#")
+        ]
+
+
+def _read_hunspell(dic_path: str, aff_path: str) -> list[str]:
+    """Word forms of a Hunspell dictionary with its PFX/SFX rules applied."""
+    rules: dict[str, list[tuple[str, str, str, re.Pattern]]] = {}
+    if os.path.exists(aff_path):
+        with open(aff_path, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                parts = line.split()
+                # Rule lines: SFX flag strip add condition (headers have 4 fields
+                # with a Y/N cross-product marker)
+                if len(parts) >= 5 and parts[0] in ("PFX", "SFX"):
+                    kind, flag, strip, add, condition = parts[:5]
+                    strip = "" if strip == "0" else strip
+                    add = "" if add == "0" else add.split("/")[0]
+                    pattern = (
+                        f"(?:{condition})$" if kind == "SFX" else f"^(?:{condition})"
+                    )
+                    rules.setdefault(flag, []).append(
+                        (kind, strip, add, re.compile(pattern))
+                    )
+
+    words = []
+    with open(dic_path, encoding="utf-8", errors="replace") as f:
+        lines = f.read().splitlines()
+    for line in lines[1:]:  # first line is the entry count
+        if not line.strip():
+            continue
+        stem, _, flags = line.strip().partition("/")
+        flags = flags.split()[0] if flags else ""
+        words.append(stem.casefold())
+        for flag in flags:
+            for kind, strip, add, condition in rules.get(flag, ()):
+                if not condition.search(stem):
+                    continue
+                if kind == "SFX":
+                    base = stem[: len(stem) - len(strip)] if strip else stem
+                    words.append((base + add).casefold())
+                else:
+                    base = stem[len(strip) :] if strip else stem
+                    words.append((add + base).casefold())
+    return words
+
+
+@lru_cache(maxsize=None)
+def load_dictionary(lang: str) -> SpellDictionary | None:
+    """The dictionary of a language (sidebar name), loaded once per process."""
+    code = LANGUAGE_CODES.get(lang)
+    if code is None:
+        return None
+    base = os.path.join(DICTIONARY_DIR, code)
+    if os.path.exists(base + ".dic"):
+        words = _read_hunspell(base + ".dic", base + ".aff")
+    elif os.path.exists(base + ".txt"):
+        words = _read_wordlist(base + ".txt")
+    else:
+        return None
+    return SpellDictionary(words)
+
+
+def misspellings(
+    segment: TranslationSegment, dictionary: SpellDictionary
+) -> list[tuple[int, int, str]]:
+    """(start, end, word) of the unknown words of a segment's target."""
+    source_words = {w.casefold() for w in _WORD.findall(segment.source_text)}
+    compounds = segment.target_lang in COMPOUND_LANGUAGES
+    found = []
+    for m in _WORD.finditer(segment.target_text):
+        word = m.group()
+        if len(word) < MIN_WORD or not word.replace("-", "").isalpha():
+            continue
+        if (word[0].isupper() and m.start() > 0) or word.isupper():
+            continue
+        folded = word.casefold()
+        if folded in source_words or dictionary.is_known(folded, compounds):
+            continue
+        found.append((m.start(), m.end(), word))
+    return found
+
+
+def check_spelling(
+    segments: list[TranslationSegment],
+    profile_name: str | None = None,
+    progress: Callable[[int, int], None] | None = None,
+) -> dict[int, list[Suggestion]]:
+    """
+    Spelling suggestions for a batch of segments, keyed by the position of
+    the segment in the list. Segments whose target language has no
+    dictionary are skipped. If progress is given, it is called as
+    progress(done, total).
+    """
+    profile = get_profile(profile_name)
+    severity = profile.default_severities.get(ERROR_TYPE, "Minor")
+
+    # Each distinct word of the document is looked up once; segments that
+    # contain none of the unknown words are skipped with a set operation
+    unknown = {}
+    for lang in {s.target_lang for s in segments}:
+        dictionary = load_dictionary(lang)
+        if dictionary is None:
+            continue
+        compounds = lang in COMPOUND_LANGUAGES
+        vocabulary = set(
+            _WORD.findall(
+                "\n".join(s.target_text for s in segments if s.target_lang == lang).casefold()
+            )
+        )
+        unknown[lang] = {
+            w
+            for w in vocabulary
+            if len(w) >= MIN_WORD
+            and w.replace("-", "").isalpha()
+            and not dictionary.is_known(w, compounds)
+        }
+
+    total = len(segments)
+    results = {}
+    for idx, segment in enumerate(segments):
+        if progress is not None and idx % PROGRESS_EVERY == 0:
+            progress(idx, total)
+        bad = unknown.get(segment.target_lang)
+        if not bad or bad.isdisjoint(_WORD.findall(segment.target_text.casefold())):
+            continue
+        dictionary = load_dictionary(segment.target_lang)
+        found = []
+        for start, end, word in misspellings(segment, dictionary):
+            candidates = dictionary.suggest(word.casefold())
+            explanation = (
+                FI["qa_spelling_suggest"].format(
+                    word=word, suggestions=", ".join(candidates)
+                )
+                if candidates
+                else FI["qa_spelling"].format(word=word)
+            )
+            found.append(
+                Suggestion(
+                    check=CHECK_NAME,
+                    annotation=ErrorAnnotation(
+                        error_type=ERROR_TYPE,
+                        severity=severity,
+                        span=word,
+                        explanation=explanation,
+                        start=start,
+                        end=end,
+                    ),
+                )
+            )
+        if found:
+            results[idx] = found
+    return results
@@ -0,0 +1,456 @@
+"""
+Standalone scoring service: scores and exports over HTTP on localhost,
+for tools that do not run the Streamlit UI.
+
+Endpoints:
+  GET  /health      status, worker count and cache size
+  POST /v1/score    score a batch of documents
+  POST /v1/export   score one document and stream its export
+                    (?format=csv|xlsx|parquet, default csv)
+
+A document is the app's saved session format (models/session.py) or the
+same shape written by hand: "segments" ({id, source_text, target_text, ...})
+and optionally "assessments" (one per segment; missing means no errors),
+"scoring_settings" and "scoring_profile". A score request is
+
+    {"documents": [{"id": "a", "segments": [...]}, ...],
+     "settings": {...}, "profile": "default", "segments": false}
+
+where settings and profile are defaults for documents that carry none, and
+"segments": true adds the per-segment word counts and penalties to each
+result. Results come back in request order; a document that fails to
+validate (not an object, invalid fields or scoring settings, an unknown
+scoring profile) gets an "error" instead of a score, without failing the
+batch; so does a document whose scoring fails unexpectedly.
+
+Documents are scored in a pool of spawned worker processes
+(TQA_SERVICE_WORKERS, default one per CPU; scoring holds the GIL, so
+threads would not help), in-process when there is a single worker or a
+single document.
+Results are cached by a digest of the document content and the settings
+(TQA_SERVICE_CACHE entries, least recently used dropped first), so a
+repeated request is answered without scoring.
+
+Exports are streamed: CSV in chunks of CHUNK_ROWS rows as it is written,
+Excel and Parquet from their temp file, which is removed afterwards.
+
+Usage:
+    python -m service.server [--host 127.0.0.1] [--port 8780] [--workers N]
+
+    curl -s localhost:8780/v1/score -d @batch.json
+    curl -s "localhost:8780/v1/export?format=xlsx" -d @session.json -o report.xlsx
+"""
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from pydantic import ValidationError
+
+from assessment.profiles import get_profile, load_profiles
+from assessment.scoring import score_assessments
+from models.session import SessionData, load_session
+
+WORKERS = int(os.environ.get("TQA_SERVICE_WORKERS", 0)) or os.cpu_count() or 1
+CACHE_SIZE = int(os.environ.get("TQA_SERVICE_CACHE", 256))
+MAX_BODY = 512 * 2**20  # bytes accepted per request
+FILE_CHUNK = 64 * 1024  # bytes per chunk when streaming an export file
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "tqa_tulokset.csv"),
+    "xlsx": (
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        "tqa_raportti.xlsx",
+    ),
+    "parquet": ("application/vnd.apache.parquet", "tqa_virherivit.parquet"),
+}
+
+
+class RequestError(Exception):
+    """A request the service cannot serve (answered with 400)."""
+
+
+def parse_document(
+    doc: dict, settings: dict | None = None, profile: str | None = None
+) -> SessionData:
+    """
+    A document as a session. Missing assessments mean no errors; the
+    document's own settings and profile take precedence over the defaults.
+    """
+    if not isinstance(doc, dict) or not isinstance(doc.get("segments"), list):
+        raise RequestError("a document needs a list of segments")
+    doc = {k: v for k, v in doc.items() if k != "id"}
+    doc.setdefault("assessments", [{} for _ in doc["segments"]])
+    if not doc.get("scoring_settings") and settings:
+        doc["scoring_settings"] = settings
+    if "scoring_profile" not in doc and profile:
+        doc["scoring_profile"] = profile
+    try:
+        session = load_session(doc)
+    except ValidationError as e:
+        first = e.errors()[0]
+        location = ".".join(str(part) for part in first["loc"])
+        raise RequestError(f"invalid document: {location}: {first['msg']}") from None
+    if len(session.assessments) != len(session.segments):
+        raise RequestError(
+            f"{len(session.segments)} segments but {len(session.assessments)} assessments"
+        )
+    _check_settings(session.scoring_settings)
+    profiles = load_profiles()
+    if session.scoring_profile not in profiles:
+        raise RequestError(
+            f"unknown scoring profile '{session.scoring_profile}', "
+            f"expected one of {list(profiles)}"
+        )
+    return session
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _check_settings(settings: dict | None):
+    """Raise RequestError for scoring settings the scoring code cannot use."""
+    if not settings:
+        return
+    for name in ("pass_fail_threshold", "critical_error_max"):
+        if name in settings and not _is_number(settings[name]):
+            raise RequestError(f"invalid document: scoring_settings.{name} must be a number")
+    if "rating_thresholds" in settings:
+        thresholds = settings["rating_thresholds"]
+        if not (
+            isinstance(thresholds, list)
+            and len(thresholds) == 4
+            and all(_is_number(t) for t in thresholds)
+        ):
+            raise RequestError(
+                "invalid document: scoring_settings.rating_thresholds must be 4 numbers"
+            )
+
+
+def document_key(doc: dict, settings: dict | None, profile: str | None, segments: bool) -> str:
+    """Cache key: digest of the document content and everything that affects its result."""
+    digest = hashlib.sha1()
+    for part in ({k: v for k, v in doc.items() if k != "id"}, settings, profile, segments):
+        digest.update(json.dumps(part, sort_keys=True, ensure_ascii=False).encode())
+        digest.update(b"\x1e")
+    return digest.hexdigest()
+
+
+def score_payload(
+    doc: dict, settings: dict | None, profile: str | None, segments: bool
+) -> dict:
+    """Score one document; runs in a worker process, so takes and returns plain data."""
+    session = parse_document(doc, settings, profile)
+    seg_scores, doc_score = score_assessments(
+        session.segments,
+        session.assessments,
+        session.scoring_settings,
+        profile=get_profile(session.scoring_profile),
+    )
+    result = {"document_score": doc_score.model_dump()}
+    if segments:
+        result["segments"] = {
+            "segment_ids": seg_scores.segment_ids.tolist(),
+            "word_counts": seg_scores.word_counts.tolist(),
+            "penalties": seg_scores.penalties.tolist(),
+        }
+    return result
+
+
+class ResultCache:
+    """Score results by document key, least recently used dropped first."""
+
+    def __init__(self, size: int = CACHE_SIZE):
+        self.size = size
+        self._results: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+            return result
+
+    def put(self, key: str, result: dict):
+        with self._lock:
+            self._results[key] = result
+            self._results.move_to_end(key)
+            while len(self._results) > self.size:
+                self._results.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+
+class ScoringServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, workers: int = WORKERS, cache_size: int = CACHE_SIZE):
+        super().__init__(address, _Handler)
+        self.workers = workers
+        self.cache = ResultCache(cache_size)
+        self.scored = 0  # documents scored (not answered from the cache)
+        self._pool: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def pool(self) -> ProcessPoolExecutor:
+        """The worker pool, started on first use."""
+        with self._lock:
+            if self._pool is None:
+                # spawn: forking the multi-threaded server process is not safe
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._pool
+
+    def _discard_pool(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    def score_batch(
+        self,
+        documents: list,
+        settings: dict | None,
+        profile: str | None,
+        segments: bool,
+    ) -> list[dict]:
+        """Results of a batch in request order, from the cache or the workers."""
+        results: list[dict | None] = [None] * len(documents)
+        pending = []  # (position, key, document)
+        for i, doc in enumerate(documents):
+            if not isinstance(doc, dict):
+                results[i] = {"id": None, "error": "a document must be a JSON object"}
+                continue
+            doc_id = doc.get("id")
+            try:
+                key = document_key(doc, settings, profile, segments)
+            except (TypeError, ValueError) as e:
+                results[i] = {"id": doc_id, "error": f"invalid document: {e}"}
+                continue
+            cached = self.cache.get(key)
+            if cached is not None:
+                results[i] = {"id": doc_id, "digest": key, "cached": True, **cached}
+            else:
+                pending.append((i, key, doc))
+
+        if len(pending) < 2 or self.workers < 2:
+            outcomes = [
+                _attempt(score_payload, doc, settings, profile, segments)
+                for _, _, doc in pending
+            ]
+        else:
+            pool = self.pool()
+            try:
+                futures = [
+                    pool.submit(_attempt, score_payload, doc, settings, profile, segments)
+                    for _, _, doc in pending
+                ]
+                outcomes = [f.result() for f in futures]
+            except BrokenProcessPool:
+                self._discard_pool()
+                raise
+
+        for (i, key, doc), (result, error) in zip(pending, outcomes):
+            doc_id = doc.get("id") if isinstance(doc, dict) else None
+            if error is not None:
+                results[i] = {"id": doc_id, "error": error}
+                continue
+            self.cache.put(key, result)
+            results[i] = {"id": doc_id, "digest": key, "cached": False, **result}
+        with self._lock:
+            self.scored += sum(1 for _, error in outcomes if error is None)
+        return results
+
+    def server_close(self):
+        super().server_close()
+        self._discard_pool()
+
+
+def _attempt(fn, *args) -> tuple[dict | None, str | None]:
+    """
+    (result, None), or (None, message) if the document is invalid or
+    scoring it failed, so one document never fails its batch.
+    """
+    try:
+        return fn(*args), None
+    except RequestError as e:
+        return None, str(e)
+    except Exception as e:
+        traceback.print_exc()
+        return None, f"internal error: {type(e).__name__}: {e}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: ScoringServer
+    # Keep-alive and chunked responses for streamed exports
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if urlparse(self.path).path != "/health":
+            self._send(404, {"error": "not found"})
+            return
+        self._send(
+            200,
+            {
+                "status": "ok",
+                "workers": self.server.workers,
+                "cached": len(self.server.cache),
+                "scored": self.server.scored,
+            },
+        )
+
+    def do_POST(self):
+        self._responding = False
+        url = urlparse(self.path)
+        try:
+            if url.path == "/v1/score":
+                self._score(self._read_json())
+            elif url.path == "/v1/export":
+                fmt = parse_qs(url.query).get("format", ["csv"])[0]
+                self._export(self._read_json(), fmt)
+            else:
+                self._send(404, {"error": "not found"})
+        except RequestError as e:
+            self._send(400, {"error": str(e)})
+        except BrokenProcessPool:
+            self._send(503, {"error": "worker pool failed, retry"})
+        except Exception as e:
+            traceback.print_exc()
+            if self._responding:
+                # Failed mid-stream: the client sees a truncated response
+                self.close_connection = True
+            else:
+                self._send(500, {"error": f"internal error: {type(e).__name__}: {e}"})
+
+    def send_response(self, code, message=None):
+        self._responding = True
+        super().send_response(code, message)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length", 0))
+        if length > MAX_BODY:
+            raise RequestError(f"request body over {MAX_BODY} bytes")
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError as e:
+            raise RequestError(f"invalid JSON: {e}") from None
+
+    def _score(self, body):
+        if isinstance(body, list):
+            body = {"documents": body}
+        if not isinstance(body, dict) or not isinstance(body.get("documents"), list):
+            raise RequestError('expected {"documents": [...]}')
+        start = time.perf_counter()
+        results = self.server.score_batch(
+            body["documents"],
+            body.get("settings"),
+            body.get("profile"),
+            bool(body.get("segments", False)),
+        )
+        self._send(200, {"results": results, "elapsed": time.perf_counter() - start})
+
+    def _export(self, body, fmt: str):
+        if fmt not in EXPORT_FORMATS:
+            raise RequestError(f"unknown format '{fmt}', expected one of {list(EXPORT_FORMATS)}")
+        session = parse_document(body)
+        profile = get_profile(session.scoring_profile)
+        seg_scores, doc_score = score_assessments(
+            session.segments, session.assessments, session.scoring_settings, profile=profile
+        )
+        args = (session.segments, session.assessments, seg_scores)
+        content_type, filename = EXPORT_FORMATS[fmt]
+        if fmt == "csv":
+            from exporters.csv_writer import iter_export_csv_chunks
+
+            chunks = iter_export_csv_chunks(*args, doc_score, profile=profile)
+            self._send_chunked(content_type, filename, (c.encode() for c in chunks))
+            return
+
+        # Excel and Parquet are written to a temp file first (their writers
+        # hold one chunk at a time), then streamed from it
+        if fmt == "xlsx":
+            from exporters.xlsx_writer import write_export_xlsx
+
+            path = write_export_xlsx(*args, doc_score, profile=profile)
+        else:
+            from exporters.parquet_writer import write_export_parquet
+
+            path = write_export_parquet(*args, profile=profile)
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(os.path.getsize(path)))
+            self.send_header("Content-Disposition", f'attachment; filename="{filename}"')
+            self.end_headers()
+            with open(path, "rb") as f:
+                while chunk := f.read(FILE_CHUNK):
+                    self.wfile.write(chunk)
+        finally:
+            os.unlink(path)
+
+    def _send_chunked(self, content_type: str, filename: str, chunks):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Disposition", f'attachment; filename="{filename}"')
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for chunk in chunks:
+            if chunk:
+                self.wfile.write(b"%X\r\n%s\r\n" % (len(chunk), chunk))
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _send(self, status: int, payload: dict):
+        data = json.dumps(payload, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port: int = 0, workers: int = WORKERS, cache_size: int = CACHE_SIZE) -> ScoringServer:
+    """Start the service on a background thread (port 0 picks a free port)."""
+    server = ScoringServer(("127.0.0.1", port), workers, cache_size)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8780)
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    args = parser.parse_args()
+    server = ScoringServer((args.host, args.port), args.workers)
+    print(f"Serving on {server.url} with {args.workers} workers")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
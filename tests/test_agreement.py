@@ -0,0 +1,152 @@
+"""Span clustering (assessment/spans) and inter-annotator agreement (assessment/agreement)."""
+
+import numpy as np
+import pytest
+
+from models.data_models import ErrorAnnotation, SegmentAssessment, TranslationSegment
+from models.session import SessionData
+from assessment.agreement import (
+    binary_cohen_kappa,
+    cohen_kappa,
+    compute_agreement,
+    fleiss_kappa,
+)
+from assessment.spans import span_clusters, span_interval
+
+TARGETS = ["Kissa istui matolla.", "Koira juoksi pihalla.", "Hyvää päivää.", "Kiitos."]
+
+
+def _ann(error_type, severity, span, start=None):
+    return ErrorAnnotation(
+        error_type=error_type, severity=severity, span=span, explanation="", start=start
+    )
+
+
+def _session(annotations):
+    """A session of TARGETS with annotations by segment position."""
+    return SessionData(
+        segments=[
+            TranslationSegment(id=i, source_text=f"source {i}", target_text=t)
+            for i, t in enumerate(TARGETS)
+        ],
+        assessments=[
+            SegmentAssessment(annotations=annotations.get(i, []))
+            for i in range(len(TARGETS))
+        ],
+    )
+
+
+def test_span_interval():
+    text = "on ja on"
+    assert span_interval(text, _ann("Grammar", "Minor", "on")) == (0, 2)
+    assert span_interval(text, _ann("Grammar", "Minor", "on", start=6)) == (6, 8)
+    # A stale offset falls back to the first occurrence
+    assert span_interval(text, _ann("Grammar", "Minor", "on", start=3)) == (0, 2)
+    assert span_interval(text, _ann("Grammar", "Minor", "ei")) == (-1, -1)
+    assert span_interval(text, _ann("Omission", "Major", "")) == (0, 1)
+
+
+def test_span_clusters():
+    a, b, c, d, e = (_ann("Grammar", "Minor", s) for s in ["a", "b", "c", "gone", "gone"])
+    items = [
+        (5, 9, 1, b),
+        (0, 3, 0, a),
+        (2, 6, 2, c),
+        (9, 12, 0, a),
+        (-1, -1, 0, d),
+        (-1, -1, 1, e),
+    ]
+    clusters = [[(it[0], it[2]) for it in cluster] for cluster in span_clusters(items)]
+    # Overlap chains (0-3, 2-6, 5-9) form one cluster; a span starting where
+    # the cluster ends (9-12) does not overlap it
+    assert clusters == [[(0, 0), (2, 2), (5, 1)], [(9, 0)], [(-1, 0), (-1, 1)]]
+
+
+def test_fleiss_kappa_reference_value():
+    # Fleiss (1971) style worked example: 10 items, 14 raters, 5 categories
+    counts = [
+        [0, 0, 0, 0, 14],
+        [0, 2, 6, 4, 2],
+        [0, 0, 3, 5, 6],
+        [0, 3, 9, 2, 0],
+        [2, 2, 8, 1, 1],
+        [7, 7, 0, 0, 0],
+        [3, 2, 6, 3, 0],
+        [2, 5, 3, 2, 2],
+        [6, 5, 2, 1, 0],
+        [0, 2, 2, 3, 7],
+    ]
+    assert fleiss_kappa(counts) == pytest.approx(0.210, abs=1e-3)
+
+
+def test_fleiss_kappa_is_batched_and_nan_when_undefined():
+    perfect = [[2, 0], [0, 2], [2, 0]]
+    constant = [[2, 0], [2, 0], [2, 0]]
+    kappas = fleiss_kappa([perfect, constant])
+    assert kappas[0] == pytest.approx(1.0)
+    assert np.isnan(kappas[1])
+
+
+def test_cohen_kappa_reference_value():
+    # 50 items: 20 both yes, 5 only the first, 10 only the second, 15 both no
+    a = [1] * 20 + [1] * 5 + [0] * 10 + [0] * 15
+    b = [1] * 20 + [0] * 5 + [1] * 10 + [0] * 15
+    assert cohen_kappa(a, b, 2) == pytest.approx(0.4)
+    assert binary_cohen_kappa(a, b) == pytest.approx(0.4)
+    assert np.isnan(cohen_kappa([1, 1], [1, 1], 2))
+    assert np.isnan(cohen_kappa([], [], 2))
+
+
+def test_full_agreement():
+    annotations = {
+        0: [_ann("Grammar", "Minor", "istui")],
+        1: [_ann("Style", "Major", "pihalla")],
+    }
+    report = compute_agreement([_session(annotations), _session(annotations)])
+    assert report.reviewer_count == 2
+    assert report.segment_count == 4
+    assert report.unit_count == 2
+    assert report.full_agreement_units == 2
+    assert report.type_fleiss_kappa == pytest.approx(1.0)
+    assert report.type_cohen_kappa[0].kappa == pytest.approx(1.0)
+    assert report.per_type["Grammar"].fleiss_kappa == pytest.approx(1.0)
+    assert report.per_type["Grammar"].flagged_segments == [1, 1]
+    assert report.score_correlation[0].pearson == pytest.approx(1.0)
+    assert report.score_correlation[0].spearman == pytest.approx(1.0)
+
+
+def test_disagreement_on_units():
+    a = _session(
+        {
+            0: [_ann("Grammar", "Minor", "istui")],
+            1: [_ann("Style", "Major", "pihalla")],
+            2: [_ann("Spelling", "Minor", "päivää")],
+        }
+    )
+    b = _session(
+        {
+            0: [_ann("Grammar", "Major", "istui matolla")],
+            1: [_ann("Unidiomatic", "Major", "pihalla")],
+            3: [_ann("Punctuation", "Minor", ".")],
+        }
+    )
+    report = compute_agreement([a, b])
+    assert report.unit_count == 4
+    assert report.full_agreement_units == 0
+    assert report.type_fleiss_kappa < 0.5
+    assert report.per_type["Grammar"].fleiss_kappa == pytest.approx(1.0)
+    assert report.per_type["Spelling"].flagged_segments == [1, 0]
+    assert report.per_severity["Major"].flagged_segments == [1, 2]
+
+
+def test_only_common_segments_are_compared():
+    a = _session({0: [_ann("Grammar", "Minor", "istui")]})
+    b = _session({0: [_ann("Grammar", "Minor", "istui")]})
+    b.segments, b.assessments = b.segments[:2], b.assessments[:2]
+    report = compute_agreement([a, b])
+    assert report.segment_count == 2
+
+
+def test_needs_two_sessions():
+    with pytest.raises(ValueError):
+        compute_agreement([_session({})])
@@ -0,0 +1,60 @@
+"""The word-token Aho-Corasick automaton (qa/automaton)."""
+
+from qa.automaton import TermAutomaton, fold, tokenize
+
+
+def _found(automaton, text):
+    return [(text[start:end], term_id) for start, end, term_id in automaton.find(text)]
+
+
+def test_tokenize_splits_words_and_punctuation():
+    assert tokenize("Safety-Equipment, now!") == ["safety", "-", "equipment", ",", "now", "!"]
+
+
+def test_tokenize_splits_unspaced_scripts_per_character():
+    assert tokenize("安全装置を") == ["安", "全", "装", "置", "を"]
+    assert tokenize("ABC安全") == ["abc", "安", "全"]
+
+
+def test_fold_keeps_offsets():
+    text = "İstanbul"  # lowercases to two characters
+    assert len(fold(text)) == len(text)
+
+
+def test_matches_fall_on_word_boundaries():
+    automaton = TermAutomaton(["cat"])
+    assert _found(automaton, "The cat sat on the category.") == [("cat", 0)]
+
+
+def test_matching_ignores_case_and_whitespace():
+    automaton = TermAutomaton(["safety equipment"])
+    assert _found(automaton, "Wear SAFETY\n  equipment.") == [("SAFETY\n  equipment", 0)]
+
+
+def test_leftmost_longest_wins():
+    automaton = TermAutomaton(["equipment", "safety equipment", "safety"])
+    assert _found(automaton, "safety equipment and safety") == [
+        ("safety equipment", 1),
+        ("safety", 2),
+    ]
+
+
+def test_find_all_reports_overlaps():
+    automaton = TermAutomaton(["a b", "b c", "b"])
+    assert sorted(automaton.find_all("a b c")) == [(0, 3, 0), (2, 3, 2), (2, 5, 1)]
+
+
+def test_failure_links_recover_partial_matches():
+    automaton = TermAutomaton(["a a b"])
+    assert _found(automaton, "a a a b") == [("a a b", 0)]
+
+
+def test_unspaced_terms_match_inside_text():
+    automaton = TermAutomaton(["安全"])
+    assert _found(automaton, "これは安全装置です") == [("安全", 0)]
+
+
+def test_empty_terms_never_match():
+    automaton = TermAutomaton(["", "...", "x"])
+    assert [term_id for _, _, term_id in automaton.find("... x")] == [1, 2]
+    assert TermAutomaton([""]).find("anything") == []
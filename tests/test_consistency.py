@@ -0,0 +1,88 @@
+"""Source/target consistency checks (qa/consistency)."""
+
+from models.data_models import TranslationSegment
+from qa import consistency
+
+
+def _check(check, source, target):
+    """(check, error type, span) of each suggestion for one segment."""
+    results = check([TranslationSegment(id=1, source_text=source, target_text=target)])
+    return [(s.check, s.annotation.error_type, s.annotation.span) for s in results.get(0, [])]
+
+
+def test_punctuation_counts():
+    check = consistency.check_punctuation_parity
+    assert _check(check, "Huh? What: now.", "Häh? Mitä: nyt.") == []
+    assert _check(check, "Huh? What?", "Häh? Mitä.") == []  # left to end_punct
+    assert _check(check, "Why? Because.", "Miksi. Siksi.") == [
+        ("punctuation", "Punctuation", "Miksi. Siksi.")
+    ]
+    assert _check(check, "なぜ？", "Miksi?") == []  # full-width marks
+
+
+def test_differing_final_mark_is_reported_once():
+    segment = ("Stop!", "Seis.")
+    assert _check(consistency.check_punctuation_parity, *segment) == []
+    assert _check(consistency.check_end_punctuation, *segment) == [
+        ("end_punct", "Punctuation", ".")
+    ]
+
+
+def test_end_punctuation():
+    check = consistency.check_end_punctuation
+    assert _check(check, 'He said "hi."', "Hän sanoi ”hei.”") == []
+    assert _check(check, "Done.", "Valmis") == [("end_punct", "Punctuation", "s")]
+    assert _check(check, "Done", "Valmis!") == [("end_punct", "Punctuation", "!")]
+
+
+def test_doubled_spaces():
+    check = consistency.check_doubled_spaces
+    assert _check(check, "a b", "x  y   z") == [
+        ("spaces", "Punctuation", "  "),
+        ("spaces", "Punctuation", "   "),
+    ]
+    assert _check(check, "a  b", "x  y") == []
+
+
+def test_brackets_and_quotes():
+    check = consistency.check_bracket_balance
+    assert _check(check, "(a) [b]", "(x) [y]") == []
+    assert _check(check, "(a)", "(x]") == [("brackets", "Punctuation", "]")]
+    assert _check(check, "(a)", "(x") == [("brackets", "Punctuation", "(")]
+    assert _check(check, "(a", "(x") == []  # unbalanced in the source too
+    assert _check(check, 'a "b"', "x „y") == [("brackets", "Punctuation", "„")]
+
+
+def test_tags():
+    check = consistency.check_tag_mismatch
+    assert _check(check, "<b>Hi</b> {1} %s", "{1} <b>Hei</b> %s") == []
+    assert _check(check, "<b>Hi</b> {1}", "<b>Hei</b>") == [
+        ("tags", "Omission", "<b>Hei</b>")
+    ]
+    assert _check(check, "Hi %s", "Hei %s %1$s") == [("tags", "Style", "%1$s")]
+
+
+def test_untranslated():
+    check = consistency.check_untranslated
+    assert _check(check, "Hello world", "hello world") == [
+        ("untranslated", "Untranslated", "hello world")
+    ]
+    assert _check(check, "Save the file and close it now", "Save the file and close it nyt") == [
+        ("untranslated", "Untranslated", "Save the file and close it nyt")
+    ]
+    assert _check(check, "Save the file", "Tallenna tiedosto") == []
+    assert _check(check, "123", "123") == []
+
+
+def test_batch_checks_key_by_position():
+    segments = [
+        TranslationSegment(id=10, source_text="Ok.", target_text="Ok."),
+        TranslationSegment(id=20, source_text="Ok.", target_text="Ok  ok."),
+    ]
+    calls = []
+    results = consistency.check_doubled_spaces(
+        segments, progress=lambda *a: calls.append(a)
+    )
+    assert list(results) == [1]
+    assert calls == [(0, 2)]
+    assert consistency.check_doubled_spaces.__name__ == "check_doubled_spaces"
@@ -0,0 +1,176 @@
+"""Streaming CSV export (exporters/csv_writer)."""
+
+import csv
+import gc
+import io
+import os
+import threading
+
+from models.data_models import ErrorAnnotation, SegmentAssessment, TranslationSegment
+from assessment.scoring import score_assessments
+from exporters import csv_writer
+from exporters.csv_writer import (
+    EXPORT_HEADER,
+    CsvExportCache,
+    iter_export_csv_chunks,
+    iter_segment_rows,
+    write_export_csv,
+)
+
+
+def _ann(error_type, severity, span, explanation):
+    return ErrorAnnotation(
+        error_type=error_type, severity=severity, span=span, explanation=explanation
+    )
+
+
+def _document(n=6):
+    segments = [
+        TranslationSegment(
+            id=100 + i, source_text=f"Source {i}", target_text=f"Kohde numero {i}"
+        )
+        for i in range(n)
+    ]
+    assessments = [SegmentAssessment() for _ in range(n)]
+    assessments[1].annotations = [
+        _ann("Grammar", "Minor", "Kohde", "a"),
+        _ann("Style", "Major", "numero", "b"),
+    ]
+    assessments[1].overall_comment = "Kommentti"
+    assessments[4].annotations = [_ann("Omission", "Critical", "4", "c")]
+    return segments, assessments
+
+
+def _rows(segments, assessments, seg_scores, **kwargs):
+    return list(iter_segment_rows(segments, assessments, seg_scores, **kwargs))
+
+
+def test_one_row_per_annotation_or_clean_segment():
+    segments, assessments = _document()
+    seg_scores, _ = score_assessments(segments, assessments)
+    rows = _rows(segments, assessments, seg_scores)
+    assert [row[0] for row in rows] == [100, 101, 101, 102, 103, 104, 105]
+    assert rows[1][5:10] == ["Grammar", "Minor", "Kohde", "a", 1]
+    assert rows[2][5:10] == ["Style", "Major", "numero", "b", 5]
+    # The comment is on the segment's first row only; totals on every row
+    assert (rows[1][12], rows[2][12]) == ("Kommentti", "")
+    assert rows[1][10:12] == rows[2][10:12] == [3, 6.0]
+    assert rows[0][5:10] == ["", "", "", "", 0]
+
+
+def test_sampled_rows_follow_the_score_indices():
+    segments, assessments = _document()
+    indices = [1, 4, 5]
+    seg_scores, _ = score_assessments(
+        [segments[i] for i in indices],
+        [assessments[i] for i in indices],
+        indices=indices,
+    )
+    rows = _rows(segments, assessments, seg_scores)
+    assert [(row[0], row[5]) for row in rows] == [
+        (101, "Grammar"),
+        (101, "Style"),
+        (104, "Omission"),
+        (105, ""),
+    ]
+
+
+def test_cache_reuses_unchanged_segments():
+    segments, assessments = _document()
+    seg_scores, _ = score_assessments(segments, assessments)
+    cache = CsvExportCache()
+    first = _rows(segments, assessments, seg_scores, cache=cache)
+    reused = cache.rows[1][1]
+
+    assessments[4] = SegmentAssessment()
+    seg_scores, _ = score_assessments(segments, assessments)
+    second = _rows(segments, assessments, seg_scores, cache=cache)
+    assert cache.rows[1][1] is reused
+    assert second[:5] == first[:5]
+    assert second[5][5] == ""
+
+
+def test_cache_is_capped_and_dropped_segments_pruned(monkeypatch):
+    monkeypatch.setattr(csv_writer, "CACHE_SEGMENTS", 3)
+    segments, assessments = _document()
+    seg_scores, _ = score_assessments(segments, assessments)
+    cache = CsvExportCache()
+    full = _rows(segments, assessments, seg_scores, cache=cache)
+    assert sorted(cache.rows) == [0, 1, 2]
+    assert _rows(segments, assessments, seg_scores, cache=cache) == full
+
+    seg_scores, _ = score_assessments(segments[:2], assessments[:2])
+    _rows(segments[:2], assessments[:2], seg_scores, cache=cache)
+    assert sorted(cache.rows) == [0, 1]
+
+
+def test_progress_every_chunk(monkeypatch):
+    monkeypatch.setattr(csv_writer, "CHUNK_ROWS", 4)
+    segments, assessments = _document(10)
+    seg_scores, _ = score_assessments(segments, assessments)
+    calls = []
+    _rows(segments, assessments, seg_scores, progress=lambda *a: calls.append(a))
+    assert calls == [(0, 10), (4, 10), (8, 10)]
+
+
+def test_csv_chunks_and_totals(monkeypatch):
+    monkeypatch.setattr(csv_writer, "CHUNK_ROWS", 3)
+    segments, assessments = _document()
+    seg_scores, doc_score = score_assessments(segments, assessments)
+    chunks = list(iter_export_csv_chunks(segments, assessments, seg_scores, doc_score))
+    assert len(chunks) > 3
+    rows = list(csv.reader(io.StringIO("".join(chunks))))
+    assert rows[0] == EXPORT_HEADER
+    assert len([row for row in rows[1:] if row and row[0].isdigit()]) == 7
+    assert ["Virhepistesumma", "16.0"] in rows
+
+
+def test_write_replaces_the_previous_file():
+    segments, assessments = _document()
+    seg_scores, doc_score = score_assessments(segments, assessments)
+    cache = CsvExportCache()
+    first = write_export_csv(segments, assessments, seg_scores, doc_score, cache)
+    second = write_export_csv(segments, assessments, seg_scores, doc_score, cache)
+    try:
+        assert not os.path.exists(first)
+        assert cache.tmp_path == second
+        with open(second, encoding="utf-8", newline="") as f:
+            assert next(csv.reader(f)) == EXPORT_HEADER
+    finally:
+        cache.discard_file()
+    assert not os.path.exists(second)
+
+
+def test_collected_cache_removes_its_file():
+    segments, assessments = _document()
+    seg_scores, doc_score = score_assessments(segments, assessments)
+    cache = CsvExportCache()
+    path = write_export_csv(segments, assessments, seg_scores, doc_score, cache)
+    assert os.path.exists(path)
+    del cache
+    gc.collect()
+    assert not os.path.exists(path)
+
+
+def test_cache_is_safe_to_clear_during_an_export(monkeypatch):
+    monkeypatch.setattr(csv_writer, "CACHE_SEGMENTS", 10_000)
+    segments, assessments = _document(5000)
+    seg_scores, _ = score_assessments(segments, assessments)
+    cache = CsvExportCache()
+    stop = threading.Event()
+
+    def evict():
+        while not stop.is_set():
+            cache.clear()
+
+    evictor = threading.Thread(target=evict)
+    evictor.start()
+    try:
+        for _ in range(5):
+            rows = _rows(segments, assessments, seg_scores, cache=cache)
+            assert len(rows) == 5001
+            shorter, _ = score_assessments(segments[:10], assessments[:10])
+            _rows(segments[:10], assessments[:10], shorter, cache=cache)
+    finally:
+        stop.set()
+        evictor.join()
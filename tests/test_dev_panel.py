@@ -0,0 +1,39 @@
+"""Access to the developer panel (ui/dev_panel)."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from ui import dev_panel
+
+
+@pytest.fixture
+def query(monkeypatch):
+    monkeypatch.delenv("TQA_DEV", raising=False)
+    monkeypatch.delenv("TQA_DEV_TOKEN", raising=False)
+
+    def query(**params):
+        monkeypatch.setattr(dev_panel, "st", SimpleNamespace(query_params=params))
+
+    return query
+
+
+def test_query_parameter_alone_does_not_open_the_panel(query):
+    query(dev="1")
+    assert not dev_panel.dev_mode()
+    query(dev="")
+    assert not dev_panel.dev_mode()
+
+
+def test_token_opens_the_panel(query, monkeypatch):
+    monkeypatch.setenv("TQA_DEV_TOKEN", "s3cret")
+    query(dev="s3cret")
+    assert dev_panel.dev_mode()
+    query(dev="1")
+    assert not dev_panel.dev_mode()
+
+
+def test_server_setting_opens_the_panel(query, monkeypatch):
+    monkeypatch.setenv("TQA_DEV", "1")
+    query()
+    assert dev_panel.dev_mode()
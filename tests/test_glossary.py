@@ -0,0 +1,133 @@
+"""Glossary parsing and the terminology check (qa/glossary)."""
+
+import pytest
+
+from models.data_models import TranslationSegment
+from qa.glossary import (
+    CHECK_NAME,
+    ERROR_TYPE,
+    CompiledGlossary,
+    GlossaryEntry,
+    check_glossary,
+    compile_glossary,
+)
+
+
+def _segments(*pairs):
+    return [
+        TranslationSegment(id=i, source_text=source, target_text=target)
+        for i, (source, target) in enumerate(pairs)
+    ]
+
+
+def _glossary(*entries):
+    return CompiledGlossary(
+        [GlossaryEntry(source=source, targets=targets.split("|")) for source, targets in entries]
+    )
+
+
+def test_parses_csv_with_header_and_alternatives():
+    data = b"source;target;note\ncomputer;tietokone|kone;IT\nscreen;n\xc3\xa4ytt\xc3\xb6\n"
+    glossary = compile_glossary(data, "terms.csv", "englanti", "suomi")
+    assert [(e.source, e.targets, e.note) for e in glossary.entries] == [
+        ("computer", ["tietokone", "kone"], "IT"),
+        ("screen", ["näyttö"], ""),
+    ]
+
+
+def test_language_names_make_a_header():
+    glossary = compile_glossary(b"en,fi\nfile,tiedosto\n", "terms.csv", "englanti", "suomi")
+    assert [e.source for e in glossary.entries] == ["file"]
+
+
+def test_single_row_csv_keeps_its_entry():
+    glossary = compile_glossary(b"computer,tietokone\n", "one.csv", "englanti", "suomi")
+    assert [(e.source, e.targets) for e in glossary.entries] == [("computer", ["tietokone"])]
+
+
+def test_csv_rows_of_uneven_length():
+    data = b"computer,tietokone,IT term\nscreen,n\xc3\xa4ytt\xc3\xb6\nmouse,hiiri,,\n"
+    glossary = compile_glossary(data, "uneven.csv", "englanti", "suomi")
+    assert [e.source for e in glossary.entries] == ["computer", "screen", "mouse"]
+
+
+def test_parses_tbx_for_the_language_pair():
+    data = """<?xml version="1.0" encoding="UTF-8"?>
+<martif type="TBX"><text><body>
+  <termEntry>
+    <langSet xml:lang="en-US"><tig><term>computer</term></tig></langSet>
+    <langSet xml:lang="fi"><tig><term>tietokone</term></tig></langSet>
+    <langSet xml:lang="sv"><tig><term>dator</term></tig></langSet>
+  </termEntry>
+  <termEntry>
+    <langSet xml:lang="en"><tig><term>only English</term></tig></langSet>
+  </termEntry>
+</body></text></martif>""".encode()
+    glossary = compile_glossary(data, "terms.tbx", "englanti", "suomi")
+    assert [(e.source, e.targets) for e in glossary.entries] == [("computer", ["tietokone"])]
+
+
+def test_empty_glossary_is_an_error():
+    with pytest.raises(ValueError):
+        compile_glossary(b"source,target\n", "empty.csv", "englanti", "suomi")
+
+
+def test_missing_target_term_is_suggested():
+    glossary = _glossary(("computer", "tietokone"))
+    results = check_glossary(
+        _segments(
+            ("The computer is on.", "Kone on päällä."),
+            ("The computer is on.", "Tietokone on päällä."),
+            ("Nothing here.", "Ei mitään."),
+        ),
+        glossary,
+    )
+    assert list(results) == [0]
+    (suggestion,) = results[0]
+    assert suggestion.check == CHECK_NAME
+    assert suggestion.annotation.error_type == ERROR_TYPE
+    assert "tietokone" in suggestion.annotation.explanation
+
+
+def test_inflected_target_term_passes():
+    glossary = _glossary(("computer", "tietokone"), ("machine", "kone"))
+    results = check_glossary(
+        _segments(
+            ("Restart the computer.", "Käynnistä tietokoneen uudelleen."),
+            ("The machine stops.", "Koneen käynti pysähtyy."),
+        ),
+        glossary,
+    )
+    assert results == {}
+
+
+def test_target_term_must_start_a_word():
+    glossary = _glossary(("machine", "kone"))
+    results = check_glossary(_segments(("The machine.", "Tietokone.")), glossary)
+    assert list(results) == [0]
+
+
+def test_each_term_is_reported_once_per_segment():
+    glossary = _glossary(("file", "tiedosto"))
+    results = check_glossary(_segments(("file and file", "asiakirja ja asiakirja")), glossary)
+    assert len(results[0]) == 1
+
+
+def test_unspaced_script_target_terms_match_inside_words():
+    glossary = _glossary(("safety device", "安全装置"), ("computer", "コンピュータ"))
+    results = check_glossary(
+        _segments(
+            ("Check the safety device.", "安全装置を確認してください。"),
+            ("The computer is on.", "パソコンが起動しています。"),
+        ),
+        glossary,
+    )
+    assert list(results) == [1]
+
+
+def test_progress_is_reported():
+    calls = []
+    check_glossary(
+        _segments(("a", "b")), _glossary(("x", "y")), progress=lambda *a: calls.append(a)
+    )
+    assert calls == [(0, 1)]
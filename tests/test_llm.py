@@ -0,0 +1,168 @@
+"""Pre-annotation (qa/llm) against the local stub endpoint (qa/llm_stub)."""
+
+import json
+
+import pytest
+
+from models.data_models import TranslationSegment
+from qa import llm, llm_stub
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(llm, "BACKOFF", 0.0)
+
+
+@pytest.fixture
+def stub():
+    servers = []
+
+    def start(fail_first=0):
+        server = llm_stub.serve(fail_first=fail_first)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return llm.AssessmentCache(str(tmp_path / "llm_cache.sqlite"))
+
+
+def _config(server, **kwargs):
+    return llm.LLMConfig(url=server.url, rate=0, **kwargs)
+
+
+def _segments():
+    return [
+        TranslationSegment(
+            id=1, source_text="The cat sat.", target_text="Kissa istui istui.",
+            source_lang="en", target_lang="fi",
+        ),
+        TranslationSegment(
+            id=2, source_text="Hello.", target_text="Hello.",
+            source_lang="en", target_lang="fi",
+        ),
+        TranslationSegment(
+            id=3, source_text="Good day.", target_text="Hyvää päivää.",
+            source_lang="en", target_lang="fi",
+        ),
+        # A repetition of the first segment
+        TranslationSegment(
+            id=4, source_text="The cat sat.", target_text="Kissa istui istui.",
+            source_lang="en", target_lang="fi",
+        ),
+    ]
+
+
+def test_annotates_segments(stub, cache):
+    server = stub()
+    progress = []
+    run = llm.pre_annotate(
+        _segments(), _config(server), cache=cache,
+        progress=lambda done, total: progress.append((done, total)),
+    )
+    assert run.failed == 0
+    assert run.cached == 0
+    assert run.requested == 3  # the repetition is sent once
+    assert server.segments == 3
+    assert sorted(run.results) == [0, 1, 2, 3]
+
+    (grammar,) = run.results[0].annotations
+    assert grammar.error_type == "Grammar"
+    assert grammar.span == "istui istui"
+    assert (grammar.start, grammar.end) == (6, 17)
+    assert run.results[3] == run.results[0]
+    assert [a.error_type for a in run.results[1].annotations] == ["Untranslated"]
+    assert run.results[2].annotations == []
+    assert progress[-1] == (4, 4)
+
+    suggestions = llm.assessment_suggestions(run.results)
+    assert sorted(suggestions) == [0, 1, 3]
+    assert suggestions[0][0].check == llm.CHECK_NAME
+
+
+def test_rerun_is_answered_from_the_cache(stub, cache):
+    server = stub()
+    llm.pre_annotate(_segments(), _config(server), cache=cache)
+    sent = server.segments
+
+    run = llm.pre_annotate(_segments(), _config(server), cache=cache)
+    assert server.segments == sent
+    assert (run.cached, run.requested, run.failed) == (4, 0, 0)
+    assert run.results[0].annotations[0].error_type == "Grammar"
+
+
+def test_changed_segment_is_sent_again(stub, cache):
+    server = stub()
+    llm.pre_annotate(_segments(), _config(server), cache=cache)
+    segments = _segments()
+    segments[2] = segments[2].model_copy(update={"target_text": "Hyvää  päivää."})
+
+    run = llm.pre_annotate(segments, _config(server), cache=cache)
+    assert run.requested == 1
+    assert [a.error_type for a in run.results[2].annotations] == ["Punctuation"]
+
+
+def test_retries_overloaded_endpoint(stub, cache):
+    server = stub(fail_first=2)
+    run = llm.pre_annotate(_segments(), _config(server), cache=cache)
+    assert server.requests == 3
+    assert run.failed == 0
+    assert len(run.results) == 4
+
+
+def test_gives_up_after_max_retries(stub, cache):
+    server = stub(fail_first=llm.MAX_RETRIES + 1)
+    run = llm.pre_annotate(_segments(), _config(server), cache=cache)
+    assert server.requests == llm.MAX_RETRIES + 1
+    assert run.failed == 4
+    assert run.results == {}
+    # Nothing was cached, so the next run asks again
+    run = llm.pre_annotate(_segments(), _config(server), cache=cache)
+    assert run.failed == 0
+    assert run.requested == 3
+
+
+def test_batches_by_size_and_language_pair(stub, cache):
+    server = stub()
+    segments = _segments() + [
+        TranslationSegment(
+            id=5, source_text="Yes.", target_text="Ja.",
+            source_lang="en", target_lang="de",
+        )
+    ]
+    run = llm.pre_annotate(segments, _config(server, batch_size=2), cache=cache)
+    # en-fi: 3 distinct segments in 2 batches, en-de: 1 batch
+    assert server.requests == 3
+    assert run.failed == 0
+
+
+def test_parse_reply_drops_annotations_outside_the_profile():
+    segment = _segments()[0]
+    annotations = [
+        {"error_type": "Grammar", "severity": "Minor", "span": "istui istui"},
+        {"error_type": "Made up", "severity": "Minor", "span": "Kissa"},
+        {"error_type": "Style", "severity": "Minor", "span": "not there"},
+    ]
+    content = json.dumps(
+        {
+            "assessments": [
+                {"id": 0, "annotations": [{**a, "explanation": ""} for a in annotations]}
+            ]
+        }
+    )
+    reply = {"choices": [{"message": {"content": content}}]}
+    (assessment,) = llm.parse_reply(reply, [segment], None)
+    assert [a.span for a in assessment.annotations] == ["istui istui"]
+    assert assessment.annotations[0].start == 6
+
+
+def test_parse_reply_rejects_incomplete_batch():
+    reply = {"choices": [{"message": {"content": '{"assessments": []}'}}]}
+    with pytest.raises(llm.InvalidReply):
+        llm.parse_reply(reply, _segments()[:1], None)
@@ -0,0 +1,116 @@
+"""Annotation memory (qa/memory)."""
+
+import math
+import random
+
+from models.data_models import ErrorAnnotation, SegmentAssessment, TranslationSegment
+from qa import memory
+from qa.memory import AnnotationMemory, _stems
+
+
+def _session(items, lang="suomi"):
+    """Segments and assessments from (target text, [(span, error type)]) items."""
+    segments = [
+        TranslationSegment(id=i, source_text="", target_text=target, target_lang=lang)
+        for i, (target, _) in enumerate(items)
+    ]
+    assessments = [
+        SegmentAssessment(
+            annotations=[
+                ErrorAnnotation(
+                    error_type=error_type,
+                    severity="Minor",
+                    span=span,
+                    explanation="",
+                    start=target.find(span),
+                )
+                for span, error_type in spans
+            ]
+        )
+        for target, spans in items
+    ]
+    return segments, assessments
+
+
+def test_matches_inflected_forms(tmp_path):
+    mem = AnnotationMemory(str(tmp_path / "memory.sqlite"))
+    mem.add_session(
+        *_session([("Avaa tiedostoikkuna nyt.", [("tiedostoikkuna", "Terminology")])])
+    )
+    (match,) = mem.match("Sulje tiedostoikkunan kautta.", "suomi")
+    assert match.entry.span == "tiedostoikkuna"
+    assert match.similarity == 1.0
+    assert match.start == 6  # "tiedostoikkuna" occurs within the inflected word
+    assert mem.match("Ei mitään yhteistä.", "suomi") == []
+    assert mem.match("Sulje tiedostoikkunan kautta.", "ruotsi") == []
+
+
+def test_saving_again_adds_only_new_annotations(tmp_path):
+    mem = AnnotationMemory(str(tmp_path / "memory.sqlite"))
+    session = _session([("Paina nappia.", [("nappia", "Style")])])
+    assert mem.add_session(*session) == 1
+    version = mem.version
+    assert mem.add_session(*session) == 0
+    assert mem.version == version
+
+    # The same span elsewhere counts as another sighting of the entry
+    again = _session([("Älä paina nappia.", [("nappia", "Style")])])
+    assert mem.add_session(*again) == 1
+    (match,) = mem.match("nappia")
+    assert match.entry.count == 2
+    assert len(mem) == 1
+
+
+def test_memory_is_read_back_from_the_file(tmp_path):
+    path = str(tmp_path / "memory.sqlite")
+    AnnotationMemory(path).add_session(
+        *_session([("Virheellinen käännös tässä.", [("Virheellinen käännös", "Style")])])
+    )
+    (match,) = AnnotationMemory(path).match("Tämä on virheellinen käännös.")
+    assert match.entry.error_type == "Style"
+
+
+def test_verbatim_and_frequent_matches_come_first(tmp_path):
+    mem = AnnotationMemory(str(tmp_path / "memory.sqlite"))
+    mem.add_session(
+        *_session(
+            [
+                ("punainen auto ajaa", [("punainen auto ajaa", "Style")]),
+                ("auto punainen", [("auto punainen", "Grammar")]),
+                ("toinen auto punainen", [("auto punainen", "Grammar")]),
+            ]
+        )
+    )
+    matches = mem.match("auto punainen ajaa")
+    assert [m.entry.span for m in matches] == ["auto punainen", "punainen auto ajaa"]
+    assert matches[1].start is None
+
+
+def test_prefix_filter_finds_every_match(tmp_path, monkeypatch):
+    """The index returns exactly the entries a full scan finds."""
+    rng = random.Random(7)
+    words = [f"sana{chr(97 + i)}{chr(97 + j)}" for i in range(6) for j in range(6)]
+    spans = {" ".join(rng.sample(words, rng.randint(1, 6))) for _ in range(300)}
+    mem = AnnotationMemory(str(tmp_path / "memory.sqlite"))
+    monkeypatch.setattr(memory, "MAX_MATCHES", len(spans))
+    for span in spans:
+        mem.add_session(*_session([(span, [(span, "Style")])]))
+
+    for _ in range(100):
+        text = " ".join(rng.sample(words, rng.randint(3, 12)))
+        stems = _stems(text)
+        expected = {
+            span
+            for span in spans
+            if len(_stems(span) & stems)
+            >= math.ceil(memory.MIN_CONTAINMENT * len(_stems(span)))
+        }
+        assert {m.entry.span for m in mem.match(text)} == expected
+
+
+def test_match_segments(tmp_path):
+    mem = AnnotationMemory(str(tmp_path / "memory.sqlite"))
+    mem.add_session(*_session([("Paina nappia.", [("nappia", "Style")])]))
+    segments, _ = _session([("Ei mitään.", []), ("Paina nappia taas.", [])])
+    results = mem.match_segments(segments)
+    assert list(results) == [1]
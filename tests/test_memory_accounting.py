@@ -0,0 +1,62 @@
+"""Per-session memory accounting and eviction (perf/memory)."""
+
+from perf.memory import MemoryAccountant, deep_size
+
+
+def _accountant(budget):
+    accountant = MemoryAccountant(budget)
+    accountant.register_evictable("cache", "cache_key")
+    return accountant
+
+
+def test_deep_size_counts_shared_objects_once():
+    item = "x" * 1000
+    assert deep_size([item, item]) < deep_size([item, "y" * 1000])
+
+
+def test_other_sessions_are_evicted_by_themselves():
+    accountant = _accountant(budget=0)
+    idle = {"cache": "x" * 100_000, "cache_key": 1, "segments": "y" * 100}
+    accountant.account("idle", idle, dict(idle))
+    busy = {"segments": "z" * 100}
+    accountant.account("busy", busy, dict(busy))
+
+    accountant.budget = 50_000
+    accountant.account("busy", busy, dict(busy), force=True)
+    # Counted as freed at once, but the idle session's state is untouched
+    (idle_usage,) = [u for u in accountant.usage() if u.session == "idle"]
+    assert "cache" not in idle_usage.sizes
+    assert idle_usage.evicted > 100_000
+    assert accountant.total() < 50_000
+    assert "cache" in idle
+
+    accountant.account("idle", idle, dict(idle))
+    assert set(idle) == {"segments"}
+    assert not idle_usage.pending
+
+
+def test_replaced_value_is_not_evicted():
+    accountant = _accountant(budget=0)
+    state = {"cache": "x" * 100_000}
+    accountant.account("a", state, dict(state))
+    accountant.budget = 50_000
+    accountant.account("b", {}, {})
+    # The session rebuilt the cache before applying the eviction
+    state["cache"] = "y" * 1000
+    accountant.account("a", state, dict(state))
+    assert state["cache"] == "y" * 1000
+
+
+def test_release_is_called_by_the_owning_session():
+    released = []
+    accountant = MemoryAccountant(0)
+    accountant.register_evictable("export", release=released.append)
+    value = ["x" * 100_000]
+    state = {"export": value}
+    accountant.account("a", state, dict(state))
+    accountant.budget = 50_000
+    accountant.account("b", {}, {})
+    assert released == []
+    accountant.account("a", state, dict(state))
+    assert released == [value]
+    assert state["export"] is value
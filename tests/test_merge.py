@@ -0,0 +1,131 @@
+"""Merging the sessions of several reviewers (assessment/merge)."""
+
+import json
+
+import pytest
+
+from models.data_models import ErrorAnnotation, SegmentAssessment, TranslationSegment
+from models.session import SessionData, load_session, session_to_json
+from assessment.merge import main, merge_sessions
+
+TARGETS = {1: "Kissa istui matolla.", 2: "Koira juoksi pihalla.", 3: "Hyvää päivää."}
+
+
+def _ann(error_type, severity, span, start=None):
+    return ErrorAnnotation(
+        error_type=error_type, severity=severity, span=span, explanation="", start=start
+    )
+
+
+def _session(annotations, ids=(1, 2, 3), targets=TARGETS, comments=None):
+    """A session of the given segment ids with annotations by segment id."""
+    return SessionData(
+        segments=[
+            TranslationSegment(id=i, source_text=f"source {i}", target_text=targets[i])
+            for i in ids
+        ],
+        assessments=[
+            SegmentAssessment(
+                annotations=annotations.get(i, []),
+                overall_comment=(comments or {}).get(i, ""),
+            )
+            for i in ids
+        ],
+    )
+
+
+def test_identical_annotations_are_kept_once():
+    a = _session({1: [_ann("Grammar", "Minor", "istui")]})
+    b = _session({1: [_ann("Grammar", "Minor", "istui")]})
+    merged, report = merge_sessions([a, b])
+    assert [ann.span for ann in merged.assessments[0].annotations] == ["istui"]
+    assert report.duplicate_count == 1
+    assert report.annotation_count == 1
+    assert report.conflicts == []
+
+
+def test_differing_labels_are_a_conflict_and_both_kept():
+    a = _session({1: [_ann("Grammar", "Minor", "istui")]})
+    b = _session({1: [_ann("Style", "Major", "istui matolla")]})
+    merged, report = merge_sessions([a, b])
+    assert [ann.error_type for ann in merged.assessments[0].annotations] == ["Grammar", "Style"]
+    (conflict,) = report.conflicts
+    assert (conflict.segment_id, conflict.kind, conflict.reviewers) == (1, "annotation", [0, 1])
+    assert conflict.detail == "Grammar/Minor, Style/Major"
+
+
+def test_separate_spans_do_not_conflict():
+    a = _session({1: [_ann("Grammar", "Minor", "Kissa")]})
+    b = _session({1: [_ann("Style", "Major", "matolla")]})
+    merged, report = merge_sessions([a, b])
+    assert [ann.span for ann in merged.assessments[0].annotations] == ["Kissa", "matolla"]
+    assert report.conflicts == []
+
+
+def test_annotations_are_in_text_order_with_unfound_spans_last():
+    a = _session(
+        {
+            2: [
+                _ann("Style", "Major", "not in the text"),
+                _ann("Grammar", "Minor", "pihalla"),
+                _ann("Spelling", "Minor", "Koira"),
+            ]
+        }
+    )
+    merged, _ = merge_sessions([a, _session({})])
+    assert [ann.span for ann in merged.assessments[1].annotations] == [
+        "Koira",
+        "pihalla",
+        "not in the text",
+    ]
+
+
+def test_offsets_locate_repeated_spans():
+    targets = {**TARGETS, 3: "on on"}
+    a = _session({3: [_ann("Grammar", "Minor", "on", start=0)]}, targets=targets)
+    b = _session({3: [_ann("Grammar", "Minor", "on", start=3)]}, targets=targets)
+    merged, report = merge_sessions([a, b])
+    assert [ann.start for ann in merged.assessments[2].annotations] == [0, 3]
+    assert report.duplicate_count == 0
+
+
+def test_missing_segments_and_changed_targets():
+    a = _session({}, ids=(1, 2))
+    b = _session({3: [_ann("Grammar", "Minor", "päivää")]}, targets={**TARGETS, 1: "Muu."})
+    merged, report = merge_sessions([a, b])
+    assert [seg.id for seg in merged.segments] == [1, 2, 3]
+    assert merged.segments[0].target_text == TARGETS[1]  # the first session's
+    kinds = {(c.segment_id, c.kind): c.reviewers for c in report.conflicts}
+    assert kinds == {(1, "target_text"): [1], (3, "missing"): [0]}
+    assert merged.assessments[2].annotations[0].span == "päivää"
+
+
+def test_comments_are_joined_once():
+    a = _session({}, comments={1: "Hyvä."})
+    b = _session({}, comments={1: " Hyvä. "})
+    c = _session({}, comments={1: "Kömpelö."})
+    merged, _ = merge_sessions([a, b, c])
+    assert merged.assessments[0].overall_comment == "Hyvä.\nKömpelö."
+
+
+def test_needs_a_session():
+    with pytest.raises(ValueError):
+        merge_sessions([])
+
+
+def test_command_line(tmp_path, capsys):
+    paths = []
+    for i, session in enumerate(
+        [
+            _session({1: [_ann("Grammar", "Minor", "istui")]}),
+            _session({1: [_ann("Grammar", "Major", "istui")]}),
+        ]
+    ):
+        path = tmp_path / f"{i}.json"
+        path.write_text(session_to_json(session), encoding="utf-8")
+        paths.append(str(path))
+    out, report = tmp_path / "merged.json", tmp_path / "report.json"
+    main([*paths, "-o", str(out), "--report", str(report)])
+    assert len(load_session(str(out)).assessments[0].annotations) == 2
+    assert json.loads(report.read_text())["conflicts"][0]["kind"] == "annotation"
+    assert "1 conflicts" in capsys.readouterr().out
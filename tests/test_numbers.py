@@ -0,0 +1,107 @@
+"""Numeric mismatch check (qa/numbers)."""
+
+from decimal import Decimal
+
+from models.data_models import TranslationSegment
+from qa.numbers import check_numbers, compare_segment, extract_numeric
+
+
+def _values(text, lang):
+    return [(t.kind, t.value, t.unit) for t in extract_numeric(text, lang)]
+
+
+def _reasons(source, target, source_lang="englanti", target_lang="suomi"):
+    return [
+        (src.text if src else None, tgt.text if tgt else None, reason)
+        for src, tgt, reason in compare_segment(
+            extract_numeric(source, source_lang), extract_numeric(target, target_lang)
+        )
+    ]
+
+
+def test_numbers_by_language():
+    assert _values("1,234.5 and 7", "englanti") == [
+        ("number", Decimal("1234.5"), ""),
+        ("number", Decimal("7"), ""),
+    ]
+    assert _values("1 234,5", "suomi") == [("number", Decimal("1234.5"), "")]
+    assert _values("1.234,5", "saksa") == [("number", Decimal("1234.5"), "")]
+
+
+def test_space_grouped_english_numbers():
+    assert _values("1 000 000 users", "englanti") == [("number", Decimal("1000000"), "")]
+    assert _values("1 000", "englanti") == [("number", Decimal("1000"), "")]
+
+
+def test_units():
+    assert _values("$12.50, 10 € and 5%", "englanti") == [
+        ("number", Decimal("12.5"), "USD"),
+        ("number", Decimal("10"), "EUR"),
+        ("number", Decimal("5"), "%"),
+    ]
+    assert _values("12,5 prosenttia ja 3 euroa", "suomi") == [
+        ("number", Decimal("12.5"), "%"),
+        ("number", Decimal("3"), "EUR"),
+    ]
+
+
+def test_dates():
+    expected = [("date", (2025, 1, 15), "")]
+    assert _values("2025-01-15", "suomi") == expected
+    assert _values("January 15th, 2025", "englanti") == expected
+    assert _values("15 Jan 2025", "englanti") == expected
+    assert _values("15. tammikuuta 2025", "suomi") == expected
+    assert _values("1/15/2025", "englanti") == expected
+    assert _values("15.1.2025", "suomi") == expected
+    assert _values("on 15 March", "englanti") == [("date", (None, 3, 15), "")]
+
+
+def test_times_of_day():
+    assert _values("10:30", "englanti") == [("time", (10, 30), "")]
+    assert _values("3:30 pm", "englanti") == [("time", (15, 30), "")]
+    assert _values("12:05 a.m.", "englanti") == [("time", (0, 5), "")]
+    assert _values("klo 15.30", "suomi") == [("time", (15, 30), "")]
+    # A point is a decimal point in English, not a time separator
+    assert _values("10.30", "englanti") == [("number", Decimal("10.30"), "")]
+
+
+def test_matching_values():
+    assert _reasons("Meet at 3:30 pm", "Tavataan klo 15.30") == []
+    assert _reasons("It costs 1,500.50 dollars", "Se maksaa 1 500,50 dollaria") == []
+    assert _reasons("On January 15, 2025", "15. tammikuuta 2025") == []
+    assert _reasons("On January 15", "15.1.2025") == []  # year missing on one side
+    assert _reasons("1 000 000 users", "1 000 000 käyttäjää") == []
+
+
+def test_mismatches():
+    assert _reasons("10 %", "10 euroa") == [("10 %", "10 euroa", "unit")]
+    assert _reasons("at 10:30", "klo 10.45") == [("10:30", "10.45", "changed")]
+    assert _reasons("5 items", "5 kohdetta ja 6") == [(None, "6", "extra")]
+    assert _reasons("5 and 6", "5") == [("6", None, "missing")]
+    # Values are matched regardless of order
+    assert _reasons("3 and 4", "4 ja 3") == []
+
+
+def test_check_numbers():
+    segments = [
+        TranslationSegment(
+            id=1, source_text="Costs $5", target_text="Maksaa 6 dollaria",
+            source_lang="englanti", target_lang="suomi",
+        ),
+        TranslationSegment(
+            id=2, source_text="No numbers", target_text="Ei numeroita",
+            source_lang="englanti", target_lang="suomi",
+        ),
+        TranslationSegment(
+            id=3, source_text="Page 2", target_text="Sivu",
+            source_lang="englanti", target_lang="suomi",
+        ),
+    ]
+    results = check_numbers(segments)
+    assert list(results) == [0, 2]
+    (changed,) = results[0]
+    assert changed.check == "numbers"
+    assert changed.annotation.error_type == "Numerical Error"
+    assert (changed.annotation.span, changed.annotation.start) == ("6 dollaria", 7)
+    (missing,) = results[2]
+    assert missing.annotation.span == "Sivu"
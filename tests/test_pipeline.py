@@ -0,0 +1,96 @@
+"""The QA check pipeline (qa/pipeline), in-process and in the worker pool."""
+
+import pytest
+
+from models.data_models import TranslationSegment
+from qa import pipeline
+
+GLOSSARY = (b"computer,tietokone\n", "terms.csv", "englanti", "suomi")
+
+
+def _segments(n):
+    pairs = [
+        ("The computer has 3 files.", "Koneessa on 3 tiedostoa."),
+        ("Hello world", "Hello world"),
+        ("Press (OK) now!", "Paina (OK  nyt."),
+        ("Fine.", "Hyvä."),
+    ]
+    return [
+        TranslationSegment(
+            id=i, source_text=pairs[i % 4][0], target_text=pairs[i % 4][1],
+            source_lang="englanti", target_lang="suomi",
+        )
+        for i in range(n)
+    ]
+
+
+def _checks(run):
+    return {idx: [s.check for s in found] for idx, found in run.results.items()}
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(pipeline, "WORKERS", 2)
+    monkeypatch.setattr(pipeline, "PARALLEL_MIN", 10)
+    monkeypatch.setattr(pipeline, "CHUNK_SIZE", 7)
+    yield
+    pipeline._discard_pool()
+
+
+def test_results_are_merged_in_registration_order():
+    run = pipeline.run_checks(_segments(4), options={"glossary": GLOSSARY})
+    assert _checks(run) == {
+        0: ["glossary"],
+        1: ["untranslated"],
+        2: ["end_punct", "spaces", "brackets"],
+    }
+    assert set(run.timings) == set(pipeline.CHECKS)
+    assert run.elapsed >= 0
+
+
+def test_checks_without_their_options_are_skipped():
+    run = pipeline.run_checks(_segments(4))
+    assert "glossary" not in run.timings
+    assert 0 not in run.results
+
+
+def test_named_checks_only():
+    run = pipeline.run_checks(_segments(4), names=["spaces"])
+    assert _checks(run) == {2: ["spaces"]}
+    assert list(run.timings) == ["spaces"]
+
+
+def test_chunks_are_offset(monkeypatch):
+    monkeypatch.setattr(pipeline, "CHUNK_SIZE", 3)
+    calls = []
+    run = pipeline.run_checks(
+        _segments(10), names=["untranslated"], progress=lambda *a: calls.append(a)
+    )
+    assert sorted(run.results) == [1, 5, 9]
+    assert calls == [(0, 10), (3, 10), (6, 10), (9, 10)]
+
+
+def test_worker_pool_matches_in_process(pool, monkeypatch):
+    segments = _segments(40)
+    options = {"glossary": GLOSSARY}
+    calls = []
+    pooled = pipeline.run_checks(
+        segments, options=options, progress=lambda *a: calls.append(a)
+    )
+    assert calls[-1] == (40, 40)
+    assert [done for done, _ in calls] == sorted(done for done, _ in calls)
+
+    monkeypatch.setattr(pipeline, "PARALLEL_MIN", len(segments) + 1)
+    in_process = pipeline.run_checks(segments, options=options)
+    assert pooled.results == in_process.results
+    assert len(pooled.results) == 30  # three of every four segments
+    assert _checks(pooled)[38] == ["end_punct", "spaces", "brackets"]
+
+
+def test_cancelling_from_progress(pool):
+    def cancel(done, total):
+        if done:
+            raise InterruptedError
+
+    with pytest.raises(InterruptedError):
+        pipeline.run_checks(_segments(40), progress=cancel)
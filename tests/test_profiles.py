@@ -0,0 +1,125 @@
+"""Scoring profiles (assessment/profiles) and re-scoring under another profile."""
+
+import pytest
+
+from models.data_models import (
+    ERROR_TYPES,
+    SEVERITY_LEVELS,
+    ErrorAnnotation,
+    SegmentAssessment,
+    TranslationSegment,
+)
+from assessment.profiles import get_profile, load_profiles
+from assessment.scoring import rescore_document, score_assessments
+
+# Penalties of the scorecard before profiles existed
+OLD_SEVERITY_PENALTIES = {"Minor": 1, "Major": 5, "Critical": 10}
+
+
+def _ann(error_type, severity):
+    return ErrorAnnotation(error_type=error_type, severity=severity, span="x", explanation="")
+
+
+def _document():
+    segments = [
+        TranslationSegment(id=i, source_text="", target_text="yksi kaksi kolme neljä")
+        for i in range(4)
+    ]
+    assessments = [
+        SegmentAssessment(annotations=[_ann("Terminology", "Major"), _ann("Style", "Minor")]),
+        SegmentAssessment(annotations=[_ann("Punctuation", "Neutral")]),
+        SegmentAssessment(annotations=[_ann("Locale Convention", "Minor")]),
+        SegmentAssessment(annotations=[_ann("Omission", "Critical"), _ann("Grammar", "Major")]),
+    ]
+    return segments, assessments
+
+
+def test_default_profile_keeps_the_old_penalties():
+    profile = get_profile()
+    assert profile.name == "default"
+    assert profile.severities == SEVERITY_LEVELS
+    assert profile.error_types == ERROR_TYPES
+    for error_type in ERROR_TYPES:
+        for severity, penalty in OLD_SEVERITY_PENALTIES.items():
+            assert profile.penalty(error_type, severity) == penalty
+    # Unknown severities cost nothing; unknown types the severity base penalty
+    assert profile.penalty("Grammar", "Neutral") == 0
+    assert profile.penalty("Made up", "Major") == 5
+
+
+def test_mqm_profile_weights():
+    profile = get_profile("mqm")
+    assert profile.critical_severity == "Critical"
+    assert profile.severities == ["Neutral", "Minor", "Major", "Critical"]
+    assert profile.penalty("Terminology", "Major") == 7.5
+    assert profile.penalty("Punctuation", "Minor") == 0.5
+    assert profile.penalty("Style", "Critical") == 12.5
+    assert profile.penalty("Grammar", "Critical") == 25
+    for error_type in profile.error_types:
+        assert profile.penalty(error_type, "Neutral") == 0
+    assert "Locale Convention" in profile.error_types
+    assert profile.type_numbers["Locale Convention"] == 13
+    assert profile.penalty("Locale Convention", "Minor") == 1
+    assert profile.weight_label("Critical") == "x25"
+
+
+def test_unknown_profile_is_the_default():
+    assert get_profile("nonexistent") is get_profile()
+    assert get_profile(None) is get_profile("default")
+
+
+def test_profiles_are_read_from_the_directory(tmp_path):
+    (tmp_path / "custom.toml").write_text(
+        'name = "custom"\n'
+        "[severities]\nLow = 2\n"
+        '[[error_types]]\nname = "Tone"\nnumber = 1\ndefault_severity = "Low"\nweight = 3\n'
+    )
+    (tmp_path / "notes.txt").write_text("not a profile")
+    profiles = load_profiles(str(tmp_path))
+    assert sorted(profiles) == ["custom", "default"]
+    assert profiles["custom"].label == "custom"
+    assert profiles["custom"].penalty("Tone", "Low") == 6
+
+
+def test_invalid_profiles_are_rejected(tmp_path):
+    (tmp_path / "bad.toml").write_text(
+        'name = "bad"\n[severities]\nLow = 1\n'
+        '[[error_types]]\nname = "Tone"\nnumber = 1\ndefault_severity = "High"\n'
+    )
+    with pytest.raises(ValueError, match="unknown default severity"):
+        load_profiles(str(tmp_path))
+
+    (tmp_path / "bad.toml").write_text('name = "default"\nerror_types = []\n[severities]\n')
+    with pytest.raises(ValueError, match="reserved"):
+        load_profiles(str(tmp_path))
+
+
+def test_document_is_scored_under_the_profile():
+    segments, assessments = _document()
+    seg_scores, doc_score = score_assessments(segments, assessments, profile=get_profile("mqm"))
+    assert list(seg_scores.penalties) == [8.0, 0.0, 1.0, 30.0]
+    assert doc_score.profile == "mqm"
+    assert doc_score.total_penalty == 39
+    assert doc_score.error_type_penalties["Terminology"] == 7.5
+    assert doc_score.error_type_severity_counts["Punctuation"]["Neutral"] == 1
+    assert doc_score.critical_error_count == 1
+
+
+@pytest.mark.parametrize("source, target", [("default", "mqm"), ("mqm", "default")])
+def test_rescore_matches_a_full_rescore(source, target):
+    segments, assessments = _document()
+    settings = {"pass_fail_threshold": 2000}
+    _, doc_score = score_assessments(segments, assessments, profile=get_profile(source))
+    _, expected = score_assessments(
+        segments, assessments, settings=settings, profile=get_profile(target)
+    )
+    rescored = rescore_document(doc_score, get_profile(target), settings)
+    assert rescored.total_penalty == expected.total_penalty
+    assert rescored.error_score == expected.error_score
+    assert rescored.critical_error_count == expected.critical_error_count
+    assert rescored.overall_pass_fail == expected.overall_pass_fail
+    assert rescored.quality_rating == expected.quality_rating
+    assert rescored.profile == target
+    assert {k: v for k, v in rescored.error_type_penalties.items() if v} == {
+        k: v for k, v in expected.error_type_penalties.items() if v
+    }
@@ -0,0 +1,63 @@
+"""Exact and near repetition groups (assessment/repetitions)."""
+
+import numpy as np
+
+from assessment import repetitions
+from assessment.repetitions import normalize, repetition_groups
+
+SOURCE = "Press the green button to start the machine and wait for the signal."
+TARGET = "Paina vihreää painiketta käynnistääksesi koneen ja odota merkkiä."
+
+
+def test_normalize():
+    assert normalize("  Hello\n\tWORLD  ") == "hello world"
+
+
+def test_exact_repetitions_ignore_case_and_whitespace():
+    groups = repetition_groups(
+        ["Hello world", "Other", "hello  WORLD", "Hello world"],
+        ["Hei maailma", "Muu", "Hei maailma", "Terve maailma"],
+    )
+    assert groups == [0, 1, 0, 3]
+
+
+def test_near_repetitions_are_grouped():
+    groups = repetition_groups(
+        [SOURCE, "Completely unrelated text about the weather today.", SOURCE + "!"],
+        [TARGET, "Täysin eri teksti tämän päivän säästä.", TARGET + "!"],
+    )
+    assert groups == [0, 1, 0]
+
+
+def test_different_segments_stay_apart():
+    sources = [f"Segment number {i} talks about topic {i * 7919}." for i in range(50)]
+    groups = repetition_groups(sources, [s.upper()[::-1] for s in sources])
+    assert groups == list(range(50))
+
+
+def test_short_texts_only_group_exactly():
+    assert repetition_groups(["a", "b", "a"], ["x", "y", "x"]) == [0, 1, 0]
+    assert repetition_groups([], []) == []
+    assert repetition_groups(["same"], ["sama"]) == [0]
+
+
+def test_signature_agreement_estimates_jaccard():
+    base = " ".join(f"word{i}" for i in range(200))
+    edited = base.replace(" word50 ", " term50 ").replace(" word150 ", " term150 ")
+    texts = [base, base, edited, "nothing alike at all " * 20]
+    signatures, has_shingles = repetitions._signatures(texts)
+    assert has_shingles.all()
+    agree = (signatures[:, None, :] == signatures[None, :, :]).mean(axis=2)
+    assert agree[0, 1] == 1.0
+    assert 0.8 < agree[0, 2] < 1.0
+    assert agree[0, 3] < 0.2
+
+
+def test_signatures_do_not_depend_on_the_batch_size(monkeypatch):
+    texts = [f"{SOURCE} {i}" for i in range(30)] + ["", "abc"]
+    expected, expected_mask = repetitions._signatures(texts)
+    monkeypatch.setattr(repetitions, "BATCH", 50)
+    signatures, mask = repetitions._signatures(texts)
+    assert np.array_equal(signatures, expected)
+    assert np.array_equal(mask, expected_mask)
+    assert not mask[-2]
@@ -0,0 +1,67 @@
+"""Background jobs (jobs/runner)."""
+
+import threading
+
+import pytest
+
+from jobs.runner import CANCELLED, DONE, JobRunner
+
+
+@pytest.fixture
+def runner():
+    runner = JobRunner(max_workers=1)
+    yield runner
+    runner._executor.shutdown(wait=True)
+
+
+def _waiting_job(release):
+    def fn(job):
+        while not release.wait(0.01):
+            job.report(0, 1)
+        job.report(1, 1)
+        return "result"
+
+    return fn
+
+
+def test_same_key_returns_the_running_job(runner):
+    release = threading.Event()
+    first = runner.submit("k", "label", _waiting_job(release), subscriber="a")
+    second = runner.submit("k", "label", _waiting_job(release), subscriber="b")
+    assert second is first
+    release.set()
+    runner._executor.shutdown(wait=True)
+    assert first.status == DONE
+    assert first.result == "result"
+
+
+def test_job_runs_until_every_subscriber_cancels(runner):
+    release = threading.Event()
+    job = runner.submit("k", "label", _waiting_job(release), subscriber="a")
+    runner.submit("k", "label", _waiting_job(release), subscriber="b")
+    job.cancel("a")
+    assert not job._cancel.is_set()
+    job.cancel("b")
+    runner._executor.shutdown(wait=True)
+    assert job.status == CANCELLED
+
+
+def test_cancelled_job_is_not_shared(runner):
+    release = threading.Event()
+    job = runner.submit("k", "label", _waiting_job(release), subscriber="a")
+    job.cancel("a")
+    again = runner.submit("k", "label", _waiting_job(release), subscriber="b")
+    assert again is not job
+    release.set()
+    runner._executor.shutdown(wait=True)
+    assert job.status == CANCELLED
+    assert again.status == DONE
+
+
+def test_pending_job_is_cancelled_at_once(runner):
+    release = threading.Event()
+    runner.submit("busy", "label", _waiting_job(release))
+    pending = runner.submit("k", "label", _waiting_job(release))
+    pending.cancel()
+    assert pending.status == CANCELLED
+    release.set()
@@ -0,0 +1,179 @@
+"""Segment and document scoring (assessment/scoring)."""
+
+import csv
+import io
+
+import pytest
+
+from models.data_models import ErrorAnnotation, SegmentAssessment, TranslationSegment
+from assessment.scoring import apply_settings, get_quality_rating, score_assessments
+from exporters.csv_writer import iter_export_csv_chunks
+
+
+def _ann(error_type, severity, span="x", explanation=""):
+    return ErrorAnnotation(
+        error_type=error_type, severity=severity, span=span, explanation=explanation
+    )
+
+
+def _scored(words, annotations, settings=None):
+    """Score one segment of the given word count with the given annotations."""
+    segments = [TranslationSegment(id=1, source_text="", target_text="x", word_count=words)]
+    assessments = [SegmentAssessment(annotations=annotations)]
+    return score_assessments(segments, assessments, settings=settings)[1]
+
+
+def test_scores_every_segment():
+    segments = [
+        TranslationSegment(id=10 + i, source_text="", target_text=text)
+        for i, text in enumerate(["Yksi kaksi kolme.", "", "Neljä viisi."])
+    ]
+    assessments = [
+        SegmentAssessment(annotations=[_ann("Grammar", "Minor"), _ann("Style", "Major")]),
+        SegmentAssessment(),
+        SegmentAssessment(annotations=[_ann("Omission", "Critical")]),
+    ]
+    progress = []
+    seg_scores, doc_score = score_assessments(
+        segments, assessments, progress=lambda done, total: progress.append((done, total))
+    )
+    assert list(seg_scores.indices) == [0, 1, 2]
+    assert list(seg_scores.segment_ids) == [10, 11, 12]
+    # An empty segment counts as one word
+    assert list(seg_scores.word_counts) == [3, 1, 2]
+    assert list(seg_scores.penalties) == [6.0, 0.0, 10.0]
+    assert progress == [(0, 3)]
+
+    assert doc_score.total_segments == 3
+    assert doc_score.total_word_count == 6
+    assert doc_score.total_penalty == 16
+    assert doc_score.error_score == pytest.approx(16 / 6 * 1000, abs=0.01)
+    assert doc_score.error_type_counts == {"Grammar": 1, "Style": 1, "Omission": 1}
+    assert doc_score.severity_counts == {"Minor": 1, "Major": 1, "Critical": 1}
+    assert doc_score.error_type_penalties["Style"] == 5
+    assert doc_score.error_type_penalties["Spelling"] == 0
+    assert doc_score.critical_error_count == 1
+
+
+def test_scores_a_sample_by_document_position():
+    segments = [
+        TranslationSegment(id=i, source_text="", target_text="yksi kaksi") for i in (7, 9)
+    ]
+    assessments = [SegmentAssessment(), SegmentAssessment(annotations=[_ann("Grammar", "Major")])]
+    seg_scores, doc_score = score_assessments(segments, assessments, indices=[3, 8])
+    assert list(seg_scores.indices) == [3, 8]
+    assert list(seg_scores.segment_ids) == [7, 9]
+    assert list(seg_scores.penalties) == [0.0, 5.0]
+    assert doc_score.total_segments == 2
+    assert doc_score.total_word_count == 4
+
+
+def test_error_score_boundary():
+    # 5 points in 125 words is exactly 40 per 1000 words
+    at_limit = _scored(125, [_ann("Grammar", "Major")])
+    assert at_limit.error_score == 40
+    assert at_limit.error_score_pass_fail == "Pass"
+    assert at_limit.overall_pass_fail == "Pass"
+
+    over = _scored(124, [_ann("Grammar", "Major")])
+    assert over.error_score_pass_fail == "Fail"
+    assert over.overall_pass_fail == "Fail"
+
+    custom = _scored(124, [_ann("Grammar", "Major")], settings={"pass_fail_threshold": 41})
+    assert custom.error_score_pass_fail == "Pass"
+
+
+def test_critical_error_boundary():
+    one = _scored(10_000, [_ann("Omission", "Critical")])
+    assert one.critical_count_pass_fail == "Pass"
+    two = _scored(10_000, [_ann("Omission", "Critical")] * 2)
+    assert two.critical_error_count == 2
+    assert two.critical_count_pass_fail == "Fail"
+    assert two.error_score_pass_fail == "Pass"
+    assert two.overall_pass_fail == "Fail"
+    allowed = _scored(10_000, [_ann("Omission", "Critical")] * 2, {"critical_error_max": 2})
+    assert allowed.overall_pass_fail == "Pass"
+
+
+@pytest.mark.parametrize(
+    "score, rating",
+    [(0, 5), (5, 5), (5.01, 4), (15, 4), (15.01, 3), (25, 3), (40, 2), (40.01, 1)],
+)
+def test_quality_rating_boundaries(score, rating):
+    assert get_quality_rating(score)[0] == rating
+
+
+def test_custom_rating_thresholds():
+    settings = {"rating_thresholds": [1, 2, 3, 4]}
+    doc_score = _scored(1000, [_ann("Grammar", "Minor")] * 2, settings)
+    assert doc_score.quality_rating == 4
+    # Anything but four thresholds falls back to the defaults
+    doc_score = _scored(1000, [_ann("Grammar", "Minor")] * 2, {"rating_thresholds": [1]})
+    assert doc_score.quality_rating == 5
+
+
+def test_apply_settings_matches_a_full_rescore():
+    annotations = [_ann("Grammar", "Major"), _ann("Omission", "Critical")]
+    settings = {"pass_fail_threshold": 200, "rating_thresholds": [50, 100, 150, 200]}
+    assert apply_settings(_scored(100, annotations), settings) == _scored(
+        100, annotations, settings
+    )
+    doc_score = _scored(100, annotations)
+    assert apply_settings(doc_score, None) is doc_score
+
+
+def test_csv_export_is_unchanged():
+    segments = [
+        TranslationSegment(id=i + 1, source_text=f"S{i}", target_text=text)
+        for i, text in enumerate(["Kissa istui matolla.", "Koira juoksi.", "Hyvää päivää."])
+    ]
+    assessments = [
+        SegmentAssessment(),
+        SegmentAssessment(
+            annotations=[_ann("Grammar", "Major", "juoksi", "aikamuoto")],
+            overall_comment="Tarkista",
+        ),
+        SegmentAssessment(),
+    ]
+    seg_scores, doc_score = score_assessments(segments, assessments)
+    text = "".join(iter_export_csv_chunks(segments, assessments, seg_scores, doc_score))
+    rows = list(csv.reader(io.StringIO(text)))
+    assert rows == [
+        [
+            "Segmentti", "Lähdeteksti", "Kohdeteksti", "Lähdekieli", "Kohdekieli",
+            "Virhetyyppi", "Vakavuusaste", "Virhejakso", "Selitys", "Pisteet",
+            "Segmentin sanamäärä", "Segmentin virhepistesumma", "Yleiskommentti",
+        ],
+        ["1", "S0", "Kissa istui matolla.", "", "", "", "", "", "", "0", "3", "0.0", ""],
+        [
+            "2", "S1", "Koira juoksi.", "", "", "Grammar", "Major", "juoksi",
+            "aikamuoto", "5.0", "2", "5.0", "Tarkista",
+        ],
+        ["3", "S2", "Hyvää päivää.", "", "", "", "", "", "", "0", "2", "0.0", ""],
+        [],
+        ["KOKONAISTULOKSET"],
+        [],
+        ["Segmenttejä yhteensä", "3"],
+        ["Sanamäärä yhteensä", "7"],
+        ["Virhepistesumma", "5.0"],
+        [],
+        ["Virhepisteet / 1000 sanaa", "714.29"],
+        ["Virhepisteiden raja-arvo", "≤ 40"],
+        ["Virhepisteet", "Hylätty"],
+        [],
+        ["Kriittiset virheet", "0"],
+        ["Kriittisten virheiden raja-arvo", "≤ 1"],
+        ["Kriittiset virheet", "Hyväksytty"],
+        [],
+        ["Kokonaistulos", "Hylätty"],
+        ["Laatuarvosana", "1/5 — Erittäin vakavia puutteita"],
+        ["Kuvaus", "Hylätty. Uudelleenkääntäminen vaaditaan."],
+        [],
+        ["VIRHEET TYYPEITTÄIN"],
+        ["Virhetyyppi", "Lukumäärä", "Virhepistesumma"],
+        ["Kielioppi", "1", "5.0"],
+        [],
+        ["VIRHEET VAKAVUUSASTEITTAIN"],
+        ["Vakavuusaste", "Lukumäärä"],
+        ["Merkittävä", "1"],
+    ]
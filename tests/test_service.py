@@ -0,0 +1,204 @@
+"""The scoring service (service/server) end to end over localhost."""
+
+import csv
+import io
+
+import httpx
+import pytest
+
+from service import server as service
+
+
+def _document(doc_id="doc", n=3, errors=()):
+    return {
+        "id": doc_id,
+        "segments": [
+            {"id": i, "source_text": "Hello world", "target_text": "Hei maailma kaikki"}
+            for i in range(n)
+        ],
+        "assessments": [
+            {
+                "annotations": [
+                    {
+                        "error_type": "Grammar",
+                        "severity": "Major",
+                        "span": "Hei",
+                        "explanation": "",
+                    }
+                ]
+            }
+            if i in errors
+            else {}
+            for i in range(n)
+        ],
+    }
+
+
+@pytest.fixture
+def start():
+    started = []
+
+    def start(workers=1):
+        server = service.serve(workers=workers)
+        client = httpx.Client(base_url=server.url, timeout=60)
+        started.append((server, client))
+        return server, client
+
+    yield start
+    for server, client in started:
+        client.close()
+        server.shutdown()
+        server.server_close()
+
+
+def test_health(start):
+    _, client = start()
+    health = client.get("/health").json()
+    assert health == {"status": "ok", "workers": 1, "cached": 0, "scored": 0}
+    assert client.get("/nowhere").status_code == 404
+
+
+def test_scores_batch_in_request_order(start):
+    server, client = start()
+    body = {
+        "documents": [_document("clean"), _document("errors", n=10, errors={0, 5})],
+        "segments": True,
+    }
+    reply = client.post("/v1/score", json=body)
+    assert reply.status_code == 200
+    clean, errors = reply.json()["results"]
+    assert clean["id"] == "clean"
+    assert clean["cached"] is False
+    assert clean["document_score"]["total_penalty"] == 0
+    assert errors["id"] == "errors"
+    assert errors["document_score"]["total_word_count"] == 30
+    assert errors["document_score"]["total_penalty"] == 10
+    assert errors["segments"]["penalties"] == [5, 0, 0, 0, 0, 5, 0, 0, 0, 0]
+    assert server.scored == 2
+
+
+def test_repeated_document_is_answered_from_the_cache(start):
+    server, client = start()
+    body = {"documents": [_document(errors={1})]}
+    first = client.post("/v1/score", json=body).json()["results"][0]
+    # The id is not part of the content
+    body = {"documents": [_document("renamed", errors={1})]}
+    second = client.post("/v1/score", json=body).json()["results"][0]
+    assert second["cached"] is True
+    assert second["id"] == "renamed"
+    assert second["digest"] == first["digest"]
+    assert second["document_score"] == first["document_score"]
+    assert server.scored == 1
+
+
+def test_invalid_documents_do_not_fail_the_batch(start):
+    _, client = start()
+    body = {
+        "documents": [
+            "not a document",
+            {"id": "no-segments"},
+            {"id": "bad-field", "segments": [{"id": "x"}]},
+            {**_document("bad-profile"), "scoring_profile": "nonexistent"},
+            _document("ok"),
+        ]
+    }
+    reply = client.post("/v1/score", json=body)
+    assert reply.status_code == 200
+    results = reply.json()["results"]
+    assert [r["id"] for r in results] == [None, "no-segments", "bad-field", "bad-profile", "ok"]
+    assert "JSON object" in results[0]["error"]
+    assert "segments" in results[1]["error"]
+    assert "invalid document" in results[2]["error"]
+    assert "unknown scoring profile" in results[3]["error"]
+    assert "error" not in results[4]
+
+
+def test_invalid_settings_do_not_fail_the_batch(start):
+    _, client = start()
+    body = {"documents": [_document("a")], "settings": {"pass_fail_threshold": "x"}}
+    reply = client.post("/v1/score", json=body)
+    assert reply.status_code == 200
+    (result,) = reply.json()["results"]
+    assert "pass_fail_threshold" in result["error"]
+
+    body = {
+        "documents": [
+            {**_document("null"), "scoring_settings": {"critical_error_max": None}},
+            {**_document("short"), "scoring_settings": {"rating_thresholds": [5, 15]}},
+            {**_document("custom"), "scoring_settings": {"pass_fail_threshold": 10.5}},
+        ]
+    }
+    null, short, custom = client.post("/v1/score", json=body).json()["results"]
+    assert "critical_error_max" in null["error"]
+    assert "rating_thresholds" in short["error"]
+    assert "error" not in custom
+    reply = client.post("/v1/export", json=body["documents"][0])
+    assert reply.status_code == 400
+
+
+def test_failing_document_does_not_fail_the_batch(start, monkeypatch):
+    def score(doc, *args):
+        if doc["id"] == "bad":
+            raise RuntimeError("boom")
+        return {"document_score": {}}
+
+    monkeypatch.setattr(service, "score_payload", score)
+    monkeypatch.setattr(service.traceback, "print_exc", lambda: None)
+    server, _ = start()
+    results = server.score_batch([_document("ok"), _document("bad")], None, None, False)
+    assert "error" not in results[0]
+    assert results[1] == {"id": "bad", "error": "internal error: RuntimeError: boom"}
+
+
+def test_bad_requests(start):
+    _, client = start()
+    assert client.post("/v1/score", content=b"{nope").status_code == 400
+    assert client.post("/v1/score", json={"documents": 1}).status_code == 400
+    reply = client.post("/v1/export?format=pdf", json=_document())
+    assert reply.status_code == 400
+    assert "unknown format" in reply.json()["error"]
+    reply = client.post("/v1/export", json={**_document(), "scoring_profile": "nonexistent"})
+    assert reply.status_code == 400
+
+
+def test_internal_error_is_answered(start, monkeypatch):
+    _, client = start()
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(service, "score_assessments", fail)
+    reply = client.post("/v1/export", json=_document())
+    assert reply.status_code == 500
+    assert "boom" in reply.json()["error"]
+    # The connection is still usable
+    assert client.get("/health").status_code == 200
+
+
+def test_streams_csv_export(start):
+    _, client = start()
+    with client.stream("POST", "/v1/export", json=_document(n=5, errors={2})) as reply:
+        assert reply.status_code == 200
+        assert reply.headers["transfer-encoding"] == "chunked"
+        text = b"".join(reply.iter_bytes()).decode()
+    rows = list(csv.reader(io.StringIO(text)))
+    assert any("Hei" in row for row in rows)
+
+
+@pytest.mark.parametrize("fmt", ["xlsx", "parquet"])
+def test_file_exports(start, fmt):
+    _, client = start()
+    reply = client.post(f"/v1/export?format={fmt}", json=_document(errors={0}))
+    assert reply.status_code == 200
+    assert int(reply.headers["content-length"]) == len(reply.content) > 0
+    assert service.EXPORT_FORMATS[fmt][1] in reply.headers["content-disposition"]
+
+
+def test_worker_pool_matches_in_process_scoring(start):
+    documents = [_document(f"d{i}", n=20, errors={i}) for i in range(4)]
+    _, single = start(workers=1)
+    expected = single.post("/v1/score", json={"documents": documents}).json()["results"]
+    server, pooled = start(workers=2)
+    results = pooled.post("/v1/score", json={"documents": documents}).json()["results"]
+    assert server.scored == 4
+    assert results == expected
@@ -0,0 +1,124 @@
+"""The Bloom filter, suggestions and the spell-check (qa/spelling)."""
+
+import pytest
+
+from models.data_models import TranslationSegment
+from qa import spelling
+from qa.spelling import BloomFilter, SpellDictionary
+
+WORDS = ["talo", "kissa", "koira", "auto", "katu", "tie", "vesi", "koulu", "kirja"]
+
+
+@pytest.fixture
+def dictionaries(tmp_path, monkeypatch):
+    (tmp_path / "fi.txt").write_text("# test wordlist\n" + "\n".join(WORDS) + "\n")
+    (tmp_path / "sv.dic").write_text("2\nhus/A\nbil/AB\n")
+    (tmp_path / "sv.aff").write_text(
+        "SFX A Y 1\nSFX A 0 et .\nSFX B Y 1\nSFX B 0 ar .\n"
+    )
+    monkeypatch.setattr(spelling, "DICTIONARY_DIR", str(tmp_path))
+    spelling.load_dictionary.cache_clear()
+    yield
+    spelling.load_dictionary.cache_clear()
+
+
+def test_bloom_filter_has_no_false_negatives():
+    words = [f"word{i}" for i in range(5000)]
+    bloom = BloomFilter(len(words))
+    bloom.update(words)
+    assert all(w in bloom for w in words)
+
+
+def test_bloom_filter_update_positions_match_lookup():
+    bloom = BloomFilter(100)
+    bloom.update(["alpha"])
+    expected = bytearray(len(bloom.bits))
+    for pos in bloom._positions("alpha"):
+        expected[pos >> 3] |= 1 << (pos & 7)
+    assert bloom.bits == expected
+
+
+def test_bloom_filter_update_keeps_earlier_words():
+    bloom = BloomFilter(1000)
+    bloom.update([f"first{i}" for i in range(500)])
+    bloom.update([f"second{i}" for i in range(500)])
+    bloom.update([])
+    assert all(f"first{i}" in bloom for i in range(500))
+    assert all(f"second{i}" in bloom for i in range(500))
+
+
+def test_bloom_filter_false_positive_rate():
+    bloom = BloomFilter(10_000, error_rate=0.01)
+    bloom.update([f"in{i}" for i in range(10_000)])
+    false_positives = sum(f"out{i}" in bloom for i in range(10_000))
+    assert false_positives < 300
+
+
+def test_known_words_hyphens_and_compounds():
+    dictionary = SpellDictionary(WORDS)
+    assert dictionary.is_known("talo", compounds=False)
+    assert dictionary.is_known("kissa-koira", compounds=False)
+    assert not dictionary.is_known("koulukirja", compounds=False)
+    assert dictionary.is_known("koulukirja", compounds=True)
+    assert not dictionary.is_known("kouluxyz", compounds=True)
+
+
+def test_suggestions_at_edit_distance_one():
+    dictionary = SpellDictionary(WORDS)
+    assert dictionary.suggest("kisa") == ["kissa"]  # insertion
+    assert dictionary.suggest("taloo") == ["talo"]  # deletion
+    assert dictionary.suggest("kaitu") == ["katu"]
+    assert dictionary.suggest("auti") == ["auto"]  # substitution
+    assert dictionary.suggest("zzzzz") == []
+
+
+def test_suggestions_follow_wordlist_order_and_are_capped():
+    dictionary = SpellDictionary(["taka", "tala", "tapa", "tasa", "taha"])
+    assert dictionary.suggest("tana") == ["taka", "tala", "tapa"]
+
+
+def test_suggestion_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(spelling, "SUGGEST_CACHE", 2)
+    dictionary = SpellDictionary(WORDS)
+    for word in ["kisa", "taloo", "auti"]:
+        dictionary.suggest(word)
+    assert len(dictionary._suggestions) <= 2
+    assert dictionary.suggest("kisa") == ["kissa"]
+
+
+def test_reads_hunspell_affixes(dictionaries):
+    dictionary = spelling.load_dictionary("ruotsi")
+    for word in ["hus", "huset", "bil", "bilet", "bilar"]:
+        assert word in dictionary
+    assert dictionary.count == 5
+
+
+def test_unknown_language_has_no_dictionary(dictionaries):
+    assert spelling.load_dictionary("klingon") is None
+    assert spelling.load_dictionary("saksa") is None
+
+
+def test_check_spelling(dictionaries):
+    segments = [
+        TranslationSegment(
+            id=1, source_text="The cat.", target_text="Kisa ja koira.", target_lang="suomi"
+        ),
+        TranslationSegment(
+            id=2,
+            source_text="Fluffy at Nokia.",
+            target_text="Fluffy kävi Nokialla koulukirja 123 ok.",
+            target_lang="suomi",
+        ),
+        TranslationSegment(
+            id=3, source_text="Hello", target_text="Hola amgio", target_lang="espanja"
+        ),
+    ]
+    results = spelling.check_spelling(segments)
+    assert list(results) == [0, 1]
+    (kisa,) = results[0]
+    assert kisa.check == spelling.CHECK_NAME
+    assert (kisa.annotation.span, kisa.annotation.start, kisa.annotation.end) == ("Kisa", 0, 4)
+    assert "kissa" in kisa.annotation.explanation
+    # Words of the source, capitalised names, compounds, numbers and short
+    # words pass; only "kävi" is unknown
+    assert [s.annotation.span for s in results[1]] == ["kävi"]
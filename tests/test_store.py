@@ -0,0 +1,149 @@
+"""The shared project store (projects/store)."""
+
+import threading
+
+import pytest
+
+from models.data_models import ErrorAnnotation, TranslationSegment
+from projects import store
+from projects.store import ProjectStore, VersionConflict
+
+
+def _segments(texts=("Yksi.", "Kaksi.", "Kolme.")):
+    return [
+        TranslationSegment(id=i, source_text=f"source {i}", target_text=t)
+        for i, t in enumerate(texts)
+    ]
+
+
+def _add(span):
+    def change(assessment):
+        assessment.annotations.append(
+            ErrorAnnotation(error_type="Grammar", severity="Minor", span=span, explanation="")
+        )
+
+    return change
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A controllable time.monotonic for the store."""
+    now = [1000.0]
+    monkeypatch.setattr(store.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_same_document_shares_segments():
+    projects = ProjectStore()
+    a = projects.open("a.xlsx", _segments())
+    b = projects.open("b.xlsx", _segments())
+    c = projects.open("c.xlsx", _segments(("Muu.",)))
+    assert a.id != b.id
+    assert a.segments is b.segments
+    assert a.assessments is not b.assessments
+    assert c.segments is not a.segments
+
+
+def test_update_versions_and_copies():
+    project = ProjectStore().open("doc", _segments())
+    before, version = project.snapshot(1)
+    assert version == 0
+    assert project.update(1, _add("Kaksi"), "alice", expected=0) == 1
+    after, version = project.snapshot(1)
+    assert version == 1
+    assert before.annotations == []  # readers keep the old copy
+    assert [a.span for a in after.annotations] == ["Kaksi"]
+    assert project.version == 1
+    assert project.versions == [0, 1, 0]
+
+
+def test_stale_update_conflicts():
+    project = ProjectStore().open("doc", _segments())
+    project.update(0, _add("Yksi"), "alice", expected=0)
+    with pytest.raises(VersionConflict) as conflict:
+        project.update(0, _add("Yksi."), "bob", expected=0)
+    assert (conflict.value.expected, conflict.value.current) == (0, 1)
+    assert len(project.snapshot(0)[0].annotations) == 1
+    # An update without an expected version always applies
+    assert project.update(0, _add("Yksi."), "bob") == 2
+
+
+def test_declined_change_leaves_the_segment():
+    project = ProjectStore().open("doc", _segments())
+    assert project.update(0, lambda assessment: False, "alice") is None
+    assert project.version == 0
+    assert project.changes_since(0) == []
+
+
+def test_changes_since():
+    project = ProjectStore().open("doc", _segments())
+    project.update(0, _add("Yksi"), "alice")
+    project.update(2, _add("Kolme"), "bob")
+    assert [(c.version, c.seg_idx, c.author) for c in project.changes_since(0)] == [
+        (1, 0, "alice"),
+        (2, 2, "bob"),
+    ]
+    assert [c.seg_idx for c in project.changes_since(1)] == [2]
+    assert project.changes_since(2) == []
+
+
+def test_changes_since_beyond_the_log(monkeypatch):
+    monkeypatch.setattr(store, "CHANGE_LOG", 2)
+    project = ProjectStore().open("doc", _segments())
+    for i in range(3):
+        project.update(i, _add("x"), "alice")
+    assert project.changes_since(0) is None
+    assert [c.version for c in project.changes_since(1)] == [2, 3]
+
+
+def test_concurrent_updates_are_all_applied():
+    project = ProjectStore().open("doc", _segments())
+
+    def work(author):
+        for _ in range(50):
+            project.update(0, _add(author), author)
+
+    threads = [threading.Thread(target=work, args=(f"s{i}",)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assessment, version = project.snapshot(0)
+    assert version == project.version == 200
+    assert len(assessment.annotations) == 200
+
+
+def test_members(clock):
+    project = ProjectStore().open("doc", _segments())
+    project.touch("alice")
+    project.touch("bob")
+    assert project.members() == 2
+    project.leave("bob")
+    assert project.members() == 1
+    clock[0] += store.MEMBER_TTL
+    assert project.members() == 0
+
+
+def test_abandoned_projects_are_dropped(clock):
+    projects = ProjectStore()
+    old = projects.open("old", _segments())
+    kept = projects.open("kept", _segments(("Muu.",)))
+    clock[0] += store.MEMBER_TTL / 2
+    kept.touch("alice")
+    clock[0] += store.MEMBER_TTL / 2 + 1
+    assert [p.id for p in projects.projects()] == [kept.id]
+    assert projects.get(old.id) is None
+    assert list(projects._documents) == [kept.digest]
+
+
+def test_polled_project_is_kept(clock):
+    projects = ProjectStore()
+    project = projects.open("doc", _segments())
+    for _ in range(5):
+        clock[0] += store.MEMBER_TTL - 1
+        assert projects.get(project.id) is project
+    assert projects.projects() == [project]
+
+
+def test_get_store_is_a_singleton():
+    assert store.get_store() is store.get_store()
@@ -0,0 +1,128 @@
+"""Tarkastajien yhtäpitävyys: saman dokumentin arvioinnit rinnakkain."""
+
+import json
+
+import streamlit as st
+
+from models.session import load_session
+from perf.memory import register_evictable
+from i18n.fi import FI
+
+# Raportti lasketaan uudelleen, jos se vapautetaan muistipaineessa
+register_evictable("_agreement")
+
+
+def render_agreement():
+    """Renderoi yhtäpitävyysnäkymä usean tarkastajan arvioinneista."""
+    st.subheader(FI["agreement_title"])
+    files = st.file_uploader(
+        FI["agreement_files_label"],
+        type=["json"],
+        accept_multiple_files=True,
+        help=FI["agreement_help"],
+        key="agreement_uploader",
+    )
+    if len(files or []) < 2:
+        st.info(FI["agreement_empty"])
+        return
+
+    # numpy ja pandas tuodaan vasta kun tiedostot on valittu
+    import pandas as pd
+
+    report = _get_report(files)
+    names = [f.name for f in files]
+
+    def fmt(value):
+        return "–" if value is None else f"{value:.3f}"
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric(FI["agreement_units"], report.unit_count)
+    with col2:
+        full = report.full_agreement_units / report.unit_count if report.unit_count else 0
+        st.metric(FI["agreement_full"], f"{full:.0%}")
+    with col3:
+        st.metric(FI["agreement_type_kappa"], fmt(report.type_fleiss_kappa))
+    with col4:
+        st.metric(FI["agreement_severity_kappa"], fmt(report.severity_fleiss_kappa))
+    st.caption(FI["agreement_segments"].format(n=report.segment_count))
+
+    # Tarkastajaparit
+    st.markdown(f"**{FI['agreement_pairs']}**")
+    pairs = pd.DataFrame(
+        [
+            {
+                FI["agreement_pair"]: f"{names[t.reviewers[0]]} – {names[t.reviewers[1]]}",
+                FI["agreement_type_kappa"]: t.kappa,
+                FI["agreement_severity_kappa"]: s.kappa,
+                "Pearson": c.pearson,
+                "Spearman": c.spearman,
+            }
+            for t, s, c in zip(
+                report.type_cohen_kappa,
+                report.severity_cohen_kappa,
+                report.score_correlation,
+            )
+        ]
+    )
+    st.dataframe(pairs, use_container_width=True, hide_index=True)
+
+    # Virhetyypeittäin ja vakavuusasteittain
+    col_type, col_sev = st.columns(2)
+    with col_type:
+        st.markdown(f"**{FI['agreement_per_type']}**")
+        st.dataframe(
+            _category_frame(report.per_type, names, FI["error_type_names"]),
+            use_container_width=True,
+            hide_index=True,
+        )
+    with col_sev:
+        st.markdown(f"**{FI['agreement_per_severity']}**")
+        st.dataframe(
+            _category_frame(report.per_severity, names, FI["severity_names"]),
+            use_container_width=True,
+            hide_index=True,
+        )
+
+    st.download_button(
+        label=FI["agreement_download"],
+        data=json.dumps(
+            {"reviewers": names, **report.model_dump()}, ensure_ascii=False, indent=2
+        ),
+        file_name="tqa_yhtapitavyys.json",
+        mime="application/json",
+    )
+
+
+def _get_report(files):
+    """Laske yhtäpitävyys; tulos säilytetään kunnes tiedostojoukko muuttuu."""
+    from assessment.agreement import compute_agreement
+
+    file_key = tuple(f.file_id for f in files)
+    cached = st.session_state.get("_agreement")
+    if cached is not None and cached[0] == file_key:
+        return cached[1]
+
+    report = compute_agreement([load_session(f) for f in files])
+    st.session_state["_agreement"] = (file_key, report)
+    return report
+
+
+def _category_frame(categories: dict, names: list[str], labels: dict):
+    """Yksi rivi luokkaa kohden: kapat ja merkittyjen segmenttien määrä tarkastajittain."""
+    import pandas as pd
+
+    return pd.DataFrame(
+        [
+            {
+                FI["agreement_category"]: labels.get(name, name),
+                "Fleiss κ": agreement.fleiss_kappa,
+                "Cohen κ": agreement.mean_cohen_kappa,
+                **{
+                    names[r]: flagged
+                    for r, flagged in enumerate(agreement.flagged_segments)
+                },
+            }
+            for name, agreement in categories.items()
+        ]
+    )
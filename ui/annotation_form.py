@@ -2,14 +2,16 @@
 
 import streamlit as st
 
+from assessment.profiles import get_profile
 from models.data_models import (
-    ERROR_TYPES,
-    SEVERITY_LEVELS,
-    DEFAULT_SEVERITIES,
     ErrorAnnotation,
     SegmentAssessment,
     TranslationSegment,
 )
+from ui.checks import decide_suggestion, segment_suggestions
+from ui.memory import prefill_from_match, segment_memory_matches
+from ui.repetitions import propagate_annotation, repetitions_of
+from ui.shared_project import begin_edit, shown_version, update_assessment
 from ui.text_highlighter import render_text_highlighter
 from i18n.fi import FI
 
@@ -17,6 +19,7 @@ SEVERITY_COLORS_DISPLAY = {
     "Critical": "red",
     "Major": "orange",
     "Minor": "blue",
+    "Neutral": "gray",
 }
 
 
@@ -27,6 +30,9 @@ def render_annotation_panel(
 ):
     """Renderoi virhemerkintäpaneeli valitulle segmentille."""
 
+    # Jaetussa projektissa arviointi luetaan versioineen (samanaikaiset muutokset)
+    assessment = begin_edit(seg_idx, assessment)
+
     st.subheader(FI["annotate_header"].format(seg_id=segment.id))
 
     # Lähde ja kohde rinnakkain
@@ -42,7 +48,9 @@ def render_annotation_panel(
                 target_text=segment.target_text,
                 existing_annotations=assessment.annotations,
                 key=f"highlighter_{seg_idx}",
-                span_input_label=FI["error_span"],
+                profile=get_profile(st.session_state.get("scoring_profile")),
+                version=shown_version(seg_idx),
+                on_commit=lambda spans, version: _add_selected_spans(seg_idx, spans, version),
             )
         except Exception as e:
             st.warning(f"Maalauskomponentti ei käytettävissä: {e}")
@@ -53,6 +61,12 @@ def render_annotation_panel(
     # Nykyiset virheet
     _render_existing_annotations(seg_idx, assessment)
 
+    # Automaattisten tarkistusten ehdotukset
+    _render_suggestions(seg_idx, segment)
+
+    # Virhemuistin osumat aiemmista arvioinneista
+    _render_memory_matches(seg_idx, segment, assessment)
+
     st.divider()
 
     # Uuden virheen lisäyslomake
@@ -65,7 +79,105 @@ def render_annotation_panel(
         key=f"comment_{seg_idx}",
     )
     if comment != assessment.overall_comment:
-        st.session_state["assessments"][seg_idx].overall_comment = comment
+        update_assessment(seg_idx, lambda a: setattr(a, "overall_comment", comment))
+
+
+def _add_selected_spans(seg_idx: int, spans: list[dict], version: int | None = None):
+    """
+    Lisää komponentissa maalatut jaksot virheiksi (callback ennen kierrosta).
+    version on segmentin versio, jonka päällä jaksot maalattiin.
+    """
+    new_anns = [
+        ErrorAnnotation(
+            error_type=s["error_type"],
+            severity=s["severity"],
+            span=s["text"],
+            explanation=s["explanation"],
+            start=s["start"],
+            end=s["end"],
+        )
+        for s in spans
+    ]
+    if not update_assessment(
+        seg_idx, lambda a: a.annotations.extend(new_anns), base=version
+    ):
+        return
+    # Lomakkeen toistovalinta koskee myös maalattuja jaksoja
+    if st.session_state.get(f"add_propagate_{seg_idx}"):
+        segments = st.session_state.get("segments") or []
+        added = skipped = 0
+        for ann in new_anns:
+            a, s = propagate_annotation(segments, seg_idx, ann)
+            added, skipped = added + a, skipped + s
+        st.toast(FI["propagated"].format(added=added, skipped=skipped))
+    st.toast(FI["spans_added"].format(n=len(new_anns)))
+
+
+def _render_suggestions(seg_idx: int, segment: TranslationSegment):
+    """Näytä tarkistusten ehdotukset hyväksyntä- ja hylkäyspainikkeilla."""
+    suggestions = segment_suggestions(seg_idx)
+    if not suggestions:
+        return
+
+    st.markdown(f"**{FI['suggestions']}:**")
+    for j, suggestion in enumerate(suggestions):
+        ann = suggestion.annotation
+        color = SEVERITY_COLORS_DISPLAY.get(ann.severity, "gray")
+        fi_type = FI["error_type_names"].get(ann.error_type, ann.error_type)
+        fi_sev = FI["severity_names"].get(ann.severity, ann.severity)
+
+        cols = st.columns([2, 2, 1, 2, 0.5, 0.5])
+        with cols[0]:
+            st.markdown(f"*{fi_type}*")
+        with cols[1]:
+            st.markdown(f'"{ann.span}"')
+        with cols[2]:
+            st.markdown(f":{color}[{fi_sev}]")
+        with cols[3]:
+            st.caption(ann.explanation)
+        with cols[4]:
+            if st.button(FI["accept"], key=f"accept_sugg_{seg_idx}_{j}"):
+                decide_suggestion(seg_idx, segment.id, j, accept=True)
+                st.rerun()
+        with cols[5]:
+            if st.button(FI["reject"], key=f"reject_sugg_{seg_idx}_{j}"):
+                decide_suggestion(seg_idx, segment.id, j, accept=False)
+                st.rerun()
+
+
+def _render_memory_matches(
+    seg_idx: int, segment: TranslationSegment, assessment: SegmentAssessment
+):
+    """Näytä virhemuistin osumat; valittu osuma täyttää lisäyslomakkeen."""
+    matches = segment_memory_matches(seg_idx, assessment.annotations)
+    if not matches:
+        return
+
+    st.markdown(f"**{FI['memory_matches']}:**")
+    for j, match in enumerate(matches):
+        entry = match.entry
+        color = SEVERITY_COLORS_DISPLAY.get(entry.severity, "gray")
+        fi_type = FI["error_type_names"].get(entry.error_type, entry.error_type)
+        fi_sev = FI["severity_names"].get(entry.severity, entry.severity)
+
+        cols = st.columns([2, 2, 1, 2, 1])
+        with cols[0]:
+            st.markdown(f"*{fi_type}*")
+        with cols[1]:
+            st.markdown(f'"{entry.span}"')
+        with cols[2]:
+            st.markdown(f":{color}[{fi_sev}]")
+        with cols[3]:
+            st.caption(
+                f"{entry.explanation} · "
+                + FI["memory_match_info"].format(
+                    similarity=match.similarity, count=entry.count
+                )
+            )
+        with cols[4]:
+            if st.button(FI["memory_use"], key=f"use_memory_{seg_idx}_{j}"):
+                prefill_from_match(seg_idx, segment.target_text, match)
+                st.rerun()
 
 
 def _render_existing_annotations(seg_idx: int, assessment: SegmentAssessment):
@@ -74,12 +186,13 @@ def _render_existing_annotations(seg_idx: int, assessment: SegmentAssessment):
         st.success(FI["no_errors"])
         return
 
-    # Käännostaulukot
+    # Käännostaulukot valitun pisteytysprofiilin mukaan
+    profile = get_profile(st.session_state.get("scoring_profile"))
     fi_to_en_type = {
-        FI["error_type_names"].get(et, et): et for et in ERROR_TYPES
+        FI["error_type_names"].get(et, et): et for et in profile.error_types
     }
     fi_to_en_sev = {
-        FI["severity_names"].get(s, s): s for s in SEVERITY_LEVELS
+        FI["severity_names"].get(s, s): s for s in profile.severities
     }
     fi_error_labels = list(fi_to_en_type.keys())
     fi_severity_labels = list(fi_to_en_sev.keys())
@@ -119,7 +232,7 @@ def _render_existing_annotations(seg_idx: int, assessment: SegmentAssessment):
                 # Jos muokataan poistettavaa tai sitä myöhempää, nollaa muokkaustila
                 if editing_idx is not None and editing_idx >= j:
                     st.session_state.pop(editing_key, None)
-                st.session_state["assessments"][seg_idx].annotations.pop(j)
+                update_assessment(seg_idx, lambda a: a.annotations.pop(j))
                 st.rerun()
 
 
@@ -170,12 +283,15 @@ def _render_edit_form(seg_idx, ann_idx, ann, fi_to_en_type, fi_to_en_sev,
     with col_save:
         if st.button(FI["save_edit"], key=f"save_edit_{seg_idx}_{ann_idx}", type="primary"):
             if new_span and new_explanation:
-                st.session_state["assessments"][seg_idx].annotations[ann_idx] = ErrorAnnotation(
+                edited = ErrorAnnotation(
                     error_type=new_error_type,
                     severity=new_severity,
                     span=new_span,
                     explanation=new_explanation,
                 )
+                update_assessment(
+                    seg_idx, lambda a: a.annotations.__setitem__(ann_idx, edited)
+                )
                 st.session_state.pop(editing_key, None)
                 st.rerun()
             else:
@@ -199,9 +315,28 @@ def _render_add_form(seg_idx: int):
 
     st.markdown(f"**{FI['add_error']}**")
 
+    # Virhetyypit ja vakavuusasteet valitun pisteytysprofiilin mukaan
+    profile = get_profile(st.session_state.get("scoring_profile"))
+
+    # Virhemuistista valittu osuma täyttää kentät (ennen widgettien luomista)
+    prefill = st.session_state.pop(f"_prefill_{seg_idx}", None)
+    if prefill is not None:
+        if prefill.error_type in profile.error_types:
+            st.session_state[f"add_type_{seg_idx}"] = FI["error_type_names"].get(
+                prefill.error_type, prefill.error_type
+            )
+            # Ei oletusvakavuuden päivitystä muistin vakavuuden päälle
+            st.session_state[f"_prev_type_{seg_idx}"] = prefill.error_type
+        if prefill.severity in profile.severities:
+            st.session_state[f"add_sev_{seg_idx}"] = FI["severity_names"].get(
+                prefill.severity, prefill.severity
+            )
+        st.session_state[f"add_span_{seg_idx}"] = prefill.span
+        st.session_state[f"add_expl_{seg_idx}"] = prefill.explanation
+
     # Virhetyyppi
     fi_to_en_type = {
-        FI["error_type_names"].get(et, et): et for et in ERROR_TYPES
+        FI["error_type_names"].get(et, et): et for et in profile.error_types
     }
     fi_error_labels = list(fi_to_en_type.keys())
     selected_fi_type = st.selectbox(
@@ -214,14 +349,14 @@ def _render_add_form(seg_idx: int):
     # Päivitä vakavuus automaattisesti kun virhetyyppi vaihtuu
     prev_type_key = f"_prev_type_{seg_idx}"
     if st.session_state.get(prev_type_key) != error_type:
-        default_sev = DEFAULT_SEVERITIES.get(error_type, "Major")
+        default_sev = profile.default_severities.get(error_type, "Major")
         default_fi_sev = FI["severity_names"].get(default_sev, default_sev)
         st.session_state[f"add_sev_{seg_idx}"] = default_fi_sev
         st.session_state[prev_type_key] = error_type
 
     # Vakavuus
     fi_to_en_sev = {
-        FI["severity_names"].get(s, s): s for s in SEVERITY_LEVELS
+        FI["severity_names"].get(s, s): s for s in profile.severities
     }
     fi_severity_labels = list(fi_to_en_sev.keys())
     selected_fi_sev = st.selectbox(
@@ -242,6 +377,15 @@ def _render_add_form(seg_idx: int):
         key=f"add_expl_{seg_idx}",
     )
 
+    # Toistot: sama virhe voidaan lisätä kerralla kaikkiin kopioihin
+    segments = st.session_state.get("segments") or []
+    repetitions = repetitions_of(segments, seg_idx) if segments else []
+    propagate = bool(repetitions) and st.checkbox(
+        FI["propagate"].format(n=len(repetitions)),
+        key=f"add_propagate_{seg_idx}",
+        help=FI["propagate_help"],
+    )
+
     if st.button(FI["add_error"], key=f"add_btn_{seg_idx}", type="primary"):
         if span and explanation:
             new_ann = ErrorAnnotation(
@@ -250,7 +394,12 @@ def _render_add_form(seg_idx: int):
                 span=span,
                 explanation=explanation,
             )
-            st.session_state["assessments"][seg_idx].annotations.append(new_ann)
+            if not update_assessment(seg_idx, lambda a: a.annotations.append(new_ann)):
+                # Toinen tarkastaja muutti segmenttiä: lomake säilyy, näytetään uusi tila
+                st.rerun()
+            if propagate:
+                added, skipped = propagate_annotation(segments, seg_idx, new_ann)
+                st.toast(FI["propagated"].format(added=added, skipped=skipped))
             # Merkitse tyhjennys seuraavalle kierrokselle
             st.session_state[f"_clear_form_{seg_idx}"] = True
             st.rerun()
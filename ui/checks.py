@@ -0,0 +1,161 @@
+"""Automaattiset tarkistukset: ajo taustalla ja ehdotusten hyväksyntä tai hylkäys."""
+
+import hashlib
+
+import streamlit as st
+
+from models.data_models import Suggestion
+from qa.llm import LLMConfig, assessment_suggestions, pre_annotate
+from qa.pipeline import CHECKS, run_checks
+from jobs.runner import DONE, FAILED
+from ui.jobs import job_running, render_job_progress, start_job
+from ui.shared_project import update_assessment
+from i18n.fi import FI
+
+
+def render_checks_button(segments):
+    """Painike, joka ajaa tarkistukset kaikille segmenteille kerralla."""
+    if st.button(FI["run_checks"], disabled=job_running("checks")):
+        profile = st.session_state.get("scoring_profile")
+        glossary = st.session_state.get("glossary")
+        glossary_args, glossary_key = None, ""
+        if glossary is not None:
+            glossary_key = hashlib.sha1(glossary[1]).hexdigest()[:12]
+            glossary_args = (
+                glossary[1],
+                glossary[0],
+                st.session_state.get("source_lang", ""),
+                st.session_state.get("target_lang", ""),
+            )
+        start_job(
+            "checks",
+            f"checks:{id(segments)}:{profile}:{glossary_key}",
+            FI["job_checking"],
+            _checks_job,
+            segments,
+            profile,
+            glossary_args,
+            on_done=_on_checks_done,
+        )
+    render_job_progress("checks")
+    render_check_timings()
+
+
+def _checks_job(job, segments, profile, glossary_args):
+    options = {"glossary": glossary_args} if glossary_args else {}
+    return run_checks(segments, profile, options, progress=job.report)
+
+
+def render_check_timings():
+    """Edellisen ajon kesto tarkistuksittain."""
+    run = st.session_state.get("_check_run")
+    if run is None:
+        return
+    timings = ", ".join(
+        f"{FI['check_names'].get(name, name)} {seconds:.1f} s"
+        for name, seconds in run.timings.items()
+    )
+    st.caption(FI["check_timings"].format(elapsed=run.elapsed, timings=timings))
+
+
+def _on_checks_done(job):
+    if job.status == DONE:
+        run = job.result
+        st.session_state["_check_run"] = run.model_copy(update={"results": {}})
+        n = _store_suggestions(run.results, set(CHECKS))
+        st.toast(FI["checks_done"].format(n=n))
+    elif job.status == FAILED:
+        st.error(f"Odottamaton virhe: {job.error}")
+
+
+def render_llm_button(segments):
+    """Esiannotointi kielimallilla; näkyy vain, kun TQA_LLM_URL on asetettu."""
+    config = LLMConfig.from_env()
+    if config is None:
+        return
+    if st.button(FI["run_llm"], disabled=job_running("llm"), help=FI["run_llm_help"]):
+        profile = st.session_state.get("scoring_profile")
+        start_job(
+            "llm",
+            f"llm:{id(segments)}:{profile}",
+            FI["job_llm"],
+            _llm_job,
+            segments,
+            config,
+            profile,
+            on_done=_on_llm_done,
+        )
+    render_job_progress("llm")
+
+
+def _llm_job(job, segments, config, profile):
+    return pre_annotate(segments, config, profile, progress=job.report)
+
+
+def _on_llm_done(job):
+    if job.status == DONE:
+        run = job.result
+        n = _store_suggestions(assessment_suggestions(run.results), {"llm"})
+        st.toast(
+            FI["llm_done"].format(n=n, cached=run.cached, requested=run.requested)
+        )
+        if run.failed:
+            st.warning(FI["llm_failed"].format(n=run.failed))
+    elif job.status == FAILED:
+        st.error(f"Odottamaton virhe: {job.error}")
+
+
+def _store_suggestions(results: dict[int, list[Suggestion]], checks: set[str]) -> int:
+    """
+    Korvaa annettujen tarkistusten ehdotukset uusilla; muiden tarkistusten
+    ehdotukset säilyvät. Jo päätetyt ja jo merkityt ohitetaan. Palauttaa
+    ehdotuksia saaneiden segmenttien määrän.
+    """
+    segments = st.session_state.get("segments") or []
+    assessments = st.session_state.get("assessments") or []
+    decided = st.session_state.setdefault("_suggestion_decisions", set())
+    suggestions = {}
+    for idx, kept in st.session_state.get("suggestions", {}).items():
+        kept = [s for s in kept if s.check not in checks]
+        if kept:
+            suggestions[idx] = kept
+    for idx, found in results.items():
+        if idx >= len(segments):
+            continue
+        seg_id = segments[idx].id
+        existing = {_annotation_key(a) for a in assessments[idx].annotations}
+        pending = [
+            s
+            for s in found
+            if s.key(seg_id) not in decided
+            and _annotation_key(s.annotation) not in existing
+        ]
+        if pending:
+            suggestions.setdefault(idx, []).extend(pending)
+    st.session_state["suggestions"] = suggestions
+    return sum(1 for idx in results if idx in suggestions)
+
+
+def _annotation_key(ann) -> tuple:
+    return (ann.error_type, ann.span, ann.start, ann.explanation)
+
+
+def segment_suggestions(seg_idx: int) -> list[Suggestion]:
+    """Segmentin käsittelemättömät ehdotukset."""
+    return st.session_state.get("suggestions", {}).get(seg_idx, [])
+
+
+def decide_suggestion(seg_idx: int, seg_id: int, j: int, accept: bool):
+    """Hyväksy (lisää virheeksi) tai hylkää segmentin j:s ehdotus."""
+    pending = st.session_state["suggestions"][seg_idx]
+    if accept and not update_assessment(
+        seg_idx, lambda a: a.annotations.append(pending[j].annotation)
+    ):
+        # Toinen tarkastaja muutti segmenttiä: ehdotus jää odottamaan
+        return
+    suggestion = pending.pop(j)
+    if not pending:
+        del st.session_state["suggestions"][seg_idx]
+    st.session_state.setdefault("_suggestion_decisions", set()).add(
+        suggestion.key(seg_id)
+    )
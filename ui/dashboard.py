@@ -1,29 +1,29 @@
 """Pisteytyslomake ja yhteenvetonakyma suomeksi."""
 
 import streamlit as st
-import plotly.express as px
-import pandas as pd
-
-from models.data_models import (
-    ERROR_TYPES,
-    ERROR_TYPE_NUMBERS,
-    SEVERITY_LEVELS,
-    DocumentScore,
-    SegmentScore,
-)
+
+from models.data_models import DocumentScore, SegmentScores
+from exporters.scorecard import scorecard_columns, scorecard_rows
+from assessment.profiles import get_profile
+from ui.sampling import render_sample_estimate
+from perf.trace import traced
 from i18n.fi import FI
 
 
+@traced("render_dashboard")
 def render_dashboard():
     """Renderoi yhteenvetonakyma pisteytyslomakkeineen."""
     doc_score: DocumentScore | None = st.session_state.get("document_score")
-    seg_scores: list[SegmentScore] | None = st.session_state.get("segment_scores")
+    seg_scores: SegmentScores | None = st.session_state.get("segment_scores")
 
     if not doc_score or not seg_scores:
         st.info(FI["run_assessment_first"])
         return
 
     _render_scorecard_header(doc_score)
+    if st.session_state.get("sample_plan") is not None:
+        st.divider()
+        render_sample_estimate(seg_scores)
     st.divider()
     _render_error_breakdown_table(doc_score)
     st.divider()
@@ -32,6 +32,7 @@ def render_dashboard():
     _render_segment_table(seg_scores)
 
 
+@traced("dashboard.scorecard_header")
 def _render_scorecard_header(doc_score: DocumentScore):
     """Paametriikat."""
     col1, col2, col3, col4, col5 = st.columns(5)
@@ -74,37 +75,17 @@ def _render_scorecard_header(doc_score: DocumentScore):
         st.info(f"**{FI['quality_rating']} {doc_score.quality_rating} - {desc}:** {action}")
 
 
+@traced("dashboard.error_breakdown_table")
 def _render_error_breakdown_table(doc_score: DocumentScore):
     """Virhepisteytyslomake taulukkomuodossa."""
-    st.subheader(FI["error_scorecard"])
+    import pandas as pd
 
-    fi_minor = FI["severity_names"]["Minor"]
-    fi_major = FI["severity_names"]["Major"]
-    fi_critical = FI["severity_names"]["Critical"]
-
-    rows = []
-    for error_type in ERROR_TYPES:
-        et_num = ERROR_TYPE_NUMBERS[error_type]
-        severity_counts = doc_score.error_type_severity_counts.get(
-            error_type, {s: 0 for s in SEVERITY_LEVELS}
-        )
-        total_count = sum(severity_counts.values())
-        penalty_total = doc_score.error_type_penalties.get(error_type, 0)
-        fi_type = FI["error_type_names"].get(error_type, error_type)
-
-        rows.append(
-            {
-                "#": et_num,
-                FI["error_type"]: fi_type,
-                FI["count"]: total_count,
-                f"{fi_minor} (x1)": severity_counts.get("Minor", 0) or "",
-                f"{fi_major} (x5)": severity_counts.get("Major", 0) or "",
-                f"{fi_critical} (x10)": severity_counts.get("Critical", 0) or "",
-                FI["penalty"]: penalty_total if penalty_total > 0 else "",
-            }
-        )
+    st.subheader(FI["error_scorecard"])
 
-    df = pd.DataFrame(rows)
+    profile = get_profile(doc_score.profile)
+    df = pd.DataFrame(
+        scorecard_rows(doc_score, profile), columns=scorecard_columns(profile)
+    )
     st.dataframe(df, use_container_width=True, hide_index=True)
 
     st.markdown(
@@ -114,8 +95,11 @@ def _render_error_breakdown_table(doc_score: DocumentScore):
     )
 
 
+@traced("dashboard.charts")
 def _render_charts(doc_score: DocumentScore):
     """Virhejakaumakaaviot."""
+    import plotly.express as px
+
     chart_col1, chart_col2 = st.columns(2)
 
     with chart_col1:
@@ -140,11 +124,13 @@ def _render_charts(doc_score: DocumentScore):
     with chart_col2:
         st.subheader(FI["errors_by_severity"])
         if doc_score.severity_counts:
-            severity_order = ["Critical", "Major", "Minor"]
+            # Vakavin ensin profiilin järjestyksessä
+            severity_order = list(reversed(get_profile(doc_score.profile).severities))
             severity_colors = {
                 "Critical": "#e74c3c",
                 "Major": "#f39c12",
                 "Minor": "#3498db",
+                "Neutral": "#95a5a6",
             }
             ordered = [s for s in severity_order if s in doc_score.severity_counts]
             fi_ordered = [FI["severity_names"].get(s, s) for s in ordered]
@@ -165,25 +151,24 @@ def _render_charts(doc_score: DocumentScore):
             st.success(FI["no_errors_found"])
 
 
-def _render_segment_table(seg_scores: list[SegmentScore]):
+@traced("dashboard.segment_table", size=lambda _, seg_scores: len(seg_scores))
+def _render_segment_table(seg_scores: SegmentScores):
     """Segmenttikohtainen taulukko."""
+    import pandas as pd
+
     st.subheader(FI["per_segment_details"])
 
+    # Virheet ja kommentit luetaan arvioinneista segmenttien paikoista
     assessments = st.session_state.get("assessments", [])
-
-    table_data = []
-    for i, s in enumerate(seg_scores):
-        comment = ""
-        if i < len(assessments) and assessments[i].overall_comment:
-            comment = assessments[i].overall_comment
-        table_data.append(
-            {
-                FI["segment"]: s.segment_id,
-                FI["words"]: s.word_count,
-                FI["errors"]: len(s.annotations),
-                FI["penalty"]: s.total_penalty,
-                FI["overall_comment"]: comment,
-            }
-        )
-    df = pd.DataFrame(table_data)
+    scored = [assessments[i] for i in seg_scores.indices]
+
+    df = pd.DataFrame(
+        {
+            FI["segment"]: seg_scores.segment_ids,
+            FI["words"]: seg_scores.word_counts,
+            FI["errors"]: [len(a.annotations) for a in scored],
+            FI["penalty"]: seg_scores.penalties,
+            FI["overall_comment"]: [a.overall_comment for a in scored],
+        }
+    )
     st.dataframe(df, use_container_width=True, hide_index=True)
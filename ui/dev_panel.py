@@ -0,0 +1,123 @@
+"""Kehittäjän suorituskykypaneeli: kuumien polkujen ajat ja sessioiden muistinkäyttö."""
+
+import hmac
+import os
+from datetime import datetime
+
+import streamlit as st
+
+from perf import trace
+from perf.memory import get_accountant
+from ui.shared_project import session_id
+from i18n.fi import FI
+
+# Muistitaulukossa näytettävien sessioiden määrä
+DEV_SESSIONS_SHOWN = 10
+
+
+def dev_mode() -> bool:
+    """
+    Paneeli näytetään kaikille, kun palvelimella on TQA_DEV=1, ja muuten vain
+    osoitteella ?dev=<TQA_DEV_TOKEN>. Paneeli näyttää kaikkien sessioiden
+    muistinkäytön ja sen mittauskytkin koskee koko prosessia, joten pelkkä
+    ?dev=1 ei riitä.
+    """
+    if os.environ.get("TQA_DEV") == "1":
+        return True
+    token = os.environ.get("TQA_DEV_TOKEN", "")
+    given = st.query_params.get("dev", "")
+    return bool(token) and hmac.compare_digest(given.encode(), token.encode())
+
+
+def render_dev_panel():
+    """Sivupalkin osio: ajanmittaus, trace-tiedosto ja suurimmat sessiot."""
+    if not dev_mode():
+        return
+    with st.expander(FI["dev_panel"], expanded=False):
+        _render_trace()
+        st.divider()
+        _render_memory_usage()
+
+
+def _render_trace():
+    on = st.toggle(FI["dev_trace"], value=trace.enabled(), key="_dev_trace")
+    if on != trace.enabled():
+        trace.set_enabled(on)
+    if not on:
+        st.caption(FI["dev_trace_off"])
+        return
+
+    runs = trace.reruns(session_id())
+    if runs:
+        run = st.selectbox(
+            FI["dev_rerun"],
+            runs,
+            format_func=lambda r: FI["dev_rerun_entry"].format(
+                id=r.id,
+                time=datetime.fromtimestamp(r.started).strftime("%H:%M:%S"),
+                ms=r.duration_ns / 1e6,
+            ),
+            key="_dev_rerun",
+        )
+        st.markdown(_stats_table(run.stats))
+    else:
+        st.caption(FI["dev_no_reruns"])
+
+    background = trace.background_stats()
+    if background:
+        st.markdown(f"**{FI['dev_background']}**")
+        st.markdown(_stats_table(background))
+
+    st.download_button(
+        FI["dev_download"],
+        data=trace.chrome_trace,
+        file_name="tqa_trace.json",
+        mime="application/json",
+        help=FI["dev_download_help"],
+        on_click="ignore",
+    )
+
+
+def _stats_table(stats: dict[str, trace.Stat]) -> str:
+    """Tilastot markdown-taulukkona, suurin kokonaisaika ensin (ilman pandasia)."""
+    h = FI["dev_columns"]
+    lines = [
+        f"| {h['name']} | {h['calls']} | {h['total']} | {h['max']} | {h['size']} |",
+        "|---|---:|---:|---:|---:|",
+    ]
+    for name, s in sorted(stats.items(), key=lambda item: -item[1].total_ns):
+        lines.append(
+            f"| `{name}` | {s.calls} | {s.total_ns / 1e6:.1f} | "
+            f"{s.max_ns / 1e6:.1f} | {s.size or ''} |"
+        )
+    return "\n".join(lines)
+
+
+def _render_memory_usage():
+    """Suurimmat sessiot: tilan koko avaimittain ja muistipaineessa vapautettu data."""
+    accountant = get_accountant()
+    mb = 2**20
+    st.markdown(
+        FI["dev_memory_total"].format(
+            total=accountant.total() / mb,
+            budget=accountant.budget // mb if accountant.budget else FI["dev_memory_unlimited"],
+        )
+    )
+    sessions = accountant.usage()[:DEV_SESSIONS_SHOWN]
+    if not sessions:
+        return
+    me = session_id()
+    h = FI["dev_memory_columns"]
+    lines = [
+        f"| {h['session']} | {h['total']} | {h['largest']} | {h['evicted']} |",
+        "|---|---:|---|---:|",
+    ]
+    for usage in sessions:
+        largest = sorted(usage.sizes.items(), key=lambda item: -item[1])[:3]
+        label = usage.session[:8] + (f" ({FI['dev_memory_you']})" if usage.session == me else "")
+        lines.append(
+            f"| {label} | {usage.total / mb:.1f} | "
+            + ", ".join(f"`{key}` {size / mb:.1f}" for key, size in largest)
+            + f" | {usage.evicted / mb:.1f} |"
+        )
+    st.markdown("\n".join(lines))
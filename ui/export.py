@@ -1,16 +1,28 @@
-"""CSV-vienti suomeksi."""
+"""CSV-, Excel- ja Parquet-vienti suomeksi."""
 
-import csv
-import io
+import functools
+import os
 
 import streamlit as st
 
-from models.data_models import SEVERITY_PENALTIES
+from assessment.profiles import get_profile
+from exporters.csv_writer import CsvExportCache, write_export_csv
+from perf.memory import register_evictable
+from perf.trace import traced
+from jobs.runner import DONE, FAILED
+from ui.jobs import job_running, render_job_progress, start_job
 from i18n.fi import FI
 
+# Muistipaineessa vientivälimuistin rivit vapautetaan; väliaikaistiedoston
+# seuranta säilyy, jotta tiedosto poistetaan seuraavan viennin yhteydessä
+# tai istunnon päättyessä
+register_evictable("_export_cache", release=lambda cache: cache.clear())
+
 
 def render_export_button():
-    """Renderoi lataa CSV -painike."""
+    """Renderoi latauspainikkeet (CSV, Excel, Parquet)."""
+    # Viedään pisteytetyt segmentit (otantatarkastuksessa otos): rivit
+    # haetaan dokumentista pisteiden indekseillä
     segments = st.session_state.get("segments")
     assessments = st.session_state.get("assessments")
     seg_scores = st.session_state.get("segment_scores")
@@ -19,14 +31,65 @@ def render_export_button():
     if not segments or not assessments or not seg_scores:
         return
 
-    csv_data = _generate_export_csv(segments, assessments, seg_scores, doc_score)
-
-    st.download_button(
-        label=FI["export_csv"],
-        data=csv_data,
-        file_name="tqa_tulokset.csv",
-        mime="text/csv",
-    )
+    # Sisältö luodaan vasta painettaessa; muuttumattomien segmenttien rivit
+    # käytetään uudelleen edellisestä viennistä
+    if "_export_cache" not in st.session_state:
+        st.session_state["_export_cache"] = CsvExportCache()
+    cache = st.session_state["_export_cache"]
+    profile = get_profile(doc_score.profile if doc_score else None)
+
+    col_csv, col_xlsx, col_parquet = st.columns(3)
+    with col_csv:
+        # CSV kirjoitetaan taustatehtävänä; valmis tiedosto vastaa näitä pisteitä
+        scores_key = st.session_state.get("_scores_key")
+        ready = st.session_state.get("_export_csv_ready")
+        if ready and ready[0] == scores_key:
+            path = ready[1]
+            st.download_button(
+                label=FI["export_csv"],
+                # Tiedosto säilyy uusia latauksia varten (poistetaan seuraavassa viennissä)
+                data=lambda: _read(path),
+                file_name="tqa_tulokset.csv",
+                mime="text/csv",
+                on_click="ignore",
+            )
+        elif st.button(FI["prepare_csv"], disabled=job_running("export")):
+            start_job(
+                "export",
+                f"export:{scores_key}",
+                FI["job_exporting"],
+                _export_job,
+                segments,
+                assessments,
+                seg_scores,
+                doc_score,
+                cache,
+                profile,
+                on_done=functools.partial(_on_export_done, scores_key),
+            )
+        render_job_progress("export")
+    with col_xlsx:
+        st.download_button(
+            label=FI["export_xlsx"],
+            data=lambda: _read_and_remove(
+                _write_xlsx(
+                    segments, assessments, seg_scores, doc_score, cache, profile
+                )
+            ),
+            file_name="tqa_raportti.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            on_click="ignore",
+        )
+    with col_parquet:
+        st.download_button(
+            label=FI["export_parquet"],
+            data=lambda: _read_and_remove(
+                _write_parquet(segments, assessments, seg_scores, cache, profile)
+            ),
+            file_name="tqa_virherivit.parquet",
+            mime="application/vnd.apache.parquet",
+            on_click="ignore",
+        )
 
     if doc_score:
         pf = FI["pass"] if doc_score.overall_pass_fail == "Pass" else FI["fail"]
@@ -38,117 +101,69 @@ def render_export_button():
         )
 
 
-def _generate_export_csv(segments, assessments, seg_scores, doc_score) -> str:
-    """Luo CSV-merkkijono: virherivit + kokonaistulokset."""
-    output = io.StringIO()
-    writer = csv.writer(output)
-
-    # ── Osa 1: Virhekohtaiset rivit ──
-    writer.writerow(
-        [
-            "Segmentti",
-            "Lähdeteksti",
-            "Kohdeteksti",
-            "Lähdekieli",
-            "Kohdekieli",
-            "Virhetyyppi",
-            "Vakavuusaste",
-            "Virhejakso",
-            "Selitys",
-            "Pisteet",
-            "Segmentin sanamäärä",
-            "Segmentin virhepistesumma",
-            "Yleiskommentti",
-        ]
+@traced("_generate_export_csv", size=lambda path, *args, **kwargs: os.path.getsize(path))
+def _generate_export_csv(
+    segments,
+    assessments,
+    seg_scores,
+    doc_score,
+    cache=None,
+    progress=None,
+    profile=None,
+) -> str:
+    """
+    Kirjoita CSV (virherivit + kokonaistulokset) väliaikaistiedostoon
+    paloittain ja palauta tiedoston polku.
+    """
+    return write_export_csv(
+        segments, assessments, seg_scores, doc_score, cache, progress, profile
     )
 
-    for seg, assessment, score in zip(segments, assessments, seg_scores):
-        comment = assessment.overall_comment or ""
-        if assessment.annotations:
-            for i, ann in enumerate(assessment.annotations):
-                penalty = SEVERITY_PENALTIES.get(ann.severity, 0)
-                writer.writerow(
-                    [
-                        seg.id,
-                        seg.source_text,
-                        seg.target_text,
-                        seg.source_lang,
-                        seg.target_lang,
-                        ann.error_type,
-                        ann.severity,
-                        ann.span,
-                        ann.explanation,
-                        penalty,
-                        score.word_count,
-                        score.total_penalty,
-                        comment if i == 0 else "",
-                    ]
-                )
-        else:
-            writer.writerow(
-                [
-                    seg.id,
-                    seg.source_text,
-                    seg.target_text,
-                    seg.source_lang,
-                    seg.target_lang,
-                    "",
-                    "",
-                    "",
-                    "",
-                    0,
-                    score.word_count,
-                    score.total_penalty,
-                    comment,
-                ]
-            )
 
-    # ── Osa 2: Kokonaistulokset ──
-    if doc_score:
-        writer.writerow([])
-        writer.writerow(["KOKONAISTULOKSET"])
-        writer.writerow([])
-
-        pf_fi = "Hyväksytty" if doc_score.overall_pass_fail == "Pass" else "Hylätty"
-        es_pf = "Hyväksytty" if doc_score.error_score_pass_fail == "Pass" else "Hylätty"
-        cr_pf = "Hyväksytty" if doc_score.critical_count_pass_fail == "Pass" else "Hylätty"
-        rating_info = FI["rating_descriptions"].get(
-            doc_score.quality_rating, ("", "")
-        )
+def _export_job(job, segments, assessments, seg_scores, doc_score, cache, profile):
+    return _generate_export_csv(
+        segments,
+        assessments,
+        seg_scores,
+        doc_score,
+        cache,
+        progress=job.report,
+        profile=profile,
+    )
 
-        writer.writerow(["Segmenttejä yhteensä", doc_score.total_segments])
-        writer.writerow(["Sanamäärä yhteensä", doc_score.total_word_count])
-        writer.writerow(["Virhepistesumma", doc_score.total_penalty])
-        writer.writerow([])
-        writer.writerow(["Virhepisteet / 1000 sanaa", f"{doc_score.error_score:.2f}"])
-        writer.writerow(["Virhepisteiden raja-arvo", "≤ 40"])
-        writer.writerow(["Virhepisteet", es_pf])
-        writer.writerow([])
-        writer.writerow(["Kriittiset virheet", doc_score.critical_error_count])
-        writer.writerow(["Kriittisten virheiden raja-arvo", "≤ 1"])
-        writer.writerow(["Kriittiset virheet", cr_pf])
-        writer.writerow([])
-        writer.writerow(["Kokonaistulos", pf_fi])
-        writer.writerow(
-            ["Laatuarvosana", f"{doc_score.quality_rating}/5 — {rating_info[0]}"]
-        )
-        writer.writerow(["Kuvaus", rating_info[1]])
-
-        # Virheet tyypeittäin
-        writer.writerow([])
-        writer.writerow(["VIRHEET TYYPEITTÄIN"])
-        writer.writerow(["Virhetyyppi", "Lukumäärä", "Virhepistesumma"])
-        for et, count in doc_score.error_type_counts.items():
-            fi_name = FI["error_type_names"].get(et, et)
-            penalty = doc_score.error_type_penalties.get(et, 0)
-            writer.writerow([fi_name, count, penalty])
-
-        # Virheet vakavuusasteittain
-        writer.writerow([])
-        writer.writerow(["VIRHEET VAKAVUUSASTEITTAIN"])
-        writer.writerow(["Vakavuusaste", "Lukumäärä"])
-        for sev, count in doc_score.severity_counts.items():
-            fi_name = FI["severity_names"].get(sev, sev)
-            writer.writerow([fi_name, count])
-
-    return output.getvalue()
+
+def _on_export_done(scores_key, job):
+    if job.status == DONE:
+        st.session_state["_export_csv_ready"] = (scores_key, job.result)
+    elif job.status == FAILED:
+        st.error(f"Virhe viennissä: {job.error}")
+
+
+def _write_xlsx(segments, assessments, seg_scores, doc_score, cache, profile) -> str:
+    # openpyxl tuodaan vasta viennissä
+    from exporters.xlsx_writer import write_export_xlsx
+
+    return write_export_xlsx(
+        segments, assessments, seg_scores, doc_score, cache, profile
+    )
+
+
+def _write_parquet(segments, assessments, seg_scores, cache, profile) -> str:
+    # pyarrow tuodaan vasta viennissä
+    from exporters.parquet_writer import write_export_parquet
+
+    return write_export_parquet(segments, assessments, seg_scores, cache, profile)
+
+
+def _read(path: str) -> bytes:
+    """Tiedoston sisältö; Streamlit lukee latauksen muistiin joka tapauksessa."""
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _read_and_remove(path: str) -> bytes:
+    """Väliaikaistiedoston sisältö; tiedosto poistetaan luettuaan."""
+    try:
+        return _read(path)
+    finally:
+        os.unlink(path)
@@ -0,0 +1,72 @@
+"""Taustatehtävät: käynnistys, edistymispalkki, peruutus ja tuloksen siirto."""
+
+from typing import Callable
+
+import streamlit as st
+
+from jobs.runner import Job, get_runner
+from i18n.fi import FI
+from ui.shared_project import session_id
+
+# Edistymisen päivitysväli sekunteina
+POLL_INTERVAL = 0.5
+
+
+def start_job(
+    slot: str,
+    key: str,
+    label: str,
+    fn: Callable,
+    *args,
+    on_done: Callable[[Job], None],
+    **kwargs,
+) -> Job:
+    """
+    Käynnistä fn(job, *args, **kwargs) taustalla.
+
+    slot nimeää tehtävän tässä sessiossa ("parse", "score", "export");
+    on_done kutsutaan skriptisäikeessä, kun tehtävä on päättynyt. Sessio
+    tilaa tehtävän; saman avaimen tehtävä jaetaan muiden sessioiden kanssa.
+    """
+    job = get_runner().submit(key, label, fn, *args, subscriber=session_id(), **kwargs)
+    st.session_state.setdefault("_jobs", {})[slot] = (job, on_done)
+    return job
+
+
+def job_running(slot: str) -> bool:
+    """Onko sessiolla keskeneräinen tehtävä tässä paikassa."""
+    return slot in st.session_state.get("_jobs", {})
+
+
+def collect_finished_jobs():
+    """Siirrä päättyneiden tehtävien tulokset session stateen."""
+    jobs = st.session_state.get("_jobs", {})
+    for slot, (job, on_done) in list(jobs.items()):
+        if job.finished:
+            del jobs[slot]
+            on_done(job)
+
+
+def render_job_progress(slot: str):
+    """Näytä edistymispalkki ja peruutuspainike, jos tehtävä on käynnissä."""
+    if job_running(slot):
+        _job_progress_fragment(slot)
+
+
+@st.fragment(run_every=POLL_INTERVAL)
+def _job_progress_fragment(slot: str):
+    entry = st.session_state.get("_jobs", {}).get(slot)
+    if entry is None:
+        return
+    job = entry[0]
+    if job.finished:
+        # Koko sovelluksen uusi kierros siirtää tuloksen
+        st.rerun()
+
+    st.progress(job.progress, text=f"{job.label} ({job.progress:.0%})")
+    if st.button(FI["cancel_job"], key=f"cancel_job_{slot}"):
+        # Peruu vain tämän session tilauksen; tehtävä pysähtyy, kun kaikki
+        # sitä odottavat sessiot ovat peruneet
+        job.cancel(session_id())
+        del st.session_state["_jobs"][slot]
+        st.rerun()
@@ -0,0 +1,99 @@
+"""Virhemuisti: aiemmissa arvioinneissa merkityt virheet ehdotuksina uusiin dokumentteihin."""
+
+import streamlit as st
+
+from models.session import load_session
+from qa.memory import MemoryMatch, get_memory
+from perf.memory import register_evictable
+from jobs.runner import DONE, FAILED
+from ui.jobs import job_running, start_job
+from i18n.fi import FI
+
+# Vapautetut osumat haetaan uudelleen: avain poistetaan osumien mukana
+register_evictable("_memory_matches", "_memory_key")
+
+
+def refresh_memory_matches(segments):
+    """Hae muistin osumat taustalla, kun dokumentti tai muisti on muuttunut."""
+    memory = get_memory()
+    if not len(memory):
+        return
+    key = f"memory:{id(segments)}:{memory.version}"
+    if st.session_state.get("_memory_key") == key or job_running("memory"):
+        return
+    st.session_state["_memory_key"] = key
+    start_job(
+        "memory",
+        key,
+        FI["job_memory"],
+        _memory_job,
+        segments,
+        on_done=_on_memory_done,
+    )
+
+
+def _memory_job(job, segments):
+    return get_memory().match_segments(segments, progress=job.report)
+
+
+def _on_memory_done(job):
+    if job.status == DONE:
+        st.session_state["_memory_matches"] = (job.key, job.result)
+    elif job.status == FAILED:
+        st.error(f"Odottamaton virhe: {job.error}")
+
+
+def segment_memory_matches(seg_idx: int, annotations) -> list[MemoryMatch]:
+    """Segmentin muistiosumat, joita ei ole jo merkitty virheiksi."""
+    cached = st.session_state.get("_memory_matches")
+    if cached is None or cached[0] != st.session_state.get("_memory_key"):
+        return []
+    existing = {(a.error_type, a.span.casefold()) for a in annotations}
+    return [
+        m
+        for m in cached[1].get(seg_idx, [])
+        if (m.entry.error_type, m.entry.span.casefold()) not in existing
+    ]
+
+
+def prefill_from_match(seg_idx: int, target_text: str, match: MemoryMatch):
+    """Täytä lisäyslomake muistiosuman tiedoilla seuraavalla kierroksella."""
+    span = match.entry.span
+    if match.start is not None:
+        # Virhejakso sellaisena kuin se esiintyy tässä käännöksessä
+        span = target_text[match.start : match.start + len(span)]
+    st.session_state[f"_prefill_{seg_idx}"] = match.entry.model_copy(
+        update={"span": span}
+    )
+
+
+def remember_session():
+    """Lisää nykyisen arvioinnin virheet muistiin (tallennuspainikkeen callback)."""
+    segments = st.session_state.get("segments") or []
+    assessments = st.session_state.get("assessments") or []
+    added = get_memory().add_session(segments, assessments)
+    if added:
+        st.toast(FI["memory_added"].format(n=added))
+
+
+def render_memory_import():
+    """Sivupalkin osio: muistin koko ja aiempien arviointien tuonti muistiin."""
+    with st.expander(FI["memory"], expanded=False):
+        memory = get_memory()
+        st.caption(FI["memory_size"].format(n=len(memory)))
+        files = st.file_uploader(
+            FI["memory_files_label"],
+            type=["json"],
+            accept_multiple_files=True,
+            help=FI["memory_help"],
+            key="memory_json_uploader",
+        )
+        if st.button(FI["memory_import"], key="memory_import_btn", disabled=not files):
+            try:
+                added = 0
+                for f in files:
+                    session = load_session(f)
+                    added += memory.add_session(session.segments, session.assessments)
+                st.success(FI["memory_added"].format(n=added))
+            except Exception as e:
+                st.error(f"Virhe ladattaessa: {e}")
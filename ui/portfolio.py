@@ -0,0 +1,247 @@
+"""Portfolionäkymä: usean arvioinnin yhteenvedot toimittajittain, kielipareittain ja kuukausittain."""
+
+import streamlit as st
+
+from models.session import load_session
+from perf.memory import register_evictable
+from i18n.fi import FI
+
+# Portfolio kootaan uudelleen, jos se vapautetaan muistipaineessa
+register_evictable("_portfolio")
+
+
+def render_portfolio():
+    """Renderoi portfolionäkymä tallennetuista arvioinneista."""
+    st.subheader(FI["portfolio_title"])
+    files = st.file_uploader(
+        FI["portfolio_files_label"],
+        type=["json"],
+        accept_multiple_files=True,
+        help=FI["portfolio_help"],
+        key="portfolio_uploader",
+    )
+    if not files:
+        st.info(FI["portfolio_empty"])
+        return
+
+    # pandas ja plotly tuodaan vasta kun portfoliota käytetään
+    import plotly.express as px
+    from assessment import portfolio as pf
+
+    portfolio = _get_portfolio(files)
+    settings = st.session_state.get("scoring_settings")
+
+    dimension_labels = {
+        "vendor": FI["vendor"],
+        "lang_pair": FI["lang_pair"],
+        "month": FI["month"],
+    }
+    by = st.selectbox(
+        FI["portfolio_group_by"],
+        pf.GROUP_DIMENSIONS,
+        format_func=dimension_labels.get,
+        key="portfolio_group_by",
+    )
+
+    docs = pf.with_outcomes(portfolio.docs, settings)
+    total_words = int(docs["words"].sum())
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric(FI["portfolio_documents"], len(docs))
+    with col2:
+        st.metric(FI["word_count"], total_words)
+    with col3:
+        overall = docs["penalty"].sum() / total_words * 1000 if total_words else 0.0
+        st.metric(FI["error_score"], f"{overall:.2f}")
+    with col4:
+        st.metric(FI["pass_rate"], f"{docs['passed'].mean():.0%}")
+
+    # Ryhmäkohtainen yhteenveto
+    summary = pf.group_summary(portfolio, by, settings)
+    st.dataframe(
+        summary.rename(columns=_column_labels(dimension_labels)),
+        use_container_width=True,
+        hide_index=True,
+    )
+
+    # Virhepisteiden kehitys kuukausittain
+    st.markdown(f"**{FI['error_score_trend']}**")
+    trend = pf.error_score_trend(portfolio, settings, by=by)
+    if len(trend):
+        fig = px.line(
+            trend,
+            x="month",
+            y="error_score",
+            color=None if by == "month" else by,
+            markers=True,
+            labels={
+                "month": FI["month"],
+                "error_score": FI["error_score"],
+                by: dimension_labels[by],
+            },
+        )
+        st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.caption(FI["portfolio_no_dates"])
+
+    # Hyväksymisaste ristiintaulukkona
+    if by != "month":
+        st.markdown(f"**{FI['pass_rate']}**")
+        st.dataframe(
+            pf.pass_rate_table(portfolio, by, "month", settings),
+            use_container_width=True,
+        )
+
+    # Eniten virhepisteitä tuottavat virhetyypit
+    st.markdown(f"**{FI['top_error_types']}**")
+    top = pf.top_error_types(portfolio, n=10)
+    top = top.assign(
+        error_type=top["error_type"].map(
+            lambda et: FI["error_type_names"].get(et, et)
+        )
+    )
+    fig_top = px.bar(
+        top,
+        x="error_type",
+        y="penalty",
+        labels={"error_type": FI["error_type"], "penalty": FI["penalty"]},
+    )
+    st.plotly_chart(fig_top, use_container_width=True)
+
+    st.divider()
+    _render_whatif(portfolio, settings)
+
+
+def _get_portfolio(files):
+    """Koosta portfolio; tulos säilytetään kunnes tiedostojoukko muuttuu."""
+    from assessment.portfolio import build_portfolio, session_record
+
+    file_key = tuple(f.file_id for f in files)
+    cached = st.session_state.get("_portfolio")
+    if cached is not None and cached[0] == file_key:
+        return cached[1]
+
+    records = [session_record(f.name, load_session(f)) for f in files]
+    portfolio = build_portfolio(records)
+    st.session_state["_portfolio"] = (file_key, portfolio)
+    return portfolio
+
+
+def _column_labels(dimension_labels: dict) -> dict:
+    return {
+        **dimension_labels,
+        "documents": FI["portfolio_documents"],
+        "words": FI["word_count"],
+        "penalty": FI["total_penalty_points"],
+        "critical": FI["critical_count"],
+        "passed": FI["pass"],
+        "error_score": FI["error_score"],
+        "pass_rate": FI["pass_rate"],
+    }
+
+
+def _render_whatif(portfolio, settings: dict | None):
+    """Entä jos -tarkastelu: raja-arvojen ruudukko koko arkistolle kerralla."""
+    import numpy as np
+    import pandas as pd
+    import plotly.express as px
+    from assessment import whatif
+    from assessment.scoring import CRITICAL_ERROR_MAX, ERROR_SCORE_THRESHOLD
+
+    st.subheader(FI["whatif_title"])
+    st.caption(FI["whatif_help"])
+
+    settings = settings or {}
+    current_pf = settings.get("pass_fail_threshold", ERROR_SCORE_THRESHOLD)
+    current_crit = settings.get("critical_error_max", CRITICAL_ERROR_MAX)
+    current_rt = settings.get("rating_thresholds", whatif.DEFAULT_RATING_THRESHOLDS)
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        pf_range = st.slider(
+            FI["pass_fail_threshold_label"],
+            min_value=0,
+            max_value=200,
+            value=(10, 80),
+            step=5,
+            key="whatif_pf_range",
+        )
+    with col2:
+        crit_range = st.slider(
+            FI["critical_error_max_label"],
+            min_value=0,
+            max_value=20,
+            value=(0, 5),
+            key="whatif_crit_range",
+        )
+    with col3:
+        factor_range = st.slider(
+            FI["whatif_rating_scale"],
+            min_value=0.25,
+            max_value=3.0,
+            value=(0.5, 2.0),
+            step=0.25,
+            key="whatif_rating_scale",
+        )
+
+    stats = whatif.SufficientStats.from_frame(portfolio.docs)
+    pf_values = list(range(pf_range[0], pf_range[1] + 1, 5))
+    crit_values = list(range(crit_range[0], crit_range[1] + 1))
+
+    # Hyväksymisaste jokaiselle raja-arvoparille
+    grid = whatif.pass_grid(stats, pf_values, crit_values)
+    fig = px.imshow(
+        grid.mean(axis=2).T,
+        x=[str(v) for v in pf_values],
+        y=[str(v) for v in crit_values],
+        labels={
+            "x": FI["pass_fail_threshold_label"],
+            "y": FI["critical_error_max_label"],
+            "color": FI["pass_rate"],
+        },
+        color_continuous_scale="RdYlGn",
+        zmin=0,
+        zmax=1,
+        aspect="auto",
+        origin="lower",
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+    # Muutos nykyisiin asetuksiin verrattuna valitulla parilla
+    col_pf, col_crit = st.columns(2)
+    with col_pf:
+        cand_pf = st.select_slider(
+            FI["pass_fail_threshold_label"],
+            options=pf_values,
+            value=min(pf_values, key=lambda v: abs(v - current_pf)),
+            key="whatif_pf_pick",
+        )
+    with col_crit:
+        cand_crit = st.select_slider(
+            FI["critical_error_max_label"],
+            options=crit_values,
+            value=min(crit_values, key=lambda v: abs(v - current_crit)),
+            key="whatif_crit_pick",
+        )
+    baseline = whatif.pass_grid(stats, [current_pf], [current_crit])[0, 0]
+    candidate = whatif.pass_grid(stats, [cand_pf], [cand_crit])[0, 0]
+    shift = whatif.outcome_shift(baseline, candidate)
+    st.markdown(
+        FI["whatif_shift"].format(
+            pass_to_fail=shift["pass_to_fail"], fail_to_pass=shift["fail_to_pass"]
+        )
+    )
+
+    # Laatuarvosanojen jakauma, kun arvosanarajoja skaalataan
+    factors = np.arange(factor_range[0], factor_range[1] + 0.001, 0.25)
+    threshold_sets = np.outer(factors, np.asarray(current_rt, dtype=float))
+    ratings = whatif.rating_grid(stats, threshold_sets)
+    distribution = whatif.rating_distribution(ratings)
+    frame = pd.DataFrame(
+        distribution,
+        index=[f"× {f:.2f}" for f in factors],
+        columns=[str(r) for r in range(1, 6)],
+    )
+    frame.index.name = FI["whatif_rating_scale"]
+    st.markdown(f"**{FI['whatif_rating_distribution']}**")
+    st.bar_chart(frame)
@@ -0,0 +1,91 @@
+"""Toistot: samanlaisten segmenttien ryhmät ja virheiden kopiointi toistoihin."""
+
+import streamlit as st
+
+from models.data_models import ErrorAnnotation, SegmentAssessment, TranslationSegment
+from perf.memory import register_evictable
+from ui.shared_project import update_assessment
+
+# Ryhmät lasketaan uudelleen, jos ne vapautetaan muistipaineessa
+register_evictable("_repetitions")
+
+
+def _groups(segments: list[TranslationSegment]) -> dict[int, list[int]]:
+    """Ryhmä -> ryhmän segmenttien indeksit; lasketaan kerran segmenttilistaa kohden."""
+    cached = st.session_state.get("_repetitions")
+    if cached is not None and cached[0] == id(segments):
+        return cached[1]
+
+    if any(s.repetition_group is None for s in segments):
+        # Vanhat tallennukset: ryhmät lasketaan kerran ja tallennetaan segmentteihin
+        from assessment.repetitions import segment_repetition_groups
+
+        for seg, group in zip(segments, segment_repetition_groups(segments)):
+            seg.repetition_group = group
+
+    groups = {}
+    for i, seg in enumerate(segments):
+        groups.setdefault(seg.repetition_group, []).append(i)
+    st.session_state["_repetitions"] = (id(segments), groups)
+    return groups
+
+
+def repetition_counts(segments: list[TranslationSegment]) -> list[int]:
+    """Kunkin segmentin ryhmän koko (1 = ei toistoja)."""
+    groups = _groups(segments)
+    return [len(groups[seg.repetition_group]) for seg in segments]
+
+
+def repetitions_of(segments: list[TranslationSegment], seg_idx: int) -> list[int]:
+    """Segmentin toistojen indeksit (ilman segmenttiä itseään)."""
+    group = _groups(segments)[segments[seg_idx].repetition_group]
+    return [i for i in group if i != seg_idx]
+
+
+def repetition_order(segments: list[TranslationSegment], indices) -> list[int]:
+    """Indeksit niin, että saman ryhmän segmentit ovat peräkkäin."""
+    _groups(segments)
+    if indices is None:
+        indices = range(len(segments))
+    return sorted(indices, key=lambda i: (segments[i].repetition_group, i))
+
+
+def propagate_annotation(
+    segments: list[TranslationSegment], seg_idx: int, annotation: ErrorAnnotation
+) -> tuple[int, int]:
+    """
+    Kopioi virhe segmentin toistoihin, joiden käännöksessä virhejakso esiintyy.
+    Palauttaa (lisätyt, ohitetut).
+    """
+    added = skipped = 0
+    for i in repetitions_of(segments, seg_idx):
+        target = segments[i].target_text
+        if annotation.start is not None and target.startswith(
+            annotation.span, annotation.start
+        ):
+            start = annotation.start
+        else:
+            start = target.find(annotation.span)
+        if start < 0:
+            skipped += 1
+            continue
+        copy = annotation.model_copy(
+            update={"start": start, "end": start + len(annotation.span)}
+        )
+
+        def add(assessment: SegmentAssessment, copy=copy) -> bool:
+            if any(
+                a.error_type == copy.error_type
+                and a.span == copy.span
+                and a.start in (None, copy.start)
+                for a in assessment.annotations
+            ):
+                return False
+            assessment.annotations.append(copy)
+            return True
+
+        # Toistoja ei ole näytetty, joten versiota ei tarkisteta; kaksoiskappaleet
+        # tunnistetaan muutoksen sisällä
+        if update_assessment(i, add, checked=False):
+            added += 1
+    return added, skipped
@@ -0,0 +1,148 @@
+"""Otantatarkastus: otoksen arvonta, segmenttien rajaus ja virhepisteiden luottamusväli."""
+
+import streamlit as st
+
+from assessment.scoring import ERROR_SCORE_THRESHOLD, segment_word_count
+from i18n.fi import FI
+
+# Luottamustasot, joista käyttäjä valitsee
+CONFIDENCE_LEVELS = [0.90, 0.95, 0.99]
+
+
+def sample_indices() -> list[int] | None:
+    """Otokseen arvottujen segmenttien indeksit tai None (koko dokumentti)."""
+    plan = st.session_state.get("sample_plan")
+    return plan.indices if plan is not None else None
+
+
+def reviewed_segments(segments, assessments):
+    """Tarkastettavat segmentit ja arvioinnit: otanta-tilassa vain otos."""
+    indices = sample_indices()
+    if indices is None:
+        return segments, assessments
+    return [segments[i] for i in indices], [assessments[i] for i in indices]
+
+
+def render_sampling_settings():
+    """Otannan asetukset sivupalkin expanderissa."""
+    segments = st.session_state.get("segments")
+    if not segments:
+        return
+
+    plan = st.session_state.get("sample_plan")
+    with st.expander(f"🎲 {FI['sampling']}", expanded=plan is not None):
+        if plan is not None:
+            st.caption(
+                FI["sample_active"].format(
+                    n=len(plan.indices), total=len(segments)
+                )
+            )
+        size = st.number_input(
+            FI["sample_size"],
+            min_value=1,
+            max_value=len(segments),
+            value=min(len(segments), 200),
+            step=10,
+            key="sample_size",
+        )
+        stratify = st.checkbox(
+            FI["sample_stratify"],
+            value=True,
+            help=FI["sample_stratify_help"],
+            key="sample_stratify",
+        )
+
+        col_draw, col_clear = st.columns(2)
+        with col_draw:
+            if st.button(FI["draw_sample"], key="draw_sample"):
+                # numpy tuodaan vasta kun otos arvotaan
+                from assessment.sampling import draw_sample
+
+                _set_plan(
+                    draw_sample(
+                        [segment_word_count(s) for s in segments],
+                        int(size),
+                        stratify=stratify,
+                    )
+                )
+                st.rerun()
+        with col_clear:
+            if st.button(
+                FI["clear_sample"], key="clear_sample", disabled=plan is None
+            ):
+                _set_plan(None)
+                st.rerun()
+
+
+def _set_plan(plan):
+    """Vaihda otos; vanhat pisteet ja segmentin valinta eivät enää päde."""
+    st.session_state["sample_plan"] = plan
+    st.session_state["segment_scores"] = None
+    st.session_state["document_score"] = None
+    st.session_state.pop("segment_selector", None)
+
+
+def render_sample_estimate(seg_scores):
+    """Koko dokumentin virhepisteiden arvio otoksesta luottamusväleineen."""
+    plan = st.session_state.get("sample_plan")
+    if plan is None:
+        return
+    # Pisteiden on oltava juuri tämän otoksen segmenteille, samassa järjestyksessä
+    if list(seg_scores.indices) != list(plan.indices):
+        st.info(FI["sample_rescore"])
+        return
+
+    from assessment.sampling import estimate_error_score
+
+    st.subheader(FI["sample_estimate"])
+    col_method, col_conf = st.columns(2)
+    with col_method:
+        method = st.radio(
+            FI["sample_method"],
+            ["bootstrap", "analytical"],
+            format_func=lambda m: FI["sample_methods"][m],
+            horizontal=True,
+            key="sample_method",
+        )
+    with col_conf:
+        confidence = st.select_slider(
+            FI["sample_confidence"],
+            options=CONFIDENCE_LEVELS,
+            value=0.95,
+            format_func=lambda c: f"{c:.0%}",
+            key="sample_confidence",
+        )
+
+    settings = st.session_state.get("scoring_settings") or {}
+    threshold = settings.get("pass_fail_threshold", ERROR_SCORE_THRESHOLD)
+    estimate = estimate_error_score(
+        plan,
+        seg_scores.penalties,
+        seg_scores.word_counts,
+        threshold,
+        method=method,
+        confidence=confidence,
+        seed=plan.seed,
+    )
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric(FI["sample_error_score"], f"{estimate.error_score:.2f}")
+    with col2:
+        st.metric(
+            FI["sample_interval"].format(confidence=confidence),
+            f"{estimate.ci_low:.2f} – {estimate.ci_high:.2f}",
+        )
+    with col3:
+        st.metric(
+            FI["pass_probability"],
+            f"{estimate.pass_probability:.0%}",
+            help=FI["pass_probability_help"].format(threshold=threshold),
+        )
+    with col4:
+        coverage = (
+            estimate.sample_words / estimate.population_words
+            if estimate.population_words
+            else 0.0
+        )
+        st.metric(FI["sample_coverage"], f"{coverage:.0%}")
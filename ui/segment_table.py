@@ -3,8 +3,13 @@
 import streamlit as st
 
 from models.data_models import TranslationSegment, SegmentAssessment
+from perf.trace import traced
+from ui.repetitions import repetition_counts
 from i18n.fi import FI
 
+# Riskipisteet, joista alkaen segmentti merkitään punaisella
+RISK_HIGH = 3.0
+
 
 def _escape_html(text: str) -> str:
     return (
@@ -15,14 +20,41 @@ def _escape_html(text: str) -> str:
     )
 
 
+def _risk_badge(risk: float | None) -> str:
+    """Riskipisteet väritettynä: punainen >= RISK_HIGH, oranssi > 0."""
+    if risk is None:
+        return "<span style='color:#999;'>–</span>"
+    if risk >= RISK_HIGH:
+        color = "#ff4b4b"
+    elif risk > 0:
+        color = "#f39c12"
+    else:
+        return f"<span style='color:#999;'>{risk:g}</span>"
+    return (
+        f"<span style='background:{color};color:white;padding:2px 8px;"
+        f"border-radius:10px;font-size:0.85em;'>{risk:g}</span>"
+    )
+
+
+@traced(
+    "render_segment_table",
+    size=lambda _, segments, assessments, indices=None: len(
+        segments if indices is None else indices
+    ),
+)
 def render_segment_table(
     segments: list[TranslationSegment],
     assessments: list[SegmentAssessment],
+    indices: list[int] | None = None,
 ) -> int | None:
     """
     Renderoi segmenttitaulukko ja segmentin valinta.
+    Jos indices on annettu (otantatarkastus), näytetään vain ne segmentit.
     Palauttaa valitun rivin indeksin tai None.
     """
+    if indices is None:
+        indices = range(len(segments))
+
     # HTML-taulukko word wrap -tuella
     header = (
         f"<tr>"
@@ -34,11 +66,16 @@ def render_segment_table(
         f"background:#f8f9fa;'>{FI['target_col']}</th>"
         f"<th style='padding:8px 12px;text-align:center;border-bottom:2px solid #ddd;"
         f"background:#f8f9fa;white-space:nowrap;'>{FI['errors_col']}</th>"
+        f"<th style='padding:8px 12px;text-align:center;border-bottom:2px solid #ddd;"
+        f"background:#f8f9fa;white-space:nowrap;'>{FI['risk_col']}</th>"
         f"</tr>"
     )
 
+    counts = repetition_counts(segments)
+
     rows_html = []
-    for i, seg in enumerate(segments):
+    for row, i in enumerate(indices):
+        seg = segments[i]
         error_count = len(assessments[i].annotations) if i < len(assessments) else 0
         error_badge = (
             f"<span style='background:#ff4b4b;color:white;padding:2px 8px;"
@@ -46,12 +83,19 @@ def render_segment_table(
             if error_count > 0
             else f"<span style='color:#999;'>0</span>"
         )
-        bg = "#ffffff" if i % 2 == 0 else "#f9f9fb"
+        risk_badge = _risk_badge(seg.risk)
+        repeat_badge = (
+            f"<br><span title='{FI['repetitions_title']}' style='color:#6c5ce7;"
+            f"font-size:0.8em;font-weight:400;'>×{counts[i]}</span>"
+            if counts[i] > 1
+            else ""
+        )
+        bg = "#ffffff" if row % 2 == 0 else "#f9f9fb"
         rows_html.append(
             f"<tr style='background:{bg};'>"
             f"<td style='padding:8px 12px;border-bottom:1px solid #eee;"
             f"vertical-align:top;white-space:nowrap;font-weight:600;'>"
-            f"{_escape_html(str(seg.id))}</td>"
+            f"{_escape_html(str(seg.id))}{repeat_badge}</td>"
             f"<td style='padding:8px 12px;border-bottom:1px solid #eee;"
             f"vertical-align:top;word-wrap:break-word;'>"
             f"{_escape_html(seg.source_text)}</td>"
@@ -61,6 +105,9 @@ def render_segment_table(
             f"<td style='padding:8px 12px;border-bottom:1px solid #eee;"
             f"vertical-align:top;text-align:center;'>"
             f"{error_badge}</td>"
+            f"<td style='padding:8px 12px;border-bottom:1px solid #eee;"
+            f"vertical-align:top;text-align:center;'>"
+            f"{risk_badge}</td>"
             f"</tr>"
         )
 
@@ -74,6 +121,7 @@ def render_segment_table(
         f"<col style='width:45%;'>"
         f"<col style='width:45%;'>"
         f"<col style='width:70px;'>"
+        f"<col style='width:70px;'>"
         f"</colgroup>"
         f"<thead>{header}</thead>"
         f"<tbody>{''.join(rows_html)}</tbody>"
@@ -85,7 +133,7 @@ def render_segment_table(
     # Segmentin valinta selectboxilla
     selected = st.selectbox(
         FI.get("select_segment_label", "Valitse segmentti"),
-        options=range(len(segments)),
+        options=indices,
         format_func=lambda i: f"{segments[i].id} — {segments[i].target_text}",
         key="segment_selector",
         index=None,
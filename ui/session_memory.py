@@ -0,0 +1,38 @@
+"""Session muistinkäytön kirjanpito kierroksen lopussa."""
+
+import functools
+
+from streamlit.runtime import Runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from perf.memory import get_accountant
+from ui.shared_project import current_project, session_id
+
+# Jaetun projektin segmentit ja arvioinnit ovat projektivaraston omia:
+# ne lasketaan solmulle kerran, vaikka useampi sessio käyttää niitä
+SHARED_KEYS = {"segments", "assessments"}
+
+
+def track_session_memory():
+    """
+    Kirjaa session tilan koko avaimittain; ylitys merkitsee johdettua dataa
+    vapautettavaksi. Session omat merkityt avaimet poistetaan tässä, session
+    omassa säikeessä, ennen mittausta.
+    """
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return
+    state = ctx.session_state
+    shared = SHARED_KEYS if current_project() is not None else set()
+    get_accountant().account(
+        session_id(),
+        state,
+        state.filtered_state,
+        alive=functools.partial(_session_open, ctx.session_id),
+        shared=shared,
+    )
+
+
+def _session_open(runtime_session_id: str) -> bool:
+    # Ilman Streamlit-palvelinta (AppTest) sessio on auki niin kauan kuin sitä ajetaan
+    return not Runtime.exists() or Runtime.instance().is_active_session(runtime_session_id)
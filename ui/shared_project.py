@@ -0,0 +1,183 @@
+"""Jaettu projekti: segmentit ja arvioinnit palvelimella kaikkien sessioiden yhteisinä."""
+
+import uuid
+from typing import Callable
+
+import streamlit as st
+
+from models.data_models import SegmentAssessment, TranslationSegment
+from projects.store import Project, VersionConflict, get_store
+from i18n.fi import FI
+
+# Muiden tarkastajien muutosten tarkistusväli sekunteina
+POLL_INTERVAL = 3.0
+
+
+def session_id() -> str:
+    """Tämän selainsession tunniste projektien muutoslokissa."""
+    if "_session_id" not in st.session_state:
+        st.session_state["_session_id"] = uuid.uuid4().hex
+    return st.session_state["_session_id"]
+
+
+def open_project(
+    name: str,
+    segments: list[TranslationSegment],
+    assessments: list[SegmentAssessment] | None = None,
+):
+    """Avaa dokumentti uutena jaettuna projektina ja ota se tämän session käyttöön."""
+    _use_project(get_store().open(name, segments, assessments))
+
+
+def join_project(project_id: str) -> bool:
+    """Liity toisen session avaamaan projektiin; False, jos sitä ei enää ole."""
+    project = get_store().get(project_id)
+    if project is None:
+        return False
+    _use_project(project)
+    return True
+
+
+def _use_project(project: Project):
+    previous = current_project()
+    if previous is not None:
+        previous.leave(session_id())
+    project.touch(session_id())
+    st.session_state["project_id"] = project.id
+    st.session_state["segments"] = project.segments
+    st.session_state["assessments"] = project.assessments
+    st.session_state["_project_version"] = project.version
+    st.session_state["_seen_versions"] = {}
+    st.session_state["_edit_base"] = {}
+
+
+def current_project() -> Project | None:
+    """Session projekti, jos session segmentit ovat jaetusta projektista."""
+    project = get_store().get(st.session_state.get("project_id"))
+    if project is None or st.session_state.get("segments") is not project.segments:
+        return None
+    return project
+
+
+def begin_edit(seg_idx: int, assessment: SegmentAssessment) -> SegmentAssessment:
+    """
+    Segmentin arviointi näytettäväksi paneelissa. Jaetussa projektissa
+    arviointi ja sen versio luetaan yhdessä; tällä kierroksella painetut
+    painikkeet perustuvat edellisellä kierroksella näytettyyn versioon.
+    """
+    project = current_project()
+    if project is None:
+        return assessment
+    assessment, version = project.snapshot(seg_idx)
+    seen = st.session_state.setdefault("_seen_versions", {})
+    st.session_state.setdefault("_edit_base", {})[seg_idx] = seen.get(seg_idx, version)
+    seen[seg_idx] = version
+    return assessment
+
+
+def shown_version(seg_idx: int) -> int | None:
+    """Segmentin versio, joka näytettiin viimeksi (None ilman jaettua projektia)."""
+    return st.session_state.get("_seen_versions", {}).get(seg_idx)
+
+
+def assessments_version() -> tuple[str, int]:
+    """
+    Arviointien versio: muuttuu jokaisessa muutoksessa (myös muiden
+    tarkastajien) ja dokumentin vaihtuessa. Pisteet ja valmis vienti
+    pätevät vain sille versiolle, josta ne laskettiin.
+    """
+    project = current_project()
+    if project is None:
+        return session_id(), st.session_state.get("_assessments_version", 0)
+    return project.id, project.version
+
+
+def update_assessment(
+    seg_idx: int,
+    change: Callable[[SegmentAssessment], bool | None],
+    checked: bool = True,
+    base: int | None = None,
+) -> bool:
+    """
+    Muuta segmentin arviointia. Jaetussa projektissa muutos tehdään
+    versiotarkistuksella (checked): jos toinen tarkastaja on muuttanut
+    segmenttiä näytetyn version jälkeen, muutos hylätään. base on
+    muutoksen pohjana näytetty versio, jos se tunnetaan (komponentin
+    callback ajetaan ennen begin_edit-kutsua). Palauttaa False, jos
+    muutosta ei tehty (hylätty tai change palautti False).
+    """
+    project = current_project()
+    if project is None:
+        if change(st.session_state["assessments"][seg_idx]) is False:
+            return False
+        st.session_state["_assessments_version"] = (
+            st.session_state.get("_assessments_version", 0) + 1
+        )
+        return True
+    expected = None
+    if checked:
+        expected = base if base is not None else st.session_state.get("_edit_base", {}).get(seg_idx)
+    try:
+        version = project.update(seg_idx, change, session_id(), expected)
+    except VersionConflict:
+        st.session_state["_project_notice"] = FI["shared_conflict"]
+        return False
+    if version is None:
+        return False
+    if checked:
+        st.session_state.setdefault("_edit_base", {})[seg_idx] = version
+        st.session_state.setdefault("_seen_versions", {})[seg_idx] = version
+    return True
+
+
+def render_project_updates():
+    """Seuraa muiden tarkastajien muutoksia taustalla ja näytä ilmoitukset."""
+    notice = st.session_state.pop("_project_notice", None)
+    if notice:
+        st.toast(notice)
+    if current_project() is not None:
+        _project_updates_fragment()
+
+
+@st.fragment(run_every=POLL_INTERVAL)
+def _project_updates_fragment():
+    project = current_project()
+    if project is None:
+        return
+    me = session_id()
+    project.touch(me)
+    last = st.session_state.get("_project_version", 0)
+    if project.version == last:
+        return
+    changes = project.changes_since(last)
+    st.session_state["_project_version"] = project.version
+    others = None if changes is None else {c.seg_idx for c in changes if c.author != me}
+    if others is None or others:
+        st.session_state["_project_notice"] = FI["shared_changed"].format(
+            n=len(others) if others is not None else FI["shared_many"]
+        )
+        # Koko sivu uudelleen, jotta taulukko ja paneeli näyttävät muutokset
+        st.rerun()
+
+
+def render_project_list():
+    """Sivupalkin osio: nykyinen projekti ja liittyminen muiden avaamiin projekteihin."""
+    with st.expander(FI["shared_projects"], expanded=False):
+        project = current_project()
+        if project is not None:
+            st.caption(
+                FI["shared_current"].format(
+                    name=project.name, id=project.id, n=project.members()
+                )
+            )
+        others = [p for p in get_store().projects() if project is None or p.id != project.id]
+        if not others:
+            st.caption(FI["shared_none"])
+            return None
+        for p in others:
+            label = FI["shared_entry"].format(
+                name=p.name, segments=len(p.segments), n=p.members()
+            )
+            if st.button(label, key=f"join_project_{p.id}", help=FI["shared_join_help"]):
+                return p.id
+        return None
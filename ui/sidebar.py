@@ -1,15 +1,27 @@
 """Sivupalkki: tiedoston lataus, kielivalinta, tallennus/lataus."""
 
+import hashlib
+import io
 import json
+from datetime import date
 
 import streamlit as st
 
 from parsers.excel_parser import parse_excel
-from models.data_models import SegmentAssessment, TranslationSegment
+from models.session import SessionData, load_session, session_to_json
+from assessment.merge import merge_sessions
+from assessment.profiles import DEFAULT_PROFILE, get_profile, load_profiles
+from jobs.runner import DONE, FAILED
+from ui.jobs import render_job_progress, start_job
+from ui.dev_panel import render_dev_panel
+from ui.memory import remember_session, render_memory_import
+from ui.sampling import render_sampling_settings, sample_indices
+from ui.shared_project import join_project, open_project, render_project_list
 from assessment.scoring import (
     ERROR_SCORE_THRESHOLD,
     CRITICAL_ERROR_MAX,
     QUALITY_RATING_THRESHOLDS,
+    score_assessments,
 )
 from i18n.fi import FI
 
@@ -38,6 +50,7 @@ SUPPORTED_LANGUAGES = [
     "kiina (yksinkertaistettu)",
     "kiina (perinteinen)",
     "korea",
+    "thai",
     "venäjä",
     "arabia",
     "hindi",
@@ -60,6 +73,9 @@ def render_sidebar():
         st.session_state["source_lang"] = source_lang
         st.session_state["target_lang"] = target_lang
 
+        # Projektin tiedot portfolioraportointia varten
+        _render_project_info()
+
         st.divider()
 
         # Tiedoston lataus
@@ -72,38 +88,130 @@ def render_sidebar():
 
         if uploaded_file is not None:
             current_file = st.session_state.get("_uploaded_filename")
+            # Peruutettu tiedosto jäsennetään vasta, kun se valitaan uudelleen
+            cancelled = st.session_state.get("_cancelled_upload")
+            if cancelled is not None and cancelled != uploaded_file.file_id:
+                del st.session_state["_cancelled_upload"]
+                current_file = None
             if current_file != uploaded_file.name:
                 _handle_upload(uploaded_file, source_lang, target_lang)
                 st.session_state["_uploaded_filename"] = uploaded_file.name
+                st.session_state["_upload_id"] = uploaded_file.file_id
+        render_job_progress("parse")
+
+        # Muiden tarkastajien avaamat projektit
+        joined = render_project_list()
+        if joined is not None and join_project(joined):
+            _reset_document_state()
+            st.rerun()
+
+        # Termistö automaattista tarkistusta varten
+        _render_glossary(source_lang, target_lang)
 
         st.divider()
 
         # Pisteytysasetukset
         _render_scoring_settings()
 
+        # Otantatarkastus
+        render_sampling_settings()
+
         st.divider()
 
         # Tallennus ja lataus
         _render_save_load()
 
+        # Suorituskykypaneeli kehittäjille (TQA_DEV=1 tai ?dev=<TQA_DEV_TOKEN>)
+        render_dev_panel()
+
 
 def _handle_upload(uploaded_file, source_lang: str, target_lang: str):
-    """Käsittele ladattu Excel-tiedosto."""
-    try:
-        segments = parse_excel(uploaded_file, source_lang, target_lang)
-        st.session_state["segments"] = segments
-        # Luo tyhjat arvioinnit jokaiselle segmentille
-        st.session_state["assessments"] = [
-            SegmentAssessment(annotations=[], overall_comment="")
-            for _ in segments
-        ]
-        st.session_state["segment_scores"] = None
-        st.session_state["document_score"] = None
-        st.success(f"{len(segments)} {FI['segments_loaded']}")
-    except ValueError as e:
-        st.error(f"Virhe: {e}")
-    except Exception as e:
-        st.error(f"Odottamaton virhe: {e}")
+    """Käynnistä ladatun Excel-tiedoston jäsennys taustalla."""
+    data = uploaded_file.getvalue()
+    digest = hashlib.sha1(data).hexdigest()
+    start_job(
+        "parse",
+        f"parse:{digest}:{source_lang}:{target_lang}",
+        FI["job_parsing"],
+        _parse_job,
+        data,
+        source_lang,
+        target_lang,
+        on_done=_on_parse_done,
+    )
+
+
+def _parse_job(job, data: bytes, source_lang: str, target_lang: str):
+    return parse_excel(io.BytesIO(data), source_lang, target_lang, progress=job.report)
+
+
+def _on_parse_done(job):
+    """Siirrä jäsennetyt segmentit session stateen."""
+    if job.status == DONE:
+        segments = job.result
+        # Uusi jaettu projekti tyhjin arvioinnein
+        open_project(st.session_state.get("_uploaded_filename", ""), segments)
+        _reset_document_state()
+        st.toast(f"{len(segments)} {FI['segments_loaded']}")
+    elif job.status == FAILED:
+        if isinstance(job.error, ValueError):
+            st.error(f"Virhe: {job.error}")
+        else:
+            st.error(f"Odottamaton virhe: {job.error}")
+    else:
+        # Peruutettu: ei uutta jäsennystä ennen kuin tiedosto valitaan uudelleen
+        st.session_state["_cancelled_upload"] = st.session_state.get("_upload_id")
+
+
+def _reset_document_state():
+    """Tyhjennä edellisen dokumentin pisteet, otos ja ehdotukset."""
+    st.session_state["segment_scores"] = None
+    st.session_state["document_score"] = None
+    st.session_state["sample_plan"] = None
+    st.session_state["suggestions"] = {}
+    st.session_state.pop("_suggestion_decisions", None)
+
+
+def _render_glossary(source_lang: str, target_lang: str):
+    """Termistön (CSV tai TBX) lataus; käännetään automaatiksi heti validointia varten."""
+    from qa.glossary import compile_glossary
+
+    with st.expander(FI["glossary"], expanded=False):
+        glossary_file = st.file_uploader(
+            FI["glossary_label"],
+            type=["csv", "tbx"],
+            help=FI["glossary_help"],
+            key="glossary_uploader",
+        )
+        if glossary_file is None:
+            st.session_state.pop("glossary", None)
+            return
+        data = glossary_file.getvalue()
+        try:
+            glossary = compile_glossary(
+                data, glossary_file.name, source_lang, target_lang
+            )
+        except (ValueError, UnicodeDecodeError, SyntaxError) as e:
+            st.session_state.pop("glossary", None)
+            st.error(f"Virhe termistössä: {e}")
+            return
+        st.session_state["glossary"] = (glossary_file.name, data)
+        st.caption(FI["glossary_loaded"].format(n=len(glossary)))
+
+
+def _render_project_info():
+    """Toimittaja ja toimituspäivä, tallennetaan arvioinnin mukana."""
+    # Ladatun arvioinnin tiedot asetetaan ENNEN widgettien luomista
+    loaded = st.session_state.pop("_load_project_info", None)
+    if loaded is not None:
+        vendor, delivered = loaded
+        st.session_state["project_vendor"] = vendor
+        st.session_state["project_delivered"] = (
+            date.fromisoformat(delivered) if delivered else None
+        )
+
+    st.text_input(FI["vendor"], key="project_vendor")
+    st.date_input(FI["delivered"], value=None, key="project_delivered")
 
 
 def _get_scoring_settings() -> dict:
@@ -139,7 +247,26 @@ def _render_scoring_settings():
     if "crit_max" not in st.session_state:
         st.session_state["crit_max"] = int(settings["critical_error_max"])
 
+    # Ladatun arvioinnin profiili asetetaan ENNEN valintalistan luomista
+    loaded_profile = st.session_state.pop("_load_scoring_profile", None)
+    if loaded_profile is not None:
+        st.session_state["scoring_profile"] = loaded_profile
+    profiles = load_profiles()
+    if st.session_state.get("scoring_profile") not in profiles:
+        st.session_state["scoring_profile"] = DEFAULT_PROFILE
+
     with st.expander(f"⚙️ {FI['scoring_settings']}", expanded=False):
+        # Pisteytysprofiili (virhetyypit, vakavuusasteet ja painot)
+        st.selectbox(
+            FI["scoring_profile"],
+            list(profiles),
+            format_func=lambda name: profiles[name].label,
+            key="scoring_profile",
+            help=FI["scoring_profile_help"],
+        )
+
+        st.divider()
+
         # Arvosanarajat
         new_rt = []
         for i, (rating, _) in enumerate([(5, rt[0]), (4, rt[1]), (3, rt[2]), (2, rt[3])]):
@@ -189,6 +316,22 @@ def _render_scoring_settings():
             st.rerun()
 
 
+def _with_current_score(session: SessionData, indices: list[int] | None) -> SessionData:
+    """Tallennettava arviointi pisteineen (otantatarkastuksessa otoksen pisteet)."""
+    segments, assessments = session.segments, session.assessments
+    if indices is not None:
+        segments = [segments[i] for i in indices]
+        assessments = [assessments[i] for i in indices]
+    _, doc_score = score_assessments(
+        segments,
+        assessments,
+        session.scoring_settings,
+        profile=get_profile(session.scoring_profile),
+        indices=indices,
+    )
+    return session.model_copy(update={"document_score": doc_score})
+
+
 def _render_save_load():
     """Tallenna arviointi JSON:na ja lataa aiempi arviointi."""
     segments = st.session_state.get("segments")
@@ -196,20 +339,33 @@ def _render_save_load():
 
     # Tallenna
     if segments and assessments:
-        save_data = {
-            "version": 2,
-            "source_lang": st.session_state.get("source_lang", ""),
-            "target_lang": st.session_state.get("target_lang", ""),
-            "segments": [seg.model_dump() for seg in segments],
-            "assessments": [asmt.model_dump() for asmt in assessments],
-            "scoring_settings": _get_scoring_settings(),
-        }
+        delivered = st.session_state.get("project_delivered")
+        session = SessionData(
+            source_lang=st.session_state.get("source_lang", ""),
+            target_lang=st.session_state.get("target_lang", ""),
+            segments=segments,
+            assessments=assessments,
+            scoring_settings=_get_scoring_settings(),
+            scoring_profile=st.session_state.get("scoring_profile", DEFAULT_PROFILE),
+            vendor=st.session_state.get("project_vendor", ""),
+            delivered=delivered.isoformat() if delivered else "",
+            sample=st.session_state.get("sample_plan"),
+        )
+        # Pisteytetyn arvioinnin pisteet lasketaan tallennushetken virheistä:
+        # session pisteet ovat vanhentuneet, jos virheitä on muutettu sen jälkeen
+        scored = st.session_state.get("document_score") is not None
+        indices = sample_indices()
         st.download_button(
             label=FI["save_session"],
-            data=json.dumps(save_data, ensure_ascii=False, indent=2),
+            # JSON luodaan vasta painettaessa, ei jokaisella kierroksella muistiin
+            data=lambda: session_to_json(
+                _with_current_score(session, indices) if scored else session
+            ),
             file_name="tqa_arviointi.json",
             mime="application/json",
             help=FI["save_help"],
+            # Tallennetut virheet lisätään virhemuistiin
+            on_click=remember_session,
         )
 
     st.divider()
@@ -228,33 +384,80 @@ def _render_save_load():
             _handle_load(loaded_file)
             st.session_state["_loaded_filename"] = loaded_file.name
 
+    st.divider()
+
+    # Usean tarkastajan arviointien yhdistäminen
+    _render_merge()
+
+    # Virhemuisti aiemmista arvioinneista
+    render_memory_import()
+
 
 def _handle_load(json_file):
     """Lataa tallennettu arviointi JSON-tiedostosta."""
     try:
-        data = json.load(json_file)
-        segments = [TranslationSegment(**s) for s in data["segments"]]
-        assessments = [SegmentAssessment(**a) for a in data["assessments"]]
-        st.session_state["segments"] = segments
-        st.session_state["assessments"] = assessments
-        st.session_state["segment_scores"] = None
-        st.session_state["document_score"] = None
-
-        # Lataa pisteytysasetukset (yhteensopivuus vanhojen tiedostojen kanssa)
-        loaded_settings = data.get("scoring_settings")
-        if loaded_settings:
-            st.session_state["scoring_settings"] = loaded_settings
-            # Päivitä widgettien arvot
-            rt = loaded_settings.get("rating_thresholds", DEFAULT_SCORING_SETTINGS["rating_thresholds"])
-            for rating, val in zip([5, 4, 3, 2], rt):
-                st.session_state[f"rating_thresh_{rating}"] = val
-            st.session_state["pf_threshold"] = loaded_settings.get(
-                "pass_fail_threshold", DEFAULT_SCORING_SETTINGS["pass_fail_threshold"]
-            )
-            st.session_state["crit_max"] = loaded_settings.get(
-                "critical_error_max", DEFAULT_SCORING_SETTINGS["critical_error_max"]
-            )
-
+        _apply_session(load_session(json_file), json_file.name)
         st.success(FI["load_success"])
     except Exception as e:
         st.error(f"Virhe ladattaessa: {e}")
+
+
+def _apply_session(session: SessionData, name: str):
+    """Avaa arvioinnin segmentit ja virheet projektina ja aseta asetukset session stateen."""
+    open_project(name, session.segments, session.assessments)
+    _reset_document_state()
+    st.session_state["sample_plan"] = session.sample
+    st.session_state["_load_project_info"] = (session.vendor, session.delivered)
+    st.session_state["_load_scoring_profile"] = session.scoring_profile
+
+    # Lataa pisteytysasetukset (yhteensopivuus vanhojen tiedostojen kanssa)
+    loaded_settings = session.scoring_settings
+    if loaded_settings:
+        st.session_state["scoring_settings"] = loaded_settings
+        # Päivitä widgettien arvot
+        rt = loaded_settings.get("rating_thresholds", DEFAULT_SCORING_SETTINGS["rating_thresholds"])
+        for rating, val in zip([5, 4, 3, 2], rt):
+            st.session_state[f"rating_thresh_{rating}"] = val
+        st.session_state["pf_threshold"] = loaded_settings.get(
+            "pass_fail_threshold", DEFAULT_SCORING_SETTINGS["pass_fail_threshold"]
+        )
+        st.session_state["crit_max"] = loaded_settings.get(
+            "critical_error_max", DEFAULT_SCORING_SETTINGS["critical_error_max"]
+        )
+
+
+def _render_merge():
+    """Yhdistä saman dokumentin arvioinnit usealta tarkastajalta."""
+    with st.expander(FI["merge_sessions"], expanded=False):
+        files = st.file_uploader(
+            FI["merge_files_label"],
+            type=["json"],
+            accept_multiple_files=True,
+            help=FI["merge_help"],
+            key="merge_json_uploader",
+        )
+        if st.button(FI["merge_button"], key="merge_btn", disabled=len(files or []) < 2):
+            try:
+                merged, report = merge_sessions([load_session(f) for f in files])
+                _apply_session(merged, ", ".join(f.name for f in files))
+                st.session_state["merge_report"] = report
+            except Exception as e:
+                st.error(f"Virhe yhdistettäessä: {e}")
+
+        report = st.session_state.get("merge_report")
+        if report is not None:
+            st.success(
+                FI["merge_summary"].format(
+                    reviewers=report.reviewer_count,
+                    segments=report.segment_count,
+                    duplicates=report.duplicate_count,
+                    conflicts=len(report.conflicts),
+                )
+            )
+            if report.conflicts:
+                st.download_button(
+                    label=FI["merge_report_download"],
+                    data=json.dumps(report.model_dump(), ensure_ascii=False, indent=2),
+                    file_name="tqa_ristiriidat.json",
+                    mime="application/json",
+                )